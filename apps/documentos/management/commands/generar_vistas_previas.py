@@ -0,0 +1,47 @@
+"""
+Genera las vistas previas pendientes de entregables y documentos.
+
+Uso: python manage.py generar_vistas_previas [--fallidas] [--sincrono]
+Encola una tarea por archivo con la vista previa pendiente (los subidos
+antes de que existieran las vistas previas). --fallidas reintenta también
+las fallidas y --sincrono las genera en el proceso, sin Celery.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.documentos.models import Documento
+from apps.documentos.tasks import generar_vista_previa_documento
+from apps.documentos.vistas_previas import generar
+from apps.entregables.models import Entregable
+from apps.entregables.tasks import generar_vista_previa_entregable
+
+
+class Command(BaseCommand):
+    help = 'Genera las vistas previas pendientes de entregables y documentos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fallidas', action='store_true', help='Reintentar también las fallidas')
+        parser.add_argument('--sincrono', action='store_true', help='Generar en este proceso, sin Celery')
+
+    def handle(self, *args, **options):
+        estados = [Documento.VISTA_PENDIENTE]
+        if options['fallidas']:
+            estados.append(Documento.VISTA_FALLIDA)
+
+        for modelo, tarea, filtro in [
+            (Entregable, generar_vista_previa_entregable, {'archivo__gt': ''}),
+            (Documento, generar_vista_previa_documento, {'valido': True}),
+        ]:
+            pendientes = modelo.objects.filter(vista_previa_estado__in=estados, **filtro).exclude(
+                **{modelo.CAMPO_ARCHIVO: ''}
+            ).order_by('pk')
+            total = 0
+            for instancia in pendientes.defer('texto_extraido').iterator(chunk_size=500):
+                if options['sincrono']:
+                    generar(instancia)
+                else:
+                    tarea.delay(instancia.pk)
+                total += 1
+            accion = 'generadas' if options['sincrono'] else 'encoladas'
+            self.stdout.write(self.style.SUCCESS(
+                f'{modelo._meta.verbose_name_plural}: {total} vistas previas {accion}.'
+            ))
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('practicas', '0005_vencidos_incluyen_enviados'),
+        ('documentos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documento',
+            name='practica',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='documentos', to='practicas.practica'),
+        ),
+        migrations.AddField(
+            model_name='documento',
+            name='subido_por',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='documentos', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documentos', '0002_propietario_documento'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documento',
+            name='mime',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='documento',
+            name='observaciones',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='documento',
+            name='revisado_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='documento',
+            name='tamano',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+    ]
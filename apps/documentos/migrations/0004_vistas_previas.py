@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documentos', '0003_inspeccion_documento'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documento',
+            name='paginas',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='documento',
+            name='texto_extraido',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='documento',
+            name='vista_previa',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='documento',
+            name='vista_previa_estado',
+            field=models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('LISTA', 'Lista'), ('NO_DISPONIBLE', 'No disponible para este tipo'), ('FALLIDA', 'Fallida')], default='PENDIENTE', editable=False, max_length=20),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('entregables', '0006_similitud'),
+        ('documentos', '0004_vistas_previas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubidaDirecta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('destino', models.CharField(choices=[('ENTREGABLE', 'Entregable'), ('DOCUMENTO', 'Documento')], max_length=20)),
+                ('datos', models.JSONField(blank=True, default=dict)),
+                ('nombre', models.CharField(max_length=255)),
+                ('clave', models.CharField(max_length=500, unique=True)),
+                ('tamano', models.PositiveBigIntegerField()),
+                ('sha256', models.CharField(max_length=64)),
+                ('mime', models.CharField(max_length=100)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('VERIFICANDO', 'Verificando'), ('COMPLETADA', 'Completada'), ('RECHAZADA', 'Rechazada')], default='PENDIENTE', max_length=20)),
+                ('mensaje', models.TextField(blank=True)),
+                ('expira_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completada_at', models.DateTimeField(blank=True, null=True)),
+                ('documento', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='documentos.documento')),
+                ('entregable', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='subidas_directas', to='entregables.entregable')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subidas_directas', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['estado', 'expira_at'], name='documentos__estado_3e78ac_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations
+
+from config.db.busqueda import indices_trigram
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documentos', '0005_subidas_directas'),
+    ]
+
+    operations = [
+        # Los search_fields de DocumentoViewSet
+        indices_trigram('documentos_documento', ['tipo', 'texto_extraido']),
+    ]
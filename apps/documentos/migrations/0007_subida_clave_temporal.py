@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+def subidas_existentes(apps, schema_editor):
+    """Las subidas ya iniciadas se hicieron sobre el nombre definitivo."""
+    SubidaDirecta = apps.get_model('documentos', 'SubidaDirecta')
+    SubidaDirecta.objects.update(clave_temporal=models.F('clave'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documentos', '0006_busqueda_trigram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subidadirecta',
+            name='clave_temporal',
+            field=models.CharField(blank=True, db_index=True, max_length=500),
+        ),
+        migrations.RunPython(subidas_existentes, migrations.RunPython.noop),
+    ]
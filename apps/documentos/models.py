@@ -1,9 +1,125 @@
 # RF-003: Documentación
 from django.db import models
 
-class Documento(models.Model):
+from apps.practicas.models import Practica
+from apps.usuarios.models import User
+
+
+class ConVistaPrevia(models.Model):
+    """
+    Vista previa de un archivo subido: imagen de la primera página, número de
+    páginas y texto extraído (ver apps.documentos.vistas_previas). Los modelos
+    indican el campo del archivo y el de su SHA-256.
+    """
+    
+    CAMPO_ARCHIVO = None
+    CAMPO_HASH = None
+    
+    VISTA_PENDIENTE = 'PENDIENTE'
+    VISTA_LISTA = 'LISTA'
+    VISTA_NO_DISPONIBLE = 'NO_DISPONIBLE'
+    VISTA_FALLIDA = 'FALLIDA'
+    
+    VISTA_ESTADO_CHOICES = [
+        (VISTA_PENDIENTE, 'Pendiente'),
+        (VISTA_LISTA, 'Lista'),
+        (VISTA_NO_DISPONIBLE, 'No disponible para este tipo'),
+        (VISTA_FALLIDA, 'Fallida'),
+    ]
+    
+    # Ruta en el storage y no FileField: la imagen se comparte entre filas con
+    # el mismo archivo y django-cleanup la borraría al borrar cualquiera de ellas
+    vista_previa = models.CharField(max_length=255, blank=True, editable=False)
+    vista_previa_estado = models.CharField(
+        max_length=20, choices=VISTA_ESTADO_CHOICES, default=VISTA_PENDIENTE, editable=False
+    )
+    paginas = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    texto_extraido = models.TextField(blank=True, editable=False)
+    
+    class Meta:
+        abstract = True
+
+
+class Documento(ConVistaPrevia):
+    CAMPO_ARCHIVO = 'file'
+    CAMPO_HASH = 'hash'
+    
     tipo = models.CharField(max_length=100)
     file = models.FileField(upload_to='documentos/')
     hash = models.CharField(max_length=64)
     valido = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Quién lo subió y a qué práctica pertenece: definen quién puede descargarlo
+    subido_por = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='documentos'
+    )
+    practica = models.ForeignKey(
+        Practica, on_delete=models.CASCADE, null=True, blank=True, related_name='documentos'
+    )
+    # Tipo detectado y tamaño al subirlo (config/archivos.py); `valido` queda
+    # en False hasta la revisión diferida (tarea revisar_documento)
+    mime = models.CharField(max_length=100, blank=True)
+    tamano = models.PositiveBigIntegerField(null=True, blank=True)
+    revisado_at = models.DateTimeField(null=True, blank=True)
+    observaciones = models.TextField(blank=True)
+
+
+class SubidaDirecta(models.Model):
+    """
+    Archivo que el cliente sube directamente al storage con una URL firmada
+    (config/subidas.py). Al completarse se verifica y se adjunta al
+    entregable o se crea el documento (ver apps.documentos.subidas).
+    """
+    
+    ENTREGABLE = 'ENTREGABLE'
+    DOCUMENTO = 'DOCUMENTO'
+    DESTINO_CHOICES = [
+        (ENTREGABLE, 'Entregable'),
+        (DOCUMENTO, 'Documento'),
+    ]
+    
+    PENDIENTE = 'PENDIENTE'
+    VERIFICANDO = 'VERIFICANDO'
+    COMPLETADA = 'COMPLETADA'
+    RECHAZADA = 'RECHAZADA'
+    ESTADO_CHOICES = [
+        (PENDIENTE, 'Pendiente'),
+        (VERIFICANDO, 'Verificando'),
+        (COMPLETADA, 'Completada'),
+        (RECHAZADA, 'Rechazada'),
+    ]
+    
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='subidas_directas')
+    destino = models.CharField(max_length=20, choices=DESTINO_CHOICES)
+    entregable = models.ForeignKey(
+        'entregables.Entregable', on_delete=models.CASCADE, null=True, blank=True, related_name='subidas_directas'
+    )
+    documento = models.ForeignKey(
+        Documento, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    # Datos del documento a crear (tipo, práctica)
+    datos = models.JSONField(default=dict, blank=True)
+    
+    # Archivo declarado por el cliente, su nombre definitivo en el storage y
+    # la clave temporal donde lo sube (se mueve al verificar)
+    nombre = models.CharField(max_length=255)
+    clave = models.CharField(max_length=500, unique=True)
+    clave_temporal = models.CharField(max_length=500, blank=True, db_index=True)
+    tamano = models.PositiveBigIntegerField()
+    sha256 = models.CharField(max_length=64)
+    mime = models.CharField(max_length=100)
+    
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default=PENDIENTE)
+    mensaje = models.TextField(blank=True)
+    expira_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    completada_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['estado', 'expira_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.nombre} ({self.get_estado_display()})"
@@ -0,0 +1,91 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.urls import reverse
+from rest_framework import serializers
+
+from apps.practicas.models import Practica
+from apps.practicas.visibilidad import obtener_visibilidad
+from config.archivos import inspeccionar_subida
+
+from .models import Documento, SubidaDirecta
+from .vistas_previas import url_vista_previa
+
+
+class PracticaVisibleMixin:
+    """La práctica indicada debe estar entre las que ve el usuario."""
+    
+    def validate_practica(self, practica):
+        visibilidad = obtener_visibilidad(self.context['request'])
+        if practica and not visibilidad.ve_todo and practica.pk not in visibilidad.practica_ids:
+            raise serializers.ValidationError('No tienes acceso a esta práctica.')
+        return practica
+
+
+class DocumentoSerializer(PracticaVisibleMixin, serializers.ModelSerializer):
+    """Serializer para Documentos; el archivo se descarga por `descarga_url`."""
+    
+    descarga_url = serializers.SerializerMethodField()
+    vista_previa_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Documento
+        fields = [
+            'id', 'tipo', 'file', 'hash', 'mime', 'tamano', 'valido', 'observaciones',
+            'revisado_at', 'practica', 'subido_por', 'descarga_url', 'vista_previa_url',
+            'vista_previa_estado', 'paginas', 'created_at'
+        ]
+        read_only_fields = [
+            'hash', 'mime', 'tamano', 'valido', 'observaciones', 'revisado_at',
+            'subido_por', 'created_at'
+        ]
+        extra_kwargs = {'file': {'write_only': True}}
+    
+    def get_descarga_url(self, obj):
+        if not obj.file:
+            return None
+        return reverse('documentos:documento-descargar', args=[obj.pk])
+    
+    def get_vista_previa_url(self, obj):
+        return url_vista_previa(obj, 'documentos:documento-vista-previa')
+    
+    def validate(self, attrs):
+        """Validar el archivo (tipo real, tamaño) y guardar su hash."""
+        try:
+            inspeccion = inspeccionar_subida(attrs['file'])
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({'file': e.messages})
+        attrs.update(hash=inspeccion.sha256, mime=inspeccion.mime, tamano=inspeccion.tamano)
+        return attrs
+
+
+class IniciarSubidaSerializer(serializers.Serializer):
+    """Archivo que el cliente va a subir directamente al storage."""
+    
+    nombre = serializers.CharField(max_length=255)
+    tamano = serializers.IntegerField(min_value=1)
+    sha256 = serializers.RegexField(r'^[0-9a-fA-F]{64}$')
+
+
+class IniciarSubidaDocumentoSerializer(PracticaVisibleMixin, IniciarSubidaSerializer):
+    """Subida directa de un documento nuevo."""
+    
+    tipo = serializers.CharField(max_length=100)
+    practica = serializers.PrimaryKeyRelatedField(
+        queryset=Practica.objects.all(), required=False, allow_null=True
+    )
+
+
+class SubidaDirectaSerializer(serializers.ModelSerializer):
+    """Estado de una subida directa; al iniciarla incluye el formulario firmado."""
+    
+    completar_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = SubidaDirecta
+        fields = [
+            'id', 'destino', 'entregable', 'documento', 'nombre', 'tamano', 'sha256',
+            'estado', 'mensaje', 'completar_url', 'expira_at', 'created_at', 'completada_at'
+        ]
+        read_only_fields = fields
+    
+    def get_completar_url(self, obj):
+        return reverse('documentos:subida-directa-completar', args=[obj.pk])
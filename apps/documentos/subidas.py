@@ -0,0 +1,185 @@
+"""
+Subidas directas de entregables y documentos (backends en config/subidas.py).
+
+1. iniciar(): valida lo declarado (extensión, tamaño), reserva el nombre
+   definitivo en el storage y devuelve el formulario firmado para una clave
+   temporal.
+2. El cliente sube el archivo directamente al storage, a la clave temporal.
+3. completar(): el cliente avisa; se comprueba el tamaño sin leer el
+   archivo y se encola verificar_subida_directa.
+4. verificar(): en Celery, mueve el archivo al nombre definitivo, donde el
+   cliente ya no puede escribir, lo lee con config.archivos.Inspector (tipo
+   real, tamaño y SHA-256), lo compara con lo declarado y lo adjunta. Si no
+   coincide se rechaza y se borra.
+
+Cada cambio de estado (PENDIENTE -> VERIFICANDO -> COMPLETADA o RECHAZADA)
+es un UPDATE condicionado al estado anterior: con dos avisos o dos tareas a
+la vez solo uno avanza, y el otro no encola, no adjunta ni borra el archivo.
+"""
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from config.archivos import MIME_POR_EXTENSION, TAMANO_BLOQUE, Inspector, tamano_maximo
+from config.subidas import clave_para, clave_temporal, expiracion, obtener_backend
+
+from .models import Documento, SubidaDirecta
+
+
+# Margen tras el vencimiento de la URL antes de borrar las subidas sin completar
+MARGEN_LIMPIEZA = timedelta(hours=1)
+
+
+def iniciar(usuario, nombre, tamano, sha256, entregable=None, tipo='', practica=None):
+    """
+    Crear la SubidaDirecta para un entregable o, sin `entregable`, para un
+    documento nuevo. Devuelve la subida y el formulario ({'url', 'campos'}).
+    """
+    inspector = Inspector(nombre)
+    if tamano > tamano_maximo():
+        raise ValidationError(f'El archivo supera el máximo de {tamano_maximo() // (1024 * 1024)} MB.')
+
+    if entregable is not None:
+        if entregable.estado not in [entregable.PENDIENTE, entregable.RECHAZADO]:
+            raise ValidationError('Solo se pueden enviar entregables pendientes o rechazados.')
+        destino, clave = SubidaDirecta.ENTREGABLE, clave_para(entregable, 'archivo', nombre)
+        datos = {}
+    else:
+        destino, clave = SubidaDirecta.DOCUMENTO, clave_para(Documento(), 'file', nombre)
+        datos = {'tipo': tipo, 'practica': practica.pk if practica else None}
+
+    mime = MIME_POR_EXTENSION.get(inspector.extension, 'application/octet-stream')
+    temporal = clave_temporal(clave)
+    subida = SubidaDirecta.objects.create(
+        usuario=usuario,
+        destino=destino,
+        entregable=entregable,
+        datos=datos,
+        nombre=nombre,
+        clave=clave,
+        clave_temporal=temporal,
+        tamano=tamano,
+        sha256=sha256.lower(),
+        mime=mime,
+        expira_at=timezone.now() + timedelta(seconds=expiracion()),
+    )
+    return subida, obtener_backend().firmar(temporal, tamano, mime)
+
+
+def _pasar(subida, desde, hacia, **campos):
+    """
+    Pasar la subida de `desde` a `hacia` solo si sigue en `desde`.
+    Retorna False si otro proceso ya la cambió.
+    """
+    actualizadas = SubidaDirecta.objects.filter(pk=subida.pk, estado=desde).update(estado=hacia, **campos)
+    if not actualizadas:
+        return False
+    subida.estado = hacia
+    for campo, valor in campos.items():
+        setattr(subida, campo, valor)
+    return True
+
+
+def completar(subida):
+    """Aviso de fin de subida: comprueba el tamaño en el storage y encola la verificación."""
+    if subida.estado != SubidaDirecta.PENDIENTE:
+        raise ValidationError('La subida ya se completó o fue rechazada.')
+
+    tamano = obtener_backend().tamano(subida.clave_temporal)
+    if tamano is None:
+        raise ValidationError('El archivo todavía no está en el almacenamiento.')
+    if tamano != subida.tamano:
+        mensaje = 'El tamaño del archivo no coincide con el declarado.'
+        rechazar(subida, mensaje, desde=SubidaDirecta.PENDIENTE)
+        raise ValidationError(mensaje)
+
+    if not _pasar(subida, SubidaDirecta.PENDIENTE, SubidaDirecta.VERIFICANDO):
+        raise ValidationError('La subida ya se completó o fue rechazada.')
+    from .tasks import verificar_subida_directa
+    transaction.on_commit(lambda: verificar_subida_directa.delay(subida.pk))
+
+
+def verificar(subida):
+    """Verificar el archivo subido contra lo declarado y adjuntarlo."""
+    inspector = Inspector(subida.nombre)
+    try:
+        _mover(subida)
+        with default_storage.open(subida.clave, 'rb') as archivo:
+            for bloque in archivo.chunks(TAMANO_BLOQUE):
+                inspector.agregar(bloque)
+        inspeccion = inspector.terminar()
+        if inspeccion.tamano != subida.tamano or inspeccion.sha256 != subida.sha256:
+            raise ValidationError('El archivo no coincide con el tamaño o el SHA-256 declarados.')
+        with transaction.atomic():
+            # El UPDATE bloquea la fila: otra verificación espera y luego no la encuentra
+            if _pasar(subida, SubidaDirecta.VERIFICANDO, SubidaDirecta.COMPLETADA, completada_at=timezone.now()):
+                _adjuntar(subida, inspeccion)
+    except ValidationError as e:
+        # Si falló el adjunto, la transacción revirtió el paso a COMPLETADA
+        subida.estado, subida.completada_at = SubidaDirecta.VERIFICANDO, None
+        rechazar(subida, ' '.join(e.messages))
+    except FileNotFoundError:
+        rechazar(subida, 'El archivo no está en el almacenamiento.')
+    return subida.estado
+
+
+def _mover(subida):
+    """
+    Llevar el archivo de la clave temporal al nombre definitivo. La firma
+    sigue vigente después de completar, pero solo permite escribir en la
+    temporal: lo que se verifica y se adjunta ya no puede reemplazarse.
+    """
+    if subida.clave_temporal == subida.clave or default_storage.exists(subida.clave):
+        # Subida anterior a las claves temporales, o ya la movió otra verificación
+        return
+    obtener_backend().mover(subida.clave_temporal, subida.clave)
+
+
+def _adjuntar(subida, inspeccion):
+    if subida.destino == SubidaDirecta.ENTREGABLE:
+        subida.entregable.enviar(subida.clave, inspeccion=inspeccion)
+    else:
+        subida.documento = Documento.objects.create(
+            tipo=subida.datos.get('tipo', ''),
+            practica_id=subida.datos.get('practica'),
+            subido_por=subida.usuario,
+            file=subida.clave,
+            hash=inspeccion.sha256,
+            mime=inspeccion.mime,
+            tamano=inspeccion.tamano,
+            valido=False,
+        )
+        from .tasks import revisar_documento
+        documento_id = subida.documento.pk
+        transaction.on_commit(lambda: revisar_documento.delay(documento_id))
+        subida.save(update_fields=['documento'])
+
+
+def rechazar(subida, mensaje, desde=SubidaDirecta.VERIFICANDO):
+    """Rechazar y borrar el archivo, si la subida sigue en `desde`."""
+    if _pasar(subida, desde, SubidaDirecta.RECHAZADA, mensaje=mensaje):
+        _eliminar(subida, obtener_backend())
+
+
+def _eliminar(subida, backend):
+    for clave in {subida.clave, subida.clave_temporal} - {''}:
+        backend.eliminar(clave)
+
+
+def limpiar_vencidas():
+    """Borrar las subidas que nunca se completaron (y lo que se haya subido)."""
+    vencidas = SubidaDirecta.objects.filter(
+        estado=SubidaDirecta.PENDIENTE, expira_at__lt=timezone.now() - MARGEN_LIMPIEZA
+    )
+    backend = obtener_backend()
+    total = 0
+    for subida in vencidas.iterator():
+        # Solo si no se completó mientras tanto
+        borradas, _ = SubidaDirecta.objects.filter(pk=subida.pk, estado=SubidaDirecta.PENDIENTE).delete()
+        if borradas:
+            _eliminar(subida, backend)
+            total += 1
+    return total
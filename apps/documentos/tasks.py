@@ -0,0 +1,61 @@
+# Celery tasks para documentos
+from celery import shared_task
+
+
+@shared_task
+def revisar_documento(documento_id):
+    """
+    Revisión diferida de un documento subido (bombas ZIP, estructura de PDF,
+    imágenes; ver config.archivos.revisar_contenido). Marca `valido`.
+    """
+    from django.utils import timezone
+    from config.archivos import revisar_contenido
+    from .models import Documento
+
+    documento = Documento.objects.get(pk=documento_id)
+    try:
+        with documento.file.open('rb') as archivo:
+            problemas = revisar_contenido(archivo, documento.mime)
+    except FileNotFoundError:
+        problemas = ['El archivo no existe.']
+
+    documento.valido = not problemas
+    documento.observaciones = '\n'.join(problemas)
+    documento.revisado_at = timezone.now()
+    documento.save(update_fields=['valido', 'observaciones', 'revisado_at'])
+    # La vista previa se genera solo para archivos que pasaron la revisión
+    if documento.valido:
+        generar_vista_previa_documento.delay(documento.pk)
+    return {'valido': documento.valido, 'problemas': problemas}
+
+
+@shared_task
+def generar_vista_previa_documento(documento_id):
+    """Generar la vista previa, páginas y texto de un documento."""
+    from .models import Documento
+    from .vistas_previas import generar
+
+    documento = Documento.objects.filter(pk=documento_id).first()
+    if documento is None:
+        return None
+    return generar(documento)
+
+
+@shared_task
+def verificar_subida_directa(subida_id):
+    """Verificar (tamaño, SHA-256, tipo real) y adjuntar un archivo subido directamente al storage."""
+    from .models import SubidaDirecta
+    from .subidas import verificar
+
+    subida = SubidaDirecta.objects.select_related('entregable', 'usuario').get(pk=subida_id)
+    if subida.estado != SubidaDirecta.VERIFICANDO:
+        return subida.estado
+    return verificar(subida)
+
+
+@shared_task
+def limpiar_subidas_directas():
+    """Tarea periódica: borrar las subidas directas que no se completaron."""
+    from .subidas import limpiar_vencidas
+
+    return limpiar_vencidas()
@@ -0,0 +1,96 @@
+"""
+Pruebas del acceso a documentos y su descarga protegida.
+"""
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
+
+from apps.documentos.models import Documento
+from apps.practicas.models import Practica
+from apps.usuarios.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def crear_usuario(username, role):
+    return User.objects.create_user(
+        email=f'{username}@example.com',
+        password='testpass123',
+        username=username,
+        role=role,
+    )
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def media_temporal(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.fixture
+def escenario():
+    docente = crear_usuario('docente', User.DOCENTE_ASESOR)
+    ana = crear_usuario('ana', User.ESTUDIANTE)
+    practica = Practica.objects.create(estudiante=ana, docente_asesor=docente)
+    documento = Documento.objects.create(
+        tipo='CV', hash='0' * 64, subido_por=ana, practica=practica,
+        file=SimpleUploadedFile('cv.pdf', b'%PDF cv'),
+    )
+    return {'docente': docente, 'ana': ana, 'documento': documento}
+
+
+def cliente_de(usuario):
+    client = APIClient()
+    client.force_authenticate(user=usuario)
+    return client
+
+
+class TestDescargarDocumento:
+    """Solo el autor, los usuarios de su práctica y la coordinadora lo descargan."""
+
+    def test_autor_y_docente(self, escenario):
+        ruta = f"/api/documentos/{escenario['documento'].pk}/descargar/"
+
+        for usuario in (escenario['ana'], escenario['docente']):
+            response = cliente_de(usuario).get(ruta)
+            assert response.status_code == 200
+            assert b''.join(response.streaming_content) == b'%PDF cv'
+
+    def test_coordinadora_ve_todo(self, escenario):
+        coordinadora = crear_usuario('coordinadora', User.COORDINADORA_EMPRESARIAL)
+        response = cliente_de(coordinadora).get('/api/documentos/')
+        assert [d['id'] for d in response.data['results']] == [escenario['documento'].pk]
+
+    def test_ajenos_no_lo_ven(self, escenario):
+        otro = crear_usuario('beto', User.ESTUDIANTE)
+        client = cliente_de(otro)
+
+        assert client.get(f"/api/documentos/{escenario['documento'].pk}/descargar/").status_code == 404
+        assert client.get('/api/documentos/').data['results'] == []
+
+    def test_no_valido(self, escenario):
+        documento = escenario['documento']
+        Documento.objects.filter(pk=documento.pk).update(valido=False)
+        ruta = f'/api/documentos/{documento.pk}/descargar/'
+        coordinadora = crear_usuario('coordinadora', User.COORDINADORA_EMPRESARIAL)
+
+        assert cliente_de(escenario['ana']).get(ruta).status_code == 409
+        assert cliente_de(escenario['ana']).get(ruta, {'forzar': 'true'}).status_code == 409
+        assert cliente_de(escenario['ana']).get(f'/api/documentos/{documento.pk}/vista-previa/').status_code == 409
+        assert cliente_de(coordinadora).get(ruta).status_code == 409
+        assert cliente_de(coordinadora).get(ruta, {'forzar': 'true'}).status_code == 200
+
+    def test_x_accel_redirect(self, escenario, settings):
+        settings.DESCARGAS_SERVIDOR = 'nginx'
+        documento = escenario['documento']
+
+        response = cliente_de(escenario['ana']).get(f'/api/documentos/{documento.pk}/descargar/')
+
+        assert response['X-Accel-Redirect'] == f'/protegido/{documento.file.name}'
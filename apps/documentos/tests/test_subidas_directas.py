@@ -0,0 +1,292 @@
+"""
+Pruebas de las subidas directas al storage con el backend local.
+"""
+import hashlib
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.documentos.models import Documento, SubidaDirecta
+from apps.documentos import subidas
+from apps.documentos.subidas import limpiar_vencidas
+from apps.entregables.models import Entregable
+from apps.practicas.models import Practica
+from apps.usuarios.models import User
+from config.subidas import AlmacenamientoS3
+
+pytestmark = pytest.mark.django_db
+
+PDF = b'%PDF-1.4\n1 0 obj<<>>endobj\nxref\n0 1\ntrailer<<>>\nstartxref\n9\n%%EOF\n'
+
+
+def crear_usuario(username, role):
+    return User.objects.create_user(
+        email=f'{username}@example.com',
+        password='testpass123',
+        username=username,
+        role=role,
+    )
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def media_temporal(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def cliente_de(usuario):
+    client = APIClient()
+    client.force_authenticate(user=usuario)
+    return client
+
+
+def declarar(contenido, nombre='informe.pdf'):
+    return {'nombre': nombre, 'tamano': len(contenido), 'sha256': hashlib.sha256(contenido).hexdigest()}
+
+
+def subir(formulario, contenido, nombre='informe.pdf'):
+    """POST al storage como lo haría el navegador, sin autenticación."""
+    return Client().post(formulario['url'], {**formulario['campos'], 'file': SimpleUploadedFile(nombre, contenido)})
+
+
+@pytest.fixture
+def escenario():
+    ana = crear_usuario('ana', User.ESTUDIANTE)
+    practica = Practica.objects.create(estudiante=ana)
+    entregable = Entregable.objects.create(
+        practica=practica, estudiante=ana, titulo='Reporte', fecha_limite=timezone.now() + timedelta(days=3)
+    )
+    return {'ana': ana, 'practica': practica, 'entregable': entregable}
+
+
+class TestSubidaDirectaEntregable:
+    """Iniciar, subir al storage, completar y verificar."""
+
+    def iniciar(self, escenario, contenido, **extra):
+        return cliente_de(escenario['ana']).post(
+            f"/api/entregables/{escenario['entregable'].pk}/subida/", {**declarar(contenido), **extra}, format='json'
+        )
+
+    def test_flujo_completo(self, escenario, django_capture_on_commit_callbacks):
+        response = self.iniciar(escenario, PDF)
+        assert response.status_code == 201
+        formulario = response.data['formulario']
+        assert formulario['url'] == '/api/subidas/local/'
+        temporal = formulario['campos']['key']
+        assert temporal.startswith('subidas/') and temporal.endswith('/informe.pdf')
+
+        assert subir(formulario, PDF).status_code == 204
+        assert default_storage.exists(temporal)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            completar = cliente_de(escenario['ana']).post(response.data['completar_url'])
+        assert completar.status_code == 202
+
+        subida = SubidaDirecta.objects.get()
+        assert subida.estado == SubidaDirecta.COMPLETADA
+        assert subida.clave.startswith('entregables/')
+        assert not default_storage.exists(temporal)
+        entregable = Entregable.objects.get(pk=escenario['entregable'].pk)
+        assert entregable.estado == Entregable.ENVIADO
+        assert entregable.archivo.name == subida.clave
+        assert entregable.archivo_hash == hashlib.sha256(PDF).hexdigest()
+        assert entregable.archivo_tamano == len(PDF)
+
+    def test_no_se_reemplaza_tras_completar(self, escenario, django_capture_on_commit_callbacks):
+        """La firma sigue vigente, pero el archivo adjuntado ya no se puede reemplazar."""
+        response = self.iniciar(escenario, PDF)
+        formulario = response.data['formulario']
+        subir(formulario, PDF)
+        with django_capture_on_commit_callbacks(execute=True):
+            cliente_de(escenario['ana']).post(response.data['completar_url'])
+
+        otro = PDF.replace(b'1 0 obj', b'2 0 obj')
+        assert subir(formulario, otro).status_code == 403
+        entregable = Entregable.objects.get(pk=escenario['entregable'].pk)
+        with default_storage.open(entregable.archivo.name, 'rb') as archivo:
+            assert archivo.read() == PDF
+        assert not default_storage.exists(formulario['campos']['key'])
+
+    def test_hash_distinto_rechaza_y_borra(self, escenario, django_capture_on_commit_callbacks):
+        alterado = PDF.replace(b'1 0 obj', b'2 0 obj')
+        response = self.iniciar(escenario, PDF)
+        subir(response.data['formulario'], alterado)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            cliente_de(escenario['ana']).post(response.data['completar_url'])
+
+        subida = SubidaDirecta.objects.get()
+        assert subida.estado == SubidaDirecta.RECHAZADA
+        assert 'SHA-256' in subida.mensaje
+        assert not default_storage.exists(subida.clave)
+        assert not default_storage.exists(subida.clave_temporal)
+        assert Entregable.objects.get(pk=escenario['entregable'].pk).estado == Entregable.PENDIENTE
+
+    def test_contenido_que_no_es_pdf(self, escenario, django_capture_on_commit_callbacks):
+        falso = b'texto plano, no es un PDF'
+        response = self.iniciar(escenario, falso)
+        subir(response.data['formulario'], falso)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            cliente_de(escenario['ana']).post(response.data['completar_url'])
+
+        assert SubidaDirecta.objects.get().estado == SubidaDirecta.RECHAZADA
+
+    def test_completar_antes_de_subir(self, escenario):
+        response = self.iniciar(escenario, PDF)
+        completar = cliente_de(escenario['ana']).post(response.data['completar_url'])
+
+        assert completar.status_code == 400
+        assert SubidaDirecta.objects.get().estado == SubidaDirecta.PENDIENTE
+
+    def test_rechaza_declaraciones_invalidas(self, escenario, settings):
+        settings.ARCHIVOS_TAMANO_MAXIMO = 10
+        assert self.iniciar(escenario, PDF).status_code == 400
+        settings.ARCHIVOS_TAMANO_MAXIMO = 1024
+        assert self.iniciar(escenario, PDF, nombre='script.exe').status_code == 400
+        assert self.iniciar(escenario, PDF, sha256='abc').status_code == 400
+        assert not SubidaDirecta.objects.exists()
+
+    def test_solo_el_estudiante_del_entregable(self, escenario):
+        beto = crear_usuario('beto', User.ESTUDIANTE)
+        response = cliente_de(beto).post(
+            f"/api/entregables/{escenario['entregable'].pk}/subida/", declarar(PDF), format='json'
+        )
+        assert response.status_code == 404
+
+        subida = self.iniciar(escenario, PDF).data
+        assert cliente_de(beto).post(subida['completar_url']).status_code == 404
+
+
+class TestReceptorLocal:
+    """El receptor local aplica la política firmada como lo haría S3."""
+
+    def formulario(self, escenario):
+        return cliente_de(escenario['ana']).post(
+            f"/api/entregables/{escenario['entregable'].pk}/subida/", declarar(PDF), format='json'
+        ).data['formulario']
+
+    def test_tamano_distinto(self, escenario):
+        assert subir(self.formulario(escenario), PDF + b'extra').status_code == 400
+
+    def test_politica_alterada(self, escenario):
+        formulario = self.formulario(escenario)
+        formulario['campos']['policy'] += 'x'
+        assert subir(formulario, PDF).status_code == 403
+
+    def test_otra_clave(self, escenario):
+        formulario = self.formulario(escenario)
+        formulario['campos']['key'] = 'entregables/otro.pdf'
+        assert subir(formulario, PDF).status_code == 403
+        assert not default_storage.exists('entregables/otro.pdf')
+
+    def test_politica_vencida(self, escenario, settings):
+        formulario = self.formulario(escenario)
+        settings.SUBIDAS_DIRECTAS_EXPIRACION = -1
+        assert subir(formulario, PDF).status_code == 403
+
+    def test_no_disponible_con_otro_backend(self, escenario, settings):
+        formulario = self.formulario(escenario)
+        settings.SUBIDAS_DIRECTAS_BACKEND = 'config.subidas.AlmacenamientoDirecto'
+        assert subir(formulario, PDF).status_code == 404
+
+
+class TestMoverEnS3:
+    """En S3 el archivo pasa a su nombre definitivo con una copia del lado del servidor."""
+
+    def test_copia_y_borra_la_temporal(self):
+        storage = mock.Mock(spec=['bucket', 'bucket_name', '_normalize_name'])
+        storage.bucket_name = 'practicas'
+        storage._normalize_name.side_effect = lambda nombre: f'media/{nombre}'
+        cliente = storage.bucket.meta.client
+
+        with mock.patch('config.subidas.default_storage', storage):
+            AlmacenamientoS3().mover('subidas/abc/informe.pdf', 'entregables/def/informe.pdf')
+
+        cliente.copy_object.assert_called_once_with(
+            Bucket='practicas',
+            Key='media/entregables/def/informe.pdf',
+            CopySource={'Bucket': 'practicas', 'Key': 'media/subidas/abc/informe.pdf'},
+        )
+        cliente.delete_object.assert_called_once_with(Bucket='practicas', Key='media/subidas/abc/informe.pdf')
+
+
+class TestSubidaDirectaDocumento:
+    """El documento se crea al completar y pasa por la revisión diferida."""
+
+    def test_crea_el_documento(self, escenario, django_capture_on_commit_callbacks):
+        client = cliente_de(escenario['ana'])
+        response = client.post('/api/documentos/subida/', {
+            **declarar(PDF, 'cv.pdf'), 'tipo': 'CV', 'practica': escenario['practica'].pk,
+        }, format='json')
+        assert response.status_code == 201
+        subir(response.data['formulario'], PDF, 'cv.pdf')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(response.data['completar_url'])
+
+        subida = client.get(f"/api/documentos/subidas/{response.data['id']}/").data
+        assert subida['estado'] == SubidaDirecta.COMPLETADA
+        documento = Documento.objects.get(pk=subida['documento'])
+        assert documento.subido_por == escenario['ana']
+        assert documento.practica == escenario['practica']
+        assert documento.mime == 'application/pdf'
+        assert documento.valido is True
+
+    def test_practica_ajena(self, escenario):
+        ajena = Practica.objects.create(estudiante=crear_usuario('beto', User.ESTUDIANTE))
+        response = cliente_de(escenario['ana']).post('/api/documentos/subida/', {
+            **declarar(PDF, 'cv.pdf'), 'tipo': 'CV', 'practica': ajena.pk,
+        }, format='json')
+
+        assert response.status_code == 400
+        assert 'practica' in response.data['details']
+
+    def test_avisos_simultaneos(self, escenario, django_capture_on_commit_callbacks):
+        """Dos avisos y dos verificaciones de la misma subida: solo uno avanza."""
+        client = cliente_de(escenario['ana'])
+        response = client.post('/api/documentos/subida/', {**declarar(PDF, 'cv.pdf'), 'tipo': 'CV'}, format='json')
+        subir(response.data['formulario'], PDF, 'cv.pdf')
+        primero, segundo = (SubidaDirecta.objects.get(pk=response.data['id']) for _ in range(2))
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            subidas.completar(primero)
+            with pytest.raises(ValidationError):
+                subidas.completar(segundo)
+        assert len(callbacks) == 1
+
+        primero, segundo = (SubidaDirecta.objects.get(pk=response.data['id']) for _ in range(2))
+        with django_capture_on_commit_callbacks(execute=True):
+            assert subidas.verificar(primero) == SubidaDirecta.COMPLETADA
+            subidas.verificar(segundo)
+
+        subida = SubidaDirecta.objects.get()
+        assert subida.estado == SubidaDirecta.COMPLETADA
+        assert Documento.objects.count() == 1
+        assert default_storage.exists(subida.clave)
+
+    def test_limpiar_vencidas(self, escenario):
+        response = cliente_de(escenario['ana']).post('/api/documentos/subida/', {
+            **declarar(PDF, 'cv.pdf'), 'tipo': 'CV',
+        }, format='json')
+        subir(response.data['formulario'], PDF, 'cv.pdf')
+        clave = response.data['formulario']['campos']['key']
+        SubidaDirecta.objects.update(expira_at=timezone.now() - timedelta(days=1))
+
+        assert limpiar_vencidas() == 1
+        assert not SubidaDirecta.objects.exists()
+        assert not default_storage.exists(clave)
@@ -0,0 +1,182 @@
+"""
+Pruebas de la validación de subidas de documentos y de su revisión diferida.
+"""
+import hashlib
+import io
+import zipfile
+
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+from rest_framework.test import APIClient
+
+from apps.documentos.models import Documento
+from apps.practicas.models import Practica
+from apps.usuarios.models import User
+from config.archivos import DOCX, Inspector, inspeccionar_subida, revisar_contenido
+
+pytestmark = pytest.mark.django_db
+
+PDF = b'%PDF-1.4\n1 0 obj<<>>endobj\nxref\n0 1\ntrailer<<>>\nstartxref\n9\n%%EOF\n'
+
+
+def crear_usuario(username, role):
+    return User.objects.create_user(
+        email=f'{username}@example.com',
+        password='testpass123',
+        username=username,
+        role=role,
+    )
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def media_temporal(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def cliente_de(usuario):
+    client = APIClient()
+    client.force_authenticate(user=usuario)
+    return client
+
+
+def png():
+    salida = io.BytesIO()
+    Image.new('RGB', (4, 4)).save(salida, 'PNG')
+    return salida.getvalue()
+
+
+def zip_con(entradas):
+    salida = io.BytesIO()
+    with zipfile.ZipFile(salida, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for nombre, contenido in entradas.items():
+            zf.writestr(nombre, contenido)
+    return salida.getvalue()
+
+
+class TestInspector:
+    """Tipo real, tamaño y hash en una pasada."""
+
+    def test_pdf_valido(self):
+        inspeccion = inspeccionar_subida(SimpleUploadedFile('cv.pdf', PDF))
+
+        assert inspeccion.mime == 'application/pdf'
+        assert inspeccion.tamano == len(PDF)
+        assert inspeccion.sha256 == hashlib.sha256(PDF).hexdigest()
+
+    def test_contenido_distinto_a_la_extension(self):
+        with pytest.raises(ValidationError):
+            inspeccionar_subida(SimpleUploadedFile('cv.pdf', png()))
+
+    def test_extension_no_permitida(self):
+        with pytest.raises(ValidationError):
+            inspeccionar_subida(SimpleUploadedFile('script.exe', b'MZ' + b'\0' * 100))
+
+    def test_corta_al_superar_el_tamano(self, settings):
+        settings.ARCHIVOS_TAMANO_MAXIMO = 100
+        inspector = Inspector('cv.pdf')
+        inspector.agregar(PDF)
+
+        with pytest.raises(ValidationError):
+            inspector.agregar(b'0' * 100)
+
+    def test_archivo_vacio(self):
+        with pytest.raises(ValidationError):
+            inspeccionar_subida(SimpleUploadedFile('cv.pdf', b''))
+
+
+class TestSubirDocumento:
+    """POST /api/documentos/ valida al subir y revisa en segundo plano."""
+
+    def test_subida_valida(self, django_capture_on_commit_callbacks):
+        ana = crear_usuario('ana', User.ESTUDIANTE)
+        practica = Practica.objects.create(estudiante=ana)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = cliente_de(ana).post('/api/documentos/', {
+                'tipo': 'CV', 'practica': practica.pk, 'file': SimpleUploadedFile('cv.pdf', PDF),
+            }, format='multipart')
+
+        assert response.status_code == 201
+        documento = Documento.objects.get(pk=response.data['id'])
+        assert documento.subido_por == ana
+        assert documento.hash == hashlib.sha256(PDF).hexdigest()
+        assert documento.mime == 'application/pdf'
+        assert documento.tamano == len(PDF)
+        assert documento.valido is True
+        assert documento.revisado_at is not None
+
+    def test_rechaza_durante_la_subida(self, settings, tmp_path):
+        settings.ARCHIVOS_TAMANO_MAXIMO = 1024
+        ana = crear_usuario('ana', User.ESTUDIANTE)
+
+        response = cliente_de(ana).post('/api/documentos/', {
+            'tipo': 'CV', 'file': SimpleUploadedFile('cv.pdf', PDF + b'0' * 4096),
+        }, format='multipart')
+
+        assert response.status_code == 400
+        assert 'file' in response.data['details']
+        assert not Documento.objects.exists()
+        assert not any(tmp_path.iterdir())
+
+    def test_no_puede_usar_practicas_ajenas(self):
+        ana = crear_usuario('ana', User.ESTUDIANTE)
+        ajena = Practica.objects.create(estudiante=crear_usuario('beto', User.ESTUDIANTE))
+
+        response = cliente_de(ana).post('/api/documentos/', {
+            'tipo': 'CV', 'practica': ajena.pk, 'file': SimpleUploadedFile('cv.pdf', PDF),
+        }, format='multipart')
+
+        assert response.status_code == 400
+        assert 'practica' in response.data['details']
+
+    def test_revision_marca_invalido(self, django_capture_on_commit_callbacks):
+        ana = crear_usuario('ana', User.ESTUDIANTE)
+        pdf_activo = PDF.replace(b'<<>>endobj', b'<</OpenAction<</S/JavaScript/JS(app.alert(1))>>>>endobj')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = cliente_de(ana).post('/api/documentos/', {
+                'tipo': 'CV', 'file': SimpleUploadedFile('cv.pdf', pdf_activo),
+            }, format='multipart')
+
+        documento = Documento.objects.get(pk=response.data['id'])
+        assert documento.valido is False
+        assert 'JavaScript' in documento.observaciones
+
+
+class TestRevisarContenido:
+    """Revisiones diferidas por tipo de archivo."""
+
+    def test_pdf_incompleto(self):
+        assert revisar_contenido(io.BytesIO(PDF[:40]), 'application/pdf')
+
+    def test_pdf_correcto(self):
+        assert revisar_contenido(io.BytesIO(PDF), 'application/pdf') == []
+
+    def test_bomba_zip(self, settings):
+        settings.ARCHIVOS_ZIP_MAX_DESCOMPRIMIDO = 1024 * 1024
+        bomba = zip_con({'ceros.bin': b'\0' * (2 * 1024 * 1024)})
+
+        problemas = revisar_contenido(io.BytesIO(bomba), 'application/zip')
+
+        assert len(bomba) < 20 * 1024
+        assert 'bomba' in problemas[0]
+
+    def test_zip_normal(self):
+        assert revisar_contenido(io.BytesIO(zip_con({'a.txt': b'hola'})), 'application/zip') == []
+
+    def test_docx_sin_estructura(self):
+        assert revisar_contenido(io.BytesIO(zip_con({'a.txt': b'hola'})), DOCX)
+
+    def test_imagen(self):
+        assert revisar_contenido(io.BytesIO(png()), 'image/png') == []
+        assert revisar_contenido(io.BytesIO(png()[:30]), 'image/png')
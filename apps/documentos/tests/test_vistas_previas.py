@@ -0,0 +1,284 @@
+"""
+Pruebas de la generación de vistas previas de entregables y documentos.
+"""
+import io
+import zipfile
+from datetime import timedelta
+from unittest import mock
+
+import docx
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgreSQL
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from apps.documentos.models import Documento
+from apps.documentos.vistas_previas import ALTO, ANCHO, generar
+from apps.entregables import tasks
+from apps.entregables.models import Entregable
+from apps.practicas.models import Practica
+from apps.usuarios.models import User
+from config.db.busqueda import expresion, indices_trigram
+
+pytestmark = pytest.mark.django_db
+
+
+def crear_usuario(username, role):
+    return User.objects.create_user(
+        email=f'{username}@example.com',
+        password='testpass123',
+        username=username,
+        role=role,
+    )
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def media_temporal(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def pdf_con_texto(paginas):
+    """PDF mínimo con una línea de texto (Helvetica) por página."""
+    objetos = [b'<</Type/Catalog/Pages 2 0 R>>', None, b'<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>']
+    kids = []
+    for texto in paginas:
+        contenido = f'BT /F1 24 Tf 72 720 Td ({texto}) Tj ET'.encode()
+        objetos.append(b'<</Length %d>>stream\n%s\nendstream' % (len(contenido), contenido))
+        objetos.append(
+            b'<</Type/Page/Parent 2 0 R/MediaBox[0 0 595 842]'
+            b'/Resources<</Font<</F1 3 0 R>>>>/Contents %d 0 R>>' % len(objetos)
+        )
+        kids.append(b'%d 0 R' % len(objetos))
+    objetos[1] = b'<</Type/Pages/Kids[%s]/Count %d>>' % (b' '.join(kids), len(kids))
+
+    salida = bytearray(b'%PDF-1.4\n')
+    posiciones = []
+    for numero, objeto in enumerate(objetos, 1):
+        posiciones.append(len(salida))
+        salida += b'%d 0 obj\n%s\nendobj\n' % (numero, objeto)
+    xref = len(salida)
+    salida += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objetos) + 1)
+    salida += b''.join(b'%010d 00000 n \n' % posicion for posicion in posiciones)
+    salida += b'trailer\n<</Size %d/Root 1 0 R>>\nstartxref\n%d\n%%%%EOF\n' % (len(objetos) + 1, xref)
+    return bytes(salida)
+
+
+def docx_con_texto(texto, miniatura=True):
+    documento = docx.Document()
+    documento.add_paragraph(texto)
+    salida = io.BytesIO()
+    documento.save(salida)
+    if miniatura:
+        return salida.getvalue()
+    # Miniatura que Pillow no abre (como las WMF de Word): se dibuja la tarjeta
+    sin_miniatura = io.BytesIO()
+    with zipfile.ZipFile(salida) as origen, zipfile.ZipFile(sin_miniatura, 'w') as destino:
+        for info in origen.infolist():
+            contenido = origen.read(info)
+            if info.filename.startswith('docProps/thumbnail.'):
+                contenido = b'\xd7\xcd\xc6\x9a metarchivo'
+            destino.writestr(info, contenido)
+    return sin_miniatura.getvalue()
+
+
+def cliente_de(usuario):
+    client = APIClient()
+    client.force_authenticate(user=usuario)
+    return client
+
+
+@pytest.fixture
+def escenario():
+    tutor = crear_usuario('tutor', User.TUTOR_EMPRESARIAL)
+    ana = crear_usuario('ana', User.ESTUDIANTE)
+    practica = Practica.objects.create(estudiante=ana, tutor_empresarial=tutor)
+
+    def entregable(titulo='Informe'):
+        return Entregable.objects.create(
+            practica=practica, estudiante=ana, titulo=titulo, fecha_limite=timezone.now() + timedelta(days=3)
+        )
+
+    return {'tutor': tutor, 'ana': ana, 'practica': practica, 'entregable': entregable}
+
+
+def leer_png(response):
+    contenido = b''.join(response.streaming_content)
+    assert contenido.startswith(b'\x89PNG')
+    return Image.open(io.BytesIO(contenido))
+
+
+class TestVistaPreviaEntregable:
+    """El envío genera la vista previa y los listados la exponen."""
+
+    def test_pdf_al_enviar(self, escenario, django_capture_on_commit_callbacks):
+        entregable = escenario['entregable']()
+        with django_capture_on_commit_callbacks(execute=True):
+            entregable.enviar(SimpleUploadedFile('informe.pdf', pdf_con_texto(['Informe final', 'Anexo'])))
+
+        entregable.refresh_from_db()
+        assert entregable.vista_previa_estado == Entregable.VISTA_LISTA
+        assert entregable.paginas == 2
+        assert 'Informe final' in entregable.texto_extraido
+        assert 'Anexo' in entregable.texto_extraido
+
+        client = cliente_de(escenario['tutor'])
+        fila = client.get('/api/entregables/').data['results'][0]
+        assert fila['paginas'] == 2
+        assert fila['vista_previa_url'] == (
+            f'/api/entregables/{entregable.pk}/vista-previa/?v={entregable.archivo_hash[:12]}'
+        )
+        assert 'texto_extraido' not in fila
+
+        response = client.get(fila['vista_previa_url'])
+        assert response.status_code == 200
+        assert 'inline' in response['Content-Disposition']
+        assert 'max-age' in response['Cache-Control']
+        imagen = leer_png(response)
+        assert imagen.width <= ANCHO and imagen.height <= ALTO
+
+    def test_busqueda_por_texto(self, escenario, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            escenario['entregable']('Uno').enviar(SimpleUploadedFile('a.pdf', pdf_con_texto(['Diagrama de red'])))
+            escenario['entregable']('Dos').enviar(SimpleUploadedFile('b.pdf', pdf_con_texto(['Presupuesto'])))
+
+        response = cliente_de(escenario['tutor']).get('/api/entregables/', {'search': 'diagrama'})
+        assert [fila['titulo'] for fila in response.data['results']] == ['Uno']
+
+    @pytest.mark.parametrize('modelo,campos', [
+        (Entregable, ['titulo', 'descripcion', 'texto_extraido']),
+        (Documento, ['tipo', 'texto_extraido']),
+    ])
+    def test_indices_trigram_cubren_la_busqueda(self, modelo, campos):
+        """La expresión indexada es la que genera icontains en PostgreSQL."""
+        postgresql = PostgreSQL({**connection.settings_dict, 'ENGINE': 'django.db.backends.postgresql'}, 'pg')
+        tabla = modelo._meta.db_table
+        for campo in campos:
+            consulta = modelo.objects.filter(**{f'{campo}__icontains': 'red'}).query
+            sql, _ = consulta.get_compiler(connection=postgresql).as_sql()
+            columna = f'"{tabla}"."{campo}"'
+            assert f'{expresion(columna)} LIKE UPPER(%s)' in sql
+
+        ejecutadas = []
+        editor = type('Editor', (), {'connection': postgresql, 'execute': lambda self, sql: ejecutadas.append(sql)})
+        indices_trigram(tabla, campos).code(None, editor())
+        assert ejecutadas[0] == 'CREATE EXTENSION IF NOT EXISTS pg_trgm'
+        assert len(ejecutadas) == len(campos) + 1
+        for campo, sql in zip(campos, ejecutadas[1:]):
+            assert f'ON {tabla} USING gin (({expresion(campo)}) gin_trgm_ops)' in sql
+
+    def test_mismo_archivo_reutiliza_la_vista(self, escenario, django_capture_on_commit_callbacks, tmp_path):
+        contenido = pdf_con_texto(['Mismo archivo'])
+        with django_capture_on_commit_callbacks(execute=True):
+            primero = escenario['entregable']('Uno')
+            primero.enviar(SimpleUploadedFile('a.pdf', contenido))
+            segundo = escenario['entregable']('Dos')
+            segundo.enviar(SimpleUploadedFile('b.pdf', contenido))
+
+        primero.refresh_from_db()
+        segundo.refresh_from_db()
+        assert segundo.vista_previa == primero.vista_previa
+        assert segundo.texto_extraido == primero.texto_extraido
+        assert len(list((tmp_path / 'vistas_previas').rglob('*.png'))) == 1
+
+        primero.delete()
+        assert default_storage.exists(segundo.vista_previa)
+
+    def test_revision_fallida_no_genera_ni_indexa(self, escenario, monkeypatch):
+        """El archivo pasa por revisar_contenido() antes de abrirlo para la vista previa."""
+        contenido = pdf_con_texto(['Informe'])
+        entregable = escenario['entregable']()
+        entregable.enviar(SimpleUploadedFile('informe.pdf', contenido))
+        with default_storage.open(entregable.archivo.name, 'wb') as archivo:
+            archivo.write(contenido[:40])
+        indexar = mock.Mock()
+        monkeypatch.setattr(tasks.indexar_similitud_entregable, 'delay', indexar)
+
+        assert tasks.generar_vista_previa_entregable(entregable.pk) == Entregable.VISTA_FALLIDA
+        entregable.refresh_from_db()
+        assert entregable.vista_previa_estado == Entregable.VISTA_FALLIDA
+        assert entregable.texto_extraido == ''
+        indexar.assert_not_called()
+
+    def test_pendiente_sin_url(self, escenario):
+        entregable = escenario['entregable']()
+        response = cliente_de(escenario['ana']).get(f'/api/entregables/{entregable.pk}/vista-previa/')
+
+        assert response.status_code == 404
+        assert cliente_de(escenario['ana']).get('/api/entregables/').data['results'][0]['vista_previa_url'] is None
+
+    def test_ajenos_no_la_ven(self, escenario, django_capture_on_commit_callbacks):
+        entregable = escenario['entregable']()
+        with django_capture_on_commit_callbacks(execute=True):
+            entregable.enviar(SimpleUploadedFile('informe.pdf', pdf_con_texto(['Privado'])))
+
+        otro = crear_usuario('beto', User.ESTUDIANTE)
+        response = cliente_de(otro).get(f'/api/entregables/{entregable.pk}/vista-previa/')
+        assert response.status_code == 404
+
+
+class TestVistaPreviaDocumento:
+    """Formatos sin render directo y errores."""
+
+    def crear(self, nombre, contenido):
+        return Documento.objects.create(tipo='CV', hash='', file=SimpleUploadedFile(nombre, contenido))
+
+    def test_docx_con_miniatura(self):
+        documento = self.crear('cv.docx', docx_con_texto('Experiencia profesional'))
+
+        assert generar(documento) == Documento.VISTA_LISTA
+        assert documento.paginas == 1
+        assert documento.texto_extraido == 'Experiencia profesional'
+        with default_storage.open(documento.vista_previa) as archivo:
+            assert Image.open(archivo).format == 'PNG'
+
+    def test_docx_sin_miniatura_dibuja_tarjeta(self):
+        documento = self.crear('cv.docx', docx_con_texto('Experiencia profesional', miniatura=False))
+
+        assert generar(documento) == Documento.VISTA_LISTA
+        with default_storage.open(documento.vista_previa) as archivo:
+            assert Image.open(archivo).size == (ANCHO, ALTO)
+
+    def test_imagen(self):
+        salida = io.BytesIO()
+        Image.new('RGB', (2000, 1000), 'red').save(salida, 'JPEG')
+        documento = self.crear('foto.jpg', salida.getvalue())
+
+        assert generar(documento) == Documento.VISTA_LISTA
+        with default_storage.open(documento.vista_previa) as archivo:
+            assert max(Image.open(archivo).size) <= ANCHO
+
+    def test_tipo_sin_vista_previa(self):
+        documento = self.crear('datos.zip', b'PK\x05\x06' + b'\0' * 18)
+        assert generar(documento) == Documento.VISTA_NO_DISPONIBLE
+
+    def test_pdf_danado(self):
+        documento = self.crear('roto.pdf', b'%PDF-1.4 sin objetos')
+
+        assert generar(documento) == Documento.VISTA_FALLIDA
+        assert not documento.vista_previa
+
+    def test_revision_valida_encadena_la_vista(self, django_capture_on_commit_callbacks):
+        ana = crear_usuario('ana', User.ESTUDIANTE)
+        with django_capture_on_commit_callbacks(execute=True):
+            response = cliente_de(ana).post('/api/documentos/', {
+                'tipo': 'CV', 'file': SimpleUploadedFile('cv.pdf', pdf_con_texto(['Curriculum'])),
+            }, format='multipart')
+
+        documento = Documento.objects.get(pk=response.data['id'])
+        assert documento.valido is True
+        assert documento.vista_previa_estado == Documento.VISTA_LISTA
+        assert 'Curriculum' in documento.texto_extraido
+        fila = cliente_de(ana).get('/api/documentos/', {'search': 'curriculum'}).data['results'][0]
+        assert fila['vista_previa_url'].startswith(f'/api/documentos/{documento.pk}/vista-previa/')
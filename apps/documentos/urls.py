@@ -1,5 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from .views import DocumentoViewSet, SubidaDirectaViewSet
+
 router = DefaultRouter()
+router.register(r'subidas', SubidaDirectaViewSet, basename='subida-directa')
+router.register(r'', DocumentoViewSet, basename='documento')
+
 app_name = 'documentos'
+
 urlpatterns = [path('', include(router.urls))]
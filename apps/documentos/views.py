@@ -0,0 +1,133 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.core.files.storage import default_storage
+from django.http import Http404
+from rest_framework import mixins, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, JSONParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.practicas.visibilidad import obtener_visibilidad
+from config.archivos import MultiPartInspeccionParser
+from config.descargas import respuesta_almacenada, respuesta_archivo
+
+from . import subidas
+from .models import Documento, SubidaDirecta
+from .serializers import DocumentoSerializer, IniciarSubidaDocumentoSerializer, SubidaDirectaSerializer
+
+
+def respuesta_subida_iniciada(subida, formulario):
+    """201 con la subida y el formulario firmado (url y campos del POST al storage)."""
+    datos = SubidaDirectaSerializer(subida).data
+    datos['formulario'] = formulario
+    return Response(datos, status=status.HTTP_201_CREATED)
+
+
+class DocumentoViewSet(mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet para Documentos.
+    - Coordinadora: todos los documentos
+    - Demás roles: los que subieron y los de las prácticas que pueden ver
+    Al subir, el tipo, el tamaño y el hash se validan durante la subida; el
+    documento queda no válido hasta que la tarea revisar_documento lo revisa.
+    Los no válidos (en revisión o rechazados) no se descargan ni se previsualizan
+    (409); la coordinadora puede hacerlo con ?forzar=true.
+    """
+    serializer_class = DocumentoSerializer
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser, FormParser, MultiPartInspeccionParser]
+    # En PostgreSQL cada campo tiene un índice trigram (config/db/busqueda.py)
+    search_fields = ['tipo', 'texto_extraido']
+    
+    def get_queryset(self):
+        visibilidad = obtener_visibilidad(self.request)
+        documentos = Documento.objects.defer('texto_extraido').order_by('-created_at')
+        if visibilidad.ve_todo:
+            return documentos
+        return documentos.filter(
+            Q(subido_por=self.request.user) | Q(practica_id__in=visibilidad.practica_ids)
+        )
+    
+    def perform_create(self, serializer):
+        documento = serializer.save(subido_por=self.request.user, valido=False)
+        from .tasks import revisar_documento
+        transaction.on_commit(lambda: revisar_documento.delay(documento.pk))
+    
+    @action(detail=False, methods=['post'], url_path='subida')
+    def subida(self, request):
+        """
+        Iniciar la subida directa al storage de un documento nuevo.
+        Body: {"nombre", "tamano", "sha256", "tipo", "practica"}. El documento
+        se crea al completar la subida (ver subidas/<id>/completar/).
+        """
+        serializer = IniciarSubidaDocumentoSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        try:
+            subida, formulario = subidas.iniciar(request.user, **serializer.validated_data)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({'nombre': e.messages})
+        return respuesta_subida_iniciada(subida, formulario)
+    
+    def _no_valido(self, documento):
+        """409 si el documento no es válido, salvo que la coordinadora lo fuerce."""
+        forzar = self.request.query_params.get('forzar', '').lower() in ('1', 'true')
+        if documento.valido or (forzar and self.request.user.is_coordinadora):
+            return None
+        return Response(
+            {'error': 'El documento está en revisión o fue rechazado.'},
+            status=status.HTTP_409_CONFLICT
+        )
+    
+    @action(detail=True, methods=['get'], url_path='descargar')
+    def descargar(self, request, pk=None):
+        """Descargar el archivo del documento (lo envía el proxy si está configurado)."""
+        documento = self.get_object()
+        if (conflicto := self._no_valido(documento)) is not None:
+            return conflicto
+        if not documento.file:
+            raise Http404('El documento no tiene archivo.')
+        try:
+            return respuesta_archivo(request, documento.file)
+        except FileNotFoundError:
+            raise Http404('El archivo del documento no existe.')
+    
+    @action(detail=True, methods=['get'], url_path='vista-previa')
+    def vista_previa(self, request, pk=None):
+        """Imagen de la primera página; la URL lleva el hash del archivo y se puede cachear."""
+        documento = self.get_object()
+        if (conflicto := self._no_valido(documento)) is not None:
+            return conflicto
+        if documento.vista_previa_estado != Documento.VISTA_LISTA:
+            raise Http404('La vista previa no está disponible.')
+        try:
+            response = respuesta_almacenada(
+                request, default_storage, documento.vista_previa, as_attachment=False
+            )
+        except FileNotFoundError:
+            raise Http404('La vista previa no existe.')
+        response['Cache-Control'] = 'private, max-age=86400'
+        return response
+
+
+class SubidaDirectaViewSet(viewsets.ReadOnlyModelViewSet):
+    """Subidas directas del usuario (ver apps.documentos.subidas)."""
+    serializer_class = SubidaDirectaSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        return SubidaDirecta.objects.filter(usuario=self.request.user)
+    
+    @action(detail=True, methods=['post'], url_path='completar')
+    def completar(self, request, pk=None):
+        """
+        Avisar que el archivo ya se subió. Responde 202: la verificación y el
+        adjunto se hacen en segundo plano (consultar subidas/<id>/).
+        """
+        subida = self.get_object()
+        try:
+            subidas.completar(subida)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({'subida': e.messages})
+        return Response(SubidaDirectaSerializer(subida).data, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,186 @@
+"""
+Vistas previas de archivos subidos (entregables y documentos).
+
+generar() abre el archivo del storage y, según su extensión (que la subida
+ya comprobó contra el contenido, ver config/archivos.py):
+- PDF: primera página renderizada con pdfium, número de páginas y texto;
+- DOCX: texto (python-docx) y páginas de docProps/app.xml. La imagen es la
+  miniatura que guarda Word o, si no la hay, una tarjeta con el inicio del
+  texto dibujada con Pillow: maquetar un DOCX requeriría LibreOffice;
+- JPEG/PNG: la imagen reducida.
+Otros tipos quedan como NO_DISPONIBLE.
+
+La imagen se guarda como vistas_previas/<sha256>.png: si el mismo archivo
+ya se procesó (mismo hash), se reutilizan la imagen y los metadatos sin
+volver a abrirlo. Por eso la imagen no se borra con la fila que la generó.
+"""
+import io
+import logging
+import os
+import re
+import textwrap
+import zipfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+
+logger = logging.getLogger(__name__)
+
+
+ANCHO = 320
+ALTO = 452  # proporción A4
+MAX_TEXTO = 100_000
+PATRON_PAGINAS_DOCX = re.compile(rb'<Pages>(\d+)</Pages>')
+
+
+def _pdf(archivo):
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(archivo.read())
+    try:
+        primera = pdf[0]
+        imagen = primera.render(scale=ANCHO / primera.get_width()).to_pil()
+        textos, total = [], 0
+        for indice in range(len(pdf)):
+            texto = pdf[indice].get_textpage().get_text_bounded()
+            textos.append(texto)
+            total += len(texto)
+            if total >= MAX_TEXTO:
+                break
+        return imagen, len(pdf), '\n'.join(textos)
+    finally:
+        pdf.close()
+
+
+def _tarjeta(texto):
+    """Imagen de página con el inicio del texto, para formatos que no se renderizan."""
+    from PIL import Image, ImageDraw
+
+    imagen = Image.new('RGB', (ANCHO, ALTO), 'white')
+    dibujo = ImageDraw.Draw(imagen)
+    y = 16
+    for parrafo in texto.splitlines():
+        for linea in textwrap.wrap(parrafo, width=48) or ['']:
+            if y > ALTO - 24:
+                return imagen
+            dibujo.text((16, y), linea, fill='black')
+            y += 14
+    return imagen
+
+
+def _docx(archivo):
+    import docx
+    from PIL import Image
+
+    contenido = io.BytesIO(archivo.read())
+    texto = '\n'.join(p.text for p in docx.Document(contenido).paragraphs if p.text)[:MAX_TEXTO]
+    with zipfile.ZipFile(contenido) as zf:
+        nombres = zf.namelist()
+        paginas = None
+        if 'docProps/app.xml' in nombres:
+            coincidencia = PATRON_PAGINAS_DOCX.search(zf.read('docProps/app.xml'))
+            paginas = int(coincidencia.group(1)) if coincidencia else None
+        miniatura = next((n for n in nombres if n.startswith('docProps/thumbnail.')), None)
+        imagen = None
+        if miniatura:
+            try:
+                imagen = Image.open(io.BytesIO(zf.read(miniatura)))
+                imagen.load()
+            except Exception:
+                # WMF/EMF u otros formatos que Pillow no abre
+                imagen = None
+    return imagen or _tarjeta(texto), paginas, texto
+
+
+def _imagen(archivo):
+    from PIL import Image
+
+    imagen = Image.open(archivo)
+    imagen.draft('RGB', (ANCHO, ALTO))  # JPEG: decodifica ya reducida
+    imagen.load()
+    return imagen, 1, ''
+
+
+GENERADORES = {
+    'pdf': _pdf,
+    'docx': _docx,
+    'jpg': _imagen,
+    'jpeg': _imagen,
+    'png': _imagen,
+}
+
+
+def _png(imagen):
+    if imagen.mode not in ('RGB', 'L'):
+        imagen = imagen.convert('RGB')
+    imagen.thumbnail((ANCHO, ALTO))
+    salida = io.BytesIO()
+    imagen.save(salida, 'PNG', optimize=True)
+    return salida.getvalue()
+
+
+def ruta_vista_previa(instancia):
+    sha256 = getattr(instancia, instancia.CAMPO_HASH)
+    if sha256:
+        return f'vistas_previas/{sha256[:2]}/{sha256}.png'
+    return f'vistas_previas/{instancia._meta.model_name}/{instancia.pk}.png'
+
+
+def _reutilizable(instancia):
+    """Otra fila con el mismo archivo (hash) y la vista previa ya generada."""
+    sha256 = getattr(instancia, instancia.CAMPO_HASH)
+    if not sha256:
+        return None
+    return type(instancia)._default_manager.filter(
+        **{instancia.CAMPO_HASH: sha256}, vista_previa_estado=instancia.VISTA_LISTA
+    ).exclude(pk=instancia.pk).only('vista_previa', 'paginas', 'texto_extraido').first()
+
+
+CAMPOS = ['vista_previa', 'vista_previa_estado', 'paginas', 'texto_extraido']
+
+
+def generar(instancia):
+    """Generar (o reutilizar) la vista previa de `instancia` y guardarla."""
+    archivo = getattr(instancia, instancia.CAMPO_ARCHIVO)
+    extension = os.path.splitext(archivo.name or '')[1].lower().lstrip('.')
+    generador = GENERADORES.get(extension)
+
+    previa = _reutilizable(instancia) if generador else None
+    if not archivo or not generador:
+        instancia.vista_previa_estado = instancia.VISTA_NO_DISPONIBLE
+    elif previa is not None and default_storage.exists(previa.vista_previa):
+        instancia.vista_previa = previa.vista_previa
+        instancia.paginas = previa.paginas
+        instancia.texto_extraido = previa.texto_extraido
+        instancia.vista_previa_estado = instancia.VISTA_LISTA
+    else:
+        try:
+            with archivo.open('rb'):
+                imagen, paginas, texto = generador(archivo)
+            ruta = ruta_vista_previa(instancia)
+            if not default_storage.exists(ruta):
+                ruta = default_storage.save(ruta, ContentFile(_png(imagen)))
+            instancia.vista_previa = ruta
+            instancia.paginas = paginas
+            instancia.texto_extraido = texto.replace('\x00', '')
+            instancia.vista_previa_estado = instancia.VISTA_LISTA
+        except Exception:
+            logger.exception(
+                'Error al generar la vista previa de %s %s', instancia._meta.model_name, instancia.pk
+            )
+            instancia.vista_previa_estado = instancia.VISTA_FALLIDA
+
+    instancia.save(update_fields=CAMPOS)
+    return instancia.vista_previa_estado
+
+
+def url_vista_previa(instancia, nombre_url):
+    """URL de la vista previa con el hash como versión (se puede cachear)."""
+    from django.urls import reverse
+
+    if instancia.vista_previa_estado != instancia.VISTA_LISTA:
+        return None
+    version = (getattr(instancia, instancia.CAMPO_HASH) or '')[:12]
+    url = reverse(nombre_url, args=[instancia.pk])
+    return f'{url}?v={version}' if version else url
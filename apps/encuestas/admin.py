@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Encuesta, Pregunta, RespuestaEncuesta, DetallePregunta
+from .models import Encuesta, Pregunta, RespuestaEncuesta, DetallePregunta, ResumenPregunta
 
 
 class PreguntaInline(admin.TabularInline):
@@ -10,14 +10,10 @@ class PreguntaInline(admin.TabularInline):
 
 @admin.register(Encuesta)
 class EncuestaAdmin(admin.ModelAdmin):
-    list_display = ['titulo', 'dirigida_a', 'estado', 'fecha_creacion', 'total_respuestas']
+    list_display = ['titulo', 'dirigida_a', 'estado', 'fecha_creacion', 'num_respuestas']
     list_filter = ['dirigida_a', 'estado', 'fecha_creacion']
     search_fields = ['titulo', 'descripcion']
     inlines = [PreguntaInline]
-    
-    def total_respuestas(self, obj):
-        return obj.respuestas.count()
-    total_respuestas.short_description = 'Respuestas'
 
 
 @admin.register(Pregunta)
@@ -38,3 +34,10 @@ class RespuestaEncuestaAdmin(admin.ModelAdmin):
 class DetallePreguntaAdmin(admin.ModelAdmin):
     list_display = ['pregunta', 'respuesta_encuesta', 'respuesta_texto']
     list_filter = ['pregunta__tipo']
+
+
+@admin.register(ResumenPregunta)
+class ResumenPreguntaAdmin(admin.ModelAdmin):
+    list_display = ['pregunta', 'total', 'actualizado']
+    list_filter = ['pregunta__tipo']
+    readonly_fields = ['pregunta', 'total', 'suma', 'conteos', 'actualizado']
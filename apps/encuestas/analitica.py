@@ -0,0 +1,186 @@
+"""
+Analítica de encuestas: tablas cruzadas de respuestas por dimensión.
+
+Cruza las respuestas de preguntas de escala, Sí/No y opciones con el rol,
+la empresa, la carrera o el estado de la práctica de quien respondió.
+Los resultados se guardan en caché por encuesta hasta la siguiente respuesta
+o el siguiente borrado (ver invalidar_analitica). Se calculan siempre sobre
+'default': una réplica atrasada dejaría en caché, bajo la versión actual,
+tablas a las que les faltan las últimas respuestas.
+"""
+import io
+import time
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+from django.db.models import Count, F
+from django.db.models.functions import Coalesce
+
+from config.db.replicas import lecturas_en_replica
+
+from .models import Pregunta, DetallePregunta
+from .resultados import TIPOS_OPCIONES, contar_opciones
+
+
+SIN_DATO = 'Sin dato'
+
+DIMENSIONES = {
+    'rol': lambda: F('respuesta_encuesta__usuario__role'),
+    'empresa': lambda: Coalesce(
+        'respuesta_encuesta__practica__empresa__nombre',
+        'respuesta_encuesta__usuario__empresa__nombre',
+    ),
+    'carrera': lambda: Coalesce(
+        'respuesta_encuesta__usuario__carrera',
+        'respuesta_encuesta__practica__estudiante__carrera',
+    ),
+    'estado_practica': lambda: F('respuesta_encuesta__practica__estado'),
+}
+
+ANALITICA_CACHE_KEY = 'encuestas:analitica:{encuesta_id}:{dimension}:{version}'
+ANALITICA_CACHE_TIMEOUT = 60 * 60 * 24
+ANALITICA_VERSION_KEY = 'encuestas:analitica:version:{encuesta_id}'
+
+
+def _categorias(pregunta, encontradas):
+    """Columnas de la tabla cruzada según el tipo de pregunta."""
+    if pregunta.tipo == Pregunta.ESCALA:
+        return [str(i) for i in range(1, 6)]
+    if pregunta.tipo == Pregunta.SI_NO:
+        return ['si', 'no']
+    categorias = [str(opcion) for opcion in pregunta.opciones or []]
+    return categorias + sorted(encontradas - set(categorias))
+
+
+def calcular_tablas_cruzadas(encuesta, dimension):
+    """
+    Distribución de respuestas por pregunta y por grupo de la dimensión.
+    Escala y Sí/No se agrupan en SQL; las opciones (JSON) también en
+    PostgreSQL, con la dimensión en el GROUP BY (resultados.contar_opciones).
+    """
+    detalles = DetallePregunta.objects.filter(
+        pregunta__encuesta=encuesta
+    ).annotate(grupo=DIMENSIONES[dimension]())
+
+    tablas = defaultdict(lambda: defaultdict(Counter))
+
+    numericas = detalles.filter(
+        pregunta__tipo=Pregunta.ESCALA, respuesta_numerica__isnull=False
+    ).values('pregunta_id', 'grupo', 'respuesta_numerica').annotate(total=Count('id')).order_by()
+    for fila in numericas:
+        tablas[fila['pregunta_id']][fila['grupo']][str(fila['respuesta_numerica'])] += fila['total']
+
+    booleanas = detalles.filter(
+        pregunta__tipo=Pregunta.SI_NO, respuesta_booleana__isnull=False
+    ).values('pregunta_id', 'grupo', 'respuesta_booleana').annotate(total=Count('id')).order_by()
+    for fila in booleanas:
+        clave = 'si' if fila['respuesta_booleana'] else 'no'
+        tablas[fila['pregunta_id']][fila['grupo']][clave] += fila['total']
+
+    opciones = detalles.filter(pregunta__tipo__in=TIPOS_OPCIONES, opciones_seleccionadas__isnull=False)
+    for (pregunta_id, grupo), conteos in contar_opciones(opciones, ['pregunta_id', 'grupo']).items():
+        tablas[pregunta_id][grupo].update(conteos)
+
+    preguntas = []
+    for pregunta in encuesta.preguntas.exclude(
+        tipo__in=[Pregunta.TEXTO_CORTO, Pregunta.TEXTO_LARGO]
+    ).order_by('orden'):
+        grupos = tablas.get(pregunta.id, {})
+        encontradas = set()
+        for conteos in grupos.values():
+            encontradas.update(conteos)
+        categorias = _categorias(pregunta, encontradas)
+
+        filas = []
+        for grupo in sorted(grupos, key=lambda g: (g is None, str(g))):
+            conteos = grupos[grupo]
+            filas.append({
+                'grupo': grupo if grupo is not None else SIN_DATO,
+                'conteos': {categoria: conteos.get(categoria, 0) for categoria in categorias},
+                'total': sum(conteos.values()),
+            })
+
+        preguntas.append({
+            'id': pregunta.id,
+            'texto': pregunta.texto,
+            'tipo': pregunta.tipo,
+            'categorias': categorias,
+            'filas': filas,
+        })
+
+    return {
+        'encuesta': encuesta.id,
+        'titulo': encuesta.titulo,
+        'dimension': dimension,
+        'total_respuestas': encuesta.num_respuestas,
+        'preguntas': preguntas,
+    }
+
+
+def version_analitica(encuesta_id):
+    """
+    Versión de la analítica de la encuesta: un contador que solo crece.
+    Si se perdió de la caché se reinicia con la hora actual, mayor que
+    cualquier versión anterior.
+    """
+    clave = ANALITICA_VERSION_KEY.format(encuesta_id=encuesta_id)
+    version = cache.get(clave)
+    if version is None:
+        cache.add(clave, time.time_ns(), None)
+        version = cache.get(clave)
+    return version
+
+
+def invalidar_analitica(encuesta_id):
+    """Pasar a la siguiente versión: las tablas en caché dejan de usarse."""
+    clave = ANALITICA_VERSION_KEY.format(encuesta_id=encuesta_id)
+    try:
+        cache.incr(clave)
+    except ValueError:
+        version_analitica(encuesta_id)
+
+
+def obtener_tablas_cruzadas(encuesta, dimension):
+    """
+    Tablas cruzadas en caché.
+    La clave incluye version_analitica(), que avanza con cada respuesta
+    nueva, editada o borrada.
+    """
+    clave = ANALITICA_CACHE_KEY.format(
+        encuesta_id=encuesta.pk,
+        dimension=dimension,
+        version=version_analitica(encuesta.pk),
+    )
+    datos = cache.get(clave)
+    if datos is None:
+        with lecturas_en_replica(False):
+            datos = calcular_tablas_cruzadas(encuesta, dimension)
+        cache.set(clave, datos, ANALITICA_CACHE_TIMEOUT)
+    return datos
+
+
+def exportar_xlsx(datos):
+    """Generar un libro XLSX con una hoja por pregunta."""
+    import xlsxwriter
+
+    salida = io.BytesIO()
+    libro = xlsxwriter.Workbook(salida, {'in_memory': True})
+    negrita = libro.add_format({'bold': True})
+
+    for numero, pregunta in enumerate(datos['preguntas'], start=1):
+        hoja = libro.add_worksheet(f'P{numero}')
+        hoja.write(0, 0, pregunta['texto'], negrita)
+        hoja.write_row(2, 0, [datos['dimension']] + pregunta['categorias'] + ['total'], negrita)
+        for fila_numero, fila in enumerate(pregunta['filas'], start=3):
+            hoja.write_row(fila_numero, 0, [
+                fila['grupo'],
+                *[fila['conteos'][categoria] for categoria in pregunta['categorias']],
+                fila['total'],
+            ])
+        hoja.set_column(0, 0, 30)
+
+    if not datos['preguntas']:
+        libro.add_worksheet('Resultados')
+
+    libro.close()
+    return salida.getvalue()
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class EncuestasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.encuestas'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,84 @@
+"""
+Tamaño de la audiencia de las encuestas por destinatario.
+
+Se calcula con una sola consulta agrupada sobre los usuarios activos y se
+guarda en caché; se invalida cuando cambia el rol, el estado activo o el
+carácter de superusuario de algún usuario.
+
+La tasa de respuesta cuenta solo los respondentes que siguen en esa misma
+audiencia (respondentes_en_audiencia), para no pasar del 100 %.
+"""
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from apps.usuarios.models import User
+
+
+AUDIENCIA_CACHE_KEY = 'encuestas:audiencia'
+AUDIENCIA_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def tamanos_audiencia():
+    """
+    Número de usuarios activos por destinatario de encuesta.
+    Retorna un diccionario con las claves de Encuesta.DESTINATARIO_CHOICES.
+    """
+    from .models import Encuesta
+
+    tamanos = cache.get(AUDIENCIA_CACHE_KEY)
+    if tamanos is not None:
+        return tamanos
+
+    por_rol = {}
+    todos = 0
+    conteos = User.objects.filter(is_active=True).values('role', 'is_superuser').annotate(
+        total=Count('id')
+    ).order_by()
+    for fila in conteos:
+        por_rol[fila['role']] = por_rol.get(fila['role'], 0) + fila['total']
+        if not fila['is_superuser']:
+            todos += fila['total']
+
+    tamanos = {
+        destinatario: sum(por_rol.get(role, 0) for role in roles)
+        for destinatario, roles in Encuesta.ROLES_DESTINATARIO.items()
+    }
+    tamanos[Encuesta.TODOS] = todos
+
+    cache.set(AUDIENCIA_CACHE_KEY, tamanos, AUDIENCIA_CACHE_TIMEOUT)
+    return tamanos
+
+
+def invalidar_tamanos_audiencia():
+    """Eliminar de la caché los tamaños de audiencia."""
+    cache.delete(AUDIENCIA_CACHE_KEY)
+
+
+def respondentes_en_audiencia(encuestas):
+    """
+    Usuarios distintos que respondieron cada encuesta y siguen en su
+    audiencia (activos y con un rol destinatario), en una sola consulta.
+    En las encuestas anónimas no se conoce al usuario y se usa
+    num_respondentes. Retorna un diccionario id de encuesta -> total.
+    """
+    from .models import Encuesta, RespuestaEncuesta
+
+    encuestas = list(encuestas)
+    en_audiencia = Q(encuesta__dirigida_a=Encuesta.TODOS, usuario__is_superuser=False)
+    for destinatario, roles in Encuesta.ROLES_DESTINATARIO.items():
+        en_audiencia |= Q(encuesta__dirigida_a=destinatario, usuario__role__in=roles)
+
+    nominales = [encuesta.pk for encuesta in encuestas if not encuesta.es_anonima]
+    conteos = {}
+    if nominales:
+        conteos = dict(
+            RespuestaEncuesta.objects.filter(
+                en_audiencia, encuesta_id__in=nominales, usuario__is_active=True
+            ).values('encuesta_id').annotate(
+                total=Count('usuario', distinct=True)
+            ).values_list('encuesta_id', 'total').order_by()
+        )
+    return {
+        encuesta.pk: encuesta.num_respondentes if encuesta.es_anonima else conteos.get(encuesta.pk, 0)
+        for encuesta in encuestas
+    }
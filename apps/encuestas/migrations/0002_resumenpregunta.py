@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('encuestas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenPregunta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Total de respuestas')),
+                ('suma', models.PositiveIntegerField(default=0, help_text='Permite calcular el promedio de preguntas de escala', verbose_name='Suma de respuestas numéricas')),
+                ('conteos', models.JSONField(blank=True, default=dict, help_text='Número de respuestas por valor, opción o Sí/No', verbose_name='Conteos')),
+                ('actualizado', models.DateTimeField(auto_now=True, verbose_name='Última actualización')),
+                ('pregunta', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='resumen', to='encuestas.pregunta', verbose_name='Pregunta')),
+            ],
+            options={
+                'verbose_name': 'Resumen de Pregunta',
+                'verbose_name_plural': 'Resúmenes de Preguntas',
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:07
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def calcular_contadores(apps, schema_editor):
+    """Inicializar los contadores con una consulta agrupada."""
+    Encuesta = apps.get_model('encuestas', 'Encuesta')
+    RespuestaEncuesta = apps.get_model('encuestas', 'RespuestaEncuesta')
+    
+    conteos = RespuestaEncuesta.objects.values('encuesta').annotate(
+        total=Count('id'),
+        usuarios=Count('usuario', distinct=True),
+        anonimas=Count('id', filter=Q(usuario__isnull=True)),
+    ).order_by()
+    
+    encuestas = []
+    for fila in conteos:
+        encuestas.append(Encuesta(
+            pk=fila['encuesta'],
+            num_respuestas=fila['total'],
+            num_respondentes=fila['usuarios'] + fila['anonimas'],
+        ))
+    Encuesta.objects.bulk_update(encuestas, ['num_respuestas', 'num_respondentes'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('encuestas', '0002_resumenpregunta'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='encuesta',
+            name='num_respondentes',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Usuarios distintos; cada respuesta anónima cuenta como una persona', verbose_name='Número de personas que respondieron'),
+        ),
+        migrations.AddField(
+            model_name='encuesta',
+            name='num_respuestas',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Número de respuestas'),
+        ),
+        migrations.RunPython(calcular_contadores, migrations.RunPython.noop),
+    ]
@@ -28,6 +28,13 @@ class Encuesta(models.Model):
         (TODOS, 'Todos los usuarios'),
     ]
     
+    # Roles que pueden responder según los destinatarios
+    ROLES_DESTINATARIO = {
+        ESTUDIANTES: [User.ESTUDIANTE],
+        TUTORES: [User.TUTOR_EMPRESARIAL],
+        DOCENTES: [User.DOCENTE_ASESOR],
+    }
+    
     # Estados
     BORRADOR = 'BORRADOR'
     ACTIVA = 'ACTIVA'
@@ -77,6 +84,19 @@ class Encuesta(models.Model):
         verbose_name='Permitir responder múltiples veces'
     )
     
+    # Contadores mantenidos de forma incremental
+    num_respuestas = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Número de respuestas'
+    )
+    num_respondentes = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Número de personas que respondieron',
+        help_text='Usuarios distintos; cada respuesta anónima cuenta como una persona'
+    )
+    
     class Meta:
         verbose_name = 'Encuesta'
         verbose_name_plural = 'Encuestas'
@@ -85,26 +105,44 @@ class Encuesta(models.Model):
     def __str__(self):
         return f"{self.titulo} - {self.get_dirigida_a_display()}"
     
+    @classmethod
+    def dirigidas_a_rol(cls, role):
+        """Valores de `dirigida_a` que incluyen al rol indicado."""
+        dirigidas = [
+            destinatario
+            for destinatario, roles in cls.ROLES_DESTINATARIO.items()
+            if role in roles
+        ]
+        return dirigidas + [cls.TODOS] if dirigidas else []
+    
+    def es_destinatario(self, usuario):
+        """Indica si la encuesta está dirigida al rol del usuario."""
+        if self.dirigida_a == self.TODOS:
+            return True
+        return usuario.role in self.ROLES_DESTINATARIO.get(self.dirigida_a, [])
+    
     def total_respuestas(self):
         """Total de respuestas recibidas"""
-        return self.respuestas.count()
-    
-    def tasa_respuesta(self):
-        """Calcula la tasa de respuesta basada en los usuarios objetivo"""
-        if self.dirigida_a == self.ESTUDIANTES:
-            total_usuarios = User.objects.filter(role=User.ESTUDIANTE).count()
-        elif self.dirigida_a == self.TUTORES:
-            total_usuarios = User.objects.filter(role=User.TUTOR_EMPRESARIAL).count()
-        elif self.dirigida_a == self.DOCENTES:
-            total_usuarios = User.objects.filter(role=User.DOCENTE_ASESOR).count()
-        else:
-            total_usuarios = User.objects.exclude(is_superuser=True).count()
+        return self.num_respuestas
+    
+    def tasa_respuesta(self, audiencia=None, respondentes=None):
+        """
+        Calcula la tasa de respuesta basada en los usuarios objetivo.
+        `audiencia` y `respondentes` (ver audiencia.respondentes_en_audiencia)
+        permiten reutilizar los conteos al calcular la tasa de varias encuestas.
+        """
+        from .audiencia import respondentes_en_audiencia, tamanos_audiencia
+        if audiencia is None:
+            audiencia = tamanos_audiencia()
+        if respondentes is None:
+            respondentes = respondentes_en_audiencia([self])[self.pk]
         
+        total_usuarios = audiencia.get(self.dirigida_a, 0)
         if total_usuarios == 0:
             return 0
         
-        respuestas = self.respuestas.values('usuario').distinct().count()
-        return (respuestas / total_usuarios) * 100
+        # Las respuestas anónimas de quien ya salió de la audiencia no se pueden descontar
+        return (min(respondentes, total_usuarios) / total_usuarios) * 100
 
 
 class Pregunta(models.Model):
@@ -248,4 +286,49 @@ class DetallePregunta(models.Model):
         unique_together = ['respuesta_encuesta', 'pregunta']
     
     def __str__(self):
-        return f"{self.pregunta.texto[:30]} - {self.respuesta_encuesta.usuario}"
\ No newline at end of file
+        return f"{self.pregunta.texto[:30]} - {self.respuesta_encuesta.usuario}"
+
+
+class ResumenPregunta(models.Model):
+    """
+    Resultados agregados de una pregunta.
+    Tabla materializada que se actualiza de forma incremental con cada
+    respuesta para que la página de resultados no recorra los detalles.
+    """
+    
+    # Relaciones
+    pregunta = models.OneToOneField(
+        Pregunta,
+        on_delete=models.CASCADE,
+        related_name='resumen',
+        verbose_name='Pregunta'
+    )
+    
+    # Agregados
+    total = models.PositiveIntegerField(default=0, verbose_name='Total de respuestas')
+    suma = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Suma de respuestas numéricas',
+        help_text='Permite calcular el promedio de preguntas de escala'
+    )
+    conteos = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Conteos',
+        help_text='Número de respuestas por valor, opción o Sí/No'
+    )
+    actualizado = models.DateTimeField(auto_now=True, verbose_name='Última actualización')
+    
+    class Meta:
+        verbose_name = 'Resumen de Pregunta'
+        verbose_name_plural = 'Resúmenes de Preguntas'
+    
+    def __str__(self):
+        return f"{self.pregunta.texto[:30]} - {self.total} respuestas"
+    
+    @property
+    def promedio(self):
+        """Promedio de las respuestas numéricas (preguntas de escala)."""
+        if not self.total:
+            return 0
+        return round(self.suma / self.total, 2)
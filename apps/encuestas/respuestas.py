@@ -0,0 +1,203 @@
+"""
+Registro de respuestas a encuestas.
+
+El formulario se valida completo contra un esquema de preguntas en caché y
+la respuesta se guarda en una sola transacción con un único bulk_create de
+los detalles. Lo usan tanto la vista de formulario como la API JSON.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from .models import Encuesta, Pregunta, RespuestaEncuesta, DetallePregunta
+from .resultados import registrar_respuesta
+
+
+ESQUEMA_CACHE_KEY = 'encuestas:esquema:{encuesta_id}'
+ESQUEMA_CACHE_TIMEOUT = 60 * 60
+
+RESPONDIDAS_CACHE_KEY = 'encuestas:respondidas:{usuario_id}'
+RESPONDIDAS_CACHE_TIMEOUT = 60 * 60
+
+VALORES_SI = {'si', 'sí', 'true', '1'}
+VALORES_NO = {'no', 'false', '0'}
+
+
+def obtener_esquema(encuesta):
+    """
+    Preguntas de la encuesta como lista de diccionarios, ordenadas.
+    Se guarda en caché y se invalida al modificar las preguntas.
+    """
+    clave = ESQUEMA_CACHE_KEY.format(encuesta_id=encuesta.pk)
+    esquema = cache.get(clave)
+    if esquema is None:
+        esquema = list(
+            Pregunta.objects.filter(encuesta_id=encuesta.pk).order_by('orden').values(
+                'id', 'texto', 'tipo', 'orden', 'es_requerida', 'opciones'
+            )
+        )
+        cache.set(clave, esquema, ESQUEMA_CACHE_TIMEOUT)
+    return esquema
+
+
+def invalidar_esquema(encuesta_id):
+    """Eliminar el esquema en caché de una encuesta."""
+    cache.delete(ESQUEMA_CACHE_KEY.format(encuesta_id=encuesta_id))
+
+
+def obtener_encuestas_respondidas(usuario):
+    """
+    Conjunto de ids de encuestas que el usuario ya respondió.
+    Se guarda en caché y se invalida al registrar o borrar una respuesta.
+    """
+    clave = RESPONDIDAS_CACHE_KEY.format(usuario_id=usuario.pk)
+    respondidas = cache.get(clave)
+    if respondidas is None:
+        respondidas = set(
+            RespuestaEncuesta.objects.filter(usuario=usuario)
+            .values_list('encuesta_id', flat=True)
+            .distinct()
+        )
+        cache.set(clave, respondidas, RESPONDIDAS_CACHE_TIMEOUT)
+    return respondidas
+
+
+def invalidar_encuestas_respondidas(usuario_id):
+    """Eliminar el conjunto en caché de encuestas respondidas por el usuario."""
+    cache.delete(RESPONDIDAS_CACHE_KEY.format(usuario_id=usuario_id))
+
+
+def ya_respondio(encuesta, usuario):
+    """Indica si el usuario ya respondió la encuesta (usa el conjunto en caché)."""
+    return encuesta.pk in obtener_encuestas_respondidas(usuario)
+
+
+def encuestas_pendientes(usuario):
+    """
+    Encuestas activas dirigidas al usuario que aún puede responder.
+    Siempre es una sola consulta: si el conjunto de respondidas está en
+    caché se excluyen por id; si no, se usa un anti-join con Exists.
+    """
+    encuestas = Encuesta.objects.filter(
+        estado=Encuesta.ACTIVA,
+        dirigida_a__in=Encuesta.dirigidas_a_rol(usuario.role),
+    )
+
+    respondidas = cache.get(RESPONDIDAS_CACHE_KEY.format(usuario_id=usuario.pk))
+    if respondidas is not None:
+        return encuestas.exclude(pk__in=respondidas, permite_multiple=False)
+
+    respuestas_usuario = RespuestaEncuesta.objects.filter(
+        encuesta=OuterRef('pk'),
+        usuario=usuario,
+    )
+    return encuestas.filter(Q(permite_multiple=True) | ~Exists(respuestas_usuario))
+
+
+def datos_formulario(esquema, post):
+    """Extraer del POST del formulario el valor de cada pregunta del esquema."""
+    datos = {}
+    for pregunta in esquema:
+        clave = f"pregunta_{pregunta['id']}"
+        if pregunta['tipo'] == Pregunta.OPCION_MULTIPLE:
+            datos[pregunta['id']] = post.getlist(clave)
+        else:
+            datos[pregunta['id']] = post.get(clave)
+    return datos
+
+
+def _vacio(valor):
+    return valor is None or valor == '' or valor == []
+
+
+def _validar_valor(pregunta, valor):
+    """
+    Convertir el valor recibido al campo de DetallePregunta que corresponde.
+    Retorna un diccionario con el campo o lanza ValueError con el mensaje.
+    """
+    tipo = pregunta['tipo']
+
+    if tipo in [Pregunta.TEXTO_CORTO, Pregunta.TEXTO_LARGO]:
+        return {'respuesta_texto': str(valor)}
+
+    if tipo == Pregunta.ESCALA:
+        try:
+            numero = int(valor)
+        except (TypeError, ValueError):
+            raise ValueError('Debe ser un número del 1 al 5.')
+        if not 1 <= numero <= 5:
+            raise ValueError('Debe ser un número del 1 al 5.')
+        return {'respuesta_numerica': numero}
+
+    if tipo == Pregunta.SI_NO:
+        if isinstance(valor, bool):
+            return {'respuesta_booleana': valor}
+        texto = str(valor).strip().lower()
+        if texto in VALORES_SI:
+            return {'respuesta_booleana': True}
+        if texto in VALORES_NO:
+            return {'respuesta_booleana': False}
+        raise ValueError('Debe ser "si" o "no".')
+
+    # Preguntas con opciones
+    opciones = valor if isinstance(valor, (list, tuple)) else [valor]
+    opciones = [str(opcion) for opcion in opciones if not _vacio(opcion)]
+    if tipo == Pregunta.SELECCION_UNICA and len(opciones) != 1:
+        raise ValueError('Debe seleccionar una sola opción.')
+    permitidas = pregunta['opciones']
+    if permitidas and any(opcion not in permitidas for opcion in opciones):
+        raise ValueError('Opción no válida.')
+    return {'opciones_seleccionadas': opciones}
+
+
+def validar_respuestas(esquema, datos):
+    """
+    Validar todas las respuestas de una vez.
+    Retorna (valores, errores): valores por id de pregunta con los campos del
+    detalle y errores por id de pregunta con el mensaje.
+    """
+    valores = {}
+    errores = {}
+
+    for pregunta in esquema:
+        valor = datos.get(pregunta['id'], datos.get(str(pregunta['id'])))
+
+        if _vacio(valor):
+            if pregunta['es_requerida']:
+                errores[pregunta['id']] = 'Esta pregunta es obligatoria.'
+            elif pregunta['tipo'] in [Pregunta.TEXTO_CORTO, Pregunta.TEXTO_LARGO]:
+                # Se conserva el registro de preguntas de texto opcionales
+                valores[pregunta['id']] = {'respuesta_texto': valor or ''}
+            continue
+
+        try:
+            valores[pregunta['id']] = _validar_valor(pregunta, valor)
+        except ValueError as e:
+            errores[pregunta['id']] = str(e)
+
+    return valores, errores
+
+
+def guardar_respuesta(encuesta, esquema, usuario, valores, practica=None):
+    """
+    Guardar la respuesta y todos sus detalles en una transacción.
+    Los detalles se insertan con un único bulk_create y se actualizan los
+    resultados materializados.
+    """
+    with transaction.atomic():
+        respuesta = RespuestaEncuesta.objects.create(
+            encuesta=encuesta,
+            usuario=usuario if not encuesta.es_anonima else None,
+            practica=practica,
+        )
+        detalles = DetallePregunta.objects.bulk_create([
+            DetallePregunta(respuesta_encuesta=respuesta, pregunta_id=pregunta_id, **campos)
+            for pregunta_id, campos in valores.items()
+        ])
+        registrar_respuesta(
+            respuesta,
+            detalles,
+            tipos={pregunta['id']: pregunta['tipo'] for pregunta in esquema},
+        )
+
+    return respuesta
@@ -0,0 +1,280 @@
+"""
+Motor de agregación de resultados de encuestas.
+
+Los resultados por pregunta se materializan en ResumenPregunta:
+- materializar_resultados() los recalcula con unas pocas consultas agrupadas.
+- registrar_respuesta() los actualiza de forma incremental con cada respuesta.
+- obtener_resultados() arma los datos de la página de resultados desde la tabla.
+
+Materializar y registrar bloquean la fila de la encuesta: así un recálculo
+completo no puede correr entre que una respuesta guarda sus detalles y
+suma sus conteos (la contaría dos veces o ninguna). Leen siempre de
+'default', aunque se llamen dentro de lecturas_en_replica(): el bloqueo debe
+tomarse en la transacción de la escritura, y contar sobre una réplica
+atrasada guardaría en el resumen conteos a los que les faltan respuestas.
+"""
+from collections import Counter, defaultdict
+
+from django.db import connections, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from config.db import iterar_en_lotes
+from config.db.replicas import lecturas_en_replica
+
+from .models import Encuesta, Pregunta, DetallePregunta, ResumenPregunta
+
+
+TIPOS_TEXTO = [Pregunta.TEXTO_CORTO, Pregunta.TEXTO_LARGO]
+TIPOS_OPCIONES = [Pregunta.OPCION_MULTIPLE, Pregunta.SELECCION_UNICA]
+
+
+def _claves_detalle(tipo, detalle):
+    """Claves de `conteos` a las que suma un detalle según el tipo de pregunta."""
+    if tipo == Pregunta.ESCALA:
+        if detalle.respuesta_numerica is not None:
+            return [str(detalle.respuesta_numerica)]
+    elif tipo == Pregunta.SI_NO:
+        if detalle.respuesta_booleana is not None:
+            return ['si' if detalle.respuesta_booleana else 'no']
+    elif tipo in TIPOS_OPCIONES:
+        return [str(opcion) for opcion in detalle.opciones_seleccionadas or []]
+    return []
+
+
+def sql_conteo_opciones(detalles, columnas, conexion):
+    """
+    SQL de PostgreSQL que cuenta las opciones seleccionadas (arreglo JSON) de
+    `detalles` agrupadas por `columnas` (nombres de .values(), incluidas las
+    anotaciones) y por opción: filas (*columnas, opcion, total).
+    """
+    consulta = detalles.values(*columnas, 'opciones_seleccionadas').order_by().query
+    sql, params = consulta.get_compiler(connection=conexion).as_sql()
+    grupos = ', '.join(f'd.{conexion.ops.quote_name(columna)}' for columna in columnas)
+    return f"""
+        SELECT {grupos}, opcion.valor, COUNT(*)
+        FROM ({sql}) d
+        CROSS JOIN LATERAL jsonb_array_elements_text(
+            CASE WHEN jsonb_typeof(d.opciones_seleccionadas) = 'array'
+                 THEN d.opciones_seleccionadas ELSE '[]'::jsonb END
+        ) AS opcion(valor)
+        GROUP BY {grupos}, opcion.valor
+    """, params
+
+
+def contar_opciones(detalles, columnas):
+    """
+    Conteos de opciones de `detalles` por `columnas`: {(*columnas): Counter}.
+    En PostgreSQL se expande el arreglo JSON y se agrupa en la base de datos
+    (sql_conteo_opciones); en otros motores se recorren solo las columnas
+    necesarias.
+    """
+    conteos = defaultdict(Counter)
+    conexion = connections[detalles.db]
+
+    if conexion.vendor == 'postgresql':
+        sql, params = sql_conteo_opciones(detalles, columnas, conexion)
+        with conexion.cursor() as cursor:
+            cursor.execute(sql, params)
+            for *claves, valor, total in cursor.fetchall():
+                conteos[tuple(claves)][valor] = total
+        return conteos
+
+    filas = detalles.values_list(*columnas, 'opciones_seleccionadas').order_by()
+    for *claves, opciones in iterar_en_lotes(filas):
+        conteos[tuple(claves)].update(str(opcion) for opcion in opciones or [])
+    return conteos
+
+
+def _conteo_opciones(encuesta):
+    """Cuenta las opciones seleccionadas (JSON) por pregunta."""
+    detalles = DetallePregunta.objects.filter(
+        pregunta__encuesta=encuesta,
+        pregunta__tipo__in=TIPOS_OPCIONES,
+        opciones_seleccionadas__isnull=False,
+    )
+    return {pregunta_id: conteo for (pregunta_id,), conteo in contar_opciones(detalles, ['pregunta_id']).items()}
+
+
+def _bloquear_encuesta(encuesta):
+    """Bloquea la fila de la encuesta hasta el fin de la transacción."""
+    list(Encuesta.objects.select_for_update().filter(pk=encuesta.pk).values_list('pk', flat=True))
+
+
+def materializar_resultados(encuesta):
+    """
+    Recalcula desde cero el resumen de todas las preguntas de la encuesta.
+    Usa consultas agrupadas en lugar de una consulta por pregunta.
+    """
+    with lecturas_en_replica(False), transaction.atomic():
+        _bloquear_encuesta(encuesta)
+        return _materializar(encuesta)
+
+
+def _materializar(encuesta):
+    detalles = DetallePregunta.objects.filter(pregunta__encuesta=encuesta)
+
+    totales = {
+        fila['pregunta_id']: fila
+        for fila in detalles.values('pregunta_id').annotate(
+            total=Count('id'),
+            suma=Sum('respuesta_numerica'),
+        ).order_by()
+    }
+
+    conteos = defaultdict(Counter)
+    numericas = detalles.filter(respuesta_numerica__isnull=False).values(
+        'pregunta_id', 'respuesta_numerica'
+    ).annotate(total=Count('id')).order_by()
+    for fila in numericas:
+        conteos[fila['pregunta_id']][str(fila['respuesta_numerica'])] = fila['total']
+
+    booleanas = detalles.filter(respuesta_booleana__isnull=False).values(
+        'pregunta_id', 'respuesta_booleana'
+    ).annotate(total=Count('id')).order_by()
+    for fila in booleanas:
+        clave = 'si' if fila['respuesta_booleana'] else 'no'
+        conteos[fila['pregunta_id']][clave] = fila['total']
+
+    for pregunta_id, opciones in _conteo_opciones(encuesta).items():
+        conteos[pregunta_id].update(opciones)
+
+    ahora = timezone.now()
+    resumenes = []
+    for pregunta_id in encuesta.preguntas.values_list('id', flat=True):
+        fila = totales.get(pregunta_id, {})
+        resumenes.append(ResumenPregunta(
+            pregunta_id=pregunta_id,
+            total=fila.get('total') or 0,
+            suma=fila.get('suma') or 0,
+            conteos=dict(conteos.get(pregunta_id, {})),
+            actualizado=ahora,
+        ))
+
+    ResumenPregunta.objects.bulk_create(
+        resumenes,
+        update_conflicts=True,
+        unique_fields=['pregunta'],
+        update_fields=['total', 'suma', 'conteos', 'actualizado'],
+    )
+    return resumenes
+
+
+def registrar_respuesta(respuesta, detalles, tipos=None):
+    """
+    Actualiza de forma incremental el resumen con los detalles de una respuesta.
+    Si la encuesta aún no tiene resumen materializado, se construye completo
+    (los detalles ya guardados quedan incluidos).
+    `tipos` (id de pregunta -> tipo) evita consultar las preguntas si ya se conocen.
+    """
+    encuesta = respuesta.encuesta
+    with lecturas_en_replica(False):
+        _registrar_respuesta(encuesta, detalles, tipos)
+
+
+def _registrar_respuesta(encuesta, detalles, tipos):
+    if tipos is None:
+        tipos = dict(encuesta.preguntas.values_list('id', 'tipo'))
+
+    with transaction.atomic(savepoint=False):
+        # Espera a un recálculo en curso; uno posterior verá estos detalles
+        _bloquear_encuesta(encuesta)
+        resumenes = {
+            resumen.pregunta_id: resumen
+            for resumen in ResumenPregunta.objects.select_for_update().filter(
+                pregunta_id__in=tipos.keys()
+            )
+        }
+        if len(resumenes) < len(tipos):
+            _materializar(encuesta)
+            return
+
+        ahora = timezone.now()
+        modificados = {}
+        for detalle in detalles:
+            resumen = resumenes.get(detalle.pregunta_id)
+            if resumen is None:
+                continue
+
+            resumen.total += 1
+            resumen.suma += detalle.respuesta_numerica or 0
+            for clave in _claves_detalle(tipos[detalle.pregunta_id], detalle):
+                resumen.conteos[clave] = resumen.conteos.get(clave, 0) + 1
+            resumen.actualizado = ahora
+            modificados[resumen.pk] = resumen
+
+        ResumenPregunta.objects.bulk_update(
+            modificados.values(), ['total', 'suma', 'conteos', 'actualizado']
+        )
+
+
+def _ordenar_opciones(pregunta, conteos):
+    """Ordena el conteo de opciones según el orden definido en la pregunta."""
+    ordenadas = {
+        opcion: conteos[opcion]
+        for opcion in pregunta.opciones or []
+        if opcion in conteos
+    }
+    for opcion, total in conteos.items():
+        ordenadas.setdefault(opcion, total)
+    return ordenadas
+
+
+def obtener_resultados(encuesta):
+    """
+    Resultados por pregunta para la página de resultados.
+    Lee la tabla materializada; las respuestas de texto se obtienen en una
+    sola consulta para toda la encuesta.
+    """
+    preguntas = list(encuesta.preguntas.select_related('resumen').order_by('orden'))
+
+    if any(not hasattr(pregunta, 'resumen') for pregunta in preguntas):
+        materializar_resultados(encuesta)
+        preguntas = list(encuesta.preguntas.select_related('resumen').order_by('orden'))
+
+    textos = defaultdict(list)
+    if any(pregunta.tipo in TIPOS_TEXTO for pregunta in preguntas):
+        respuestas_texto = DetallePregunta.objects.filter(
+            pregunta__encuesta=encuesta,
+            pregunta__tipo__in=TIPOS_TEXTO,
+        ).values_list('pregunta_id', 'respuesta_texto')
+        for pregunta_id, texto in respuestas_texto:
+            textos[pregunta_id].append(texto)
+
+    resultados = []
+    for pregunta in preguntas:
+        resumen = pregunta.resumen
+
+        if pregunta.tipo == Pregunta.ESCALA:
+            resultados.append({
+                'pregunta': pregunta,
+                'tipo': 'escala',
+                'promedio': resumen.promedio,
+                'distribucion': {
+                    i: resumen.conteos.get(str(i), 0) for i in range(1, 6)
+                },
+            })
+
+        elif pregunta.tipo in TIPOS_OPCIONES:
+            resultados.append({
+                'pregunta': pregunta,
+                'tipo': 'opciones',
+                'respuestas': _ordenar_opciones(pregunta, resumen.conteos),
+            })
+
+        elif pregunta.tipo == Pregunta.SI_NO:
+            resultados.append({
+                'pregunta': pregunta,
+                'tipo': 'si_no',
+                'si': resumen.conteos.get('si', 0),
+                'no': resumen.conteos.get('no', 0),
+            })
+
+        else:  # Texto
+            resultados.append({
+                'pregunta': pregunta,
+                'tipo': 'texto',
+                'respuestas': textos.get(pregunta.id, []),
+            })
+
+    return resultados
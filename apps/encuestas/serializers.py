@@ -0,0 +1,23 @@
+from rest_framework import serializers
+from apps.practicas.models import Practica
+from apps.practicas.visibilidad import obtener_visibilidad
+
+
+class ResponderEncuestaSerializer(serializers.Serializer):
+    """Serializer para responder una encuesta vía API."""
+    
+    respuestas = serializers.DictField(
+        help_text='Respuestas por id de pregunta'
+    )
+    practica = serializers.PrimaryKeyRelatedField(
+        queryset=Practica.objects.all(),
+        required=False,
+        allow_null=True
+    )
+    
+    def validate_practica(self, practica):
+        """Solo se puede asociar una práctica que el usuario ve."""
+        visibilidad = obtener_visibilidad(self.context['request'])
+        if practica and not visibilidad.ve_todo and practica.pk not in visibilidad.practica_ids:
+            raise serializers.ValidationError('No tienes acceso a esta práctica.')
+        return practica
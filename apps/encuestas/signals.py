@@ -0,0 +1,129 @@
+"""
+Señales de la app de encuestas.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.usuarios.models import User
+from apps.usuarios.signals import usuarios_creados_en_bloque
+from .analitica import invalidar_analitica
+from .audiencia import invalidar_tamanos_audiencia
+from .models import Encuesta, Pregunta, RespuestaEncuesta, DetallePregunta, ResumenPregunta
+from .respuestas import invalidar_esquema, invalidar_encuestas_respondidas
+
+
+# Campos del usuario que cambian el tamaño de la audiencia
+CAMPOS_AUDIENCIA = ('role', 'is_active', 'is_superuser')
+
+
+@receiver(post_save, sender=DetallePregunta)
+@receiver(post_delete, sender=DetallePregunta)
+def invalidar_resumen_pregunta(sender, instance, created=False, **kwargs):
+    """
+    Al editar o borrar respuestas el resumen deja de ser válido.
+    Se elimina para que se vuelva a materializar en la siguiente lectura.
+    Los detalles nuevos los suma registrar_respuesta().
+    """
+    if created:
+        return
+    ResumenPregunta.objects.filter(pregunta_id=instance.pregunta_id).delete()
+
+
+@receiver(post_save, sender=RespuestaEncuesta)
+@receiver(post_delete, sender=RespuestaEncuesta)
+@receiver(post_save, sender=DetallePregunta)
+@receiver(post_delete, sender=DetallePregunta)
+def invalidar_analitica_encuesta(sender, instance, created=False, **kwargs):
+    """
+    Descarta las tablas cruzadas de la encuesta. Se invalida de inmediato y
+    otra vez al confirmar, para no dejar en caché una lectura hecha antes
+    de que la respuesta fuera visible.
+    """
+    if sender is DetallePregunta:
+        if created:
+            return  # la RespuestaEncuesta nueva ya invalidó
+        encuesta_id = Pregunta.objects.filter(pk=instance.pregunta_id).values_list('encuesta_id', flat=True).first()
+    else:
+        encuesta_id = instance.encuesta_id
+    invalidar_analitica(encuesta_id)
+    transaction.on_commit(lambda: invalidar_analitica(encuesta_id))
+
+
+@receiver(post_save, sender=Pregunta)
+@receiver(post_delete, sender=Pregunta)
+def invalidar_esquema_encuesta(sender, instance, **kwargs):
+    """Al modificar las preguntas se descarta el esquema en caché."""
+    invalidar_esquema(instance.encuesta_id)
+
+
+@receiver(post_save, sender=RespuestaEncuesta)
+@receiver(post_delete, sender=RespuestaEncuesta)
+def invalidar_respondidas_usuario(sender, instance, **kwargs):
+    """
+    Descarta el conjunto de encuestas respondidas del usuario.
+    Se hace al confirmar la transacción para no volver a guardar en caché
+    un conjunto anterior a la respuesta.
+    """
+    if instance.usuario_id:
+        usuario_id = instance.usuario_id
+        transaction.on_commit(lambda: invalidar_encuestas_respondidas(usuario_id))
+
+
+def _otras_respuestas_usuario(respuesta):
+    """Indica si el usuario tiene otras respuestas en la misma encuesta."""
+    return RespuestaEncuesta.objects.filter(
+        encuesta_id=respuesta.encuesta_id,
+        usuario_id=respuesta.usuario_id,
+    ).exclude(pk=respuesta.pk).exists()
+
+
+@receiver(post_save, sender=RespuestaEncuesta)
+def incrementar_contadores_encuesta(sender, instance, created, **kwargs):
+    """Actualizar los contadores de la encuesta al registrar una respuesta."""
+    if not created:
+        return
+    
+    # Solo si la encuesta permite varias respuestas puede repetirse el usuario
+    nuevo_respondente = (
+        instance.usuario_id is None
+        or not instance.encuesta.permite_multiple
+        or not _otras_respuestas_usuario(instance)
+    )
+    Encuesta.objects.filter(pk=instance.encuesta_id).update(
+        num_respuestas=F('num_respuestas') + 1,
+        num_respondentes=F('num_respondentes') + int(nuevo_respondente),
+    )
+
+
+@receiver(post_delete, sender=RespuestaEncuesta)
+def decrementar_contadores_encuesta(sender, instance, **kwargs):
+    """Actualizar los contadores de la encuesta al borrar una respuesta."""
+    respondente_eliminado = instance.usuario_id is None or not _otras_respuestas_usuario(instance)
+    Encuesta.objects.filter(pk=instance.encuesta_id).update(
+        num_respuestas=Greatest(F('num_respuestas') - 1, 0),
+        num_respondentes=Greatest(F('num_respondentes') - int(respondente_eliminado), 0),
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidar_audiencia_usuario(sender, instance, **kwargs):
+    """Invalidar los tamaños de audiencia si cambió el rol o el estado del usuario."""
+    # Sin User.save() (p. ej. loaddata) no se sabe qué cambió
+    modificados = getattr(instance, 'campos_modificados', CAMPOS_AUDIENCIA)
+    if set(CAMPOS_AUDIENCIA) & set(modificados):
+        invalidar_tamanos_audiencia()
+
+
+@receiver(post_delete, sender=User)
+def invalidar_audiencia_usuario_eliminado(sender, instance, **kwargs):
+    """Invalidar los tamaños de audiencia al eliminar un usuario."""
+    invalidar_tamanos_audiencia()
+
+
+@receiver(usuarios_creados_en_bloque)
+def invalidar_audiencia_usuarios_en_bloque(sender, **kwargs):
+    """Invalidar los tamaños de audiencia tras crear usuarios en bloque."""
+    invalidar_tamanos_audiencia()
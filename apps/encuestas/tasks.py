@@ -0,0 +1,12 @@
+# Celery tasks para encuestas
+from celery import shared_task
+
+
+@shared_task
+def materializar_resultados_encuesta(encuesta_id):
+    """Recalcular desde cero los resultados materializados de una encuesta."""
+    from .models import Encuesta
+    from .resultados import materializar_resultados
+    
+    encuesta = Encuesta.objects.get(id=encuesta_id)
+    materializar_resultados(encuesta)
@@ -0,0 +1,231 @@
+"""
+Pruebas para las tablas cruzadas y la exportación de analítica de encuestas.
+"""
+import pytest
+from django.core.cache import cache
+from django.db import connections
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgreSQL
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.encuestas.analitica import DIMENSIONES, SIN_DATO, obtener_tablas_cruzadas
+from apps.encuestas.models import DetallePregunta, Encuesta, Pregunta, RespuestaEncuesta
+from apps.encuestas.respuestas import obtener_esquema, validar_respuestas, guardar_respuesta
+from apps.encuestas.resultados import sql_conteo_opciones
+from apps.usuarios.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def crear_usuario(username, role, **extra):
+    return User.objects.create_user(
+        email=f'{username}@example.com',
+        password='testpass123',
+        username=username,
+        first_name='Nombre',
+        last_name='Apellido',
+        role=role,
+        **extra
+    )
+
+
+def responder(encuesta, usuario, datos):
+    esquema = obtener_esquema(encuesta)
+    valores, errores = validar_respuestas(esquema, datos)
+    assert not errores
+    return guardar_respuesta(encuesta, esquema, usuario, valores)
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def coordinadora():
+    return crear_usuario('coordinadora', User.COORDINADORA_EMPRESARIAL)
+
+
+@pytest.fixture
+def encuesta(coordinadora):
+    encuesta = Encuesta.objects.create(
+        titulo='Satisfacción',
+        creada_por=coordinadora,
+        estado=Encuesta.ACTIVA,
+        dirigida_a=Encuesta.TODOS,
+        permite_multiple=True,
+    )
+    escala = Pregunta.objects.create(encuesta=encuesta, texto='Escala', tipo=Pregunta.ESCALA, orden=0)
+    si_no = Pregunta.objects.create(encuesta=encuesta, texto='Sí/No', tipo=Pregunta.SI_NO, orden=1)
+    opciones = Pregunta.objects.create(
+        encuesta=encuesta, texto='Opciones', tipo=Pregunta.OPCION_MULTIPLE, orden=2,
+        opciones=['A', 'B'],
+    )
+    Pregunta.objects.create(
+        encuesta=encuesta, texto='Comentarios', tipo=Pregunta.TEXTO_CORTO, orden=3,
+        es_requerida=False,
+    )
+
+    estudiante = crear_usuario('estudiante', User.ESTUDIANTE, carrera='Sistemas')
+    tutor = crear_usuario('tutor', User.TUTOR_EMPRESARIAL)
+    responder(encuesta, estudiante, {escala.id: 5, si_no.id: 'si', opciones.id: ['A', 'B']})
+    responder(encuesta, estudiante, {escala.id: 4, si_no.id: 'no', opciones.id: ['A']})
+    responder(encuesta, tutor, {escala.id: 5, si_no.id: 'si', opciones.id: ['B']})
+    encuesta.refresh_from_db()
+    return encuesta
+
+
+class TestTablasCruzadas:
+    """Pruebas del cálculo de tablas cruzadas"""
+
+    def test_por_rol(self, encuesta):
+        """Cuenta cada categoría por rol y omite preguntas de texto"""
+        datos = obtener_tablas_cruzadas(encuesta, 'rol')
+        assert datos['total_respuestas'] == 3
+        assert [p['texto'] for p in datos['preguntas']] == ['Escala', 'Sí/No', 'Opciones']
+
+        escala, si_no, opciones = datos['preguntas']
+        filas = {fila['grupo']: fila for fila in escala['filas']}
+        assert filas[User.ESTUDIANTE]['conteos'] == {'1': 0, '2': 0, '3': 0, '4': 1, '5': 1}
+        assert filas[User.TUTOR_EMPRESARIAL]['conteos']['5'] == 1
+
+        filas = {fila['grupo']: fila for fila in si_no['filas']}
+        assert filas[User.ESTUDIANTE]['conteos'] == {'si': 1, 'no': 1}
+
+        filas = {fila['grupo']: fila for fila in opciones['filas']}
+        assert opciones['categorias'] == ['A', 'B']
+        assert filas[User.ESTUDIANTE]['conteos'] == {'A': 2, 'B': 1}
+        assert filas[User.TUTOR_EMPRESARIAL]['total'] == 1
+
+    def test_grupo_sin_dato(self, encuesta):
+        """Las respuestas sin valor en la dimensión se agrupan como 'Sin dato'"""
+        datos = obtener_tablas_cruzadas(encuesta, 'carrera')
+        grupos = [fila['grupo'] for fila in datos['preguntas'][0]['filas']]
+        assert grupos == ['Sistemas', SIN_DATO]
+
+    def test_cache_hasta_siguiente_respuesta(self, encuesta, django_assert_num_queries):
+        """El resultado se reutiliza hasta que llega una nueva respuesta"""
+        obtener_tablas_cruzadas(encuesta, 'rol')
+        with django_assert_num_queries(0):
+            obtener_tablas_cruzadas(encuesta, 'rol')
+
+        escala, si_no, opciones = encuesta.preguntas.exclude(
+            tipo=Pregunta.TEXTO_CORTO
+        ).order_by('orden')
+        responder(
+            encuesta,
+            crear_usuario('otro', User.DOCENTE_ASESOR),
+            {escala.id: 1, si_no.id: 'no', opciones.id: ['A']},
+        )
+        encuesta.refresh_from_db()
+
+        datos = obtener_tablas_cruzadas(encuesta, 'rol')
+        filas = {fila['grupo']: fila for fila in datos['preguntas'][0]['filas']}
+        assert filas[User.DOCENTE_ASESOR]['conteos']['1'] == 1
+
+    def test_borrar_y_responder_invalida(self, encuesta):
+        """Borrar una respuesta y recibir otra no reutiliza las tablas anteriores"""
+        obtener_tablas_cruzadas(encuesta, 'rol')
+        escala, si_no, opciones = encuesta.preguntas.exclude(
+            tipo=Pregunta.TEXTO_CORTO
+        ).order_by('orden')
+
+        RespuestaEncuesta.objects.filter(usuario__role=User.TUTOR_EMPRESARIAL).delete()
+        responder(
+            encuesta,
+            crear_usuario('otro', User.DOCENTE_ASESOR),
+            {escala.id: 1, si_no.id: 'no', opciones.id: ['A']},
+        )
+        encuesta.refresh_from_db()
+        assert encuesta.num_respuestas == 3
+
+        datos = obtener_tablas_cruzadas(encuesta, 'rol')
+        grupos = [fila['grupo'] for fila in datos['preguntas'][0]['filas']]
+        assert User.TUTOR_EMPRESARIAL not in grupos
+        assert User.DOCENTE_ASESOR in grupos
+
+    def test_editar_detalle_invalida(self, encuesta):
+        """Editar una respuesta también invalida las tablas"""
+        obtener_tablas_cruzadas(encuesta, 'rol')
+        detalle = DetallePregunta.objects.get(
+            pregunta__tipo=Pregunta.ESCALA, respuesta_encuesta__usuario__role=User.TUTOR_EMPRESARIAL
+        )
+        detalle.respuesta_numerica = 2
+        detalle.save()
+
+        datos = obtener_tablas_cruzadas(encuesta, 'rol')
+        filas = {fila['grupo']: fila for fila in datos['preguntas'][0]['filas']}
+        assert filas[User.TUTOR_EMPRESARIAL]['conteos']['2'] == 1
+
+    def test_sin_cursores_de_servidor(self, encuesta, monkeypatch):
+        """Detrás de PgBouncer (sin cursores de servidor) el resultado es el mismo."""
+        esperado = obtener_tablas_cruzadas(encuesta, 'rol')
+        cache.clear()
+        monkeypatch.setitem(connections['default'].settings_dict, 'DISABLE_SERVER_SIDE_CURSORS', True)
+        assert obtener_tablas_cruzadas(encuesta, 'rol') == esperado
+
+    def test_opciones_agrupadas_en_sql_con_postgresql(self, encuesta):
+        """En PostgreSQL las opciones se cuentan con GROUP BY por pregunta, grupo y opción."""
+        postgresql = PostgreSQL({**connections['default'].settings_dict, 'ENGINE': 'django.db.backends.postgresql'}, 'pg')
+        detalles = DetallePregunta.objects.filter(pregunta__encuesta=encuesta).annotate(grupo=DIMENSIONES['empresa']())
+
+        sql, params = sql_conteo_opciones(detalles, ['pregunta_id', 'grupo'], postgresql)
+
+        assert 'jsonb_array_elements_text' in sql
+        assert 'GROUP BY d."pregunta_id", d."grupo", opcion.valor' in sql
+        assert 'COALESCE' in sql
+        assert encuesta.pk in params
+
+
+class TestAnaliticaAPI:
+    """Pruebas del endpoint de analítica"""
+
+    def test_json(self, encuesta, coordinadora):
+        client = APIClient()
+        client.force_authenticate(user=coordinadora)
+        url = reverse('encuestas_api:analitica', args=[encuesta.pk])
+        response = client.get(url, {'dimension': 'empresa'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['dimension'] == 'empresa'
+
+    def test_xlsx(self, encuesta, coordinadora):
+        client = APIClient()
+        client.force_login(coordinadora)
+        url = reverse('encuestas_api:analitica_xlsx', args=[encuesta.pk])
+        response = client.get(url, {'dimension': 'empresa'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Disposition'].endswith('_empresa.xlsx"')
+        assert response.content[:2] == b'PK'
+
+    def test_xlsx_con_jwt(self, encuesta, coordinadora):
+        """La vista async acepta el mismo token que la API"""
+        client = APIClient()
+        token = RefreshToken.for_user(coordinadora).access_token
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        url = reverse('encuestas_api:analitica_xlsx', args=[encuesta.pk])
+        assert client.get(url).status_code == status.HTTP_200_OK
+
+    def test_xlsx_solo_coordinadora(self, encuesta):
+        url = reverse('encuestas_api:analitica_xlsx', args=[encuesta.pk])
+        assert APIClient().get(url).status_code == status.HTTP_401_UNAUTHORIZED
+        client = APIClient()
+        client.force_login(User.objects.get(username='estudiante'))
+        assert client.get(url).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_dimension_invalida(self, encuesta, coordinadora):
+        client = APIClient()
+        client.force_authenticate(user=coordinadora)
+        url = reverse('encuestas_api:analitica', args=[encuesta.pk])
+        response = client.get(url, {'dimension': 'color'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_solo_coordinadora(self, encuesta):
+        client = APIClient()
+        client.force_authenticate(user=User.objects.get(username='estudiante'))
+        url = reverse('encuestas_api:analitica', args=[encuesta.pk])
+        response = client.get(url)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
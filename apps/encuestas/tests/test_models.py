@@ -0,0 +1,140 @@
+"""
+Pruebas para los modelos de encuestas.
+"""
+import pytest
+from django.core.cache import cache
+
+from apps.encuestas.audiencia import tamanos_audiencia
+from apps.encuestas.models import Encuesta, RespuestaEncuesta
+from apps.usuarios.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def crear_usuario(username, role, **extra):
+    return User.objects.create_user(
+        email=f'{username}@example.com',
+        password='testpass123',
+        username=username,
+        first_name='Nombre',
+        last_name='Apellido',
+        role=role,
+        **extra
+    )
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def coordinadora():
+    return crear_usuario('coordinadora', User.COORDINADORA_EMPRESARIAL)
+
+
+class TestContadoresRespuestas:
+    """Pruebas para los contadores incrementales de respuestas."""
+    
+    def test_incrementa_al_responder(self, coordinadora):
+        """Cada respuesta debe incrementar los contadores de la encuesta."""
+        encuesta = Encuesta.objects.create(titulo='E', creada_por=coordinadora)
+        estudiante = crear_usuario('estudiante', User.ESTUDIANTE)
+        
+        RespuestaEncuesta.objects.create(encuesta=encuesta, usuario=estudiante)
+        RespuestaEncuesta.objects.create(encuesta=encuesta)
+        encuesta.refresh_from_db()
+        
+        assert encuesta.num_respuestas == 2
+        assert encuesta.num_respondentes == 2
+        assert encuesta.total_respuestas() == 2
+    
+    def test_respuestas_multiples_cuentan_un_respondente(self, coordinadora):
+        """Varias respuestas del mismo usuario cuentan como un respondente."""
+        encuesta = Encuesta.objects.create(
+            titulo='E', creada_por=coordinadora, permite_multiple=True
+        )
+        estudiante = crear_usuario('estudiante', User.ESTUDIANTE)
+        
+        primera = RespuestaEncuesta.objects.create(encuesta=encuesta, usuario=estudiante)
+        RespuestaEncuesta.objects.create(encuesta=encuesta, usuario=estudiante)
+        encuesta.refresh_from_db()
+        assert (encuesta.num_respuestas, encuesta.num_respondentes) == (2, 1)
+        
+        primera.delete()
+        encuesta.refresh_from_db()
+        assert (encuesta.num_respuestas, encuesta.num_respondentes) == (1, 1)
+
+
+class TestTasaRespuesta:
+    """Pruebas para la tasa de respuesta con audiencias en caché."""
+    
+    def test_tasa_respuesta(self, coordinadora):
+        """La tasa debe usar los usuarios activos del rol destinatario."""
+        encuesta = Encuesta.objects.create(
+            titulo='E', creada_por=coordinadora, dirigida_a=Encuesta.ESTUDIANTES
+        )
+        estudiantes = [crear_usuario(f'est{i}', User.ESTUDIANTE) for i in range(4)]
+        crear_usuario('inactivo', User.ESTUDIANTE, is_active=False)
+        RespuestaEncuesta.objects.create(encuesta=encuesta, usuario=estudiantes[0])
+        encuesta.refresh_from_db()
+        
+        assert encuesta.tasa_respuesta() == 25
+    
+    def test_tasa_cuenta_respondentes_de_la_audiencia(self, coordinadora):
+        """Quien respondió y ya no es destinatario no cuenta en la tasa."""
+        encuesta = Encuesta.objects.create(
+            titulo='E', creada_por=coordinadora, dirigida_a=Encuesta.ESTUDIANTES
+        )
+        estudiantes = [crear_usuario(f'est{i}', User.ESTUDIANTE) for i in range(2)]
+        for estudiante in estudiantes:
+            RespuestaEncuesta.objects.create(encuesta=encuesta, usuario=estudiante)
+        estudiantes[0].is_active = False
+        estudiantes[0].save()
+        encuesta.refresh_from_db()
+        
+        assert encuesta.num_respondentes == 2
+        assert encuesta.tasa_respuesta() == 100
+        
+        estudiantes[1].role = User.DOCENTE_ASESOR
+        estudiantes[1].save()
+        crear_usuario('nuevo', User.ESTUDIANTE)
+        assert encuesta.tasa_respuesta() == 0
+    
+    def test_audiencia_en_cache(self, coordinadora, django_assert_num_queries):
+        """Los tamaños de audiencia se calculan una vez y se reutilizan."""
+        crear_usuario('tutor', User.TUTOR_EMPRESARIAL)
+        tamanos_audiencia()
+        
+        with django_assert_num_queries(0):
+            tamanos = tamanos_audiencia()
+        
+        assert tamanos[Encuesta.TUTORES] == 1
+        assert tamanos[Encuesta.TODOS] == 2
+    
+    def test_cambio_de_rol_invalida_audiencia(self, coordinadora):
+        """Cambiar el rol o desactivar un usuario debe invalidar la caché."""
+        estudiante = crear_usuario('estudiante', User.ESTUDIANTE)
+        assert tamanos_audiencia()[Encuesta.ESTUDIANTES] == 1
+        
+        estudiante.role = User.DOCENTE_ASESOR
+        estudiante.save()
+        assert tamanos_audiencia()[Encuesta.ESTUDIANTES] == 0
+        assert tamanos_audiencia()[Encuesta.DOCENTES] == 1
+        
+        estudiante.is_active = False
+        estudiante.save()
+        assert tamanos_audiencia()[Encuesta.DOCENTES] == 0
+    
+    def test_login_no_invalida_audiencia(self, coordinadora):
+        """Guardar campos que no afectan la audiencia no invalida la caché."""
+        tamanos_audiencia()
+        
+        coordinadora.save(update_fields=['last_login'])
+        coordinadora.first_name = 'Otro'
+        coordinadora.save()
+        User.objects.get(pk=coordinadora.pk).save()
+        
+        assert cache.get('encuestas:audiencia') is not None
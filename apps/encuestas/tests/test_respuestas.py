@@ -0,0 +1,277 @@
+"""
+Pruebas para la validación y el guardado en bloque de respuestas.
+"""
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.encuestas.models import (
+    Encuesta, Pregunta, RespuestaEncuesta, DetallePregunta, ResumenPregunta
+)
+from apps.encuestas.respuestas import (
+    obtener_esquema, validar_respuestas, guardar_respuesta,
+    obtener_encuestas_respondidas, ya_respondio, encuestas_pendientes,
+)
+from apps.practicas.models import Practica
+from apps.usuarios.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def crear_usuario(username, role):
+    return User.objects.create_user(
+        email=f'{username}@example.com',
+        password='testpass123',
+        username=username,
+        first_name='Nombre',
+        last_name='Apellido',
+        role=role,
+    )
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def encuesta():
+    coordinadora = crear_usuario('coordinadora', User.COORDINADORA_EMPRESARIAL)
+    encuesta = Encuesta.objects.create(
+        titulo='Evaluación de la práctica',
+        creada_por=coordinadora,
+        estado=Encuesta.ACTIVA,
+        dirigida_a=Encuesta.ESTUDIANTES,
+    )
+    Pregunta.objects.create(encuesta=encuesta, texto='Escala', tipo=Pregunta.ESCALA, orden=0)
+    Pregunta.objects.create(encuesta=encuesta, texto='Sí/No', tipo=Pregunta.SI_NO, orden=1)
+    Pregunta.objects.create(
+        encuesta=encuesta, texto='Única', tipo=Pregunta.SELECCION_UNICA, orden=2,
+        opciones=['A', 'B'],
+    )
+    Pregunta.objects.create(
+        encuesta=encuesta, texto='Comentarios', tipo=Pregunta.TEXTO_LARGO, orden=3,
+        es_requerida=False,
+    )
+    return encuesta
+
+
+def ids(encuesta):
+    return {p.tipo: p.id for p in encuesta.preguntas.all()}
+
+
+class TestEsquema:
+    """Pruebas para el esquema de preguntas en caché."""
+    
+    def test_esquema_en_cache(self, encuesta, django_assert_num_queries):
+        """La segunda lectura del esquema no debe consultar la base de datos."""
+        obtener_esquema(encuesta)
+        
+        with django_assert_num_queries(0):
+            esquema = obtener_esquema(encuesta)
+        
+        assert [p['orden'] for p in esquema] == [0, 1, 2, 3]
+    
+    def test_modificar_pregunta_invalida_esquema(self, encuesta):
+        """Agregar una pregunta debe invalidar el esquema en caché."""
+        obtener_esquema(encuesta)
+        Pregunta.objects.create(encuesta=encuesta, texto='Nueva', tipo=Pregunta.TEXTO_CORTO, orden=4)
+        
+        assert len(obtener_esquema(encuesta)) == 5
+
+
+class TestValidarRespuestas:
+    """Pruebas para la validación completa del formulario."""
+    
+    def test_respuestas_validas(self, encuesta):
+        """Debe convertir cada valor al campo del detalle."""
+        p = ids(encuesta)
+        valores, errores = validar_respuestas(obtener_esquema(encuesta), {
+            p[Pregunta.ESCALA]: '4',
+            p[Pregunta.SI_NO]: 'si',
+            p[Pregunta.SELECCION_UNICA]: 'B',
+        })
+        
+        assert errores == {}
+        assert valores[p[Pregunta.ESCALA]] == {'respuesta_numerica': 4}
+        assert valores[p[Pregunta.SI_NO]] == {'respuesta_booleana': True}
+        assert valores[p[Pregunta.SELECCION_UNICA]] == {'opciones_seleccionadas': ['B']}
+        assert valores[p[Pregunta.TEXTO_LARGO]] == {'respuesta_texto': ''}
+    
+    def test_reporta_todos_los_errores(self, encuesta):
+        """Debe reportar todos los errores de una sola vez."""
+        p = ids(encuesta)
+        _, errores = validar_respuestas(obtener_esquema(encuesta), {
+            p[Pregunta.ESCALA]: '9',
+            p[Pregunta.SELECCION_UNICA]: 'Z',
+        })
+        
+        assert set(errores) == {p[Pregunta.ESCALA], p[Pregunta.SI_NO], p[Pregunta.SELECCION_UNICA]}
+
+
+class TestGuardarRespuesta:
+    """Pruebas para el guardado en bloque."""
+    
+    def test_guarda_en_bloque(self, encuesta, django_assert_max_num_queries):
+        """Debe insertar la respuesta y sus detalles con pocas consultas."""
+        estudiante = crear_usuario('estudiante', User.ESTUDIANTE)
+        esquema = obtener_esquema(encuesta)
+        p = ids(encuesta)
+        valores, _ = validar_respuestas(esquema, {
+            p[Pregunta.ESCALA]: 5,
+            p[Pregunta.SI_NO]: False,
+            p[Pregunta.SELECCION_UNICA]: 'A',
+        })
+        
+        guardar_respuesta(encuesta, esquema, estudiante, valores)
+        
+        # Incluye el bloqueo de la encuesta antes de sumar al resumen
+        with django_assert_max_num_queries(8):
+            guardar_respuesta(encuesta, esquema, estudiante, valores)
+        
+        assert RespuestaEncuesta.objects.filter(encuesta=encuesta).count() == 2
+        assert DetallePregunta.objects.filter(pregunta__encuesta=encuesta).count() == 8
+        assert ResumenPregunta.objects.get(pregunta_id=p[Pregunta.ESCALA]).total == 2
+
+
+class TestResponderEncuestaAPI:
+    """Pruebas para la API JSON de respuestas."""
+    
+    def test_responder_via_api(self, encuesta):
+        """Un estudiante debe poder responder la encuesta vía API."""
+        estudiante = crear_usuario('estudiante', User.ESTUDIANTE)
+        client = APIClient()
+        client.force_authenticate(user=estudiante)
+        p = ids(encuesta)
+        
+        url = reverse('encuestas_api:responder_api', kwargs={'pk': encuesta.pk})
+        response = client.post(url, {'respuestas': {
+            str(p[Pregunta.ESCALA]): 3,
+            str(p[Pregunta.SI_NO]): True,
+            str(p[Pregunta.SELECCION_UNICA]): 'A',
+            str(p[Pregunta.TEXTO_LARGO]): 'Todo bien',
+        }}, format='json')
+        
+        assert response.status_code == status.HTTP_201_CREATED
+        respuesta = RespuestaEncuesta.objects.get(pk=response.data['id'])
+        assert respuesta.usuario == estudiante
+        assert respuesta.detalles.count() == 4
+    
+    def test_respuestas_invalidas_no_guardan(self, encuesta):
+        """Si alguna respuesta es inválida no debe guardarse nada."""
+        estudiante = crear_usuario('estudiante', User.ESTUDIANTE)
+        client = APIClient()
+        client.force_authenticate(user=estudiante)
+        
+        url = reverse('encuestas_api:responder_api', kwargs={'pk': encuesta.pk})
+        response = client.post(url, {'respuestas': {}}, format='json')
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not RespuestaEncuesta.objects.exists()
+    
+    def test_rol_no_destinatario(self, encuesta):
+        """Un tutor no debe poder responder una encuesta para estudiantes."""
+        tutor = crear_usuario('tutor', User.TUTOR_EMPRESARIAL)
+        client = APIClient()
+        client.force_authenticate(user=tutor)
+        
+        url = reverse('encuestas_api:responder_api', kwargs={'pk': encuesta.pk})
+        response = client.post(url, {'respuestas': {}}, format='json')
+        
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+    
+    def test_practica_ajena(self, encuesta):
+        """Solo se puede asociar una práctica que el usuario ve."""
+        estudiante = crear_usuario('estudiante', User.ESTUDIANTE)
+        ajena = Practica.objects.create(estudiante=crear_usuario('otro', User.ESTUDIANTE))
+        client = APIClient()
+        client.force_authenticate(user=estudiante)
+        p = ids(encuesta)
+        
+        url = reverse('encuestas_api:responder_api', kwargs={'pk': encuesta.pk})
+        response = client.post(url, {'practica': ajena.pk, 'respuestas': {
+            str(p[Pregunta.ESCALA]): 3,
+            str(p[Pregunta.SI_NO]): True,
+            str(p[Pregunta.SELECCION_UNICA]): 'A',
+        }}, format='json')
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'practica' in response.data['details']
+        assert not RespuestaEncuesta.objects.exists()
+
+
+class TestResponderEncuestaFormulario:
+    """Pruebas para el formulario HTML de respuestas."""
+    
+    def test_conserva_lo_enviado_si_hay_errores(self, encuesta, client):
+        """Al mostrar los errores se mantienen los valores ya ingresados."""
+        client.force_login(crear_usuario('estudiante', User.ESTUDIANTE))
+        p = ids(encuesta)
+        
+        response = client.post(reverse('encuestas_web:responder', kwargs={'pk': encuesta.pk}), {
+            f'pregunta_{p[Pregunta.ESCALA]}': '4',
+            f'pregunta_{p[Pregunta.SELECCION_UNICA]}': 'B',
+            f'pregunta_{p[Pregunta.TEXTO_LARGO]}': 'Mis comentarios',
+        })
+        
+        assert response.status_code == 200
+        contenido = response.content.decode()
+        assert 'Mis comentarios</textarea>' in contenido
+        assert contenido.count('checked') == 2
+        assert not RespuestaEncuesta.objects.exists()
+
+
+class TestEncuestasPendientes:
+    """Pruebas para el listado de encuestas pendientes."""
+    
+    def test_excluye_respondidas(self, encuesta, django_assert_num_queries):
+        """Las encuestas ya respondidas no deben aparecer como pendientes."""
+        estudiante = crear_usuario('estudiante', User.ESTUDIANTE)
+        otra = Encuesta.objects.create(
+            titulo='Otra', creada_por=encuesta.creada_por,
+            estado=Encuesta.ACTIVA, dirigida_a=Encuesta.TODOS,
+        )
+        Encuesta.objects.create(
+            titulo='Tutores', creada_por=encuesta.creada_por,
+            estado=Encuesta.ACTIVA, dirigida_a=Encuesta.TUTORES,
+        )
+        RespuestaEncuesta.objects.create(encuesta=encuesta, usuario=estudiante)
+        
+        with django_assert_num_queries(1):
+            pendientes = list(encuestas_pendientes(estudiante))
+        
+        assert pendientes == [otra]
+    
+    def test_usa_conjunto_en_cache(self, encuesta, django_assert_num_queries):
+        """Con el conjunto en caché el listado sigue siendo una sola consulta."""
+        estudiante = crear_usuario('estudiante', User.ESTUDIANTE)
+        RespuestaEncuesta.objects.create(encuesta=encuesta, usuario=estudiante)
+        assert ya_respondio(encuesta, estudiante)
+        
+        with django_assert_num_queries(1):
+            assert list(encuestas_pendientes(estudiante)) == []
+    
+    def test_permite_multiple_sigue_pendiente(self, encuesta):
+        """Las encuestas que permiten varias respuestas siguen pendientes."""
+        estudiante = crear_usuario('estudiante', User.ESTUDIANTE)
+        encuesta.permite_multiple = True
+        encuesta.save()
+        RespuestaEncuesta.objects.create(encuesta=encuesta, usuario=estudiante)
+        
+        assert list(encuestas_pendientes(estudiante)) == [encuesta]
+        obtener_encuestas_respondidas(estudiante)
+        assert list(encuestas_pendientes(estudiante)) == [encuesta]
+    
+    def test_nueva_respuesta_invalida_cache(self, encuesta, django_capture_on_commit_callbacks):
+        """Registrar una respuesta debe invalidar el conjunto en caché."""
+        estudiante = crear_usuario('estudiante', User.ESTUDIANTE)
+        assert not ya_respondio(encuesta, estudiante)
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            RespuestaEncuesta.objects.create(encuesta=encuesta, usuario=estudiante)
+        
+        assert ya_respondio(encuesta, estudiante)
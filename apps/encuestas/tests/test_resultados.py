@@ -0,0 +1,192 @@
+"""
+Pruebas para el motor de resultados materializados de encuestas.
+"""
+from unittest import mock
+
+import pytest
+
+from apps.encuestas.models import (
+    Encuesta, Pregunta, RespuestaEncuesta, DetallePregunta, ResumenPregunta
+)
+from apps.encuestas import resultados as motor
+from apps.encuestas.resultados import (
+    materializar_resultados, registrar_respuesta, obtener_resultados
+)
+from apps.usuarios.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def encuesta():
+    coordinadora = User.objects.create_user(
+        email='coordinadora@example.com',
+        password='testpass123',
+        username='coordinadora',
+        first_name='María',
+        last_name='González',
+        role=User.COORDINADORA_EMPRESARIAL,
+    )
+    encuesta = Encuesta.objects.create(
+        titulo='Satisfacción',
+        creada_por=coordinadora,
+        estado=Encuesta.ACTIVA,
+    )
+    Pregunta.objects.create(encuesta=encuesta, texto='Escala', tipo=Pregunta.ESCALA, orden=0)
+    Pregunta.objects.create(encuesta=encuesta, texto='Sí/No', tipo=Pregunta.SI_NO, orden=1)
+    Pregunta.objects.create(
+        encuesta=encuesta, texto='Opciones', tipo=Pregunta.OPCION_MULTIPLE, orden=2,
+        opciones=['A', 'B', 'C'],
+    )
+    Pregunta.objects.create(encuesta=encuesta, texto='Texto', tipo=Pregunta.TEXTO_CORTO, orden=3)
+    return encuesta
+
+
+def responder(encuesta, escala, si_no, opciones, texto):
+    """Crear una respuesta completa y devolver sus detalles."""
+    preguntas = {p.tipo: p for p in encuesta.preguntas.all()}
+    respuesta = RespuestaEncuesta.objects.create(encuesta=encuesta)
+    detalles = [
+        DetallePregunta.objects.create(
+            respuesta_encuesta=respuesta, pregunta=preguntas[Pregunta.ESCALA],
+            respuesta_numerica=escala,
+        ),
+        DetallePregunta.objects.create(
+            respuesta_encuesta=respuesta, pregunta=preguntas[Pregunta.SI_NO],
+            respuesta_booleana=si_no,
+        ),
+        DetallePregunta.objects.create(
+            respuesta_encuesta=respuesta, pregunta=preguntas[Pregunta.OPCION_MULTIPLE],
+            opciones_seleccionadas=opciones,
+        ),
+        DetallePregunta.objects.create(
+            respuesta_encuesta=respuesta, pregunta=preguntas[Pregunta.TEXTO_CORTO],
+            respuesta_texto=texto,
+        ),
+    ]
+    return respuesta, detalles
+
+
+def resultados_por_tipo(encuesta):
+    return {r['tipo']: r for r in obtener_resultados(encuesta)}
+
+
+class TestMaterializarResultados:
+    """Pruebas para el recálculo completo del resumen."""
+    
+    def test_materializa_todas_las_preguntas(self, encuesta):
+        """Debe crear un resumen por pregunta aunque no haya respuestas."""
+        materializar_resultados(encuesta)
+        
+        assert ResumenPregunta.objects.filter(pregunta__encuesta=encuesta).count() == 4
+    
+    def test_agrega_respuestas_existentes(self, encuesta):
+        """Debe agregar escala, Sí/No, opciones JSON y textos."""
+        responder(encuesta, 5, True, ['A', 'B'], 'Muy bien')
+        responder(encuesta, 3, False, ['B'], 'Regular')
+        
+        resultados = resultados_por_tipo(encuesta)
+        
+        assert resultados['escala']['promedio'] == 4
+        assert resultados['escala']['distribucion'] == {1: 0, 2: 0, 3: 1, 4: 0, 5: 1}
+        assert resultados['si_no']['si'] == 1
+        assert resultados['si_no']['no'] == 1
+        assert resultados['opciones']['respuestas'] == {'A': 1, 'B': 2}
+        assert sorted(resultados['texto']['respuestas']) == ['Muy bien', 'Regular']
+    
+    def test_es_idempotente(self, encuesta):
+        """Recalcular dos veces no debe duplicar conteos."""
+        responder(encuesta, 4, True, ['C'], '')
+        
+        materializar_resultados(encuesta)
+        materializar_resultados(encuesta)
+        
+        resumen = ResumenPregunta.objects.get(pregunta__tipo=Pregunta.OPCION_MULTIPLE)
+        assert resumen.total == 1
+        assert resumen.conteos == {'C': 1}
+
+
+class TestRegistrarRespuesta:
+    """Pruebas para la actualización incremental del resumen."""
+    
+    def test_actualiza_incrementalmente(self, encuesta):
+        """Las respuestas nuevas deben sumarse al resumen existente."""
+        materializar_resultados(encuesta)
+        
+        respuesta, detalles = responder(encuesta, 2, True, ['A', 'C'], 'Ok')
+        registrar_respuesta(respuesta, detalles)
+        respuesta, detalles = responder(encuesta, 4, True, ['A'], 'Bien')
+        registrar_respuesta(respuesta, detalles)
+        
+        escala = ResumenPregunta.objects.get(pregunta__tipo=Pregunta.ESCALA)
+        assert escala.total == 2
+        assert escala.suma == 6
+        assert escala.conteos == {'2': 1, '4': 1}
+        
+        opciones = ResumenPregunta.objects.get(pregunta__tipo=Pregunta.OPCION_MULTIPLE)
+        assert opciones.conteos == {'A': 2, 'C': 1}
+    
+    def test_coincide_con_recalculo_completo(self, encuesta):
+        """El resumen incremental debe coincidir con el recálculo completo."""
+        materializar_resultados(encuesta)
+        for valor in [1, 5, 5, 3]:
+            respuesta, detalles = responder(encuesta, valor, valor > 2, ['B'], str(valor))
+            registrar_respuesta(respuesta, detalles)
+        
+        incremental = resultados_por_tipo(encuesta)
+        materializar_resultados(encuesta)
+        completo = resultados_por_tipo(encuesta)
+        
+        assert incremental['escala']['distribucion'] == completo['escala']['distribucion']
+        assert incremental['si_no']['si'] == completo['si_no']['si'] == 3
+        assert incremental['opciones']['respuestas'] == completo['opciones']['respuestas']
+    
+    def test_sin_resumen_materializa(self, encuesta):
+        """Si no existe resumen, debe construirse incluyendo la respuesta."""
+        respuesta, detalles = responder(encuesta, 5, False, ['A'], 'Hola')
+        registrar_respuesta(respuesta, detalles)
+        
+        escala = ResumenPregunta.objects.get(pregunta__tipo=Pregunta.ESCALA)
+        assert escala.total == 1
+        assert escala.conteos == {'5': 1}
+    
+    def test_bloquea_la_encuesta(self, encuesta):
+        """Registrar y materializar se serializan con el bloqueo de la encuesta."""
+        respuesta, detalles = responder(encuesta, 5, False, ['A'], 'Hola')
+        with mock.patch(
+            'apps.encuestas.resultados._bloquear_encuesta',
+            wraps=motor._bloquear_encuesta,
+        ) as bloquear:
+            materializar_resultados(encuesta)
+            registrar_respuesta(respuesta, detalles)
+        
+        assert bloquear.call_args_list == [mock.call(encuesta), mock.call(encuesta)]
+
+
+class TestInvalidacion:
+    """Pruebas para la invalidación del resumen al borrar respuestas."""
+    
+    def test_borrar_respuesta_recalcula(self, encuesta):
+        """Borrar una respuesta debe reflejarse en los resultados."""
+        respuesta, _ = responder(encuesta, 5, True, ['A'], 'Uno')
+        responder(encuesta, 1, False, ['B'], 'Dos')
+        materializar_resultados(encuesta)
+        
+        respuesta.delete()
+        resultados = resultados_por_tipo(encuesta)
+        
+        assert resultados['escala']['distribucion'][5] == 0
+        assert resultados['escala']['distribucion'][1] == 1
+        assert resultados['opciones']['respuestas'] == {'B': 1}
+    
+    def test_editar_detalle_recalcula(self, encuesta):
+        """Editar un detalle descarta el resumen y se vuelve a calcular."""
+        _, detalles = responder(encuesta, 5, True, ['A'], 'Uno')
+        materializar_resultados(encuesta)
+        
+        detalles[0].respuesta_numerica = 2
+        detalles[0].save()
+        resultados = resultados_por_tipo(encuesta)
+        
+        assert resultados['escala']['distribucion'][5] == 0
+        assert resultados['escala']['distribucion'][2] == 1
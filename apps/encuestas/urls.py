@@ -15,4 +15,9 @@ urlpatterns = [
     path('responder/<int:pk>/', views.responder_encuesta, name='responder'),
     path('mis-pendientes/', views.mis_encuestas_pendientes, name='mis_pendientes'),
     path('agradecimiento/', views.agradecimiento, name='agradecimiento'),
+    
+    # API JSON (SPA)
+    path('<int:pk>/responder/', views.ResponderEncuestaAPIView.as_view(), name='responder_api'),
+    path('<int:pk>/analitica/', views.AnaliticaEncuestaAPIView.as_view(), name='analitica'),
+    path('<int:pk>/analitica/xlsx/', views.exportar_analitica_xlsx, name='analitica_xlsx'),
 ]
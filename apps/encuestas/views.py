@@ -1,13 +1,33 @@
 """
 Vistas para el sistema de encuestas
 """
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
-from django.db.models import Count, Avg
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from apps.usuarios.authentication import autenticar_async
 from apps.usuarios.decorators import role_required
-from .models import Encuesta, Pregunta, RespuestaEncuesta, DetallePregunta
+from config.db.replicas import (
+    LecturaEnReplicaMixin, lecturas_en_replica, puede_usar_replica,
+)
+from config.permissions import IsCoordinadora
+from .models import Encuesta, Pregunta, RespuestaEncuesta
+from .respuestas import (
+    obtener_esquema, datos_formulario, validar_respuestas, guardar_respuesta,
+    ya_respondio, encuestas_pendientes,
+)
+from .analitica import DIMENSIONES, obtener_tablas_cruzadas, exportar_xlsx
+from .audiencia import respondentes_en_audiencia, tamanos_audiencia
+from .resultados import obtener_resultados
+from .serializers import ResponderEncuestaSerializer
 
 
 @login_required
@@ -57,9 +77,13 @@ def crear_encuesta(request):
 @role_required(['COORDINADORA_EMPRESARIAL'])
 def lista_encuestas(request):
     """Lista de todas las encuestas"""
-    encuestas = Encuesta.objects.all().annotate(
-        total_respuestas=Count('respuestas')
-    )
+    encuestas = list(Encuesta.objects.all())
+    
+    # Tamaños de audiencia en caché y respondentes en una consulta agrupada
+    audiencia = tamanos_audiencia()
+    respondentes = respondentes_en_audiencia(encuestas)
+    for encuesta in encuestas:
+        encuesta.tasa = round(encuesta.tasa_respuesta(audiencia, respondentes[encuesta.pk]), 1)
     
     context = {
         'encuestas': encuestas,
@@ -73,86 +97,90 @@ def responder_encuesta(request, pk):
     encuesta = get_object_or_404(Encuesta, pk=pk, estado=Encuesta.ACTIVA)
     
     # Verificar si el usuario puede responder esta encuesta
-    if encuesta.dirigida_a == Encuesta.ESTUDIANTES and request.user.role != 'ESTUDIANTE':
-        messages.error(request, 'Esta encuesta no está dirigida a tu rol')
-        return redirect('config:dashboard')
-    
-    if encuesta.dirigida_a == Encuesta.TUTORES and request.user.role != 'TUTOR_EMPRESARIAL':
+    if not encuesta.es_destinatario(request.user):
         messages.error(request, 'Esta encuesta no está dirigida a tu rol')
         return redirect('config:dashboard')
     
     # Verificar si ya respondió
-    if not encuesta.permite_multiple:
-        ya_respondio = RespuestaEncuesta.objects.filter(
-            encuesta=encuesta,
-            usuario=request.user
-        ).exists()
-        
-        if ya_respondio:
-            messages.info(request, 'Ya has respondido esta encuesta')
-            return redirect('encuestas:agradecimiento')
+    if not encuesta.permite_multiple and ya_respondio(encuesta, request.user):
+        messages.info(request, 'Ya has respondido esta encuesta')
+        return redirect('encuestas:agradecimiento')
+    
+    esquema = obtener_esquema(encuesta)
+    enviados, errores = {}, {}
     
     if request.method == 'POST':
-        # Crear respuesta
-        respuesta = RespuestaEncuesta.objects.create(
-            encuesta=encuesta,
-            usuario=request.user if not encuesta.es_anonima else None
-        )
+        # Validar todo el formulario antes de guardar
+        enviados = datos_formulario(esquema, request.POST)
+        valores, errores = validar_respuestas(esquema, enviados)
         
-        # Guardar respuestas a cada pregunta
-        for pregunta in encuesta.preguntas.all():
-            clave = f'pregunta_{pregunta.id}'
-            
-            if pregunta.tipo == Pregunta.TEXTO_CORTO or pregunta.tipo == Pregunta.TEXTO_LARGO:
-                respuesta_texto = request.POST.get(clave)
-                if respuesta_texto or not pregunta.es_requerida:
-                    DetallePregunta.objects.create(
-                        respuesta_encuesta=respuesta,
-                        pregunta=pregunta,
-                        respuesta_texto=respuesta_texto
-                    )
-            
-            elif pregunta.tipo == Pregunta.ESCALA:
-                respuesta_numerica = request.POST.get(clave)
-                if respuesta_numerica:
-                    DetallePregunta.objects.create(
-                        respuesta_encuesta=respuesta,
-                        pregunta=pregunta,
-                        respuesta_numerica=int(respuesta_numerica)
-                    )
-            
-            elif pregunta.tipo == Pregunta.SI_NO:
-                respuesta_booleana = request.POST.get(clave)
-                if respuesta_booleana:
-                    DetallePregunta.objects.create(
-                        respuesta_encuesta=respuesta,
-                        pregunta=pregunta,
-                        respuesta_booleana=respuesta_booleana == 'si'
-                    )
-            
-            elif pregunta.tipo in [Pregunta.OPCION_MULTIPLE, Pregunta.SELECCION_UNICA]:
-                if pregunta.tipo == Pregunta.OPCION_MULTIPLE:
-                    opciones = request.POST.getlist(clave)
-                else:
-                    opciones = [request.POST.get(clave)]
-                
-                if opciones and opciones[0]:
-                    DetallePregunta.objects.create(
-                        respuesta_encuesta=respuesta,
-                        pregunta=pregunta,
-                        opciones_seleccionadas=opciones
-                    )
+        if not errores:
+            guardar_respuesta(encuesta, esquema, request.user, valores)
+            messages.success(request, '¡Gracias por responder la encuesta!')
+            return redirect('encuestas:agradecimiento')
         
-        messages.success(request, '¡Gracias por responder la encuesta!')
-        return redirect('encuestas:agradecimiento')
+        messages.error(request, 'Revisa las respuestas marcadas antes de enviar')
     
     context = {
         'encuesta': encuesta,
-        'preguntas': encuesta.preguntas.all().order_by('orden'),
+        'preguntas': [
+            # Lo enviado se vuelve a mostrar junto a los errores
+            dict(pregunta, error=errores.get(pregunta['id']), valor=enviados.get(pregunta['id']))
+            for pregunta in esquema
+        ],
     }
     return render(request, 'encuestas/responder.html', context)
 
 
+class ResponderEncuestaAPIView(APIView):
+    """
+    API JSON para responder una encuesta (SPA).
+    Usa el mismo esquema en caché y la misma inserción en bloque que el formulario.
+    
+    Formato: {"respuestas": {"<id_pregunta>": valor, ...}, "practica": id opcional}
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, pk):
+        encuesta = get_object_or_404(Encuesta, pk=pk, estado=Encuesta.ACTIVA)
+        
+        if not encuesta.es_destinatario(request.user):
+            return Response(
+                {'error': 'Esta encuesta no está dirigida a tu rol.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        if not encuesta.permite_multiple and ya_respondio(encuesta, request.user):
+            return Response(
+                {'error': 'Ya has respondido esta encuesta.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        serializer = ResponderEncuestaSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        
+        esquema = obtener_esquema(encuesta)
+        valores, errores = validar_respuestas(esquema, serializer.validated_data['respuestas'])
+        if errores:
+            return Response({'respuestas': errores}, status=status.HTTP_400_BAD_REQUEST)
+        
+        respuesta = guardar_respuesta(
+            encuesta,
+            esquema,
+            request.user,
+            valores,
+            practica=serializer.validated_data.get('practica'),
+        )
+        return Response(
+            {
+                'id': respuesta.id,
+                'encuesta': encuesta.id,
+                'fecha_respuesta': respuesta.fecha_respuesta,
+            },
+            status=status.HTTP_201_CREATED
+        )
+
+
 @login_required
 def agradecimiento(request):
     """Página de agradecimiento después de responder"""
@@ -162,61 +190,18 @@ def agradecimiento(request):
 @login_required
 @role_required(['COORDINADORA_EMPRESARIAL'])
 def resultados_encuesta(request, pk):
-    """Vista de resultados de una encuesta"""
+    """
+    Vista de resultados de una encuesta.
+    Lee de 'default': puede materializar el resumen (ver resultados.py).
+    """
     encuesta = get_object_or_404(Encuesta, pk=pk)
     
     # Obtener estadísticas
-    total_respuestas = encuesta.respuestas.count()
+    total_respuestas = encuesta.num_respuestas
     tasa_respuesta = encuesta.tasa_respuesta()
     
-    # Resultados por pregunta
-    resultados = []
-    for pregunta in encuesta.preguntas.all().order_by('orden'):
-        detalles = DetallePregunta.objects.filter(pregunta=pregunta)
-        
-        if pregunta.tipo == Pregunta.ESCALA:
-            promedio = detalles.aggregate(Avg('respuesta_numerica'))['respuesta_numerica__avg']
-            distribucion = {}
-            for i in range(1, 6):
-                distribucion[i] = detalles.filter(respuesta_numerica=i).count()
-            
-            resultados.append({
-                'pregunta': pregunta,
-                'tipo': 'escala',
-                'promedio': round(promedio, 2) if promedio else 0,
-                'distribucion': distribucion,
-            })
-        
-        elif pregunta.tipo in [Pregunta.OPCION_MULTIPLE, Pregunta.SELECCION_UNICA]:
-            respuestas = {}
-            for detalle in detalles:
-                for opcion in detalle.opciones_seleccionadas:
-                    respuestas[opcion] = respuestas.get(opcion, 0) + 1
-            
-            resultados.append({
-                'pregunta': pregunta,
-                'tipo': 'opciones',
-                'respuestas': respuestas,
-            })
-        
-        elif pregunta.tipo == Pregunta.SI_NO:
-            si_count = detalles.filter(respuesta_booleana=True).count()
-            no_count = detalles.filter(respuesta_booleana=False).count()
-            
-            resultados.append({
-                'pregunta': pregunta,
-                'tipo': 'si_no',
-                'si': si_count,
-                'no': no_count,
-            })
-        
-        else:  # Texto
-            respuestas_texto = detalles.values_list('respuesta_texto', flat=True)
-            resultados.append({
-                'pregunta': pregunta,
-                'tipo': 'texto',
-                'respuestas': list(respuestas_texto),
-            })
+    # Resultados por pregunta (desde la tabla materializada)
+    resultados = obtener_resultados(encuesta)
     
     context = {
         'encuesta': encuesta,
@@ -257,35 +242,94 @@ def cerrar_encuesta(request, pk):
 @login_required
 def mis_encuestas_pendientes(request):
     """Lista de encuestas pendientes de responder para el usuario actual"""
-    # Filtrar encuestas según el rol
-    if request.user.role == 'ESTUDIANTE':
-        dirigida = [Encuesta.ESTUDIANTES, Encuesta.TODOS]
-    elif request.user.role == 'TUTOR_EMPRESARIAL':
-        dirigida = [Encuesta.TUTORES, Encuesta.TODOS]
-    elif request.user.role == 'DOCENTE_ASESOR':
-        dirigida = [Encuesta.DOCENTES, Encuesta.TODOS]
-    else:
-        dirigida = []
-    
-    # Obtener encuestas activas
-    encuestas_disponibles = Encuesta.objects.filter(
-        estado=Encuesta.ACTIVA,
-        dirigida_a__in=dirigida
+    # Una sola consulta: encuestas activas para el rol que aún no respondió
+    encuestas_pendientes_usuario = encuestas_pendientes(request.user).annotate(
+        num_preguntas=_contar(Pregunta),
     )
     
-    # Filtrar las que ya respondió
-    encuestas_pendientes = []
-    for encuesta in encuestas_disponibles:
-        ya_respondio = RespuestaEncuesta.objects.filter(
-            encuesta=encuesta,
-            usuario=request.user
-        ).exists()
-        
-        if not ya_respondio or encuesta.permite_multiple:
-            encuestas_pendientes.append(encuesta)
-    
     context = {
-        'encuestas': encuestas_pendientes,
+        'encuestas': list(encuestas_pendientes_usuario),
     }
     
     return render(request, 'encuestas/mis_pendientes.html', context)
+
+
+def _contar(modelo):
+    """Subconsulta que cuenta las filas de `modelo` de cada encuesta."""
+    return Coalesce(
+        Subquery(
+            modelo.objects.filter(encuesta=OuterRef('pk'))
+            .order_by()
+            .values('encuesta')
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0,
+    )
+
+
+class AnaliticaEncuestaAPIView(LecturaEnReplicaMixin, APIView):
+    """
+    Tablas cruzadas de resultados por rol, empresa, carrera o estado de práctica.
+    
+    Parámetros: ?dimension=rol|empresa|carrera|estado_practica (por defecto rol).
+    El libro XLSX se descarga en exportar_analitica_xlsx.
+    """
+    permission_classes = [IsCoordinadora]
+    
+    def get(self, request, pk):
+        encuesta = get_object_or_404(Encuesta, pk=pk)
+        
+        dimension = request.query_params.get('dimension', 'rol')
+        if dimension not in DIMENSIONES:
+            return Response(
+                {'dimension': f'Debe ser una de: {", ".join(DIMENSIONES)}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(obtener_tablas_cruzadas(encuesta, dimension))
+
+
+async def exportar_analitica_xlsx(request, pk):
+    """
+    Descargar las tablas cruzadas como XLSX (solo coordinadora).
+
+    Vista async: las consultas corren en el hilo de la petición y el armado
+    del libro en un hilo aparte, así la descarga de un cliente lento no
+    bloquea al worker. Mismo ?dimension= que AnaliticaEncuestaAPIView.
+    """
+    usuario = await autenticar_async(request)
+    if usuario is None:
+        return JsonResponse(
+            {'detail': 'Las credenciales de autenticación no se proveyeron.'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+    if not usuario.is_coordinadora:
+        return JsonResponse(
+            {'detail': 'Usted no tiene permiso para realizar esta acción.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    dimension = request.GET.get('dimension', 'rol')
+    if dimension not in DIMENSIONES:
+        return JsonResponse(
+            {'dimension': f'Debe ser una de: {", ".join(DIMENSIONES)}.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    with lecturas_en_replica(puede_usar_replica(usuario, request.method)):
+        encuesta = await Encuesta.objects.filter(pk=pk).afirst()
+        if encuesta is None:
+            raise Http404('Encuesta no encontrada.')
+
+        datos = await sync_to_async(obtener_tablas_cruzadas)(encuesta, dimension)
+    contenido = await sync_to_async(exportar_xlsx, thread_sensitive=False)(datos)
+
+    response = HttpResponse(
+        contenido,
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="encuesta_{encuesta.pk}_{dimension}.xlsx"'
+    )
+    return response
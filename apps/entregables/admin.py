@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Entregable
+from .models import Entregable, PaqueteEntregables, SimilitudEntregable
 
 
 @admin.register(Entregable)
@@ -24,3 +24,21 @@ class EntregableAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(PaqueteEntregables)
+class PaqueteEntregablesAdmin(admin.ModelAdmin):
+    """Admin para paquetes ZIP de entregables generados en segundo plano."""
+    
+    list_display = ['id', 'estado', 'total_archivos', 'tamano', 'solicitado_por', 'created_at']
+    list_filter = ['estado', 'created_at']
+    readonly_fields = ['filtros', 'entregable_ids', 'mensaje', 'finalizado_at']
+
+
+@admin.register(SimilitudEntregable)
+class SimilitudEntregableAdmin(admin.ModelAdmin):
+    """Admin para pares de entregables casi iguales."""
+    
+    list_display = ['entregable', 'similar_a', 'similitud', 'created_at']
+    list_filter = ['created_at']
+    readonly_fields = ['entregable', 'similar_a', 'similitud']
@@ -0,0 +1,94 @@
+"""
+Evaluación de entregables en lote.
+
+Un tutor califica muchos entregables con una sola petición:
+- una consulta valida que todos sean suyos y estén enviados (con bloqueo de fila);
+- un bulk_update aplica los cambios dentro de una transacción;
+- los agregados de las prácticas afectadas se actualizan una vez por práctica;
+- una sola tarea notifica a los estudiantes al confirmar la transacción.
+
+Es todo o nada: si algún elemento no es válido no se aplica ninguno.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.practicas import agregados
+from apps.practicas.models import Practica
+
+from .models import Entregable
+
+
+MAXIMO_POR_LOTE = 200
+CAMPOS_EVALUACION = [
+    'evaluado_por', 'calificacion', 'retroalimentacion', 'estado', 'fecha_evaluacion', 'updated_at',
+]
+
+
+def resumen_practicas(practica_ids):
+    """Progreso y promedio guardados de las prácticas (ver apps.practicas.agregados)."""
+    return {
+        fila['pk']: {'progreso': fila['progreso'], 'promedio': fila['promedio_calificacion']}
+        for fila in Practica.objects.filter(pk__in=practica_ids).values(
+            'pk', 'progreso', 'promedio_calificacion'
+        )
+    }
+
+
+def evaluar_en_bloque(tutor, evaluaciones):
+    """
+    Aplicar `evaluaciones` (dicts con id, calificacion, retroalimentacion y
+    aprobado) como `tutor`. Retorna (entregables evaluados, resumen por práctica).
+    Lanza ValidationError con los errores por id si alguno no se puede evaluar.
+    """
+    por_id = {item['id']: item for item in evaluaciones}
+
+    with transaction.atomic():
+        entregables = list(
+            Entregable.objects.select_for_update(of=('self',))
+            .select_related('estudiante')
+            .filter(pk__in=por_id, practica__tutor_empresarial=tutor)
+            .order_by('pk')
+        )
+
+        errores = {}
+        encontrados = {entregable.pk for entregable in entregables}
+        for entregable_id in por_id.keys() - encontrados:
+            errores[entregable_id] = 'No existe o no pertenece a tus prácticas.'
+        for entregable in entregables:
+            if entregable.estado != Entregable.ENVIADO:
+                errores[entregable.pk] = 'Solo se pueden evaluar entregables enviados.'
+        if errores:
+            raise ValidationError({str(pk): mensaje for pk, mensaje in sorted(errores.items())})
+
+        ahora = timezone.now()
+        deltas = {}
+        for entregable in entregables:
+            anterior = entregable._agregado_original
+            item = por_id[entregable.pk]
+            entregable.evaluado_por = tutor
+            entregable.calificacion = item['calificacion']
+            entregable.retroalimentacion = item.get('retroalimentacion', '')
+            entregable.estado = Entregable.APROBADO if item.get('aprobado', True) else Entregable.RECHAZADO
+            entregable.fecha_evaluacion = ahora
+            entregable.updated_at = ahora
+            entregable._agregado_original = entregable._estado_agregado()
+            for practica_id, delta in agregados.diferencia(anterior, entregable._agregado_original).items():
+                acumulado = deltas.setdefault(practica_id, dict.fromkeys(agregados.CONTADORES, 0))
+                for campo, valor in delta.items():
+                    acumulado[campo] += valor
+        Entregable.objects.bulk_update(entregables, CAMPOS_EVALUACION)
+        # bulk_update no pasa por save(): los agregados se aplican una vez por práctica
+        agregados.aplicar_cambios(deltas, ahora)
+
+        resumen = resumen_practicas(deltas)
+
+        ids = sorted(encontrados)
+        transaction.on_commit(lambda: _notificar(ids))
+
+    return entregables, resumen
+
+
+def _notificar(entregable_ids):
+    from .tasks import notificar_evaluaciones_entregables
+    notificar_evaluaciones_entregables.delay(entregable_ids)
@@ -0,0 +1,31 @@
+import django_filters
+from django.db.models import Exists, OuterRef, Q
+
+from .models import Entregable, SimilitudEntregable
+
+
+class EntregableFilter(django_filters.FilterSet):
+    """
+    Filtros del listado de entregables (?estado=, ?practica=, ?retrasado=true,
+    ?posible_duplicado=true) y de la cohorte de un paquete (?tutor=, ?empresa=, ?carrera=).
+    """
+    
+    retrasado = django_filters.BooleanFilter(method='filtrar_retrasado')
+    posible_duplicado = django_filters.BooleanFilter(method='filtrar_posible_duplicado')
+    tutor = django_filters.NumberFilter(field_name='practica__tutor_empresarial')
+    docente = django_filters.NumberFilter(field_name='practica__docente_asesor')
+    empresa = django_filters.NumberFilter(field_name='practica__empresa')
+    carrera = django_filters.CharFilter(field_name='estudiante__carrera')
+    
+    class Meta:
+        model = Entregable
+        fields = ['estado', 'practica', 'estudiante']
+    
+    def filtrar_retrasado(self, queryset, name, value):
+        return queryset.overdue() if value else queryset.not_overdue()
+    
+    def filtrar_posible_duplicado(self, queryset, name, value):
+        pares = SimilitudEntregable.objects.filter(
+            Q(entregable=OuterRef('pk')) | Q(similar_a=OuterRef('pk'))
+        )
+        return queryset.filter(Exists(pares)) if value else queryset.exclude(Exists(pares))
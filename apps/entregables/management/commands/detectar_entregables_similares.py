@@ -0,0 +1,56 @@
+"""
+Busca entregables casi iguales entre los de un periodo.
+
+Uso: python manage.py detectar_entregables_similares [--desde AAAA-MM-DD]
+     [--hasta AAAA-MM-DD] [--umbral 0.6] [--mostrar 20]
+Toma los entregables con archivo cuya fecha límite cae en el periodo,
+calcula las firmas que falten y registra los pares de distintos
+estudiantes con similitud >= umbral (ver apps/entregables/similitud.py).
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.entregables.models import Entregable
+from apps.entregables.similitud import escanear
+
+
+def _fecha(valor):
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise CommandError(f'Fecha inválida: {valor} (se espera AAAA-MM-DD).')
+
+
+class Command(BaseCommand):
+    help = 'Busca entregables casi iguales entre los de un periodo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', type=_fecha, help='Fecha límite desde (AAAA-MM-DD)')
+        parser.add_argument('--hasta', type=_fecha, help='Fecha límite hasta (AAAA-MM-DD)')
+        parser.add_argument('--umbral', type=float, help='Similitud mínima (0 a 1)')
+        parser.add_argument('--mostrar', type=int, default=20, help='Pares a listar')
+
+    def handle(self, *args, **options):
+        entregables = Entregable.objects.exclude(archivo='').exclude(archivo__isnull=True)
+        if options['desde']:
+            entregables = entregables.filter(fecha_limite__date__gte=options['desde'])
+        if options['hasta']:
+            entregables = entregables.filter(fecha_limite__date__lte=options['hasta'])
+
+        pares = escanear(entregables, minimo=options['umbral'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{entregables.count()} entregables revisados, {len(pares)} pares casi iguales.'
+        ))
+
+        mostrar = pares[:options['mostrar']]
+        nombres = dict(
+            Entregable.objects.filter(
+                pk__in={p.entregable_id for p in mostrar} | {p.similar_a_id for p in mostrar}
+            ).values_list('pk', 'titulo')
+        )
+        for par in mostrar:
+            self.stdout.write(
+                f'{par.similitud:.0%}  #{par.entregable_id} {nombres[par.entregable_id]}'
+                f'  ~  #{par.similar_a_id} {nombres[par.similar_a_id]}'
+            )
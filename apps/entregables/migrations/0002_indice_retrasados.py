@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entregables', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='entregable',
+            index=models.Index(condition=models.Q(('estado__in', ['PENDIENTE', 'ENVIADO'])), fields=['fecha_limite'], name='entregable_abierto_limite_idx'),
+        ),
+    ]
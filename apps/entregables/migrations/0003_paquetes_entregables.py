@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('entregables', '0002_indice_retrasados'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaqueteEntregables',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('PROCESANDO', 'Procesando'), ('COMPLETADO', 'Completado'), ('FALLIDO', 'Fallido')], default='PENDIENTE', max_length=20, verbose_name='Estado')),
+                ('filtros', models.JSONField(blank=True, default=dict, help_text='Parámetros con los que se pidió el paquete', verbose_name='Filtros')),
+                ('entregable_ids', models.JSONField(default=list, help_text='Entregables visibles para el solicitante al pedir el paquete', verbose_name='Entregables')),
+                ('archivo', models.FileField(blank=True, upload_to='paquetes/entregables/%Y/%m/', verbose_name='Archivo ZIP')),
+                ('total_archivos', models.PositiveIntegerField(default=0, verbose_name='Archivos')),
+                ('tamano', models.PositiveBigIntegerField(default=0, verbose_name='Tamaño (bytes)')),
+                ('mensaje', models.TextField(blank=True, verbose_name='Mensaje')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finalizado_at', models.DateTimeField(blank=True, null=True)),
+                ('solicitado_por', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='paquetes_entregables', to=settings.AUTH_USER_MODEL, verbose_name='Solicitado por')),
+            ],
+            options={
+                'verbose_name': 'Paquete de Entregables',
+                'verbose_name_plural': 'Paquetes de Entregables',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entregables', '0003_paquetes_entregables'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entregable',
+            name='archivo_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='SHA-256 del archivo'),
+        ),
+        migrations.AddField(
+            model_name='entregable',
+            name='archivo_tamano',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True, verbose_name='Tamaño del archivo (bytes)'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entregables', '0005_vistas_previas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CubetaLSH',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.BigIntegerField(verbose_name='Clave')),
+            ],
+            options={
+                'verbose_name': 'Cubeta LSH',
+                'verbose_name_plural': 'Cubetas LSH',
+            },
+        ),
+        migrations.CreateModel(
+            name='FirmaSimilitud',
+            fields=[
+                ('entregable', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='firma_similitud', serialize=False, to='entregables.entregable', verbose_name='Entregable')),
+                ('firma', models.BinaryField(verbose_name='Firma MinHash')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Firma de Similitud',
+                'verbose_name_plural': 'Firmas de Similitud',
+            },
+        ),
+        migrations.CreateModel(
+            name='SimilitudEntregable',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('similitud', models.FloatField(help_text='Jaccard estimada entre los textos (1 = mismo archivo)', verbose_name='Similitud')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Similitud de Entregables',
+                'verbose_name_plural': 'Similitudes de Entregables',
+                'ordering': ['-similitud', '-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='entregable',
+            index=models.Index(fields=['archivo_hash'], name='entregables_archivo_03e2e3_idx'),
+        ),
+        migrations.AddField(
+            model_name='similitudentregable',
+            name='entregable',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similitudes', to='entregables.entregable', verbose_name='Entregable'),
+        ),
+        migrations.AddField(
+            model_name='similitudentregable',
+            name='similar_a',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similitudes_posteriores', to='entregables.entregable', verbose_name='Similar a'),
+        ),
+        migrations.AddField(
+            model_name='cubetalsh',
+            name='entregable',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cubetas_lsh', to='entregables.entregable', verbose_name='Entregable'),
+        ),
+        migrations.AddConstraint(
+            model_name='similitudentregable',
+            constraint=models.UniqueConstraint(fields=('entregable', 'similar_a'), name='similitud_entregable_unica'),
+        ),
+        migrations.AddIndex(
+            model_name='cubetalsh',
+            index=models.Index(fields=['clave', 'entregable'], name='entregables_clave_f114ab_idx'),
+        ),
+    ]
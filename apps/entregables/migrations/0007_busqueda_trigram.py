@@ -0,0 +1,15 @@
+from django.db import migrations
+
+from config.db.busqueda import indices_trigram
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entregables', '0006_similitud'),
+    ]
+
+    operations = [
+        # Los search_fields de EntregableViewSet
+        indices_trigram('entregables_entregable', ['titulo', 'descripcion', 'texto_extraido']),
+    ]
@@ -3,19 +3,49 @@ Modelos para la app de entregables.
 Sistema para que estudiantes suban entregables y tutores empresariales los evalúen.
 """
 
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 from apps.usuarios.models import User
 from apps.practicas.models import Practica
+from apps.documentos.models import ConVistaPrevia
 
 
-class Entregable(models.Model):
+class EntregableQuerySet(models.QuerySet):
+    """QuerySet de entregables con el retraso calculado en la base de datos."""
+    
+    def _overdue_q(self, now=None):
+        from django.utils import timezone
+        return models.Q(
+            estado__in=Entregable.ESTADOS_ABIERTOS,
+            fecha_limite__lt=now or timezone.now(),
+        )
+    
+    def with_overdue(self, now=None):
+        """Anotar `retrasado` (abierto y con la fecha límite vencida)."""
+        return self.annotate(retrasado=models.Case(
+            models.When(self._overdue_q(now), then=models.Value(True)),
+            default=models.Value(False),
+            output_field=models.BooleanField(),
+        ))
+    
+    def overdue(self, now=None):
+        """Solo los entregables retrasados (usa el índice parcial de abiertos)."""
+        return self.filter(self._overdue_q(now))
+    
+    def not_overdue(self, now=None):
+        return self.exclude(self._overdue_q(now))
+
+
+class Entregable(ConVistaPrevia):
     """
     Modelo para los entregables de los estudiantes.
     El estudiante sube documentos/archivos y el tutor empresarial los evalúa.
     """
     
+    CAMPO_ARCHIVO = 'archivo'
+    CAMPO_HASH = 'archivo_hash'
+    
     # Estados
     PENDIENTE = 'PENDIENTE'
     ENVIADO = 'ENVIADO'
@@ -31,6 +61,9 @@ class Entregable(models.Model):
         (RECHAZADO, 'Rechazado'),
     ]
     
+    # Estados en los que el entregable sigue abierto y puede retrasarse
+    ESTADOS_ABIERTOS = [PENDIENTE, ENVIADO]
+    
     # Relaciones
     practica = models.ForeignKey(
         Practica,
@@ -71,6 +104,18 @@ class Entregable(models.Model):
         null=True,
         verbose_name='Archivo'
     )
+    archivo_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        verbose_name='SHA-256 del archivo'
+    )
+    archivo_tamano = models.PositiveBigIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Tamaño del archivo (bytes)'
+    )
     
     # Fechas
     fecha_limite = models.DateTimeField(
@@ -117,6 +162,8 @@ class Entregable(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = EntregableQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Entregable'
         verbose_name_plural = 'Entregables'
@@ -126,11 +173,91 @@ class Entregable(models.Model):
             models.Index(fields=['estudiante', 'estado']),
             models.Index(fields=['evaluado_por', 'estado']),
             models.Index(fields=['fecha_limite']),
+            models.Index(fields=['archivo_hash']),
+            # Retrasados: solo los abiertos, ordenados por fecha límite
+            models.Index(
+                fields=['fecha_limite'],
+                condition=models.Q(estado__in=['PENDIENTE', 'ENVIADO']),
+                name='entregable_abierto_limite_idx',
+            ),
         ]
     
     def __str__(self):
         return f"{self.titulo} - {self.estudiante.get_full_name()}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._agregado_original = instance._estado_agregado()
+        return instance
+    
+    CAMPOS_AGREGADO = ('practica_id', 'estado', 'calificacion', 'fecha_limite')
+    
+    def _estado_agregado(self):
+        """Valores que afectan los agregados de la práctica, o None si no están cargados."""
+        if any(campo not in self.__dict__ for campo in self.CAMPOS_AGREGADO):
+            return None
+        return tuple(self.__dict__[campo] for campo in self.CAMPOS_AGREGADO)
+    
+    def _agregado_bloqueado(self):
+        """
+        Valores de CAMPOS_AGREGADO en la base de datos, con la fila bloqueada
+        hasta el fin de la transacción; None si la fila no existe.
+        """
+        return (
+            Entregable.objects.select_for_update().filter(pk=self.pk)
+            .order_by().values_list(*self.CAMPOS_AGREGADO).first()
+        )
+    
+    def save(self, *args, **kwargs):
+        """Guardar y actualizar los agregados de la práctica en la misma transacción."""
+        from apps.practicas import agregados
+        
+        creado = self._state.adding
+        anterior = None if creado else getattr(self, '_agregado_original', None)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            guardados = {self._meta.get_field(campo).attname for campo in update_fields}
+        else:
+            guardados = set(self.CAMPOS_AGREGADO)
+        
+        with transaction.atomic():
+            if anterior is not None and guardados & set(self.CAMPOS_AGREGADO):
+                # La diferencia se calcula contra la fila bloqueada y no contra lo
+                # leído al cargar la instancia: otra petición pudo cambiarla después
+                anterior = self._agregado_bloqueado()
+            super().save(*args, **kwargs)
+            actual = self._estado_agregado()
+            if anterior is not None and actual is not None:
+                # Solo cambió en la base de datos lo que se guardó
+                actual = tuple(
+                    nuevo if campo in guardados else viejo
+                    for campo, viejo, nuevo in zip(self.CAMPOS_AGREGADO, anterior, actual)
+                )
+            if creado or (anterior is not None and actual != anterior):
+                agregados.aplicar_cambios(agregados.diferencia(anterior, actual))
+            elif anterior is None and guardados & set(self.CAMPOS_AGREGADO):
+                # Sin valores originales (instancia creada con pk o cargada con .only())
+                agregados.reconstruir(Practica.objects.filter(pk=self.practica_id))
+                actual = None
+        self._agregado_original = actual
+        # La anotación de with_overdue() se calculó con el estado anterior
+        self.__dict__.pop('retrasado', None)
+    
+    def delete(self, *args, **kwargs):
+        """
+        Eliminar y descontar de los agregados. Se hace aquí y no con post_delete
+        para que los borrados masivos (y la cascada al borrar una práctica)
+        sigan siendo un solo DELETE; esos casos requieren agregados.reconstruir().
+        """
+        from apps.practicas import agregados
+        
+        with transaction.atomic():
+            anterior = self._agregado_bloqueado()
+            resultado = super().delete(*args, **kwargs)
+            agregados.aplicar_cambios(agregados.diferencia(anterior, None))
+        return resultado
+    
     def clean(self):
         """Validaciones del modelo."""
         super().clean()
@@ -141,44 +268,216 @@ class Entregable(models.Model):
                 'estudiante': 'El estudiante debe ser el mismo de la práctica.'
             })
     
-    def enviar(self, archivo):
-        """Enviar el entregable."""
+    def enviar(self, archivo, inspeccion=None):
+        """
+        Enviar el entregable; el archivo se valida con config.archivos.
+        Con `inspeccion` el archivo ya está en el storage (subida directa,
+        ver apps.documentos.subidas) y `archivo` es su nombre.
+        """
+        from config.archivos import inspeccionar_subida
+        
         if self.estado not in [self.PENDIENTE, self.RECHAZADO]:
             raise ValidationError('Solo se pueden enviar entregables pendientes o rechazados.')
         
+        inspeccion = inspeccion or inspeccionar_subida(archivo)
         self.archivo = archivo
+        self.archivo_hash = inspeccion.sha256
+        self.archivo_tamano = inspeccion.tamano
+        self.vista_previa_estado = self.VISTA_PENDIENTE
         self.estado = self.ENVIADO
         self.save()
+        
+        from .tasks import generar_vista_previa_entregable
+        transaction.on_commit(lambda: generar_vista_previa_entregable.delay(self.id))
     
     def evaluar(self, tutor, calificacion, retroalimentacion='', aprobado=True):
         """
         Evaluar el entregable.
         Solo el tutor empresarial puede evaluar.
         """
+        from django.db import transaction
         from django.utils import timezone
         
         if self.estado != self.ENVIADO:
             raise ValidationError('Solo se pueden evaluar entregables enviados.')
         
-        # Validar que sea el tutor empresarial de la práctica
-        if tutor != self.practica.tutor_empresarial:
+        # Validar que sea el tutor empresarial de la práctica (sin cargar al tutor)
+        if tutor.pk != self.practica.tutor_empresarial_id:
             raise ValidationError('Solo el tutor empresarial asignado puede evaluar.')
         
-        self.evaluado_por = tutor
-        self.calificacion = calificacion
-        self.retroalimentacion = retroalimentacion
-        self.estado = self.APROBADO if aprobado else self.RECHAZADO
-        self.fecha_evaluacion = timezone.now()
-        self.save()
+        with transaction.atomic():
+            # Con la fila bloqueada: dos evaluaciones simultáneas no pueden partir de ENVIADO
+            bloqueado = self._agregado_bloqueado()
+            if bloqueado is None or bloqueado[1] != self.ENVIADO:
+                raise ValidationError('Solo se pueden evaluar entregables enviados.')
+            
+            self.evaluado_por = tutor
+            self.calificacion = calificacion
+            self.retroalimentacion = retroalimentacion
+            self.estado = self.APROBADO if aprobado else self.RECHAZADO
+            self.fecha_evaluacion = timezone.now()
+            self.save(update_fields=[
+                'evaluado_por', 'calificacion', 'retroalimentacion', 'estado', 'fecha_evaluacion', 'updated_at'
+            ])
         
-        # TODO: Notificar al estudiante
-        # from .tasks import notificar_evaluacion_entregable
-        # notificar_evaluacion_entregable.delay(self.id)
+        from .tasks import notificar_evaluacion_entregable
+        transaction.on_commit(lambda: notificar_evaluacion_entregable.delay(self.id))
     
     @property
     def esta_retrasado(self):
-        """Verificar si el entregable está retrasado."""
+        """
+        Verificar si el entregable está retrasado.
+        Usa la anotación `retrasado` de with_overdue() si se cargó con ella.
+        """
         from django.utils import timezone
-        if self.estado in [self.PENDIENTE, self.ENVIADO]:
+        if 'retrasado' in self.__dict__:
+            return self.retrasado
+        if self.estado in self.ESTADOS_ABIERTOS:
             return timezone.now() > self.fecha_limite
         return False
+
+
+class PaqueteEntregables(models.Model):
+    """
+    ZIP con los archivos y el manifiesto de calificaciones de muchos
+    entregables, generado en segundo plano cuando es demasiado grande para
+    descargarse en flujo (ver apps.entregables.paquetes).
+    """
+    
+    PENDIENTE = 'PENDIENTE'
+    PROCESANDO = 'PROCESANDO'
+    COMPLETADO = 'COMPLETADO'
+    FALLIDO = 'FALLIDO'
+    
+    ESTADO_CHOICES = [
+        (PENDIENTE, 'Pendiente'),
+        (PROCESANDO, 'Procesando'),
+        (COMPLETADO, 'Completado'),
+        (FALLIDO, 'Fallido'),
+    ]
+    
+    solicitado_por = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='paquetes_entregables',
+        verbose_name='Solicitado por'
+    )
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADO_CHOICES,
+        default=PENDIENTE,
+        verbose_name='Estado'
+    )
+    filtros = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Filtros',
+        help_text='Parámetros con los que se pidió el paquete'
+    )
+    entregable_ids = models.JSONField(
+        default=list,
+        verbose_name='Entregables',
+        help_text='Entregables visibles para el solicitante al pedir el paquete'
+    )
+    archivo = models.FileField(
+        upload_to='paquetes/entregables/%Y/%m/',
+        blank=True,
+        verbose_name='Archivo ZIP'
+    )
+    total_archivos = models.PositiveIntegerField(default=0, verbose_name='Archivos')
+    tamano = models.PositiveBigIntegerField(default=0, verbose_name='Tamaño (bytes)')
+    mensaje = models.TextField(blank=True, verbose_name='Mensaje')
+    created_at = models.DateTimeField(auto_now_add=True)
+    finalizado_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Paquete de Entregables'
+        verbose_name_plural = 'Paquetes de Entregables'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Paquete {self.pk} ({self.get_estado_display()})"
+
+
+class FirmaSimilitud(models.Model):
+    """
+    Firma MinHash del texto de un entregable (ver apps.entregables.similitud),
+    guardada como bytes de un array de enteros de 32 bits.
+    """
+    
+    entregable = models.OneToOneField(
+        Entregable,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='firma_similitud',
+        verbose_name='Entregable'
+    )
+    firma = models.BinaryField(verbose_name='Firma MinHash')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Firma de Similitud'
+        verbose_name_plural = 'Firmas de Similitud'
+    
+    def __str__(self):
+        return f"Firma del entregable {self.entregable_id}"
+
+
+class CubetaLSH(models.Model):
+    """
+    Cubeta LSH de una banda de la firma: los entregables que comparten
+    alguna cubeta son los candidatos a comparar.
+    """
+    
+    entregable = models.ForeignKey(
+        Entregable,
+        on_delete=models.CASCADE,
+        related_name='cubetas_lsh',
+        verbose_name='Entregable'
+    )
+    clave = models.BigIntegerField(verbose_name='Clave')
+    
+    class Meta:
+        verbose_name = 'Cubeta LSH'
+        verbose_name_plural = 'Cubetas LSH'
+        indexes = [
+            # Búsqueda de candidatos solo con el índice
+            models.Index(fields=['clave', 'entregable']),
+        ]
+
+
+class SimilitudEntregable(models.Model):
+    """
+    Par de entregables de distintos estudiantes con texto (o archivo) casi
+    igual. `entregable` es el enviado después.
+    """
+    
+    entregable = models.ForeignKey(
+        Entregable,
+        on_delete=models.CASCADE,
+        related_name='similitudes',
+        verbose_name='Entregable'
+    )
+    similar_a = models.ForeignKey(
+        Entregable,
+        on_delete=models.CASCADE,
+        related_name='similitudes_posteriores',
+        verbose_name='Similar a'
+    )
+    similitud = models.FloatField(
+        verbose_name='Similitud',
+        help_text='Jaccard estimada entre los textos (1 = mismo archivo)'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Similitud de Entregables'
+        verbose_name_plural = 'Similitudes de Entregables'
+        ordering = ['-similitud', '-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['entregable', 'similar_a'], name='similitud_entregable_unica'),
+        ]
+    
+    def __str__(self):
+        return f"{self.entregable_id} ~ {self.similar_a_id} ({self.similitud:.0%})"
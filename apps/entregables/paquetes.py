@@ -0,0 +1,174 @@
+"""
+Paquetes ZIP con los archivos de los entregables.
+
+escribir_zip() genera el ZIP en bloques a medida que lee cada archivo del
+storage: no usa archivos temporales y la memoria no depende del tamaño del
+paquete (un bloque de archivo más el búfer del ZIP). Al final agrega
+manifiesto.csv con las calificaciones de todos los entregables, tengan o no
+archivo.
+
+Los paquetes con más de ENTREGABLES_ZIP_MAX_ARCHIVOS archivos se generan en
+segundo plano (PaqueteEntregables + tarea generar_paquete_entregables) para
+no ocupar un worker web durante toda la descarga.
+"""
+import csv
+import io
+import logging
+import os
+import tempfile
+import zipfile
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+from django.utils.text import slugify
+
+from config.db.replicas import lecturas_en_replica
+
+
+logger = logging.getLogger(__name__)
+
+
+TAMANO_BLOQUE = 256 * 1024
+NOMBRE_MANIFIESTO = 'manifiesto.csv'
+COLUMNAS_MANIFIESTO = [
+    'entregable_id', 'estudiante', 'matricula', 'email', 'practica', 'empresa', 'titulo',
+    'estado', 'fecha_limite', 'fecha_entrega', 'calificacion', 'retroalimentacion', 'archivo',
+]
+
+
+def max_archivos_directo():
+    return getattr(settings, 'ENTREGABLES_ZIP_MAX_ARCHIVOS', 300)
+
+
+class _Salida:
+    """Destino del ZIP sin seek: acumula lo escrito hasta que se vacía."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def write(self, datos):
+        self._buffer += datos
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        datos = bytes(self._buffer)
+        self._buffer.clear()
+        return datos
+
+
+def preparar(entregables):
+    """Queryset con las relaciones que usan el ZIP y el manifiesto."""
+    return entregables.select_related('estudiante', 'practica__empresa').order_by(
+        'estudiante__last_name', 'estudiante__first_name', 'estudiante_id', 'fecha_limite', 'pk'
+    )
+
+
+def nombre_en_zip(entregable):
+    """Carpeta por estudiante y nombre único por entregable."""
+    estudiante = entregable.estudiante
+    carpeta = slugify(
+        f'{estudiante.matricula or estudiante.pk} {estudiante.last_name} {estudiante.first_name}'
+    ) or str(estudiante.pk)
+    return f'{carpeta}/{entregable.pk}_{os.path.basename(entregable.archivo.name)}'
+
+
+def _fila_manifiesto(entregable, ruta):
+    estudiante = entregable.estudiante
+    empresa = entregable.practica.empresa
+    return [
+        entregable.pk, estudiante.get_full_name(), estudiante.matricula or '', estudiante.email,
+        entregable.practica_id, empresa.nombre if empresa else '', entregable.titulo,
+        entregable.estado,
+        entregable.fecha_limite.isoformat() if entregable.fecha_limite else '',
+        entregable.fecha_entrega.isoformat() if entregable.fecha_entrega else '',
+        '' if entregable.calificacion is None else entregable.calificacion,
+        entregable.retroalimentacion or '', ruta,
+    ]
+
+
+def escribir_zip(entregables, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Generar el ZIP de `entregables` (queryset) como bloques de bytes.
+    Los archivos se guardan sin comprimir (PDF y Office ya lo están); el
+    manifiesto, comprimido y escrito en una segunda pasada por la consulta.
+    """
+    for bloque in _escribir_zip(entregables, tamano_bloque):
+        if bloque:
+            yield bloque
+
+
+def _escribir_zip(entregables, tamano_bloque):
+    salida = _Salida()
+    faltantes = set()
+
+    with zipfile.ZipFile(salida, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+        for entregable in preparar(entregables).filter(archivo__gt='').iterator(chunk_size=200):
+            info = zipfile.ZipInfo(
+                nombre_en_zip(entregable), date_time=timezone.localtime(entregable.updated_at).timetuple()[:6]
+            )
+            try:
+                with entregable.archivo.open('rb') as origen, zf.open(info, 'w', force_zip64=True) as destino:
+                    for bloque in origen.chunks(tamano_bloque):
+                        destino.write(bloque)
+                        yield salida.vaciar()
+            except FileNotFoundError:
+                faltantes.add(entregable.pk)
+            yield salida.vaciar()
+
+        info = zipfile.ZipInfo(NOMBRE_MANIFIESTO, date_time=timezone.localtime().timetuple()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        with zf.open(info, 'w', force_zip64=True) as destino:
+            # utf-8-sig: con BOM para que Excel abra el CSV como UTF-8
+            texto = io.TextIOWrapper(destino, encoding='utf-8-sig', newline='')
+            filas = csv.writer(texto)
+            filas.writerow(COLUMNAS_MANIFIESTO)
+            for entregable in preparar(entregables).iterator(chunk_size=500):
+                if entregable.pk in faltantes:
+                    ruta = '(archivo no encontrado)'
+                else:
+                    ruta = nombre_en_zip(entregable) if entregable.archivo else ''
+                filas.writerow(_fila_manifiesto(entregable, ruta))
+                yield salida.vaciar()
+            texto.flush()
+            texto.detach()
+    yield salida.vaciar()
+
+
+def nombre_paquete(prefijo='entregables'):
+    return f'{prefijo}_{timezone.localtime():%Y%m%d_%H%M}.zip'
+
+
+def generar_paquete(paquete):
+    """
+    Escribir el ZIP de un PaqueteEntregables en el storage. Se arma en un
+    archivo temporal que pasa a disco al superar unos MB, así la memoria del
+    worker no depende del tamaño del paquete.
+    """
+    from .models import Entregable, PaqueteEntregables
+
+    paquete.estado = PaqueteEntregables.PROCESANDO
+    paquete.save(update_fields=['estado'])
+
+    try:
+        entregables = Entregable.objects.filter(pk__in=paquete.entregable_ids)
+        # Reporte de solo lectura: con réplica configurada no carga la principal
+        with lecturas_en_replica(), tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as temporal:
+            for bloque in escribir_zip(entregables):
+                temporal.write(bloque)
+            paquete.tamano = temporal.tell()
+            temporal.seek(0)
+            paquete.archivo.save(nombre_paquete(f'paquete_{paquete.pk}'), File(temporal), save=False)
+            paquete.total_archivos = entregables.filter(archivo__gt='').count()
+        paquete.estado = PaqueteEntregables.COMPLETADO
+    except Exception as e:
+        logger.exception('Error al generar el paquete de entregables %s', paquete.pk)
+        paquete.estado = PaqueteEntregables.FALLIDO
+        paquete.mensaje = str(e)
+
+    paquete.finalizado_at = timezone.now()
+    paquete.save()
+    return paquete
@@ -1,6 +1,10 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Entregable
+from .models import Entregable, PaqueteEntregables, SimilitudEntregable
+from apps.documentos.vistas_previas import url_vista_previa
 from apps.usuarios.models import User
+from config.archivos import inspeccionar_subida
 
 
 class EntregableSerializer(serializers.ModelSerializer):
@@ -9,17 +13,43 @@ class EntregableSerializer(serializers.ModelSerializer):
     estudiante_nombre = serializers.CharField(source='estudiante.get_full_name', read_only=True)
     evaluador_nombre = serializers.CharField(source='evaluado_por.get_full_name', read_only=True)
     esta_retrasado = serializers.BooleanField(read_only=True)
+    descarga_url = serializers.SerializerMethodField()
+    vista_previa_url = serializers.SerializerMethodField()
     
     class Meta:
         model = Entregable
         fields = [
             'id', 'practica', 'estudiante', 'estudiante_nombre',
-            'titulo', 'descripcion', 'archivo', 'fecha_limite',
+            'titulo', 'descripcion', 'archivo', 'descarga_url', 'vista_previa_url',
+            'vista_previa_estado', 'paginas', 'fecha_limite',
             'fecha_entrega', 'fecha_evaluacion', 'estado',
             'calificacion', 'retroalimentacion', 'evaluado_por',
             'evaluador_nombre', 'esta_retrasado', 'created_at', 'updated_at'
         ]
         read_only_fields = ['fecha_entrega', 'fecha_evaluacion', 'estado', 'created_at', 'updated_at']
+        # MEDIA no es privado: el archivo solo se lee por descarga_url
+        extra_kwargs = {'archivo': {'write_only': True}}
+    
+    def get_descarga_url(self, obj):
+        """Descarga con control de acceso (ver EntregableViewSet.descargar)."""
+        if not obj.archivo:
+            return None
+        return reverse('entregable-descargar', args=[obj.pk])
+    
+    def get_vista_previa_url(self, obj):
+        return url_vista_previa(obj, 'entregable-vista-previa')
+    
+    def validate(self, attrs):
+        """Validar el archivo (tipo real, tamaño) y guardar su hash y tamaño."""
+        archivo = attrs.get('archivo')
+        if archivo:
+            try:
+                inspeccion = inspeccionar_subida(archivo)
+            except DjangoValidationError as e:
+                raise serializers.ValidationError({'archivo': e.messages})
+            attrs['archivo_hash'] = inspeccion.sha256
+            attrs['archivo_tamano'] = inspeccion.tamano
+        return attrs
 
 
 class EvaluarEntregableSerializer(serializers.Serializer):
@@ -34,3 +64,74 @@ class EvaluarEntregableSerializer(serializers.Serializer):
     )
     retroalimentacion = serializers.CharField(required=False, allow_blank=True)
     aprobado = serializers.BooleanField(default=True)
+
+
+class EvaluacionLoteItemSerializer(EvaluarEntregableSerializer):
+    """Una evaluación dentro de un lote."""
+    
+    id = serializers.IntegerField()
+
+
+class EvaluarEntregablesLoteSerializer(serializers.Serializer):
+    """Serializer para evaluar varios entregables en una sola petición."""
+    
+    evaluaciones = EvaluacionLoteItemSerializer(many=True, allow_empty=False)
+    
+    def validate_evaluaciones(self, value):
+        from .evaluacion import MAXIMO_POR_LOTE
+        
+        if len(value) > MAXIMO_POR_LOTE:
+            raise serializers.ValidationError(f'Máximo {MAXIMO_POR_LOTE} evaluaciones por lote.')
+        ids = [item['id'] for item in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError('Hay entregables repetidos en el lote.')
+        return value
+
+
+class PaqueteEntregablesSerializer(serializers.ModelSerializer):
+    """Estado de un paquete ZIP generado en segundo plano."""
+    
+    descarga_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = PaqueteEntregables
+        fields = [
+            'id', 'estado', 'filtros', 'total_archivos', 'tamano', 'descarga_url',
+            'mensaje', 'created_at', 'finalizado_at'
+        ]
+        read_only_fields = fields
+    
+    def get_descarga_url(self, obj):
+        """Descarga con control de acceso (ver EntregableViewSet.paquete_descargar)."""
+        if obj.estado != PaqueteEntregables.COMPLETADO or not obj.archivo:
+            return None
+        return reverse('entregable-paquete-descargar', args=[obj.pk])
+
+
+class SimilitudEntregableSerializer(serializers.ModelSerializer):
+    """
+    Par de entregables casi iguales visto desde `context['entregable']`:
+    `otro` es el entregable del otro estudiante. Si es de una práctica que
+    `context['visibilidad']` no ve, solo se indica que existe.
+    """
+    
+    otro = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = SimilitudEntregable
+        fields = ['id', 'similitud', 'otro', 'created_at']
+        read_only_fields = fields
+    
+    def get_otro(self, obj):
+        otro = obj.similar_a if obj.entregable_id == self.context['entregable'].pk else obj.entregable
+        if not self.context['visibilidad'].ve_practica(otro.practica_id):
+            return {'visible': False}
+        return {
+            'visible': True,
+            'id': otro.pk,
+            'titulo': otro.titulo,
+            'estudiante': otro.estudiante_id,
+            'estudiante_nombre': otro.estudiante.get_full_name(),
+            'practica': otro.practica_id,
+            'estado': otro.estado,
+        }
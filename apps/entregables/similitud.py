@@ -0,0 +1,234 @@
+"""
+Detección de entregables casi iguales con MinHash y LSH.
+
+El texto extraído del archivo (ver apps.documentos.vistas_previas) se
+reduce a shingles de PALABRAS_SHINGLE palabras y estos a una firma MinHash
+de PERMUTACIONES enteros de 32 bits (512 bytes en FirmaSimilitud). La
+fracción de posiciones iguales entre dos firmas estima la similitud de
+Jaccard entre los textos.
+
+Para no comparar cada envío contra todos, la firma se parte en BANDAS
+bandas de FILAS valores y cada banda se resume en una clave (CubetaLSH):
+solo se comparan los entregables que comparten alguna clave. Con 32x4, un
+par con similitud 0.6 comparte alguna cubeta con probabilidad ~99 % y uno
+con 0.3 con ~23 %; las firmas de esos candidatos se comparan después
+contra ENTREGABLES_SIMILITUD_UMBRAL.
+
+Los archivos idénticos (mismo archivo_hash) se marcan con similitud 1
+aunque no tengan texto. Solo se comparan entregables de estudiantes
+distintos.
+
+indexar() procesa un envío (tarea indexar_similitud_entregable);
+escanear() revisa de una vez un conjunto de entregables, p. ej. los de un
+periodo, con las cubetas en memoria.
+"""
+import hashlib
+import random
+import re
+import sys
+import unicodedata
+import zlib
+from array import array
+from collections import defaultdict
+from itertools import combinations
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+
+PERMUTACIONES = 128
+BANDAS = 32
+FILAS = PERMUTACIONES // BANDAS
+PALABRAS_SHINGLE = 5
+MIN_SHINGLES = 10  # textos más cortos no se comparan
+PATRON_PALABRA = re.compile(r'\w+')
+TAMANO_LOTE = 200
+
+_PRIMO = (1 << 61) - 1
+_MASCARA = 0xFFFFFFFF
+# Semilla fija: las firmas guardadas dependen de estos coeficientes
+_aleatorio = random.Random(49)
+_COEFICIENTES = [
+    (_aleatorio.randrange(1, _PRIMO), _aleatorio.randrange(0, _PRIMO)) for _ in range(PERMUTACIONES)
+]
+
+
+def umbral():
+    return getattr(settings, 'ENTREGABLES_SIMILITUD_UMBRAL', 0.6)
+
+
+def _normalizar(texto):
+    """Minúsculas y sin acentos, para que no cuenten como cambios."""
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def shingles(texto):
+    """Hashes (32 bits) de las secuencias de PALABRAS_SHINGLE palabras del texto."""
+    palabras = PATRON_PALABRA.findall(_normalizar(texto or ''))
+    return {
+        zlib.crc32(' '.join(palabras[i:i + PALABRAS_SHINGLE]).encode())
+        for i in range(len(palabras) - PALABRAS_SHINGLE + 1)
+    }
+
+
+def _a_bytes(valores):
+    arreglo = array('I', valores)
+    if sys.byteorder == 'big':
+        arreglo.byteswap()
+    return arreglo.tobytes()
+
+
+def _de_bytes(datos):
+    arreglo = array('I')
+    arreglo.frombytes(bytes(datos))
+    if sys.byteorder == 'big':
+        arreglo.byteswap()
+    return arreglo
+
+
+def firma(texto):
+    """Firma MinHash (bytes) del texto, o None si es demasiado corto para compararlo."""
+    hashes = list(shingles(texto))
+    if len(hashes) < MIN_SHINGLES:
+        return None
+    return _a_bytes(
+        min([(a * x + b) % _PRIMO for x in hashes]) & _MASCARA for a, b in _COEFICIENTES
+    )
+
+
+def claves(datos):
+    """Clave (entero de 64 bits con signo) de cada banda de la firma."""
+    datos = bytes(datos)
+    ancho = FILAS * 4
+    return [
+        int.from_bytes(
+            hashlib.blake2b(bytes([banda]) + datos[banda * ancho:(banda + 1) * ancho], digest_size=8).digest(),
+            'little', signed=True,
+        )
+        for banda in range(BANDAS)
+    ]
+
+
+def similitud(firma_a, firma_b):
+    """Jaccard estimada: fracción de valores iguales entre las dos firmas."""
+    iguales = sum(a == b for a, b in zip(_de_bytes(firma_a), _de_bytes(firma_b)))
+    return iguales / PERMUTACIONES
+
+
+def _par(entregable_id, otro_id, valor):
+    """Cada par se guarda una vez, con el id mayor como `entregable`."""
+    from .models import SimilitudEntregable
+
+    return SimilitudEntregable(
+        entregable_id=max(entregable_id, otro_id),
+        similar_a_id=min(entregable_id, otro_id),
+        similitud=round(valor, 4),
+    )
+
+
+def _guardar_firma(entregable_id, datos):
+    from .models import CubetaLSH, FirmaSimilitud
+
+    FirmaSimilitud.objects.create(entregable_id=entregable_id, firma=datos)
+    CubetaLSH.objects.bulk_create([CubetaLSH(entregable_id=entregable_id, clave=c) for c in claves(datos)])
+
+
+def indexar(entregable):
+    """
+    Guardar la firma y las cubetas de `entregable` (reemplazando las de un
+    envío anterior) y registrar los entregables de otros estudiantes casi
+    iguales. Devuelve los SimilitudEntregable creados.
+    """
+    from .models import CubetaLSH, Entregable, FirmaSimilitud, SimilitudEntregable
+
+    nueva = firma(entregable.texto_extraido)
+    minimo = umbral()
+    encontrados = {}
+    if entregable.archivo_hash:
+        iguales = Entregable.objects.filter(archivo_hash=entregable.archivo_hash).exclude(
+            estudiante_id=entregable.estudiante_id
+        )
+        encontrados.update((pk, 1.0) for pk in iguales.values_list('pk', flat=True))
+
+    with transaction.atomic():
+        FirmaSimilitud.objects.filter(entregable_id=entregable.pk).delete()
+        CubetaLSH.objects.filter(entregable_id=entregable.pk).delete()
+        SimilitudEntregable.objects.filter(Q(entregable_id=entregable.pk) | Q(similar_a_id=entregable.pk)).delete()
+
+        if nueva is not None:
+            candidatos = CubetaLSH.objects.filter(clave__in=claves(nueva)).values('entregable_id')
+            firmas = FirmaSimilitud.objects.filter(entregable_id__in=candidatos).exclude(
+                entregable__estudiante_id=entregable.estudiante_id
+            )
+            for pk, otra in firmas.values_list('entregable_id', 'firma'):
+                valor = similitud(nueva, otra)
+                if valor >= minimo:
+                    encontrados[pk] = max(encontrados.get(pk, 0), valor)
+            _guardar_firma(entregable.pk, nueva)
+
+        return SimilitudEntregable.objects.bulk_create(
+            [_par(entregable.pk, pk, valor) for pk, valor in encontrados.items()]
+        )
+
+
+def escanear(entregables, minimo=None):
+    """
+    Buscar los pares casi iguales dentro de `entregables` (queryset).
+    Calcula las firmas que falten y agrupa las cubetas en memoria, sin
+    consultar CubetaLSH. Guarda los pares (actualizando la similitud de los
+    ya registrados) y los devuelve ordenados de mayor a menor similitud.
+    """
+    from .models import FirmaSimilitud, SimilitudEntregable
+
+    minimo = umbral() if minimo is None else minimo
+    entregables = entregables.order_by()
+
+    faltantes = entregables.filter(firma_similitud__isnull=True).exclude(texto_extraido='')
+    for entregable in faltantes.only('pk', 'texto_extraido').iterator(chunk_size=TAMANO_LOTE):
+        datos = firma(entregable.texto_extraido)
+        if datos is not None:
+            _guardar_firma(entregable.pk, datos)
+
+    firmas, estudiantes = {}, {}
+    cubetas = defaultdict(list)
+    filas = FirmaSimilitud.objects.filter(entregable__in=entregables).values_list(
+        'entregable_id', 'entregable__estudiante_id', 'firma'
+    )
+    for pk, estudiante_id, datos in filas.iterator(chunk_size=TAMANO_LOTE):
+        firmas[pk] = bytes(datos)
+        estudiantes[pk] = estudiante_id
+        for clave in claves(datos):
+            cubetas[clave].append(pk)
+
+    encontrados = {}
+    revisados = set()
+    for miembros in cubetas.values():
+        for par in combinations(sorted(miembros), 2):
+            if par in revisados or estudiantes[par[0]] == estudiantes[par[1]]:
+                continue
+            revisados.add(par)
+            valor = similitud(firmas[par[0]], firmas[par[1]])
+            if valor >= minimo:
+                encontrados[par] = valor
+
+    por_hash = defaultdict(list)
+    for pk, estudiante_id, sha256 in entregables.exclude(archivo_hash='').values_list(
+        'pk', 'estudiante_id', 'archivo_hash'
+    ).iterator(chunk_size=TAMANO_LOTE):
+        por_hash[sha256].append((pk, estudiante_id))
+    for grupo in por_hash.values():
+        for (a, estudiante_a), (b, estudiante_b) in combinations(sorted(grupo), 2):
+            if estudiante_a != estudiante_b:
+                encontrados[(a, b)] = 1.0
+
+    pares = sorted(
+        (_par(a, b, valor) for (a, b), valor in encontrados.items()),
+        key=lambda par: -par.similitud,
+    )
+    SimilitudEntregable.objects.bulk_create(
+        pares, batch_size=TAMANO_LOTE, update_conflicts=True,
+        unique_fields=['entregable', 'similar_a'], update_fields=['similitud'],
+    )
+    return pares
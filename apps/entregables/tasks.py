@@ -1,12 +1,159 @@
 # Celery tasks para entregables
+import logging
+
 from celery import shared_task
 
 
+logger = logging.getLogger(__name__)
+
+
 @shared_task
 def notificar_evaluacion_entregable(entregable_id):
     """Notificar al estudiante que su entregable fue evaluado."""
-    # TODO: Implementar envío de email/notificación
-    pass
+    notificar_evaluaciones_entregables(entregable_ids=[entregable_id])
+
+
+@shared_task
+def notificar_evaluaciones_entregables(entregable_ids):
+    """
+    Notificar en un solo envío las evaluaciones de varios entregables:
+    un correo por estudiante con todos sus entregables evaluados.
+    """
+    from .models import Entregable
+    from django.core.mail import send_mass_mail
+
+    entregables = (
+        Entregable.objects.filter(id__in=entregable_ids, calificacion__isnull=False)
+        .select_related('estudiante')
+        .order_by('estudiante_id', 'fecha_limite')
+    )
+    por_estudiante = {}
+    for entregable in entregables:
+        por_estudiante.setdefault(entregable.estudiante, []).append(entregable)
+
+    mensajes = [
+        (
+            'Entregables evaluados',
+            'Tu tutor empresarial evaluó:\n' + '\n'.join(
+                f'- {e.titulo}: {e.calificacion} ({e.get_estado_display()})' for e in evaluados
+            ),
+            'noreply@practicas.com',
+            [estudiante.email],
+        )
+        for estudiante, evaluados in por_estudiante.items()
+    ]
+    return send_mass_mail(mensajes, fail_silently=False)
+
+
+def _revisar_archivo(entregable):
+    """
+    config.archivos.revisar_contenido() sobre el archivo del entregable. El
+    tipo sale de la extensión, que la subida ya comprobó contra el contenido.
+    """
+    import os
+    from config.archivos import MIME_POR_EXTENSION, revisar_contenido
+
+    if not entregable.archivo:
+        return []
+    extension = os.path.splitext(entregable.archivo.name)[1].lower().lstrip('.')
+    mime = MIME_POR_EXTENSION.get(extension, 'application/octet-stream')
+    try:
+        with entregable.archivo.open('rb') as archivo:
+            return revisar_contenido(archivo, mime)
+    except FileNotFoundError:
+        return ['El archivo no existe.']
+
+
+@shared_task
+def generar_vista_previa_entregable(entregable_id):
+    """Generar la vista previa, páginas y texto del archivo de un entregable."""
+    from apps.documentos.vistas_previas import generar
+    from .models import Entregable
+
+    entregable = Entregable.objects.filter(pk=entregable_id).first()
+    if entregable is None:
+        return None
+    # Antes de abrirlo con pdfium o python-docx, las mismas revisiones que a
+    # los documentos (bombas ZIP, estructura de PDF); si falla no se indexa
+    problemas = _revisar_archivo(entregable)
+    if problemas:
+        logger.warning('Entregable %s rechazado para vista previa: %s', entregable.pk, '; '.join(problemas))
+        entregable.vista_previa_estado = entregable.VISTA_FALLIDA
+        entregable.save(update_fields=['vista_previa_estado'])
+        return entregable.vista_previa_estado
+    estado = generar(entregable)
+    # Con el texto ya extraído se busca si se parece a otros entregables
+    indexar_similitud_entregable.delay(entregable.pk)
+    return estado
+
+
+@shared_task
+def indexar_similitud_entregable(entregable_id):
+    """
+    Indexar el texto de un entregable enviado y avisar al tutor empresarial
+    si se parece a entregables de otros estudiantes (ver similitud.py).
+    """
+    from .models import Entregable
+    from .similitud import indexar
+    from apps.practicas.visibilidad import Visibilidad
+    from django.core.mail import send_mail
+
+    entregable = (
+        Entregable.objects.filter(pk=entregable_id)
+        .select_related('estudiante', 'practica__tutor_empresarial')
+        .first()
+    )
+    if entregable is None:
+        return None
+    pares = indexar(entregable)
+    tutor = entregable.practica.tutor_empresarial
+    if pares and tutor and tutor.email:
+        # Similitud por entregable del otro estudiante (el par se guarda en un solo sentido)
+        similitudes = {
+            par.entregable_id if par.similar_a_id == entregable.pk else par.similar_a_id: par.similitud
+            for par in pares
+        }
+        otros = Entregable.objects.filter(pk__in=similitudes).select_related('estudiante')
+        # De las prácticas que el tutor no ve no se nombra al estudiante ni el entregable
+        visibilidad = Visibilidad(tutor)
+        lineas = [
+            f'- {otro.titulo} de {otro.estudiante.get_full_name()}: {similitudes[otro.pk]:.0%}'
+            if visibilidad.ve_practica(otro.practica_id)
+            else f'- Un entregable de otra práctica: {similitudes[otro.pk]:.0%}'
+            for otro in sorted(otros, key=lambda otro: -similitudes[otro.pk])
+        ]
+        send_mail(
+            subject='Posible entregable duplicado',
+            message=(
+                f'El entregable "{entregable.titulo}" de {entregable.estudiante.get_full_name()} '
+                'se parece a:\n' + '\n'.join(lineas) + '\n\n'
+                f'Detalle en /api/entregables/{entregable.pk}/similares/.'
+            ),
+            from_email='noreply@practicas.com',
+            recipient_list=[tutor.email],
+        )
+    return len(pares)
+
+
+@shared_task
+def generar_paquete_entregables(paquete_id):
+    """Generar el ZIP de un paquete grande y avisar al solicitante."""
+    from .models import PaqueteEntregables
+    from .paquetes import generar_paquete
+    from django.core.mail import send_mail
+
+    paquete = generar_paquete(PaqueteEntregables.objects.select_related('solicitado_por').get(pk=paquete_id))
+    if paquete.solicitado_por and paquete.estado == PaqueteEntregables.COMPLETADO:
+        send_mail(
+            subject='Paquete de entregables listo',
+            message=(
+                f'Tu paquete con {paquete.total_archivos} archivos está listo para descargar '
+                f'desde /api/entregables/paquetes/{paquete.pk}/descargar/.'
+            ),
+            from_email='noreply@practicas.com',
+            recipient_list=[paquete.solicitado_por.email],
+        )
+    return {'estado': paquete.estado, 'tamano': paquete.tamano}
 
 
 @shared_task
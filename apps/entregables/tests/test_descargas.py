@@ -0,0 +1,169 @@
+"""
+Pruebas de la descarga protegida de archivos de entregables.
+"""
+import asyncio
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncRequestFactory, RequestFactory
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.entregables.models import Entregable
+from apps.practicas.models import Practica
+from apps.usuarios.models import User
+from config.descargas import respuesta_almacenada, respuesta_archivo
+
+pytestmark = pytest.mark.django_db
+
+
+def crear_usuario(username, role):
+    return User.objects.create_user(
+        email=f'{username}@example.com',
+        password='testpass123',
+        username=username,
+        role=role,
+    )
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def media_temporal(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.fixture
+def escenario():
+    tutor = crear_usuario('tutor', User.TUTOR_EMPRESARIAL)
+    ana = crear_usuario('ana', User.ESTUDIANTE)
+    practica = Practica.objects.create(estudiante=ana, tutor_empresarial=tutor)
+    entregable = Entregable.objects.create(
+        practica=practica, estudiante=ana, titulo='Reporte', fecha_limite=timezone.now() + timedelta(days=3)
+    )
+    entregable.enviar(SimpleUploadedFile('reporte final.pdf', b'%PDF-1.4 contenido'))
+    return {'tutor': tutor, 'ana': ana, 'entregable': entregable}
+
+
+def cliente_de(usuario):
+    client = APIClient()
+    client.force_authenticate(user=usuario)
+    return client
+
+
+def ruta(entregable):
+    return f'/api/entregables/{entregable.pk}/descargar/'
+
+
+class TestDescargarEntregable:
+    """Acceso por rol y modos de envío."""
+
+    def test_estudiante_descarga_su_archivo(self, escenario):
+        response = cliente_de(escenario['ana']).get(ruta(escenario['entregable']))
+
+        assert response.status_code == 200
+        assert b''.join(response.streaming_content) == b'%PDF-1.4 contenido'
+        assert 'attachment' in response['Content-Disposition']
+
+    def test_otros_usuarios_no_lo_ven(self, escenario):
+        otro = crear_usuario('beto', User.ESTUDIANTE)
+        otro_tutor = crear_usuario('otro_tutor', User.TUTOR_EMPRESARIAL)
+
+        assert cliente_de(otro).get(ruta(escenario['entregable'])).status_code == 404
+        assert cliente_de(otro_tutor).get(ruta(escenario['entregable'])).status_code == 404
+        assert cliente_de(escenario['tutor']).get(ruta(escenario['entregable'])).status_code == 200
+
+    def test_url_de_descarga_en_el_listado(self, escenario):
+        response = cliente_de(escenario['ana']).get('/api/entregables/')
+        assert response.data['results'][0]['descarga_url'] == ruta(escenario['entregable'])
+        # La ruta pública en MEDIA no se expone
+        assert 'archivo' not in response.data['results'][0]
+
+    def test_sin_archivo(self, escenario):
+        entregable = Entregable.objects.create(
+            practica=escenario['entregable'].practica, estudiante=escenario['ana'],
+            titulo='Vacío', fecha_limite=timezone.now(),
+        )
+        assert cliente_de(escenario['ana']).get(ruta(entregable)).status_code == 404
+
+    def test_archivo_borrado(self, escenario):
+        archivo = escenario['entregable'].archivo
+        archivo.storage.delete(archivo.name)
+        assert cliente_de(escenario['ana']).get(ruta(escenario['entregable'])).status_code == 404
+
+    def test_nginx_x_accel_redirect(self, escenario, settings):
+        settings.DESCARGAS_SERVIDOR = 'nginx'
+        archivo = escenario['entregable'].archivo
+
+        response = cliente_de(escenario['ana']).get(ruta(escenario['entregable']))
+
+        assert response.status_code == 200
+        assert response.content == b''
+        assert response['X-Accel-Redirect'] == '/protegido/' + archivo.name.replace(' ', '%20')
+        assert response['Content-Type'] == 'application/pdf'
+
+    def test_apache_x_sendfile(self, escenario, settings):
+        settings.DESCARGAS_SERVIDOR = 'apache'
+        archivo = escenario['entregable'].archivo
+
+        response = cliente_de(escenario['ana']).get(ruta(escenario['entregable']))
+
+        assert response['X-Sendfile'] == archivo.path
+        assert response.content == b''
+
+    def test_respaldo_wsgi_y_asgi(self, escenario):
+        archivo = escenario['entregable'].archivo
+
+        wsgi = respuesta_archivo(RequestFactory().get('/'), archivo)
+        assert not wsgi.is_async
+        assert wsgi.file_to_stream is not None  # wsgi.file_wrapper / sendfile
+        wsgi.close()
+
+        asgi = respuesta_archivo(AsyncRequestFactory().get('/'), archivo)
+        assert asgi.is_async
+        assert asgi['Content-Length'] == str(len(b'%PDF-1.4 contenido'))
+
+        async def consumir():
+            return b''.join([bloque async for bloque in asgi])
+
+        assert asyncio.run(consumir()) == b'%PDF-1.4 contenido'
+        asgi.close()
+
+
+class TestStorageRemoto:
+    """Con S3 se redirige a una URL prefirmada, no a storage.url()."""
+
+    def storage_s3(self):
+        storage = mock.Mock(spec=['bucket', 'bucket_name', '_normalize_name', 'path', 'url'])
+        storage.path.side_effect = NotImplementedError
+        storage.bucket_name = 'practicas'
+        storage._normalize_name.side_effect = lambda nombre: f'media/{nombre}'
+        storage.bucket.meta.client.generate_presigned_url.return_value = 'https://s3.example.com/firmada'
+        return storage
+
+    def test_redirige_a_url_prefirmada(self, settings):
+        settings.DESCARGAS_URL_EXPIRACION = 30
+        storage = self.storage_s3()
+
+        response = respuesta_almacenada(RequestFactory().get('/'), storage, 'entregables/informe.pdf')
+
+        assert response.status_code == 302
+        assert response['Location'] == 'https://s3.example.com/firmada'
+        storage.url.assert_not_called()
+        storage.bucket.meta.client.generate_presigned_url.assert_called_once_with(
+            'get_object',
+            Params={
+                'Bucket': 'practicas',
+                'Key': 'media/entregables/informe.pdf',
+                'ResponseContentDisposition': 'attachment; filename="informe.pdf"',
+            },
+            ExpiresIn=30,
+        )
@@ -0,0 +1,166 @@
+"""
+Pruebas de la evaluación de entregables en lote.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.core import mail
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.entregables.evaluacion import evaluar_en_bloque
+from apps.entregables.models import Entregable
+from apps.practicas.models import Practica
+from apps.usuarios.models import User
+
+pytestmark = pytest.mark.django_db
+
+URL = '/api/entregables/evaluar-lote/'
+
+
+def crear_usuario(username, role):
+    return User.objects.create_user(
+        email=f'{username}@example.com',
+        password='testpass123',
+        username=username,
+        role=role,
+    )
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def escenario():
+    tutor = crear_usuario('tutor', User.TUTOR_EMPRESARIAL)
+    otro_tutor = crear_usuario('otro_tutor', User.TUTOR_EMPRESARIAL)
+    ana = crear_usuario('ana', User.ESTUDIANTE)
+    luis = crear_usuario('luis', User.ESTUDIANTE)
+    eva = crear_usuario('eva', User.ESTUDIANTE)
+
+    limite = timezone.now() + timedelta(days=7)
+    practicas = {
+        'ana': Practica.objects.create(estudiante=ana, tutor_empresarial=tutor),
+        'luis': Practica.objects.create(estudiante=luis, tutor_empresarial=tutor),
+        'eva': Practica.objects.create(estudiante=eva, tutor_empresarial=otro_tutor),
+    }
+    entregables = {}
+    for nombre, practica in practicas.items():
+        for i in range(2):
+            entregables[f'{nombre}{i}'] = Entregable.objects.create(
+                practica=practica, estudiante=practica.estudiante, titulo=f'Informe {i}',
+                fecha_limite=limite, estado=Entregable.ENVIADO,
+            )
+
+    client = APIClient()
+    client.force_authenticate(tutor)
+    return {'tutor': tutor, 'client': client, 'practicas': practicas, 'entregables': entregables}
+
+
+def item(entregable, calificacion='90.00', aprobado=True):
+    return {'id': entregable.pk, 'calificacion': calificacion, 'retroalimentacion': 'Bien', 'aprobado': aprobado}
+
+
+class TestEvaluarLote:
+    """Pruebas del endpoint evaluar-lote."""
+
+    def test_evalua_todos_y_resume_practicas(self, escenario):
+        e = escenario['entregables']
+        response = escenario['client'].post(URL, {'evaluaciones': [
+            item(e['ana0'], '80.00'), item(e['ana1'], '100.00'), item(e['luis0'], '50.00', aprobado=False),
+        ]}, format='json')
+
+        assert response.status_code == 200
+        assert len(response.data['evaluados']) == 3
+        estados = dict(Entregable.objects.values_list('pk', 'estado'))
+        assert estados[e['ana0'].pk] == Entregable.APROBADO
+        assert estados[e['luis0'].pk] == Entregable.RECHAZADO
+        assert estados[e['luis1'].pk] == Entregable.ENVIADO
+
+        practicas = response.data['practicas']
+        assert practicas[str(escenario['practicas']['ana'].pk)] == {'progreso': 100, 'promedio': Decimal('90.00')}
+        assert practicas[str(escenario['practicas']['luis'].pk)]['progreso'] == 50
+
+    def test_consultas_constantes(self, escenario, django_assert_max_num_queries):
+        """El número de consultas no crece con el tamaño del lote."""
+        evaluaciones = [item(entregable) for clave, entregable in escenario['entregables'].items()
+                        if not clave.startswith('eva')]
+        with django_assert_max_num_queries(8):
+            response = escenario['client'].post(URL, {'evaluaciones': evaluaciones}, format='json')
+        assert response.status_code == 200
+
+    def test_un_correo_por_estudiante(self, escenario, django_capture_on_commit_callbacks):
+        e = escenario['entregables']
+        with django_capture_on_commit_callbacks(execute=True):
+            escenario['client'].post(URL, {'evaluaciones': [
+                item(e['ana0']), item(e['ana1']), item(e['luis0']),
+            ]}, format='json')
+
+        assert sorted(m.to[0] for m in mail.outbox) == ['ana@example.com', 'luis@example.com']
+        assert 'Informe 1' in next(m.body for m in mail.outbox if m.to[0] == 'ana@example.com')
+
+    def test_entregable_ajeno_no_aplica_ninguno(self, escenario):
+        e = escenario['entregables']
+        response = escenario['client'].post(URL, {'evaluaciones': [
+            item(e['ana0']), item(e['eva0']),
+        ]}, format='json')
+
+        assert response.status_code == 400
+        assert str(e['eva0'].pk) in response.data['errores']
+        assert not Entregable.objects.filter(calificacion__isnull=False).exists()
+
+    def test_entregable_no_enviado(self, escenario):
+        entregable = escenario['entregables']['ana0']
+        Entregable.objects.filter(pk=entregable.pk).update(estado=Entregable.APROBADO)
+
+        with pytest.raises(ValidationError) as error:
+            evaluar_en_bloque(escenario['tutor'], [{'id': entregable.pk, 'calificacion': 70}])
+        assert 'enviados' in str(error.value)
+
+    def test_repetidos_rechazados(self, escenario):
+        entregable = escenario['entregables']['ana0']
+        response = escenario['client'].post(
+            URL, {'evaluaciones': [item(entregable), item(entregable)]}, format='json'
+        )
+        assert response.status_code == 400
+
+    def test_solo_tutores(self, escenario):
+        client = APIClient()
+        client.force_authenticate(escenario['practicas']['ana'].estudiante)
+        response = client.post(URL, {'evaluaciones': [item(escenario['entregables']['ana0'])]}, format='json')
+        assert response.status_code == 403
+
+
+class TestEvaluarIndividual:
+    """La evaluación individual también notifica al estudiante."""
+
+    def test_evaluar_notifica(self, escenario, django_capture_on_commit_callbacks):
+        entregable = escenario['entregables']['ana0']
+        with django_capture_on_commit_callbacks(execute=True):
+            response = escenario['client'].post(
+                f'/api/entregables/{entregable.pk}/evaluar/', {'calificacion': '75.00'}, format='json'
+            )
+
+        assert response.status_code == 200
+        assert [m.to for m in mail.outbox] == [['ana@example.com']]
+
+    def test_evaluar_vencido_ya_no_esta_retrasado(self, escenario):
+        """La respuesta no arrastra la anotación `retrasado` calculada antes de evaluar."""
+        entregable = escenario['entregables']['ana0']
+        Entregable.objects.filter(pk=entregable.pk).update(fecha_limite=timezone.now() - timedelta(days=1))
+        assert escenario['client'].get(f'/api/entregables/{entregable.pk}/').data['esta_retrasado'] is True
+
+        response = escenario['client'].post(
+            f'/api/entregables/{entregable.pk}/evaluar/', {'calificacion': '75.00'}, format='json'
+        )
+
+        assert response.status_code == 200
+        assert response.data['estado'] == Entregable.APROBADO
+        assert response.data['esta_retrasado'] is False
@@ -0,0 +1,207 @@
+"""
+Pruebas de la descarga de entregables en un ZIP con manifiesto.
+"""
+import asyncio
+import csv
+import io
+import zipfile
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.entregables.models import Entregable, PaqueteEntregables
+from apps.entregables.paquetes import NOMBRE_MANIFIESTO, escribir_zip
+from apps.practicas.models import Practica
+from apps.usuarios.models import User
+from apps.vacantes.models import Empresa
+from config.db import replicas
+from config.descargas import _iterar_async
+
+pytestmark = pytest.mark.django_db
+
+PAQUETE = '/api/entregables/paquete/'
+
+
+def crear_usuario(username, role):
+    return User.objects.create_user(
+        email=f'{username}@example.com',
+        password='testpass123',
+        username=username,
+        role=role,
+    )
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def media_temporal(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.fixture
+def escenario():
+    coordinadora = crear_usuario('coordinadora', User.COORDINADORA_EMPRESARIAL)
+    tutor = crear_usuario('tutor', User.TUTOR_EMPRESARIAL)
+    empresa = Empresa.objects.create(nombre='Acme', rfc='ACM010101AAA', created_by=coordinadora)
+
+    practicas = []
+    for nombre in ['ana', 'beto']:
+        estudiante = crear_usuario(nombre, User.ESTUDIANTE)
+        practicas.append(Practica.objects.create(estudiante=estudiante, tutor_empresarial=tutor, empresa=empresa))
+
+    limite = timezone.now() + timedelta(days=5)
+    for practica in practicas:
+        enviado = Entregable.objects.create(
+            practica=practica, estudiante=practica.estudiante, titulo='Reporte', fecha_limite=limite
+        )
+        enviado.enviar(SimpleUploadedFile('reporte.pdf', f'%PDF-1.4 {practica.estudiante.username}'.encode()))
+        enviado.evaluar(tutor, 95, 'Muy bien')
+        Entregable.objects.create(
+            practica=practica, estudiante=practica.estudiante, titulo='Pendiente', fecha_limite=limite
+        )
+    return {'coordinadora': coordinadora, 'tutor': tutor, 'practicas': practicas}
+
+
+def cliente_de(usuario):
+    client = APIClient()
+    client.force_authenticate(user=usuario)
+    return client
+
+
+def leer_zip(contenido):
+    zf = zipfile.ZipFile(io.BytesIO(contenido))
+    manifiesto = zf.read(NOMBRE_MANIFIESTO).decode('utf-8-sig')
+    return zf, list(csv.DictReader(io.StringIO(manifiesto)))
+
+
+class TestPaqueteEnFlujo:
+    """Descarga directa del ZIP."""
+
+    def test_zip_con_archivos_y_manifiesto(self, escenario):
+        response = cliente_de(escenario['tutor']).get(PAQUETE)
+
+        assert response.status_code == 200
+        assert response.streaming
+        assert response['Content-Type'] == 'application/zip'
+        assert 'attachment' in response['Content-Disposition']
+        zf, filas = leer_zip(b''.join(response.streaming_content))
+
+        archivos = [n for n in zf.namelist() if n != NOMBRE_MANIFIESTO]
+        assert len(archivos) == 2
+        assert {zf.read(n) for n in archivos} == {b'%PDF-1.4 ana', b'%PDF-1.4 beto'}
+        # Todos los entregables aparecen en el manifiesto, tengan o no archivo
+        assert len(filas) == 4
+        evaluados = [f for f in filas if f['archivo']]
+        assert {f['archivo'] for f in evaluados} == set(archivos)
+        assert {f['calificacion'] for f in evaluados} == {'95.00'}
+
+    def test_filtro_por_practica(self, escenario):
+        practica = escenario['practicas'][0]
+        response = cliente_de(escenario['coordinadora']).get(PAQUETE, {'practica': practica.pk})
+
+        zf, filas = leer_zip(b''.join(response.streaming_content))
+        assert len(zf.namelist()) == 2
+        assert {f['practica'] for f in filas} == {str(practica.pk)}
+
+    def test_archivo_faltante_queda_en_manifiesto(self, escenario):
+        entregable = Entregable.objects.filter(archivo__gt='').first()
+        entregable.archivo.storage.delete(entregable.archivo.name)
+
+        zf, filas = leer_zip(b''.join(escribir_zip(Entregable.objects.all())))
+
+        assert len(zf.namelist()) == 2
+        fila = next(f for f in filas if f['entregable_id'] == str(entregable.pk))
+        assert fila['archivo'] == '(archivo no encontrado)'
+
+    def test_estudiante_no_puede_descargar(self, escenario):
+        estudiante = escenario['practicas'][0].estudiante
+        response = cliente_de(estudiante).get(PAQUETE)
+        assert response.status_code == 403
+
+    def test_sin_archivos(self, escenario):
+        response = cliente_de(escenario['coordinadora']).get(PAQUETE, {'estado': Entregable.PENDIENTE})
+        assert response.status_code == 404
+
+    def test_iterador_async_entrega_los_bloques(self):
+        async def consumir():
+            return [bloque async for bloque in _iterar_async(iter([b'a', b'b', b'c']))]
+
+        assert asyncio.run(consumir()) == [b'a', b'b', b'c']
+
+
+class TestPaqueteEnSegundoPlano:
+    """Paquetes grandes generados por la tarea."""
+
+    def test_segundo_plano_genera_y_avisa(self, escenario, django_capture_on_commit_callbacks):
+        coordinadora = escenario['coordinadora']
+        with django_capture_on_commit_callbacks(execute=True):
+            response = cliente_de(coordinadora).post(PAQUETE)
+
+        assert response.status_code == 202
+        paquete = PaqueteEntregables.objects.get(pk=response.data['id'])
+        assert paquete.estado == PaqueteEntregables.COMPLETADO
+        assert paquete.total_archivos == 2
+        assert paquete.tamano > 0
+        with paquete.archivo.open('rb') as archivo:
+            zf, filas = leer_zip(archivo.read())
+        assert len(filas) == 4
+        assert [m.to for m in mail.outbox] == [[coordinadora.email]]
+        assert f'/api/entregables/paquetes/{paquete.pk}/descargar/' in mail.outbox[0].body
+
+    def test_post_lee_sus_escrituras(self, escenario, monkeypatch, django_capture_on_commit_callbacks):
+        """Crear el paquete es una escritura: el sondeo siguiente no lee de la réplica."""
+        monkeypatch.setattr(replicas, 'replica_configurada', lambda: True)
+        tutor = escenario['tutor']
+        with django_capture_on_commit_callbacks(execute=True):
+            assert cliente_de(tutor).post(PAQUETE).status_code == 202
+        assert replicas.escribio_recientemente(tutor.pk)
+        assert not replicas.puede_usar_replica(tutor, 'GET')
+
+    def test_descarga_protegida(self, escenario, django_capture_on_commit_callbacks):
+        tutor = escenario['tutor']
+        with django_capture_on_commit_callbacks(execute=True):
+            response = cliente_de(tutor).post(PAQUETE)
+        estado = cliente_de(tutor).get(f"/api/entregables/paquetes/{response.data['id']}/").data
+        assert 'archivo' not in estado
+
+        descarga = cliente_de(tutor).get(estado['descarga_url'])
+        assert descarga.status_code == 200
+        zf, filas = leer_zip(b''.join(descarga.streaming_content))
+        assert len(filas) == 4
+        otro = crear_usuario('otro_tutor', User.TUTOR_EMPRESARIAL)
+        assert cliente_de(otro).get(estado['descarga_url']).status_code == 403
+
+    def test_descarga_antes_de_terminar(self, escenario):
+        paquete = PaqueteEntregables.objects.create(solicitado_por=escenario['tutor'], entregable_ids=[])
+        ruta = f'/api/entregables/paquetes/{paquete.pk}/'
+
+        assert cliente_de(escenario['tutor']).get(ruta).data['descarga_url'] is None
+        assert cliente_de(escenario['tutor']).get(ruta + 'descargar/').status_code == 404
+
+    def test_supera_el_limite(self, escenario, settings, django_capture_on_commit_callbacks):
+        settings.ENTREGABLES_ZIP_MAX_ARCHIVOS = 1
+        assert cliente_de(escenario['tutor']).get(PAQUETE).status_code == 400
+        assert not PaqueteEntregables.objects.exists()
+        with django_capture_on_commit_callbacks(execute=True):
+            response = cliente_de(escenario['tutor']).post(PAQUETE)
+        assert response.status_code == 202
+
+    def test_estado_solo_para_el_solicitante(self, escenario):
+        tutor = escenario['tutor']
+        paquete = PaqueteEntregables.objects.create(solicitado_por=tutor, entregable_ids=[])
+        ruta = f'/api/entregables/paquetes/{paquete.pk}/'
+
+        assert cliente_de(tutor).get(ruta).status_code == 200
+        assert cliente_de(escenario['coordinadora']).get(ruta).status_code == 200
+        otro = crear_usuario('otro_tutor', User.TUTOR_EMPRESARIAL)
+        assert cliente_de(otro).get(ruta).status_code == 403
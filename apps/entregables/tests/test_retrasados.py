@@ -0,0 +1,131 @@
+"""
+Pruebas de la detección de entregables retrasados y del reporte de la coordinadora.
+"""
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.entregables.models import Entregable
+from apps.practicas.models import Practica
+from apps.usuarios.models import User
+from apps.vacantes.models import Empresa
+
+pytestmark = pytest.mark.django_db
+
+REPORTE = '/api/reportes/entregables-retrasados/'
+
+
+def crear_usuario(username, role):
+    return User.objects.create_user(
+        email=f'{username}@example.com',
+        password='testpass123',
+        username=username,
+        role=role,
+    )
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def escenario():
+    coordinadora = crear_usuario('coordinadora', User.COORDINADORA_EMPRESARIAL)
+    tutor = crear_usuario('tutor', User.TUTOR_EMPRESARIAL)
+    ana = crear_usuario('ana', User.ESTUDIANTE)
+    empresa = Empresa.objects.create(nombre='Acme', rfc='ACM010101AAA', created_by=coordinadora)
+    practica = Practica.objects.create(estudiante=ana, tutor_empresarial=tutor, empresa=empresa)
+
+    ahora = timezone.now()
+    entregables = {}
+    for nombre, dias, estado in [
+        ('pendiente_vencido', -3, Entregable.PENDIENTE),
+        ('enviado_vencido', -1, Entregable.ENVIADO),
+        ('aprobado_vencido', -5, Entregable.APROBADO),
+        ('pendiente_a_tiempo', 2, Entregable.PENDIENTE),
+    ]:
+        entregables[nombre] = Entregable.objects.create(
+            practica=practica, estudiante=ana, titulo=nombre,
+            fecha_limite=ahora + timedelta(days=dias), estado=estado,
+        )
+    return {'coordinadora': coordinadora, 'ana': ana, 'practica': practica, 'entregables': entregables}
+
+
+def titulos(queryset):
+    return sorted(queryset.values_list('titulo', flat=True))
+
+
+class TestQuerySet:
+    """Anotación y filtro de retraso en la base de datos."""
+
+    def test_overdue_incluye_enviados_tarde(self, escenario):
+        assert titulos(Entregable.objects.overdue()) == ['enviado_vencido', 'pendiente_vencido']
+        assert titulos(Entregable.objects.not_overdue()) == ['aprobado_vencido', 'pendiente_a_tiempo']
+
+    def test_anotacion_coincide_con_la_propiedad(self, escenario):
+        for entregable in Entregable.objects.with_overdue():
+            assert entregable.retrasado == Entregable.objects.get(pk=entregable.pk).esta_retrasado
+
+    def test_propiedad_usa_la_anotacion(self, escenario, django_assert_num_queries):
+        entregables = list(Entregable.objects.with_overdue())
+        with django_assert_num_queries(0):
+            assert sum(e.esta_retrasado for e in entregables) == 2
+
+    def test_indice_parcial_creado(self):
+        with connection.cursor() as cursor:
+            indices = connection.introspection.get_constraints(cursor, Entregable._meta.db_table)
+        assert indices['entregable_abierto_limite_idx']['columns'] == ['fecha_limite']
+
+
+class TestFiltroAPI:
+    """?retrasado= en el listado de entregables."""
+
+    @pytest.mark.parametrize('valor, esperado', [
+        ('true', ['enviado_vencido', 'pendiente_vencido']),
+        ('false', ['aprobado_vencido', 'pendiente_a_tiempo']),
+    ])
+    def test_filtro(self, escenario, valor, esperado):
+        client = APIClient()
+        client.force_authenticate(escenario['ana'])
+        response = client.get('/api/entregables/', {'retrasado': valor})
+
+        assert response.status_code == 200
+        resultados = response.data['results']
+        assert sorted(e['titulo'] for e in resultados) == esperado
+        assert all(e['esta_retrasado'] == (valor == 'true') for e in resultados)
+
+
+class TestReporteRetrasados:
+    """Reporte de retrasados de todo el campus."""
+
+    def test_reporte(self, escenario):
+        client = APIClient()
+        client.force_authenticate(escenario['coordinadora'])
+        response = client.get(REPORTE)
+
+        assert response.status_code == 200
+        assert response.data['count'] == 2
+        assert [e['titulo'] for e in response.data['results']] == ['pendiente_vencido', 'enviado_vencido']
+        assert response.data['results'][0]['dias_retraso'] == 3
+        assert response.data['results'][0]['empresa']['nombre'] == 'Acme'
+        assert response.data['por_empresa'][0]['retrasados'] == 2
+
+    def test_filtro_por_empresa(self, escenario):
+        client = APIClient()
+        client.force_authenticate(escenario['coordinadora'])
+        response = client.get(REPORTE, {'empresa': escenario['practica'].empresa_id + 1})
+
+        assert response.data['count'] == 0
+        assert response.data['por_empresa'] == []
+
+    def test_solo_coordinadora(self, escenario):
+        client = APIClient()
+        client.force_authenticate(escenario['ana'])
+        assert client.get(REPORTE).status_code == 403
@@ -0,0 +1,276 @@
+"""
+Pruebas de la detección de entregables casi iguales (MinHash + LSH).
+"""
+import io
+import random
+from datetime import timedelta
+
+import docx
+import pytest
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.entregables.models import CubetaLSH, Entregable, FirmaSimilitud, SimilitudEntregable
+from apps.entregables.similitud import BANDAS, PERMUTACIONES, claves, escanear, firma, indexar, similitud
+from apps.practicas.models import Practica
+from apps.usuarios.models import User
+
+pytestmark = pytest.mark.django_db
+
+VOCABULARIO = (
+    'red servidor base datos usuario proceso empresa informe sistema modelo prueba cliente '
+    'diseño análisis requisito entrega módulo interfaz reporte seguridad acceso respaldo'
+).split()
+
+
+def crear_usuario(username, role):
+    return User.objects.create_user(
+        email=f'{username}@example.com',
+        password='testpass123',
+        username=username,
+        role=role,
+    )
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def media_temporal(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def texto(semilla, palabras=300):
+    aleatorio = random.Random(semilla)
+    return ' '.join(aleatorio.choice(VOCABULARIO) for _ in range(palabras))
+
+
+def editado(original, cambios):
+    """El mismo texto con una palabra cambiada cada `len/cambios` palabras."""
+    palabras = original.split()
+    for i in range(0, len(palabras), len(palabras) // cambios):
+        palabras[i] = 'cambio'
+    return ' '.join(palabras)
+
+
+def docx_con(contenido):
+    documento = docx.Document()
+    documento.add_paragraph(contenido)
+    salida = io.BytesIO()
+    documento.save(salida)
+    return SimpleUploadedFile('informe.docx', salida.getvalue())
+
+
+def cliente_de(usuario):
+    client = APIClient()
+    client.force_authenticate(user=usuario)
+    return client
+
+
+@pytest.fixture
+def escenario():
+    tutor = crear_usuario('tutor', User.TUTOR_EMPRESARIAL)
+    practicas = {
+        nombre: Practica.objects.create(estudiante=crear_usuario(nombre, User.ESTUDIANTE), tutor_empresarial=tutor)
+        for nombre in ['ana', 'beto', 'carla']
+    }
+
+    def entregable(nombre, contenido=None, titulo='Informe'):
+        practica = practicas[nombre]
+        nuevo = Entregable.objects.create(
+            practica=practica, estudiante=practica.estudiante, titulo=titulo,
+            fecha_limite=timezone.now() + timedelta(days=3),
+        )
+        if contenido is not None:
+            nuevo.texto_extraido = contenido
+            nuevo.archivo = 'entregables/informe.pdf'
+            nuevo.save(update_fields=['texto_extraido', 'archivo'])
+        return nuevo
+
+    return {'tutor': tutor, 'practicas': practicas, 'entregable': entregable}
+
+
+class TestFirma:
+    """La fracción de valores iguales estima la similitud de los textos."""
+
+    def test_formato_compacto(self):
+        datos = firma(texto(1))
+
+        assert isinstance(datos, bytes) and len(datos) == PERMUTACIONES * 4
+        assert len(set(claves(datos))) == BANDAS
+        assert firma(texto(1)) == datos
+
+    def test_texto_corto_no_se_firma(self):
+        assert firma('Informe de la semana') is None
+        assert firma('') is None
+
+    def test_estimaciones(self):
+        original = texto(1)
+
+        assert similitud(firma(original), firma(original.upper())) == 1
+        assert similitud(firma(original), firma(editado(original, 5))) > 0.8
+        assert similitud(firma(original), firma(texto(2))) < 0.2
+
+
+class TestIndexarAlEnviar:
+    """Cada envío se compara con los ya indexados y se avisa al tutor."""
+
+    def test_marca_y_avisa_al_tutor(self, escenario, django_capture_on_commit_callbacks):
+        original = texto(1)
+        with django_capture_on_commit_callbacks(execute=True):
+            anterior = escenario['entregable']('ana', titulo='Red de la empresa')
+            anterior.enviar(docx_con(original))
+        assert not SimilitudEntregable.objects.exists()
+        assert FirmaSimilitud.objects.filter(entregable=anterior).exists()
+        assert CubetaLSH.objects.filter(entregable=anterior).count() == BANDAS
+
+        mail.outbox.clear()
+        with django_capture_on_commit_callbacks(execute=True):
+            copia = escenario['entregable']('beto')
+            copia.enviar(docx_con(editado(original, 5)))
+            escenario['entregable']('carla').enviar(docx_con(texto(2)))
+
+        par = SimilitudEntregable.objects.get()
+        assert {par.entregable_id, par.similar_a_id} == {anterior.pk, copia.pk}
+        assert par.similitud > 0.8
+        assert [m.to for m in mail.outbox] == [['tutor@example.com']]
+        assert 'Red de la empresa' in mail.outbox[0].body
+
+    def test_no_nombra_entregables_de_practicas_ajenas(self, escenario, django_capture_on_commit_callbacks):
+        original = texto(1)
+        otro_tutor = crear_usuario('otro_tutor', User.TUTOR_EMPRESARIAL)
+        dani = crear_usuario('dani', User.ESTUDIANTE)
+        ajena = Practica.objects.create(estudiante=dani, tutor_empresarial=otro_tutor)
+        indexar(Entregable.objects.create(
+            practica=ajena, estudiante=dani, titulo='Red de la empresa', texto_extraido=original,
+            archivo='entregables/informe.pdf', fecha_limite=timezone.now() + timedelta(days=3),
+        ))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            escenario['entregable']('beto').enviar(docx_con(original))
+
+        assert [m.to for m in mail.outbox] == [['tutor@example.com']]
+        assert 'Red de la empresa' not in mail.outbox[0].body
+        assert 'dani' not in mail.outbox[0].body
+        assert 'otra práctica: 100%' in mail.outbox[0].body
+
+    def test_mismo_archivo_sin_texto(self, escenario, django_capture_on_commit_callbacks):
+        contenido = b'%PDF-1.4 escaneado\nstartxref\n0\n%%EOF\n'
+        with django_capture_on_commit_callbacks(execute=True):
+            escenario['entregable']('ana').enviar(SimpleUploadedFile('a.pdf', contenido))
+            escenario['entregable']('beto').enviar(SimpleUploadedFile('b.pdf', contenido))
+
+        assert SimilitudEntregable.objects.get().similitud == 1
+
+    def test_reenvio_del_mismo_estudiante(self, escenario, django_capture_on_commit_callbacks):
+        original = texto(1)
+        with django_capture_on_commit_callbacks(execute=True):
+            escenario['entregable']('ana', titulo='Borrador').enviar(docx_con(original))
+            escenario['entregable']('ana', titulo='Final').enviar(docx_con(original))
+
+        assert not SimilitudEntregable.objects.exists()
+
+    def test_nuevo_envio_reemplaza_la_firma(self, escenario, django_capture_on_commit_callbacks):
+        original = texto(1)
+        indexar(escenario['entregable']('ana', original))
+        with django_capture_on_commit_callbacks(execute=True):
+            copia = escenario['entregable']('beto')
+            copia.enviar(docx_con(original))
+        assert SimilitudEntregable.objects.count() == 1
+
+        copia.estado = Entregable.RECHAZADO
+        copia.save(update_fields=['estado'])
+        with django_capture_on_commit_callbacks(execute=True):
+            copia.enviar(docx_con(texto(3)))
+
+        assert not SimilitudEntregable.objects.exists()
+        assert CubetaLSH.objects.filter(entregable=copia).count() == BANDAS
+
+
+class TestEscanear:
+    """Escaneo por lotes de un periodo."""
+
+    def test_encuentra_los_pares(self, escenario):
+        original = texto(1)
+        ana = escenario['entregable']('ana', original)
+        beto = escenario['entregable']('beto', editado(original, 5))
+        escenario['entregable']('carla', texto(2))
+        escenario['entregable']('ana', editado(original, 4))  # mismo estudiante que `ana`
+
+        pares = escanear(Entregable.objects.all())
+
+        assert [(p.entregable_id, p.similar_a_id) for p in pares if p.similar_a_id == ana.pk] == [(beto.pk, ana.pk)]
+        assert len(pares) == 2  # beto también se parece al segundo de ana
+        assert FirmaSimilitud.objects.count() == 4
+        # Repetirlo no duplica los pares
+        escanear(Entregable.objects.all())
+        assert SimilitudEntregable.objects.count() == 2
+
+    def test_comando_por_periodo(self, escenario):
+        original = texto(1)
+        escenario['entregable']('ana', original)
+        escenario['entregable']('beto', original)
+        fuera = escenario['entregable']('carla', original)
+        Entregable.objects.filter(pk=fuera.pk).update(fecha_limite=timezone.now() - timedelta(days=400))
+
+        salida = io.StringIO()
+        desde = (timezone.now() - timedelta(days=30)).date().isoformat()
+        call_command('detectar_entregables_similares', '--desde', desde, stdout=salida)
+
+        assert '2 entregables revisados, 1 pares' in salida.getvalue()
+        assert not SimilitudEntregable.objects.filter(similar_a=fuera).exists()
+
+
+class TestConsultarSimilares:
+    """Los tutores ven los pares; los estudiantes no."""
+
+    def test_endpoint_y_filtro(self, escenario):
+        original = texto(1)
+        ana = escenario['entregable']('ana', original, titulo='Original')
+        beto = escenario['entregable']('beto', original)
+        escenario['entregable']('carla', texto(2))
+        escanear(Entregable.objects.all())
+        client = cliente_de(escenario['tutor'])
+
+        response = client.get(f'/api/entregables/{ana.pk}/similares/')
+        assert response.status_code == 200
+        assert response.data[0]['otro']['id'] == beto.pk
+        assert response.data[0]['otro']['visible'] is True
+        assert response.data[0]['similitud'] == 1
+
+        response = client.get('/api/entregables/', {'posible_duplicado': 'true'})
+        assert sorted(fila['id'] for fila in response.data['results']) == sorted([ana.pk, beto.pk])
+
+        estudiante = cliente_de(ana.estudiante)
+        assert estudiante.get(f'/api/entregables/{ana.pk}/similares/').status_code == 403
+
+    def test_redacta_entregables_de_practicas_ajenas(self, escenario):
+        original = texto(1)
+        ana = escenario['entregable']('ana', original)
+        otro_tutor = crear_usuario('otro_tutor', User.TUTOR_EMPRESARIAL)
+        dani = crear_usuario('dani', User.ESTUDIANTE)
+        ajena = Practica.objects.create(estudiante=dani, tutor_empresarial=otro_tutor)
+        copia = Entregable.objects.create(
+            practica=ajena, estudiante=dani, titulo='Copia', texto_extraido=original,
+            archivo='entregables/informe.pdf', fecha_limite=timezone.now() + timedelta(days=3),
+        )
+        escanear(Entregable.objects.all())
+        ruta = f'/api/entregables/{ana.pk}/similares/'
+
+        response = cliente_de(escenario['tutor']).get(ruta)
+        assert response.status_code == 200
+        assert response.data[0]['otro'] == {'visible': False}
+        assert response.data[0]['similitud'] == 1
+
+        coordinadora = crear_usuario('coordinadora', User.COORDINADORA_EMPRESARIAL)
+        otro = cliente_de(coordinadora).get(ruta).data[0]['otro']
+        assert otro['visible'] is True
+        assert (otro['id'], otro['titulo']) == (copia.pk, 'Copia')
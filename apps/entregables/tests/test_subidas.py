@@ -0,0 +1,83 @@
+"""
+Pruebas de la validación del archivo al enviar un entregable.
+"""
+import hashlib
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.entregables.models import Entregable
+from apps.practicas.models import Practica
+from apps.usuarios.models import User
+
+pytestmark = pytest.mark.django_db
+
+PDF = b'%PDF-1.4\n1 0 obj<<>>endobj\nstartxref\n9\n%%EOF\n'
+
+
+def crear_usuario(username, role):
+    return User.objects.create_user(
+        email=f'{username}@example.com',
+        password='testpass123',
+        username=username,
+        role=role,
+    )
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def media_temporal(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.fixture
+def entregable():
+    ana = crear_usuario('ana', User.ESTUDIANTE)
+    practica = Practica.objects.create(estudiante=ana)
+    return Entregable.objects.create(
+        practica=practica, estudiante=ana, titulo='Reporte', fecha_limite=timezone.now() + timedelta(days=3)
+    )
+
+
+def enviar(entregable, archivo):
+    client = APIClient()
+    client.force_authenticate(user=entregable.estudiante)
+    return client.post(f'/api/entregables/{entregable.pk}/enviar/', {'archivo': archivo}, format='multipart')
+
+
+class TestEnviarArchivo:
+    """El archivo se valida mientras se sube y se guardan su hash y tamaño."""
+
+    def test_guarda_hash_y_tamano(self, entregable):
+        response = enviar(entregable, SimpleUploadedFile('reporte.pdf', PDF))
+
+        assert response.status_code == 200
+        entregable.refresh_from_db()
+        assert entregable.estado == Entregable.ENVIADO
+        assert entregable.archivo_hash == hashlib.sha256(PDF).hexdigest()
+        assert entregable.archivo_tamano == len(PDF)
+
+    def test_rechaza_tipo_falso(self, entregable):
+        response = enviar(entregable, SimpleUploadedFile('reporte.pdf', b'texto plano, no es un PDF'))
+
+        assert response.status_code == 400
+        assert 'archivo' in response.data['details']
+        entregable.refresh_from_db()
+        assert entregable.estado == Entregable.PENDIENTE
+
+    def test_rechaza_archivo_grande(self, entregable, settings):
+        settings.ARCHIVOS_TAMANO_MAXIMO = 1024
+        response = enviar(entregable, SimpleUploadedFile('reporte.pdf', PDF + b'0' * 4096))
+
+        assert response.status_code == 400
+        assert not entregable.__class__.objects.get(pk=entregable.pk).archivo
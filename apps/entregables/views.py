@@ -1,14 +1,33 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, JSONParser
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.core.exceptions import ValidationError
-from .models import Entregable
-from .serializers import EntregableSerializer, EvaluarEntregableSerializer
+from django.db import transaction
+from django.db.models import Q
+from django.core.files.storage import default_storage
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from .models import Entregable, PaqueteEntregables, SimilitudEntregable
+from .evaluacion import evaluar_en_bloque
+from .filters import EntregableFilter
+from .paquetes import escribir_zip, max_archivos_directo, nombre_paquete
+from .serializers import (
+    EntregableSerializer, EvaluarEntregableSerializer, EvaluarEntregablesLoteSerializer,
+    PaqueteEntregablesSerializer, SimilitudEntregableSerializer,
+)
+from apps.documentos import subidas
+from apps.documentos.serializers import IniciarSubidaSerializer
+from apps.documentos.views import respuesta_subida_iniciada
+from apps.practicas.visibilidad import obtener_visibilidad
 from apps.usuarios.models import User
+from config.db.replicas import LecturaEnReplicaMixin
+from config.archivos import MultiPartInspeccionParser
+from config.descargas import respuesta_almacenada, respuesta_archivo, respuesta_en_flujo
 
 
-class EntregableViewSet(viewsets.ModelViewSet):
+class EntregableViewSet(LecturaEnReplicaMixin, viewsets.ModelViewSet):
     """
     ViewSet para Entregables.
     - Estudiantes: pueden ver sus entregables y subirlos
@@ -18,29 +37,21 @@ class EntregableViewSet(viewsets.ModelViewSet):
     """
     serializer_class = EntregableSerializer
     permission_classes = [IsAuthenticated]
+    # Los archivos se validan mientras se suben (config/archivos.py)
+    parser_classes = [JSONParser, FormParser, MultiPartInspeccionParser]
+    filterset_class = EntregableFilter
+    ordering_fields = ['fecha_limite', 'created_at', 'calificacion']
+    # En PostgreSQL cada campo tiene un índice trigram (config/db/busqueda.py)
+    search_fields = ['titulo', 'descripcion', 'texto_extraido']
     
     def get_queryset(self):
-        """Filtrar entregables según rol."""
-        user = self.request.user
-        
-        if user.is_coordinadora:
-            # Coordinadora ve todos
-            return Entregable.objects.all()
-        elif user.is_docente_asesor:
-            # Docente asesor ve entregables de sus estudiantes
-            return Entregable.objects.filter(
-                practica__docente_asesor=user
-            )
-        elif user.is_tutor_empresarial:
-            # Tutor empresarial ve entregables de sus estudiantes
-            return Entregable.objects.filter(
-                practica__tutor_empresarial=user
-            )
-        elif user.is_estudiante:
-            # Estudiante ve solo sus entregables
-            return Entregable.objects.filter(estudiante=user)
-        
-        return Entregable.objects.none()
+        """
+        Filtrar entregables según rol, con el retraso calculado en la consulta.
+        El texto extraído solo se usa para buscar: no se carga.
+        """
+        return obtener_visibilidad(self.request).filtrar(
+            Entregable.objects.with_overdue().defer('texto_extraido')
+        )
     
     def perform_create(self, serializer):
         """Crear entregable (solo estudiantes)."""
@@ -81,6 +92,198 @@ class EntregableViewSet(viewsets.ModelViewSet):
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=False, methods=['post'], url_path='evaluar-lote')
+    def evaluar_lote(self, request):
+        """
+        Evaluar varios entregables a la vez.
+        Body: {"evaluaciones": [{"id", "calificacion", "retroalimentacion", "aprobado"}, ...]}
+        Si algún entregable no se puede evaluar no se aplica ninguna evaluación.
+        """
+        if not request.user.is_tutor_empresarial:
+            return Response(
+                {'error': 'Solo los tutores empresariales pueden evaluar entregables.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = EvaluarEntregablesLoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            entregables, practicas = evaluar_en_bloque(
+                request.user, serializer.validated_data['evaluaciones']
+            )
+        except ValidationError as e:
+            return Response({'errores': e.message_dict}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'evaluados': EntregableSerializer(entregables, many=True).data,
+            'practicas': {str(pk): resumen for pk, resumen in practicas.items()},
+        }, status=status.HTTP_200_OK)
+    
+    @action(detail=True, methods=['get'], url_path='descargar')
+    def descargar(self, request, pk=None):
+        """
+        Descargar el archivo del entregable.
+        El acceso es el del listado; la transferencia la hace el proxy si
+        DESCARGAS_SERVIDOR está configurado (ver config/descargas.py).
+        """
+        entregable = self.get_object()
+        if not entregable.archivo:
+            raise Http404('El entregable no tiene archivo.')
+        try:
+            return respuesta_archivo(request, entregable.archivo)
+        except FileNotFoundError:
+            raise Http404('El archivo del entregable no existe.')
+    
+    @action(detail=True, methods=['get'], url_path='vista-previa')
+    def vista_previa(self, request, pk=None):
+        """Imagen de la primera página; la URL lleva el hash del archivo y se puede cachear."""
+        entregable = self.get_object()
+        if entregable.vista_previa_estado != Entregable.VISTA_LISTA:
+            raise Http404('La vista previa no está disponible.')
+        try:
+            response = respuesta_almacenada(
+                request, default_storage, entregable.vista_previa, as_attachment=False
+            )
+        except FileNotFoundError:
+            raise Http404('La vista previa no existe.')
+        response['Cache-Control'] = 'private, max-age=86400'
+        return response
+    
+    @action(detail=True, methods=['get'], url_path='similares')
+    def similares(self, request, pk=None):
+        """
+        Entregables de otros estudiantes casi iguales a este (ver similitud.py).
+        No disponible para estudiantes. De los que son de prácticas que el
+        usuario no ve solo se muestra la similitud.
+        """
+        if request.user.is_estudiante:
+            return Response(
+                {'error': 'Los estudiantes no pueden ver las similitudes.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        entregable = self.get_object()
+        pares = SimilitudEntregable.objects.filter(
+            Q(entregable=entregable) | Q(similar_a=entregable)
+        ).select_related('entregable__estudiante', 'similar_a__estudiante')
+        return Response(SimilitudEntregableSerializer(pares, many=True, context={
+            'entregable': entregable, 'visibilidad': obtener_visibilidad(request),
+        }).data)
+    
+    @action(detail=False, methods=['get', 'post'], url_path='paquete')
+    def paquete(self, request):
+        """
+        Descargar en un ZIP los archivos de los entregables filtrados, con
+        manifiesto.csv de calificaciones. Acepta los filtros del listado
+        (?practica=, ?tutor=, ?empresa=, ?carrera=, ?estado=, ...).
+        GET lo envía directamente, hasta ENTREGABLES_ZIP_MAX_ARCHIVOS archivos.
+        POST crea el paquete, responde 202 y se genera en segundo plano (ver
+        paquetes/<id>/): es una escritura, así que no pasa por la réplica y el
+        primer sondeo del estado ya encuentra la fila.
+        """
+        if request.user.is_estudiante:
+            return Response(
+                {'error': 'Los estudiantes no pueden descargar paquetes de entregables.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        entregables = self.filter_queryset(self.get_queryset())
+        # La descarga se lee al enviar la respuesta: se fija la base de datos elegida ahora
+        entregables = entregables.using(entregables.db)
+        archivos = entregables.filter(archivo__gt='').count()
+        if not archivos:
+            return Response(
+                {'error': 'No hay archivos de entregables con esos filtros.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        if request.method == 'GET':
+            if archivos > max_archivos_directo():
+                return Response(
+                    {'error': (
+                        f'Son más de {max_archivos_directo()} archivos: '
+                        'solicita el paquete con POST para generarlo en segundo plano.'
+                    )},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            return respuesta_en_flujo(
+                request, escribir_zip(entregables), nombre_archivo=nombre_paquete(), content_type='application/zip'
+            )
+        
+        paquete = PaqueteEntregables.objects.create(
+            solicitado_por=request.user,
+            filtros=request.query_params.dict(),
+            entregable_ids=list(entregables.order_by().values_list('pk', flat=True)),
+            total_archivos=archivos,
+        )
+        from .tasks import generar_paquete_entregables
+        transaction.on_commit(lambda: generar_paquete_entregables.delay(paquete.id))
+        return Response(PaqueteEntregablesSerializer(paquete).data, status=status.HTTP_202_ACCEPTED)
+    
+    @action(detail=False, methods=['get'], url_path=r'paquetes/(?P<paquete_id>\d+)')
+    def paquete_estado(self, request, paquete_id=None):
+        """Estado de un paquete generado en segundo plano y su descarga_url cuando está listo."""
+        paquete = get_object_or_404(PaqueteEntregables, pk=paquete_id)
+        if not self._puede_ver_paquete(request, paquete):
+            return Response(
+                {'error': 'No tienes permiso para ver este paquete.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return Response(PaqueteEntregablesSerializer(paquete, context={'request': request}).data)
+    
+    @action(
+        detail=False, methods=['get'], url_path=r'paquetes/(?P<paquete_id>\d+)/descargar',
+        url_name='paquete-descargar',
+    )
+    def paquete_descargar(self, request, paquete_id=None):
+        """Descargar el ZIP de un paquete terminado (mismo acceso que paquetes/<id>/)."""
+        paquete = get_object_or_404(PaqueteEntregables, pk=paquete_id)
+        if not self._puede_ver_paquete(request, paquete):
+            return Response(
+                {'error': 'No tienes permiso para descargar este paquete.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        if paquete.estado != PaqueteEntregables.COMPLETADO or not paquete.archivo:
+            raise Http404('El paquete todavía no está listo.')
+        try:
+            return respuesta_archivo(request, paquete.archivo)
+        except FileNotFoundError:
+            raise Http404('El archivo del paquete no existe.')
+    
+    @staticmethod
+    def _puede_ver_paquete(request, paquete):
+        return paquete.solicitado_por_id == request.user.pk or request.user.is_coordinadora
+    
+    @action(detail=True, methods=['post'], url_path='subida')
+    def subida(self, request, pk=None):
+        """
+        Iniciar el envío con subida directa al storage.
+        Body: {"nombre", "tamano", "sha256"}. Responde el formulario firmado;
+        el entregable se envía al completar la subida
+        (/api/documentos/subidas/<id>/completar/).
+        """
+        if not request.user.is_estudiante:
+            return Response(
+                {'error': 'Solo los estudiantes pueden enviar entregables.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        entregable = self.get_object()
+        if entregable.estudiante_id != request.user.pk:
+            return Response(
+                {'error': 'No tienes permiso para enviar este entregable.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = IniciarSubidaSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            subida, formulario = subidas.iniciar(request.user, entregable=entregable, **serializer.validated_data)
+        except ValidationError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return respuesta_subida_iniciada(subida, formulario)
+    
     @action(detail=True, methods=['post'], url_path='enviar')
     def enviar(self, request, pk=None):
         """
@@ -0,0 +1,126 @@
+"""
+Tests del sondeo asíncrono de notificaciones no leídas
+"""
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.test import AsyncClient
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.notificaciones.models import Notificacion
+from apps.usuarios.models import User
+
+
+pytestmark = pytest.mark.django_db
+
+URL = '/api/notificaciones/no-leidas/'
+
+
+def crear_usuario(username, role):
+    return User.objects.create_user(
+        email=f'{username}@example.com',
+        password='testpass123',
+        username=username,
+        role=role,
+    )
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def coordinadora():
+    return crear_usuario('coordinadora', User.COORDINADORA_EMPRESARIAL)
+
+
+@pytest.fixture
+def estudiante():
+    return crear_usuario('estudiante', User.ESTUDIANTE)
+
+
+def cliente_jwt(usuario):
+    client = APIClient()
+    token = RefreshToken.for_user(usuario).access_token
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+def notificar(coordinadora, estudiante, asunto, estado=Notificacion.ENVIADA):
+    return Notificacion.objects.create(
+        remitente=coordinadora, destinatario=estudiante,
+        asunto=asunto, mensaje='...', estado=estado,
+    )
+
+
+class TestNoLeidas:
+    """Pruebas del endpoint de sondeo"""
+
+    def test_lista_no_leidas(self, coordinadora, estudiante):
+        notificar(coordinadora, estudiante, 'Nueva')
+        notificar(coordinadora, estudiante, 'Leída', estado=Notificacion.LEIDA)
+        response = cliente_jwt(estudiante).get(URL)
+        assert response.status_code == status.HTTP_200_OK
+        assert [n['asunto'] for n in response.json()] == ['Nueva']
+        assert response.json()[0]['remitente_nombre'] == coordinadora.get_full_name()
+
+    def test_desde(self, coordinadora, estudiante):
+        primera = notificar(coordinadora, estudiante, 'Primera')
+        notificar(coordinadora, estudiante, 'Segunda')
+        response = cliente_jwt(estudiante).get(URL, {'desde': primera.pk})
+        assert [n['asunto'] for n in response.json()] == ['Segunda']
+
+    def test_esperar_sin_novedades(self, estudiante, settings):
+        """Sin notificaciones nuevas responde vacío al agotar la espera"""
+        settings.NOTIFICACIONES_INTERVALO_SONDEO = 0.01
+        response = cliente_jwt(estudiante).get(URL, {'esperar': 0.05})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == []
+
+    def test_sesion(self, coordinadora, estudiante):
+        notificar(coordinadora, estudiante, 'Nueva')
+        client = APIClient()
+        client.force_login(estudiante)
+        assert len(client.get(URL).json()) == 1
+
+    def test_permisos(self, coordinadora):
+        assert APIClient().get(URL).status_code == status.HTTP_401_UNAUTHORIZED
+        assert cliente_jwt(coordinadora).get(URL).status_code == status.HTTP_403_FORBIDDEN
+        assert cliente_jwt(coordinadora).post(URL).status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+    def test_parametros_invalidos(self, estudiante):
+        response = cliente_jwt(estudiante).get(URL, {'esperar': 'mucho'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestMiddlewareAsync:
+    """La cadena de middleware no pasa el sondeo por un hilo"""
+
+    def middleware_adaptado(self, settings, caplog):
+        settings.DEBUG = True
+        with caplog.at_level(logging.DEBUG, logger='django.request'):
+            ASGIHandler()
+        return [r.getMessage() for r in caplog.records if 'adapted for middleware' in r.getMessage()]
+
+    def test_whitenoise_y_axes_sin_adaptar(self, settings, caplog):
+        adaptados = self.middleware_adaptado(settings, caplog)
+        assert not [m for m in adaptados if 'config.middleware' in m]
+
+    def test_ningun_middleware_adaptado(self, settings, caplog):
+        assert self.middleware_adaptado(settings, caplog) == []
+
+    def test_camino_async(self, coordinadora, estudiante, settings):
+        settings.AXES_ENABLED = True
+        notificar(coordinadora, estudiante, 'Nueva')
+        token = RefreshToken.for_user(estudiante).access_token
+        response = async_to_sync(AsyncClient().get)(URL, headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == status.HTTP_200_OK
+        assert [n['asunto'] for n in response.json()] == ['Nueva']
@@ -1,11 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import NotificacionViewSet, NotificacionMasivaViewSet
+from .views import NotificacionViewSet, NotificacionMasivaViewSet, notificaciones_no_leidas
 
 router = DefaultRouter()
 router.register(r'notificaciones', NotificacionViewSet, basename='notificacion')
 router.register(r'notificaciones-masivas', NotificacionMasivaViewSet, basename='notificacion-masiva')
 
 urlpatterns = [
+    # Vista async para el sondeo; va antes del router para atender la misma ruta
+    path('notificaciones/no-leidas/', notificaciones_no_leidas, name='notificacion-no-leidas'),
     path('', include(router.urls)),
 ]
@@ -1,13 +1,21 @@
+import asyncio
+import time
+
+from django.conf import settings
+from django.http import JsonResponse
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.core.exceptions import ValidationError
+from apps.practicas.visibilidad import obtener_visibilidad
+from apps.usuarios.authentication import autenticar_async
+from config.db.replicas import LecturaEnReplicaMixin
 from .models import Notificacion, NotificacionMasiva
 from .serializers import NotificacionSerializer, NotificacionMasivaSerializer
 
 
-class NotificacionViewSet(viewsets.ModelViewSet):
+class NotificacionViewSet(LecturaEnReplicaMixin, viewsets.ModelViewSet):
     """
     ViewSet para Notificaciones.
     - Coordinadora: puede crear y enviar notificaciones a estudiantes
@@ -18,24 +26,13 @@ class NotificacionViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        """Filtrar notificaciones según rol."""
-        user = self.request.user
-        
-        if user.is_coordinadora:
-            # Coordinadora ve todas
-            return Notificacion.objects.all()
-        elif user.is_estudiante:
-            # Estudiante ve solo sus notificaciones
-            return Notificacion.objects.filter(destinatario=user)
-        elif user.is_docente_asesor or user.is_tutor_empresarial:
-            # Docentes y tutores pueden ver notificaciones de sus estudiantes
-            if user.is_docente_asesor:
-                estudiantes = user.practicas_asesoradas.values_list('estudiante', flat=True)
-            else:
-                estudiantes = user.practicas_tutoradas.values_list('estudiante', flat=True)
-            return Notificacion.objects.filter(destinatario__in=estudiantes)
-        
-        return Notificacion.objects.none()
+        """
+        Filtrar notificaciones según rol.
+        Docentes y tutores ven las notificaciones de sus estudiantes.
+        """
+        return obtener_visibilidad(self.request).filtrar(
+            Notificacion.objects.all(), practica=None, estudiante='destinatario'
+        )
     
     def perform_create(self, serializer):
         """Crear notificación (solo coordinadora)."""
@@ -107,21 +104,55 @@ class NotificacionViewSet(viewsets.ModelViewSet):
             status=status.HTTP_200_OK
         )
     
-    @action(detail=False, methods=['get'], url_path='no-leidas')
-    def no_leidas(self, request):
-        """Obtener notificaciones no leídas del estudiante actual."""
-        if not request.user.is_estudiante:
-            return Response(
-                {'error': 'Solo los estudiantes pueden ver sus notificaciones no leídas.'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        notificaciones = Notificacion.objects.filter(
-            destinatario=request.user,
-            estado__in=[Notificacion.PENDIENTE, Notificacion.ENVIADA]
+
+
+async def notificaciones_no_leidas(request):
+    """
+    Notificaciones no leídas del estudiante actual.
+
+    Vista async para el sondeo del cliente: ?desde=<id> devuelve solo las
+    posteriores a ese id y ?esperar=<segundos> mantiene la petición abierta
+    hasta que llegue alguna (como máximo NOTIFICACIONES_ESPERA_MAXIMA). Mientras
+    espera no ocupa un hilo del worker solo si todo el MIDDLEWARE es
+    async-capable; uno solo síncrono hace que Django pase la petición por
+    un hilo (ver config/middleware.py).
+    """
+    if request.method != 'GET':
+        return JsonResponse({'detail': f'Método "{request.method}" no permitido.'}, status=405)
+
+    usuario = await autenticar_async(request)
+    if usuario is None:
+        return JsonResponse(
+            {'detail': 'Las credenciales de autenticación no se proveyeron.'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+    if not usuario.is_estudiante:
+        return JsonResponse(
+            {'error': 'Solo los estudiantes pueden ver sus notificaciones no leídas.'},
+            status=status.HTTP_403_FORBIDDEN
         )
-        serializer = self.get_serializer(notificaciones, many=True)
-        return Response(serializer.data)
+
+    try:
+        desde = int(request.GET.get('desde', 0))
+        esperar = float(request.GET.get('esperar', 0))
+    except ValueError:
+        return JsonResponse(
+            {'error': 'desde y esperar deben ser números.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    notificaciones = Notificacion.objects.filter(
+        destinatario_id=usuario.pk,
+        estado__in=[Notificacion.PENDIENTE, Notificacion.ENVIADA],
+        pk__gt=desde,
+    ).select_related('remitente', 'destinatario')
+
+    limite = time.monotonic() + min(max(esperar, 0), settings.NOTIFICACIONES_ESPERA_MAXIMA)
+    while not await notificaciones.aexists() and time.monotonic() < limite:
+        await asyncio.sleep(settings.NOTIFICACIONES_INTERVALO_SONDEO)
+
+    lista = [notificacion async for notificacion in notificaciones]
+    return JsonResponse(NotificacionSerializer(lista, many=True).data, safe=False)
 
 
 class NotificacionMasivaViewSet(viewsets.ModelViewSet):
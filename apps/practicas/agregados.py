@@ -0,0 +1,212 @@
+"""
+Agregados de entregables mantenidos en Practica.
+
+Cada práctica guarda cuántos entregables tiene (total, enviados, evaluados y
+vencidos), la suma y el promedio de sus calificaciones, el progreso y la
+última actividad. Así los listados filtran y ordenan por columnas indexadas
+en lugar de recorrer la tabla de entregables.
+
+- Entregable.save() y Entregable.delete() aplican la diferencia con UPDATEs
+  con F() en la misma transacción (aplicar_cambios).
+- La evaluación en lote aplica las diferencias de todo el lote de una vez.
+- `vencidos` (entregables retrasados, ver EntregableQuerySet.overdue)
+  depende de la hora: se recalcula con una subconsulta en cada cambio y con
+  actualizar_vencidos(), pero entre un cambio y otro se queda atrás. Los
+  listados y el dashboard lo calculan al momento con anotar_vencidos().
+- reconstruir() recalcula todo desde la tabla de entregables y verificar()
+  compara ambos (comando `verificar_agregados`).
+
+Los cambios que no pasan por save()/delete() (bulk_create, update o delete de
+querysets) deben seguirse de reconstruir() sobre las prácticas afectadas.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import (
+    Case, Count, DecimalField, F, FloatField, IntegerField, Max, OuterRef, Q, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Cast, Coalesce
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+
+from .models import Practica
+
+
+CONTADORES = ('entregables_total', 'entregables_enviados', 'entregables_evaluados', 'suma_calificaciones')
+CAMPOS_VERIFICADOS = CONTADORES + ('entregables_vencidos', 'progreso', 'promedio_calificacion')
+CERO = Decimal('0')
+
+
+def _entregable():
+    from apps.entregables.models import Entregable
+    return Entregable
+
+
+def filtro_vencidos(ahora=None, prefijo=''):
+    """Entregables retrasados: abiertos con la fecha límite vencida (ver EntregableQuerySet.overdue)."""
+    Entregable = _entregable()
+    return Q(**{
+        f'{prefijo}estado__in': Entregable.ESTADOS_ABIERTOS,
+        f'{prefijo}fecha_limite__lt': ahora or timezone.now(),
+    })
+
+
+def aporte(estado, calificacion, fecha_limite=None):
+    """Contribución de un entregable a los contadores de su práctica."""
+    Entregable = _entregable()
+    return {
+        'entregables_total': 1,
+        'entregables_enviados': int(estado != Entregable.PENDIENTE),
+        'entregables_evaluados': int(calificacion is not None),
+        'suma_calificaciones': calificacion if calificacion is not None else CERO,
+    }
+
+
+def diferencia(anterior, actual):
+    """
+    Diferencias por práctica entre dos estados de un entregable, cada uno
+    (practica_id, estado, calificacion, fecha_limite) o None si no existe.
+    Un cambio que solo mueve la fecha límite da diferencias en cero, pero la
+    práctica igual se actualiza (vencidos y última actividad).
+    """
+    deltas = defaultdict(lambda: dict.fromkeys(CONTADORES, 0))
+    for estado, signo in ((anterior, -1), (actual, 1)):
+        if estado is None:
+            continue
+        practica_id, *valores = estado
+        for campo, valor in aporte(*valores).items():
+            deltas[practica_id][campo] += signo * valor
+    return dict(deltas)
+
+
+def _derivados(total, evaluados, suma):
+    """Progreso (0-100, redondeado) y promedio a partir de los contadores."""
+    return {
+        'progreso': Case(
+            When(GreaterThan(total, 0), then=(evaluados * 100 + total / 2) / total),
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+        'promedio_calificacion': Case(
+            # Cast: SQLite guarda 175.00 como entero y dividiría sin decimales
+            When(GreaterThan(evaluados, 0), then=suma / Cast(evaluados, FloatField())),
+            default=Value(None),
+            output_field=DecimalField(max_digits=5, decimal_places=2),
+        ),
+    }
+
+
+def _vencidos_subconsulta(ahora):
+    return Coalesce(Subquery(
+        _entregable().objects.overdue(ahora).filter(practica=OuterRef('pk'))
+        .order_by().values('practica').annotate(n=Count('pk')).values('n')
+    ), 0)
+
+
+def anotar_vencidos(practicas, ahora=None):
+    """
+    Anotar `vencidos` con los entregables retrasados de cada práctica a la
+    hora actual (usa el índice parcial de los abiertos, ver overdue()).
+    """
+    return practicas.annotate(vencidos=_vencidos_subconsulta(ahora or timezone.now()))
+
+
+def aplicar_cambios(deltas, ahora=None):
+    """
+    Aplicar `deltas` ({practica_id: {contador: diferencia}}) con un UPDATE
+    por práctica. Debe llamarse dentro de la transacción del cambio.
+    """
+    ahora = ahora or timezone.now()
+    for practica_id, delta in deltas.items():
+        if practica_id is None:
+            continue
+        nuevos = {campo: F(campo) + delta.get(campo, 0) for campo in CONTADORES}
+        Practica.objects.filter(pk=practica_id).update(
+            **nuevos,
+            **_derivados(
+                nuevos['entregables_total'], nuevos['entregables_evaluados'], nuevos['suma_calificaciones']
+            ),
+            entregables_vencidos=_vencidos_subconsulta(ahora),
+            ultima_actividad=ahora,
+        )
+
+
+def esperados(practicas=None, ahora=None):
+    """Queryset de prácticas anotado con los agregados calculados desde los entregables."""
+    practicas = Practica.objects.all() if practicas is None else practicas
+    return practicas.order_by().annotate(
+        esperado_total=Count('entregables'),
+        esperado_enviados=Count('entregables', filter=~Q(entregables__estado=_entregable().PENDIENTE)),
+        esperado_evaluados=Count('entregables', filter=Q(entregables__calificacion__isnull=False)),
+        esperado_vencidos=Count('entregables', filter=filtro_vencidos(ahora, prefijo='entregables__')),
+        esperado_suma=Coalesce(Sum('entregables__calificacion'), Value(CERO)),
+    )
+
+
+def reconstruir(practicas=None, ahora=None):
+    """Recalcular los agregados de `practicas` (todas por defecto) desde los entregables."""
+    ahora = ahora or timezone.now()
+    practicas = Practica.objects.all() if practicas is None else practicas
+    entregables = _entregable().objects.filter(practica=OuterRef('pk')).order_by().values('practica')
+
+    def contar(filtro=Q()):
+        return Coalesce(Subquery(entregables.filter(filtro).annotate(n=Count('pk')).values('n')), 0)
+
+    actualizadas = practicas.update(
+        entregables_total=contar(),
+        entregables_enviados=contar(~Q(estado=_entregable().PENDIENTE)),
+        entregables_evaluados=contar(Q(calificacion__isnull=False)),
+        entregables_vencidos=contar(filtro_vencidos(ahora)),
+        suma_calificaciones=Coalesce(
+            Subquery(entregables.annotate(s=Sum('calificacion')).values('s')), Value(CERO),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+        ultima_actividad=Subquery(entregables.annotate(m=Max('updated_at')).values('m')),
+    )
+    # Los derivados se calculan sobre los contadores ya actualizados
+    practicas.update(**_derivados(
+        F('entregables_total'), F('entregables_evaluados'), F('suma_calificaciones')
+    ))
+    return actualizadas
+
+
+def actualizar_vencidos(ahora=None):
+    """Recalcular `entregables_vencidos` de las prácticas con retrasos nuevos o anteriores."""
+    ahora = ahora or timezone.now()
+    con_retrasos = _entregable().objects.overdue(ahora).order_by().values('practica')
+    return Practica.objects.filter(
+        Q(pk__in=con_retrasos) | Q(entregables_vencidos__gt=0)
+    ).update(entregables_vencidos=_vencidos_subconsulta(ahora))
+
+
+def verificar(practicas=None, ahora=None):
+    """
+    Comparar los agregados guardados con los calculados.
+    Retorna {practica_id: {campo: (guardado, esperado)}} solo con las diferencias.
+    """
+    diferencias = {}
+    for practica in esperados(practicas, ahora).iterator(chunk_size=2000):
+        total, evaluados = practica.esperado_total, practica.esperado_evaluados
+        esperado = {
+            'entregables_total': total,
+            'entregables_enviados': practica.esperado_enviados,
+            'entregables_evaluados': evaluados,
+            'entregables_vencidos': practica.esperado_vencidos,
+            'suma_calificaciones': practica.esperado_suma,
+            'progreso': (evaluados * 100 + total // 2) // total if total else 0,
+            'promedio_calificacion': (
+                (practica.esperado_suma / evaluados).quantize(Decimal('0.01')) if evaluados else None
+            ),
+        }
+        distintos = {}
+        for campo in CAMPOS_VERIFICADOS:
+            guardado = getattr(practica, campo)
+            if campo == 'promedio_calificacion' and None not in (guardado, esperado[campo]):
+                iguales = abs(guardado - esperado[campo]) <= Decimal('0.01')
+            else:
+                iguales = guardado == esperado[campo]
+            if not iguales:
+                distintos[campo] = (guardado, esperado[campo])
+        if distintos:
+            diferencias[practica.pk] = distintos
+    return diferencias
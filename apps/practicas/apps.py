@@ -4,3 +4,6 @@ class PracticasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.practicas'
     verbose_name = 'Prácticas'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,284 @@
+"""
+Cargas de trabajo por rol para medir la API.
+
+Cada escenario es una secuencia de pasos (peticiones) que repite un usuario
+virtual del rol: dashboard del estudiante, calificación del tutor y reportes
+de la coordinadora. Se ejecutan con el cliente de pruebas de Django dentro
+de una transacción que se revierte (ClienteLocal) o contra un servidor real
+(ClienteRemoto). Por paso se mide la latencia y el número de consultas; por
+escenario, el throughput.
+
+Los usuarios se eligen con una semilla entre los del campus sintético
+(apps.practicas.campus) o, si no existe, entre los usuarios del rol.
+"""
+import json
+import math
+import random
+import re
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.encuestas.models import Encuesta
+from apps.entregables.models import Entregable
+from apps.usuarios.models import User
+
+from .campus import DOMINIO, PASSWORD
+
+
+@dataclass
+class Paso:
+    """Una petición del escenario. `ruta(contexto)` puede retornar None para omitirla."""
+    nombre: str
+    ruta: object
+    metodo: str = 'GET'
+    datos: dict = None
+
+
+@dataclass
+class Escenario:
+    nombre: str
+    role: str
+    pasos: list
+    preparar: object = None  # preparar(usuario) -> contexto del usuario virtual
+
+
+def _siguiente_enviado(contexto):
+    pendientes = contexto.get('enviados') or []
+    if not pendientes:
+        return None
+    return f'/api/entregables/{pendientes.pop()}/evaluar/'
+
+
+def _preparar_tutor(usuario):
+    enviados = list(
+        Entregable.objects.filter(
+            practica__tutor_empresarial=usuario, estado=Entregable.ENVIADO
+        ).order_by('-pk').values_list('pk', flat=True)[:500]
+    )
+    return {'enviados': enviados}
+
+
+def _preparar_coordinadora(usuario):
+    encuesta = Encuesta.objects.order_by('-pk').values_list('pk', flat=True).first()
+    return {'encuesta': encuesta}
+
+
+ESCENARIOS = {
+    'estudiante': Escenario('estudiante', User.ESTUDIANTE, [
+        Paso('entregables', lambda c: '/api/entregables/'),
+        Paso('no_leidas', lambda c: '/api/notificaciones/no-leidas/'),
+        Paso('notificaciones', lambda c: '/api/notificaciones/'),
+        Paso('reuniones', lambda c: '/api/reuniones/'),
+    ]),
+    'tutor': Escenario('tutor', User.TUTOR_EMPRESARIAL, [
+        Paso('entregables', lambda c: '/api/entregables/'),
+        Paso('evaluar', _siguiente_enviado, 'POST', {'calificacion': '90.00', 'retroalimentacion': 'Bien'}),
+        Paso('reuniones', lambda c: '/api/reuniones/'),
+    ], preparar=_preparar_tutor),
+    'coordinadora': Escenario('coordinadora', User.COORDINADORA_EMPRESARIAL, [
+        Paso('entregables', lambda c: '/api/entregables/'),
+        Paso('notificaciones', lambda c: '/api/notificaciones/'),
+        Paso('reuniones', lambda c: '/api/reuniones/'),
+        Paso('analitica', lambda c: c['encuesta'] and f"/api/encuestas/{c['encuesta']}/analitica/?dimension=empresa"),
+    ], preparar=_preparar_coordinadora),
+}
+
+
+def elegir_usuarios(role, cantidad, semilla):
+    """Usuarios del rol elegidos con la semilla (prefiere los del campus sintético)."""
+    usuarios = User.objects.filter(role=role, is_active=True).order_by('pk')
+    del_campus = usuarios.filter(email__endswith=f'@{DOMINIO}')
+    if role == User.TUTOR_EMPRESARIAL:
+        # Solo tutores con entregables por calificar
+        del_campus = del_campus.filter(practicas_tutoradas__entregables__estado=Entregable.ENVIADO).distinct()
+    ids = list((del_campus if del_campus.exists() else usuarios).values_list('pk', flat=True))
+    rnd = random.Random(semilla)
+    return list(User.objects.filter(pk__in=rnd.sample(ids, min(cantidad, len(ids)))).order_by('pk'))
+
+
+# ---------------------------------------------------------------------------
+# Clientes
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Respuesta:
+    status: int
+    ms: float
+    consultas: int = None
+
+
+def host_permitido():
+    """
+    Host para el cliente local: el primero de ALLOWED_HOSTS. Fuera de pytest
+    'testserver' no está permitido y cada petición respondería 400.
+    """
+    if not settings.ALLOWED_HOSTS:
+        return 'localhost'  # con DEBUG Django lo permite aunque la lista esté vacía
+    for host in settings.ALLOWED_HOSTS:
+        if host != '*':
+            return host.lstrip('.')
+    return 'testserver'
+
+
+class ClienteLocal:
+    """Cliente de pruebas de Django autenticado con JWT; cuenta las consultas."""
+
+    def __init__(self, usuario):
+        host = host_permitido()
+        self.client = Client(SERVER_NAME=host, HTTP_HOST=host)
+        token = RefreshToken.for_user(usuario).access_token
+        self.encabezados = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def pedir(self, metodo, ruta, datos=None):
+        with CaptureQueriesContext(connection) as consultas:
+            inicio = time.perf_counter()
+            if metodo == 'GET':
+                response = self.client.get(ruta, **self.encabezados)
+            else:
+                response = self.client.generic(
+                    metodo, ruta, json.dumps(datos or {}), 'application/json', **self.encabezados
+                )
+            ms = (time.perf_counter() - inicio) * 1000
+        return Respuesta(response.status_code, ms, len(consultas))
+
+
+class ClienteRemoto:
+    """Cliente HTTP contra un servidor real; las consultas salen de Server-Timing si está activo."""
+
+    PATRON_CONSULTAS = re.compile(r'(\d+) consultas')
+
+    def __init__(self, usuario, url, password=PASSWORD):
+        self.url = url.rstrip('/')
+        response = self._enviar('POST', '/api/auth/login/', {'email': usuario.email, 'password': password})
+        if response[0] != 200:
+            raise RuntimeError(f'No se pudo iniciar sesión como {usuario.email} (HTTP {response[0]}).')
+        self.token = json.loads(response[1])['access']
+
+    def _enviar(self, metodo, ruta, datos=None, encabezados=None):
+        cuerpo = json.dumps(datos).encode() if datos is not None else None
+        peticion = urllib.request.Request(
+            self.url + ruta, data=cuerpo, method=metodo,
+            headers={'Content-Type': 'application/json', **(encabezados or {})},
+        )
+        try:
+            with urllib.request.urlopen(peticion, timeout=60) as response:
+                return response.status, response.read(), response.headers
+        except urllib.error.HTTPError as e:
+            return e.code, e.read(), e.headers
+
+    def pedir(self, metodo, ruta, datos=None):
+        inicio = time.perf_counter()
+        status, _, encabezados = self._enviar(
+            metodo, ruta, datos if metodo != 'GET' else None,
+            {'Authorization': f'Bearer {self.token}'},
+        )
+        ms = (time.perf_counter() - inicio) * 1000
+        coincidencia = self.PATRON_CONSULTAS.search(encabezados.get('Server-Timing', '') or '')
+        return Respuesta(status, ms, int(coincidencia.group(1)) if coincidencia else None)
+
+
+# ---------------------------------------------------------------------------
+# Ejecución y resultados
+# ---------------------------------------------------------------------------
+
+@dataclass
+class ResultadoPaso:
+    tiempos: list = field(default_factory=list)
+    consultas: list = field(default_factory=list)
+    errores: int = 0
+    omitidos: int = 0
+
+
+def percentil(valores, p):
+    """Percentil por rango más cercano (valores no vacíos)."""
+    ordenados = sorted(valores)
+    indice = max(0, min(len(ordenados) - 1, math.ceil(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+def _recorrer(escenario, cliente, contexto, iteraciones, resultados):
+    for _ in range(iteraciones):
+        for paso in escenario.pasos:
+            ruta = paso.ruta(contexto)
+            resultado = resultados.setdefault(paso.nombre, ResultadoPaso())
+            if not ruta:
+                resultado.omitidos += 1
+                continue
+            respuesta = cliente.pedir(paso.metodo, ruta, paso.datos)
+            if respuesta.status >= 400:
+                resultado.errores += 1
+            resultado.tiempos.append(respuesta.ms)
+            if respuesta.consultas is not None:
+                resultado.consultas.append(respuesta.consultas)
+
+
+def ejecutar_escenario(escenario, usuarios, iteraciones, url=None, concurrencia=1, calentamiento=1):
+    """
+    Ejecutar el escenario con cada usuario virtual y retornar el resumen.
+    Sin `url` se usa el cliente local y los cambios se revierten al terminar.
+    """
+    contextos = [(u, escenario.preparar(u) if escenario.preparar else {}) for u in usuarios]
+
+    def cliente_para(usuario):
+        return ClienteRemoto(usuario, url) if url else ClienteLocal(usuario)
+
+    resultados = {}
+    if url:
+        clientes = [(cliente_para(u), c) for u, c in contextos]
+        for cliente, contexto in clientes:
+            _recorrer(escenario, cliente, contexto, calentamiento, {})
+        inicio = time.perf_counter()
+        parciales = [{} for _ in clientes]
+        with ThreadPoolExecutor(max_workers=max(1, concurrencia)) as pool:
+            list(pool.map(
+                lambda args: _recorrer(escenario, args[0][0], args[0][1], iteraciones, args[1]),
+                zip(clientes, parciales),
+            ))
+        duracion = time.perf_counter() - inicio
+        for parcial in parciales:
+            for nombre, resultado in parcial.items():
+                total = resultados.setdefault(nombre, ResultadoPaso())
+                total.tiempos += resultado.tiempos
+                total.consultas += resultado.consultas
+                total.errores += resultado.errores
+                total.omitidos += resultado.omitidos
+    else:
+        with transaction.atomic():
+            clientes = [(cliente_para(u), c) for u, c in contextos]
+            for cliente, contexto in clientes:
+                _recorrer(escenario, cliente, contexto, calentamiento, {})
+            inicio = time.perf_counter()
+            for cliente, contexto in clientes:
+                _recorrer(escenario, cliente, contexto, iteraciones, resultados)
+            duracion = time.perf_counter() - inicio
+            transaction.set_rollback(True)
+
+    peticiones = sum(len(r.tiempos) for r in resultados.values())
+    return {
+        'usuarios': len(usuarios),
+        'peticiones': peticiones,
+        'errores': sum(r.errores for r in resultados.values()),
+        'segundos': round(duracion, 3),
+        'rps': round(peticiones / duracion, 2) if duracion else 0.0,
+        'pasos': {
+            nombre: {
+                'n': len(r.tiempos),
+                'p50_ms': round(percentil(r.tiempos, 50), 2),
+                'p95_ms': round(percentil(r.tiempos, 95), 2),
+                'p99_ms': round(percentil(r.tiempos, 99), 2),
+                'consultas': round(sum(r.consultas) / len(r.consultas), 1) if r.consultas else None,
+                'errores': r.errores,
+                'omitidos': r.omitidos,
+            } if r.tiempos else {'n': 0, 'omitidos': r.omitidos, 'errores': r.errores}
+            for nombre, r in resultados.items()
+        },
+    }
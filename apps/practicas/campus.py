@@ -0,0 +1,260 @@
+"""
+Generador de un campus sintético para pruebas de carga.
+
+Con escala=1 crea ~20k estudiantes, 500 empresas, 5k vacantes, 200k
+entregables y 1M de notificaciones (ver VOLUMENES). Todo se inserta con
+bulk_create por lotes y a partir de una semilla: la misma semilla y la misma
+escala producen los mismos datos (las fechas son relativas al día de hoy).
+
+Los registros generados se reconocen por el dominio de correo DOMINIO y se
+eliminan con limpiar_campus(). Todos los usuarios comparten la contraseña
+PASSWORD, hasheada una sola vez.
+"""
+import random
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from apps.entregables.models import Entregable
+from apps.notificaciones.models import Notificacion
+from apps.usuarios.models import User
+from apps.usuarios.signals import usuarios_creados_en_bloque
+from apps.vacantes.models import Empresa, Vacante
+
+from . import agregados
+from .models import Practica
+
+
+DOMINIO = 'campus.test'
+PASSWORD = 'campus123'
+TAMANO_LOTE = 2000
+
+# Volúmenes para escala=1
+VOLUMENES = {
+    'estudiantes': 20000,
+    'docentes': 400,
+    'empresas': 500,
+    'tutores_por_empresa': 2,
+    'vacantes': 5000,
+    'practicas': 12000,
+    'entregables': 200000,
+    'notificaciones': 1000000,
+}
+
+CARRERAS = [
+    'Ingeniería de Sistemas', 'Ingeniería Industrial', 'Administración de Empresas',
+    'Contaduría Pública', 'Ingeniería Electrónica', 'Psicología',
+]
+SECTORES = ['Tecnología', 'Manufactura', 'Servicios', 'Salud', 'Educación', 'Finanzas']
+TITULOS_ENTREGABLE = ['Plan de trabajo', 'Informe de avance', 'Bitácora', 'Informe final', 'Presentación']
+
+
+def _lotes(iterable, tamano=TAMANO_LOTE):
+    iterador = iter(iterable)
+    while lote := list(islice(iterador, tamano)):
+        yield lote
+
+
+def _insertar(modelo, objetos, tamano=TAMANO_LOTE):
+    """bulk_create por lotes; retorna los objetos creados (con id)."""
+    creados = []
+    for lote in _lotes(objetos, tamano):
+        creados.extend(modelo.objects.bulk_create(lote))
+    return creados
+
+
+def _insertar_sin_retorno(modelo, objetos, tamano=TAMANO_LOTE):
+    """bulk_create por lotes sin conservar los objetos (para tablas enormes)."""
+    total = 0
+    for lote in _lotes(objetos, tamano):
+        modelo.objects.bulk_create(lote)
+        total += len(lote)
+    return total
+
+
+def cantidades(escala):
+    """Volúmenes para la escala dada (al menos 1 de cada cosa)."""
+    return {
+        clave: valor if clave == 'tutores_por_empresa' else max(1, round(valor * escala))
+        for clave, valor in VOLUMENES.items()
+    }
+
+
+def generar_campus(escala=1.0, semilla=42, progreso=None):
+    """
+    Crear el campus sintético y retornar un dict con lo creado por tabla.
+    `progreso(mensaje)` se llama después de cada etapa.
+    """
+    if User.objects.filter(email__endswith=f'@{DOMINIO}').exists():
+        raise ValueError('Ya existe un campus sintético; elimínalo primero con limpiar_campus().')
+
+    progreso = progreso or (lambda mensaje: None)
+    rnd = random.Random(semilla)
+    n = cantidades(escala)
+    hoy = timezone.make_aware(datetime.combine(timezone.localdate(), time(9)))
+    password = make_password(PASSWORD)
+    resumen = {}
+
+    def usuario(prefijo, i, role, **extra):
+        return User(
+            username=f'{prefijo}{i:05d}',
+            email=f'{prefijo}{i:05d}@{DOMINIO}',
+            password=password,
+            first_name=prefijo.capitalize(),
+            last_name=f'{i:05d}',
+            role=role,
+            is_active=True,
+            **extra
+        )
+
+    with transaction.atomic():
+        coordinadora = _insertar(User, [usuario('coordinadora', 0, User.COORDINADORA_EMPRESARIAL)])[0]
+
+        empresas = _insertar(Empresa, (
+            Empresa(
+                nombre=f'Empresa {i:04d}',
+                rfc=f'CMP{i:010d}',
+                razon_social=f'Empresa {i:04d} S.A.',
+                direccion=f'Calle {rnd.randint(1, 200)} #{rnd.randint(1, 999)}',
+                telefono=f'555{i:07d}',
+                email=f'contacto{i:04d}@{DOMINIO}',
+                contacto_nombre=f'Contacto {i:04d}',
+                contacto_puesto='Recursos Humanos',
+                contacto_email=f'rh{i:04d}@{DOMINIO}',
+                contacto_telefono=f'556{i:07d}',
+                sector=rnd.choice(SECTORES),
+                tamaño=rnd.choice(['MICRO', 'PEQUEÑA', 'MEDIANA', 'GRANDE']),
+                created_by=coordinadora,
+            )
+            for i in range(n['empresas'])
+        ))
+        resumen['empresas'] = len(empresas)
+        progreso(f"Empresas: {len(empresas)}")
+
+        docentes = _insertar(User, (
+            usuario('docente', i, User.DOCENTE_ASESOR, departamento='Prácticas')
+            for i in range(n['docentes'])
+        ))
+        tutores = _insertar(User, (
+            usuario('tutor', i, User.TUTOR_EMPRESARIAL, empresa=empresas[i % len(empresas)], puesto='Líder')
+            for i in range(len(empresas) * n['tutores_por_empresa'])
+        ))
+        estudiantes = _insertar(User, (
+            usuario(
+                'estudiante', i, User.ESTUDIANTE,
+                matricula=f'CMP{i:08d}',
+                carrera=rnd.choice(CARRERAS),
+                semestre=rnd.randint(5, 10),
+                promedio=Decimal(rnd.randint(700, 1000)) / 100,
+            )
+            for i in range(n['estudiantes'])
+        ))
+        creados = [coordinadora] + docentes + tutores + estudiantes
+        usuarios_creados_en_bloque.send(sender=User, usuarios=creados)
+        resumen['usuarios'] = len(creados)
+        progreso(f"Usuarios: {len(creados)}")
+
+        resumen['vacantes'] = _insertar_sin_retorno(Vacante, (
+            Vacante(
+                empresa=empresas[i % len(empresas)],
+                titulo=f'Practicante {i:05d}',
+                descripcion='Vacante generada para pruebas de carga.',
+                requisitos='Ninguno',
+                carreras_solicitadas=rnd.choice(CARRERAS),
+                area=rnd.choice(SECTORES),
+                ubicacion='Campus',
+                horario='Lunes a viernes',
+                duracion_meses=rnd.choice([3, 6]),
+                fecha_inicio=(hoy + timedelta(days=rnd.randint(0, 60))).date(),
+                fecha_cierre_convocatoria=(hoy + timedelta(days=rnd.randint(-30, 30))).date(),
+                estado=rnd.choice(['ABIERTA', 'ABIERTA', 'CERRADA', 'PAUSADA']),
+                created_by=coordinadora,
+            )
+            for i in range(n['vacantes'])
+        ))
+        progreso(f"Vacantes: {resumen['vacantes']}")
+
+        con_practica = rnd.sample(estudiantes, min(n['practicas'], len(estudiantes)))
+        practicas = []
+        for i, estudiante in enumerate(con_practica):
+            tutor = tutores[rnd.randrange(len(tutores))]
+            inicio = hoy - timedelta(days=rnd.randint(0, 120))
+            practicas.append(Practica(
+                estudiante=estudiante,
+                docente_asesor=docentes[i % len(docentes)],
+                tutor_empresarial=tutor,
+                empresa_id=tutor.empresa_id,
+                area_practica=rnd.choice(SECTORES),
+                fecha_inicio=inicio.date(),
+                fecha_fin=(inicio + timedelta(days=180)).date(),
+                fecha_asignacion=inicio,
+                estado=rnd.choice([Practica.EN_CURSO] * 4 + [Practica.ASIGNADA, Practica.COMPLETADA]),
+                asignada_por=coordinadora,
+            ))
+        practicas = _insertar(Practica, practicas)
+        resumen['practicas'] = len(practicas)
+        progreso(f"Prácticas: {len(practicas)}")
+
+        def entregables():
+            estados = [Entregable.PENDIENTE, Entregable.ENVIADO, Entregable.APROBADO, Entregable.RECHAZADO]
+            for i in range(n['entregables']):
+                practica = practicas[i % len(practicas)]
+                estado = rnd.choices(estados, weights=[4, 3, 2, 1])[0]
+                limite = hoy + timedelta(days=rnd.randint(-60, 60))
+                evaluado = estado in (Entregable.APROBADO, Entregable.RECHAZADO)
+                yield Entregable(
+                    practica_id=practica.pk,
+                    estudiante_id=practica.estudiante_id,
+                    titulo=f'{rnd.choice(TITULOS_ENTREGABLE)} {i // len(practicas) + 1}',
+                    fecha_limite=limite,
+                    fecha_entrega=limite - timedelta(days=1) if estado != Entregable.PENDIENTE else None,
+                    estado=estado,
+                    calificacion=Decimal(rnd.randint(60, 100)) if evaluado else None,
+                    evaluado_por_id=practica.tutor_empresarial_id if evaluado else None,
+                    fecha_evaluacion=limite if evaluado else None,
+                )
+
+        resumen['entregables'] = _insertar_sin_retorno(Entregable, entregables())
+        # bulk_create no pasa por Entregable.save(): agregados desde cero
+        agregados.reconstruir(Practica.objects.filter(pk__in=[p.pk for p in practicas]))
+        progreso(f"Entregables: {resumen['entregables']}")
+
+        def notificaciones():
+            estados = [Notificacion.PENDIENTE, Notificacion.ENVIADA, Notificacion.LEIDA]
+            tipos = [Notificacion.INFORMATIVA, Notificacion.IMPORTANTE, Notificacion.RECORDATORIO]
+            for i in range(n['notificaciones']):
+                estado = rnd.choices(estados, weights=[1, 2, 7])[0]
+                yield Notificacion(
+                    remitente_id=coordinadora.pk,
+                    destinatario_id=estudiantes[i % len(estudiantes)].pk,
+                    tipo=rnd.choice(tipos),
+                    asunto=f'Aviso {i:07d}',
+                    mensaje='Notificación generada para pruebas de carga.',
+                    estado=estado,
+                    enviar_email=False,
+                    fecha_envio=hoy if estado != Notificacion.PENDIENTE else None,
+                )
+
+        resumen['notificaciones'] = _insertar_sin_retorno(Notificacion, notificaciones(), tamano=5000)
+        progreso(f"Notificaciones: {resumen['notificaciones']}")
+
+    return resumen
+
+
+def limpiar_campus():
+    """Eliminar todo lo creado por generar_campus()."""
+    with transaction.atomic():
+        usuarios = User.objects.filter(email__endswith=f'@{DOMINIO}')
+        # Primero las tablas grandes: sin dependientes ni señales, Django las
+        # borra con un solo DELETE en lugar de cargarlas por la cascada
+        Notificacion.objects.filter(destinatario__in=usuarios).delete()
+        Entregable.objects.filter(estudiante__in=usuarios).delete()
+        Practica.objects.filter(estudiante__in=usuarios).delete()
+        Vacante.objects.filter(empresa__email__endswith=f'@{DOMINIO}').delete()
+        eliminados, _ = usuarios.delete()
+        Empresa.objects.filter(email__endswith=f'@{DOMINIO}').delete()
+    return eliminados
@@ -0,0 +1,39 @@
+import django_filters
+from rest_framework.filters import OrderingFilter
+
+from .models import Practica
+
+
+class PracticaFilter(django_filters.FilterSet):
+    """
+    Filtros del listado de prácticas. ?entregables_vencidos= y
+    ?entregables_vencidos__gte= usan los vencidos calculados al momento
+    (anotación `vencidos`, ver agregados.anotar_vencidos).
+    """
+    
+    entregables_vencidos = django_filters.NumberFilter(field_name='vencidos')
+    entregables_vencidos__gte = django_filters.NumberFilter(field_name='vencidos', lookup_expr='gte')
+    
+    class Meta:
+        model = Practica
+        fields = {
+            'estado': ['exact'],
+            'estudiante': ['exact'],
+            'docente_asesor': ['exact'],
+            'empresa': ['exact'],
+            'progreso': ['exact', 'gte', 'lte'],
+            'promedio_calificacion': ['gte', 'lte', 'isnull'],
+        }
+
+
+class PracticaOrdering(OrderingFilter):
+    """?ordering=entregables_vencidos ordena por la anotación `vencidos`."""
+    
+    ANOTACIONES = {'entregables_vencidos': 'vencidos'}
+    
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view) or []
+        return [
+            ('-' if campo.startswith('-') else '') + self.ANOTACIONES.get(campo.lstrip('-'), campo.lstrip('-'))
+            for campo in ordering
+        ]
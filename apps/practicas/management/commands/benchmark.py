@@ -0,0 +1,122 @@
+"""
+Reproduce las cargas de trabajo por rol y reporta latencia, consultas y throughput.
+
+Uso:
+    python manage.py benchmark [--escenario todos] [--usuarios 5] [--iteraciones 20]
+                               [--url http://localhost:8000 --concurrencia 8]
+                               [--json actual.json] [--comparar base.json]
+
+Sin --url se usa el cliente de pruebas de Django y los cambios (p. ej. las
+calificaciones del tutor) se revierten. Con --url se ataca un servidor real
+que use la misma base de datos; las consultas solo se reportan si el
+servidor envía Server-Timing (METRICAS_SERVER_TIMING=True).
+
+--json guarda los resultados y --comparar muestra la diferencia contra un
+archivo guardado antes (p. ej. en otro commit). Las respuestas 4xx/5xx se
+cuentan como errores; si un escenario no tuvo ninguna respuesta correcta el
+comando termina con error (los tiempos no medirían la API).
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.practicas.benchmark import ESCENARIOS, ejecutar_escenario, elegir_usuarios
+
+
+class Command(BaseCommand):
+    help = 'Mide la API con cargas de trabajo por rol (estudiante, tutor, coordinadora)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escenario', choices=[*ESCENARIOS, 'todos'], default='todos')
+        parser.add_argument('--usuarios', type=int, default=5, help='Usuarios virtuales por escenario')
+        parser.add_argument('--iteraciones', type=int, default=20, help='Repeticiones por usuario')
+        parser.add_argument('--calentamiento', type=int, default=1, help='Repeticiones sin medir')
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--url', help='Servidor a medir (por defecto, cliente de pruebas local)')
+        parser.add_argument('--concurrencia', type=int, default=1, help='Hilos con --url')
+        parser.add_argument('--json', dest='salida', help='Guardar los resultados en este archivo')
+        parser.add_argument('--comparar', help='Resultados previos (--json) contra los que comparar')
+
+    def handle(self, *args, **options):
+        if options['iteraciones'] < 1 or options['usuarios'] < 1:
+            raise CommandError('--iteraciones y --usuarios deben ser al menos 1.')
+
+        base = {}
+        if options['comparar']:
+            try:
+                with open(options['comparar'], encoding='utf-8') as archivo:
+                    base = json.load(archivo)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"No se pudo leer {options['comparar']}: {e}")
+
+        nombres = list(ESCENARIOS) if options['escenario'] == 'todos' else [options['escenario']]
+        resultados = {}
+        for nombre in nombres:
+            escenario = ESCENARIOS[nombre]
+            usuarios = elegir_usuarios(escenario.role, options['usuarios'], options['semilla'])
+            if not usuarios:
+                self.stdout.write(self.style.WARNING(f'{nombre}: no hay usuarios del rol, se omite.'))
+                continue
+            try:
+                resultados[nombre] = ejecutar_escenario(
+                    escenario, usuarios, options['iteraciones'],
+                    url=options['url'],
+                    concurrencia=options['concurrencia'],
+                    calentamiento=options['calentamiento'],
+                )
+            except RuntimeError as e:
+                raise CommandError(str(e))
+            self._tabla(nombre, resultados[nombre], base.get(nombre))
+
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Resultados guardados en {options['salida']}")
+
+        fallidos = [
+            nombre for nombre, resultado in resultados.items()
+            if resultado['peticiones'] and resultado['errores'] == resultado['peticiones']
+        ]
+        if fallidos:
+            raise CommandError(
+                f"Todas las peticiones respondieron con error en: {', '.join(fallidos)}. "
+                'Revisa ALLOWED_HOSTS, las credenciales o el servidor.'
+            )
+
+    def _tabla(self, nombre, resultado, base=None):
+        self.stdout.write('')
+        encabezado = (
+            f"{nombre}: {resultado['usuarios']} usuarios, {resultado['peticiones']} peticiones, "
+            f"{resultado['rps']:.1f} req/s"
+        )
+        if resultado['errores']:
+            encabezado += f", {resultado['errores']} con error"
+        if base:
+            encabezado += f" ({self._delta(resultado['rps'], base.get('rps'))})"
+        self.stdout.write(self.style.MIGRATE_HEADING(encabezado))
+        self.stdout.write(
+            f"{'paso':<16}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'consultas':>11}{'errores':>9}"
+        )
+        for paso, datos in resultado['pasos'].items():
+            if not datos['n']:
+                self.stdout.write(f"{paso:<16}{0:>6}  (omitido)")
+                continue
+            consultas = '-' if datos['consultas'] is None else f"{datos['consultas']:.1f}"
+            self.stdout.write(
+                f"{paso:<16}{datos['n']:>6}{datos['p50_ms']:>10.2f}{datos['p95_ms']:>10.2f}"
+                f"{datos['p99_ms']:>10.2f}{consultas:>11}{datos['errores']:>9}"
+            )
+            previo = (base or {}).get('pasos', {}).get(paso)
+            if previo and previo.get('n'):
+                self.stdout.write(
+                    f"{'  vs base':<16}{'':>6}{self._delta(datos['p50_ms'], previo['p50_ms']):>10}"
+                    f"{self._delta(datos['p95_ms'], previo['p95_ms']):>10}"
+                    f"{self._delta(datos['p99_ms'], previo['p99_ms']):>10}"
+                    f"{self._delta(datos['consultas'], previo.get('consultas')):>11}"
+                )
+
+    @staticmethod
+    def _delta(actual, previo):
+        if actual is None or not previo:
+            return '-'
+        return f'{(actual - previo) / previo * 100:+.0f}%'
@@ -0,0 +1,46 @@
+"""
+Genera el campus sintético para pruebas de carga.
+
+Uso: python manage.py generar_campus [--escala 1.0] [--semilla 42] [--limpiar]
+Con escala=1: ~20k estudiantes, 500 empresas, 5k vacantes, 200k entregables y
+1M de notificaciones (ver apps.practicas.campus.VOLUMENES).
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.practicas.campus import DOMINIO, PASSWORD, generar_campus, limpiar_campus
+
+
+class Command(BaseCommand):
+    help = 'Genera (o elimina) el campus sintético con bulk_create y una semilla fija'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escala', type=float, default=1.0, help='Factor sobre los volúmenes base')
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--limpiar', action='store_true', help='Eliminar el campus existente y terminar')
+
+    def handle(self, *args, **options):
+        if options['limpiar']:
+            eliminados = limpiar_campus()
+            self.stdout.write(self.style.SUCCESS(f'Campus eliminado ({eliminados} registros).'))
+            return
+
+        if options['escala'] <= 0:
+            raise CommandError('--escala debe ser mayor que 0.')
+
+        inicio = time.perf_counter()
+        try:
+            resumen = generar_campus(
+                escala=options['escala'],
+                semilla=options['semilla'],
+                progreso=lambda mensaje: self.stdout.write(f'  {mensaje}'),
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Campus generado en {time.perf_counter() - inicio:.1f} s: "
+            + ', '.join(f'{clave}={valor}' for clave, valor in resumen.items())
+        ))
+        self.stdout.write(f'Usuarios: *@{DOMINIO}, contraseña: {PASSWORD}')
@@ -0,0 +1,49 @@
+"""
+Verifica los agregados de entregables guardados en cada práctica.
+
+Uso: python manage.py verificar_agregados [--reparar] [--reconstruir-todo]
+Compara los contadores, el progreso y el promedio con lo calculado desde la
+tabla de entregables. --reparar recalcula las prácticas con diferencias y
+--reconstruir-todo recalcula todas sin verificar.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.practicas import agregados
+from apps.practicas.models import Practica
+
+
+MAXIMO_DETALLE = 20
+
+
+class Command(BaseCommand):
+    help = 'Verifica (y repara) los agregados de entregables de las prácticas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reparar', action='store_true', help='Recalcular las prácticas con diferencias')
+        parser.add_argument('--reconstruir-todo', action='store_true', help='Recalcular todas las prácticas')
+
+    def handle(self, *args, **options):
+        if options['reconstruir_todo']:
+            actualizadas = agregados.reconstruir()
+            self.stdout.write(self.style.SUCCESS(f'Agregados recalculados en {actualizadas} prácticas.'))
+            return
+
+        diferencias = agregados.verificar()
+        if not diferencias:
+            self.stdout.write(self.style.SUCCESS('Los agregados de todas las prácticas son correctos.'))
+            return
+
+        self.stdout.write(self.style.WARNING(f'{len(diferencias)} prácticas con agregados distintos:'))
+        for practica_id, campos in list(diferencias.items())[:MAXIMO_DETALLE]:
+            detalle = ', '.join(f'{campo}: {guardado} != {esperado}' for campo, (guardado, esperado) in campos.items())
+            self.stdout.write(f'  práctica {practica_id}: {detalle}')
+        if len(diferencias) > MAXIMO_DETALLE:
+            self.stdout.write(f'  ... y {len(diferencias) - MAXIMO_DETALLE} más')
+
+        if options['reparar']:
+            agregados.reconstruir(Practica.objects.filter(pk__in=diferencias))
+            restantes = agregados.verificar(Practica.objects.filter(pk__in=diferencias))
+            if restantes:
+                self.stdout.write(self.style.ERROR(f'{len(restantes)} prácticas siguen con diferencias.'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{len(diferencias)} prácticas reparadas.'))
@@ -0,0 +1,103 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:43
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+
+def calcular_agregados(apps, schema_editor):
+    """Inicializar los agregados con una consulta agrupada sobre los entregables."""
+    Practica = apps.get_model('practicas', 'Practica')
+    Entregable = apps.get_model('entregables', 'Entregable')
+    
+    filas = Entregable.objects.values('practica').annotate(
+        total=Count('id'),
+        enviados=Count('id', filter=~Q(estado='PENDIENTE')),
+        evaluados=Count('id', filter=Q(calificacion__isnull=False)),
+        vencidos=Count('id', filter=Q(estado='PENDIENTE', fecha_limite__lt=timezone.now())),
+        suma=Sum('calificacion'),
+        ultima=Max('updated_at'),
+    ).order_by()
+    
+    practicas = []
+    for fila in filas:
+        total, evaluados, suma = fila['total'], fila['evaluados'], fila['suma'] or 0
+        practicas.append(Practica(
+            pk=fila['practica'],
+            entregables_total=total,
+            entregables_enviados=fila['enviados'],
+            entregables_evaluados=evaluados,
+            entregables_vencidos=fila['vencidos'],
+            suma_calificaciones=suma,
+            promedio_calificacion=round(suma / evaluados, 2) if evaluados else None,
+            progreso=(evaluados * 100 + total // 2) // total,
+            ultima_actividad=fila['ultima'],
+        ))
+    Practica.objects.bulk_update(practicas, [
+        'entregables_total', 'entregables_enviados', 'entregables_evaluados', 'entregables_vencidos',
+        'suma_calificaciones', 'promedio_calificacion', 'progreso', 'ultima_actividad',
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('practicas', '0003_remove_practica_practicas_p_profeso_a55eb2_idx_and_more'),
+        ('entregables', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='practica',
+            name='entregables_enviados',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Entregables que ya no están pendientes', verbose_name='Entregables enviados'),
+        ),
+        migrations.AddField(
+            model_name='practica',
+            name='entregables_evaluados',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Entregables evaluados'),
+        ),
+        migrations.AddField(
+            model_name='practica',
+            name='entregables_total',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Entregables'),
+        ),
+        migrations.AddField(
+            model_name='practica',
+            name='entregables_vencidos',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Pendientes con la fecha límite vencida', verbose_name='Entregables vencidos'),
+        ),
+        migrations.AddField(
+            model_name='practica',
+            name='progreso',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='Porcentaje de entregables evaluados (0 a 100)', verbose_name='Progreso'),
+        ),
+        migrations.AddField(
+            model_name='practica',
+            name='promedio_calificacion',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=5, null=True, verbose_name='Promedio de calificaciones'),
+        ),
+        migrations.AddField(
+            model_name='practica',
+            name='suma_calificaciones',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12, verbose_name='Suma de calificaciones'),
+        ),
+        migrations.AddField(
+            model_name='practica',
+            name='ultima_actividad',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Última actividad'),
+        ),
+        migrations.AddIndex(
+            model_name='practica',
+            index=models.Index(fields=['progreso'], name='practicas_p_progres_d4effe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='practica',
+            index=models.Index(fields=['promedio_calificacion'], name='practicas_p_promedi_a09e45_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='practica',
+            index=models.Index(fields=['ultima_actividad'], name='practicas_p_ultima__9deba4_idx'),
+        ),
+        migrations.RunPython(calcular_agregados, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:46
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils import timezone
+
+
+def recalcular_vencidos(apps, schema_editor):
+    """Contar también los entregables enviados sin evaluar con la fecha límite vencida."""
+    Practica = apps.get_model('practicas', 'Practica')
+    Entregable = apps.get_model('entregables', 'Entregable')
+    
+    conteos = dict(
+        Entregable.objects.filter(estado__in=['PENDIENTE', 'ENVIADO'], fecha_limite__lt=timezone.now())
+        .values('practica').annotate(total=Count('id')).order_by()
+        .values_list('practica', 'total')
+    )
+    Practica.objects.filter(entregables_vencidos__gt=0).exclude(pk__in=conteos).update(entregables_vencidos=0)
+    Practica.objects.bulk_update(
+        [Practica(pk=pk, entregables_vencidos=total) for pk, total in conteos.items()],
+        ['entregables_vencidos'],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('practicas', '0004_agregados_entregables'),
+        ('entregables', '0002_indice_retrasados'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='practica',
+            name='entregables_vencidos',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Pendientes o enviados sin evaluar con la fecha límite vencida', verbose_name='Entregables vencidos'),
+        ),
+        migrations.RunPython(recalcular_vencidos, migrations.RunPython.noop),
+    ]
@@ -137,6 +137,57 @@ class Practica(models.Model):
         verbose_name='Calificación Final'
     )
     
+    # Agregados de entregables (mantenidos por apps.practicas.agregados)
+    entregables_total = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Entregables'
+    )
+    entregables_enviados = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Entregables enviados',
+        help_text='Entregables que ya no están pendientes'
+    )
+    entregables_evaluados = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Entregables evaluados'
+    )
+    entregables_vencidos = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Entregables vencidos',
+        help_text='Pendientes o enviados sin evaluar con la fecha límite vencida'
+    )
+    suma_calificaciones = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        verbose_name='Suma de calificaciones'
+    )
+    promedio_calificacion = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Promedio de calificaciones'
+    )
+    progreso = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Progreso',
+        help_text='Porcentaje de entregables evaluados (0 a 100)'
+    )
+    ultima_actividad = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Última actividad'
+    )
+    
     # Metadata
     asignada_por = models.ForeignKey(
         User,
@@ -175,6 +226,9 @@ class Practica(models.Model):
             models.Index(fields=['tutor_empresarial', 'estado']),
             models.Index(fields=['empresa', 'estado']),
             models.Index(fields=['estado', 'created_at']),
+            models.Index(fields=['progreso']),
+            models.Index(fields=['promedio_calificacion']),
+            models.Index(fields=['ultima_actividad']),
         ]
         constraints = [
             # Un estudiante no puede tener múltiples prácticas activas
@@ -274,17 +328,14 @@ class Practica(models.Model):
     
     def calcular_progreso(self):
         """
-        Calcula el progreso de la práctica basado en entregables evaluados.
-        Retorna un valor entre 0 y 100.
+        Calcula el progreso de la práctica basado en entregables evaluados,
+        consultando la tabla de entregables. Retorna un valor entre 0 y 100.
+        El campo `progreso` guarda el mismo valor sin consultar.
         """
         total_entregables = self.entregables.count()
         if total_entregables == 0:
             return 0
         
         evaluados = self.entregables.filter(calificacion__isnull=False).count()
-        return round((evaluados / total_entregables) * 100)
-    
-    @property
-    def progreso(self):
-        """Alias para calcular_progreso()"""
-        return self.calcular_progreso()
+        # Redondeo hacia arriba en .5, igual que el cálculo en SQL de agregados
+        return (evaluados * 100 + total_entregables // 2) // total_entregables
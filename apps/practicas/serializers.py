@@ -7,8 +7,13 @@ class PracticaSerializer(serializers.ModelSerializer):
     estudiante_detail = EstudianteSerializer(source='estudiante', read_only=True)
     profesor_detail = ProfesorSerializer(source='profesor', read_only=True)
     empresa_detail = EmpresaSerializer(source='empresa', read_only=True)
+    entregables_vencidos = serializers.SerializerMethodField()
     
     class Meta:
         model = Practica
         fields = '__all__'
         read_only_fields = ['asignada_por', 'fecha_asignacion', 'created_at', 'updated_at']
+    
+    def get_entregables_vencidos(self, obj):
+        # Al momento si el queryset viene anotado (ver agregados.anotar_vencidos)
+        return getattr(obj, 'vencidos', obj.entregables_vencidos)
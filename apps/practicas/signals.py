@@ -0,0 +1,36 @@
+"""
+Señales de prácticas.
+"""
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import Practica
+from .visibilidad import invalidar_visibilidad
+
+
+CAMPOS_VISIBILIDAD = ('estudiante_id', 'docente_asesor_id', 'tutor_empresarial_id')
+
+
+@receiver(post_init, sender=Practica)
+def recordar_participantes(sender, instance, **kwargs):
+    """Guardar los participantes originales para invalidar también a los anteriores."""
+    instance._participantes_originales = tuple(
+        instance.__dict__.get(campo) for campo in CAMPOS_VISIBILIDAD
+    )
+
+
+@receiver(post_save, sender=Practica)
+def invalidar_visibilidad_practica(sender, instance, created, update_fields=None, **kwargs):
+    """Invalidar la visibilidad en caché de los participantes actuales y anteriores."""
+    if update_fields is not None and not {c[:-3] for c in CAMPOS_VISIBILIDAD} & set(update_fields):
+        return
+
+    actuales = tuple(getattr(instance, campo) for campo in CAMPOS_VISIBILIDAD)
+    if created or actuales != instance._participantes_originales:
+        invalidar_visibilidad(*set(actuales + instance._participantes_originales))
+    instance._participantes_originales = actuales
+
+
+@receiver(post_delete, sender=Practica)
+def invalidar_visibilidad_practica_eliminada(sender, instance, **kwargs):
+    invalidar_visibilidad(*(getattr(instance, campo) for campo in CAMPOS_VISIBILIDAD))
@@ -23,3 +23,10 @@ def notificar_asignacion_practica(practica_id):
         from_email='noreply@practicas.com',
         recipient_list=[practica.profesor.email],
     )
+
+
+@shared_task
+def actualizar_entregables_vencidos():
+    """Tarea periódica: recalcular los entregables vencidos de cada práctica."""
+    from .agregados import actualizar_vencidos
+    return actualizar_vencidos()
@@ -0,0 +1,277 @@
+"""
+Pruebas de los agregados de entregables guardados en Practica.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import Client
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.entregables.evaluacion import evaluar_en_bloque
+from apps.entregables.models import Entregable
+from apps.practicas import agregados
+from apps.practicas.models import Practica
+from apps.usuarios.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def crear_usuario(username, role):
+    return User.objects.create_user(
+        email=f'{username}@example.com',
+        password='testpass123',
+        username=username,
+        role=role,
+    )
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def media_temporal(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.fixture
+def practica():
+    tutor = crear_usuario('tutor', User.TUTOR_EMPRESARIAL)
+    ana = crear_usuario('ana', User.ESTUDIANTE)
+    return Practica.objects.create(estudiante=ana, tutor_empresarial=tutor)
+
+
+def crear_entregable(practica, dias=7, **extra):
+    return Entregable.objects.create(
+        practica=practica, estudiante=practica.estudiante, titulo='Informe',
+        fecha_limite=timezone.now() + timedelta(days=dias), **extra
+    )
+
+
+def archivo():
+    return SimpleUploadedFile('informe.pdf', b'%PDF-1.4', content_type='application/pdf')
+
+
+class TestMantenimiento:
+    """Los agregados siguen los cambios de los entregables."""
+
+    def test_ciclo_de_vida(self, practica):
+        primero = crear_entregable(practica)
+        segundo = crear_entregable(practica, dias=-1)
+        practica.refresh_from_db()
+        assert (practica.entregables_total, practica.entregables_enviados) == (2, 0)
+        assert practica.entregables_vencidos == 1
+        assert practica.progreso == 0
+        assert practica.promedio_calificacion is None
+
+        primero.enviar(archivo())
+        primero.evaluar(practica.tutor_empresarial, Decimal('80.00'))
+        segundo.enviar(archivo())
+        segundo.evaluar(practica.tutor_empresarial, Decimal('95.00'), aprobado=False)
+        practica.refresh_from_db()
+        assert practica.entregables_enviados == 2
+        assert practica.entregables_evaluados == 2
+        assert practica.entregables_vencidos == 0
+        assert practica.suma_calificaciones == Decimal('175.00')
+        assert practica.promedio_calificacion == Decimal('87.50')
+        assert practica.progreso == 100
+        assert practica.ultima_actividad is not None
+
+        segundo.delete()
+        practica.refresh_from_db()
+        assert practica.entregables_total == 1
+        assert practica.promedio_calificacion == Decimal('80.00')
+        assert agregados.verificar() == {}
+
+    def test_progreso_redondea(self, practica):
+        entregables = [crear_entregable(practica, estado=Entregable.ENVIADO) for _ in range(3)]
+        entregables[0].evaluar(practica.tutor_empresarial, Decimal('70'))
+        practica.refresh_from_db()
+        assert practica.progreso == 33 == practica.calcular_progreso()
+
+        entregables[1].evaluar(practica.tutor_empresarial, Decimal('70'))
+        practica.refresh_from_db()
+        assert practica.progreso == 67 == practica.calcular_progreso()
+
+    def test_update_fields_parcial(self, practica):
+        entregable = crear_entregable(practica)
+        entregable.estado = Entregable.ENVIADO
+        entregable.titulo = 'Otro'
+        entregable.save(update_fields=['titulo'])
+        practica.refresh_from_db()
+        assert practica.entregables_enviados == 0
+
+        entregable.save(update_fields=['estado'])
+        practica.refresh_from_db()
+        assert practica.entregables_enviados == 1
+
+    def test_enviado_tarde_sigue_vencido_hasta_evaluarse(self, practica):
+        entregable = crear_entregable(practica, dias=-1)
+        entregable.enviar(archivo())
+        assert Practica.objects.get(pk=practica.pk).entregables_vencidos == 1
+
+        entregable.evaluar(practica.tutor_empresarial, Decimal('70'))
+        assert Practica.objects.get(pk=practica.pk).entregables_vencidos == 0
+
+    def test_cambio_de_fecha_limite_actualiza_vencidos(self, practica):
+        entregable = crear_entregable(practica)
+        entregable.fecha_limite = timezone.now() - timedelta(hours=1)
+        entregable.save()
+        practica.refresh_from_db()
+        assert practica.entregables_vencidos == 1
+
+    def test_mover_a_otra_practica(self, practica):
+        luis = crear_usuario('luis', User.ESTUDIANTE)
+        otra = Practica.objects.create(estudiante=luis)
+        entregable = crear_entregable(practica)
+
+        entregable.practica = otra
+        entregable.save()
+
+        assert Practica.objects.get(pk=practica.pk).entregables_total == 0
+        assert Practica.objects.get(pk=otra.pk).entregables_total == 1
+
+    def test_instancia_sin_valores_originales(self, practica):
+        entregable = crear_entregable(practica)
+        parcial = Entregable.objects.only('pk', 'practica').get(pk=entregable.pk)
+        parcial.estado = Entregable.ENVIADO
+        parcial.save(update_fields=['estado'])
+
+        assert Practica.objects.get(pk=practica.pk).entregables_enviados == 1
+        assert agregados.verificar() == {}
+
+    def test_evaluar_con_instancia_desactualizada(self, practica):
+        entregable = crear_entregable(practica, estado=Entregable.ENVIADO)
+        otra_peticion = Entregable.objects.get(pk=entregable.pk)
+        entregable.evaluar(practica.tutor_empresarial, Decimal('80'))
+
+        with pytest.raises(ValidationError):
+            otra_peticion.evaluar(practica.tutor_empresarial, Decimal('60'))
+
+        practica.refresh_from_db()
+        assert practica.entregables_evaluados == 1
+        assert practica.promedio_calificacion == Decimal('80.00')
+        assert agregados.verificar() == {}
+
+    def test_guardar_con_instancia_desactualizada(self, practica):
+        entregable = crear_entregable(practica, estado=Entregable.ENVIADO)
+        otra_peticion = Entregable.objects.get(pk=entregable.pk)
+        entregable.evaluar(practica.tutor_empresarial, Decimal('80'))
+
+        # La diferencia parte de la fila guardada (APROBADO, 80), no de lo leído antes
+        otra_peticion.calificacion = Decimal('60')
+        otra_peticion.save(update_fields=['calificacion'])
+
+        practica.refresh_from_db()
+        assert practica.entregables_evaluados == 1
+        assert practica.promedio_calificacion == Decimal('60.00')
+        assert agregados.verificar() == {}
+
+    def test_evaluacion_en_lote(self, practica):
+        entregables = [crear_entregable(practica, estado=Entregable.ENVIADO) for _ in range(4)]
+        evaluar_en_bloque(practica.tutor_empresarial, [
+            {'id': e.pk, 'calificacion': Decimal(str(60 + 10 * i))} for i, e in enumerate(entregables[:3])
+        ])
+
+        practica.refresh_from_db()
+        assert practica.entregables_evaluados == 3
+        assert practica.progreso == 75
+        assert practica.promedio_calificacion == Decimal('70.00')
+        assert agregados.verificar() == {}
+
+
+class TestReconstruccion:
+    """Verificación, reparación y vencidos periódicos."""
+
+    def test_verificar_y_reparar(self, practica):
+        crear_entregable(practica, estado=Entregable.ENVIADO)
+        Entregable.objects.update(calificacion=Decimal('90'))  # sin pasar por save()
+
+        diferencias = agregados.verificar()
+        assert set(diferencias[practica.pk]) == {
+            'entregables_evaluados', 'suma_calificaciones', 'progreso', 'promedio_calificacion'
+        }
+
+        salida = StringIO()
+        call_command('verificar_agregados', reparar=True, stdout=salida)
+        assert '1 prácticas reparadas' in salida.getvalue()
+        practica.refresh_from_db()
+        assert practica.progreso == 100
+        assert practica.promedio_calificacion == Decimal('90.00')
+
+    def test_reconstruir_todo(self, practica):
+        crear_entregable(practica)
+        Practica.objects.update(entregables_total=9)
+
+        call_command('verificar_agregados', reconstruir_todo=True, stdout=StringIO())
+
+        assert Practica.objects.get(pk=practica.pk).entregables_total == 1
+
+    def test_actualizar_vencidos(self, practica):
+        entregable = crear_entregable(practica)
+        ahora = entregable.fecha_limite + timedelta(minutes=1)
+
+        assert agregados.actualizar_vencidos(ahora) == 1
+        assert Practica.objects.get(pk=practica.pk).entregables_vencidos == 1
+
+    def test_filtrar_y_ordenar_por_columnas(self, practica):
+        luis = crear_usuario('luis', User.ESTUDIANTE)
+        otra = Practica.objects.create(estudiante=luis, tutor_empresarial=practica.tutor_empresarial)
+        crear_entregable(otra, estado=Entregable.ENVIADO).evaluar(practica.tutor_empresarial, Decimal('50'))
+        crear_entregable(practica)
+
+        docente = crear_usuario('docente', User.DOCENTE_ASESOR)
+        Practica.objects.filter(pk=otra.pk).update(docente_asesor=docente)
+        client = APIClient()
+        client.force_authenticate(user=crear_usuario('coordinadora', User.COORDINADORA_EMPRESARIAL))
+
+        def ids(**parametros):
+            response = client.get('/api/practicas/', parametros)
+            assert response.status_code == 200
+            return [fila['id'] for fila in response.data['results']]
+
+        assert ids(ordering='-progreso') == [otra.pk, practica.pk]
+        assert ids(progreso__gte=50) == [otra.pk]
+        assert ids(docente_asesor=docente.pk) == [otra.pk]
+        assert ids(search='docente@example.com') == [otra.pk]
+
+    def test_vencidos_al_momento(self, practica, monkeypatch):
+        """Listado y dashboard no dependen de que se haya corrido actualizar_vencidos()."""
+        luis = crear_usuario('luis', User.ESTUDIANTE)
+        otra = Practica.objects.create(estudiante=luis, estado='EN_PROCESO')
+        crear_entregable(practica)
+        crear_entregable(otra, dias=-1)
+        # La columna guardada quedó atrasada
+        Practica.objects.update(entregables_vencidos=0)
+        Practica.objects.filter(pk=practica.pk).update(estado='EN_PROCESO')
+        Practica.objects.update(fecha_inicio=timezone.now().date())
+
+        coordinadora = crear_usuario('coordinadora', User.COORDINADORA_EMPRESARIAL)
+        client = APIClient()
+        client.force_authenticate(user=coordinadora)
+        response = client.get('/api/practicas/', {'entregables_vencidos__gte': 1})
+        assert [fila['id'] for fila in response.data['results']] == [otra.pk]
+        assert response.data['results'][0]['entregables_vencidos'] == 1
+        response = client.get('/api/practicas/', {'ordering': '-entregables_vencidos'})
+        assert [fila['id'] for fila in response.data['results']] == [otra.pk, practica.pk]
+
+        contextos = []
+        monkeypatch.setattr(
+            'config.views.render', lambda request, plantilla, contexto: contextos.append(contexto) or HttpResponse()
+        )
+        web = Client()
+        web.force_login(coordinadora)
+        web.get('/coordinadora/dashboard/')
+        alertas = contextos[0]['practicas_alerta']
+        assert [(p.pk, p.alerta) for p in alertas] == [(otra.pk, '1 entregables vencidos'), (practica.pk, 'Sin alertas')]
@@ -0,0 +1,158 @@
+"""
+Tests del campus sintético y de las cargas de trabajo del benchmark.
+"""
+import json
+
+import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+
+from apps.entregables.models import Entregable
+from apps.notificaciones.models import Notificacion
+from apps.practicas import agregados
+from apps.practicas import benchmark
+from apps.practicas.benchmark import ESCENARIOS, ejecutar_escenario, elegir_usuarios, percentil
+from apps.practicas.campus import DOMINIO, cantidades, generar_campus, limpiar_campus
+from apps.practicas.models import Practica
+from apps.usuarios.models import User
+from apps.vacantes.models import Empresa, Vacante
+
+
+pytestmark = pytest.mark.django_db
+
+ESCALA = 0.001
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class TestGenerarCampus:
+    """Tests de generar_campus y limpiar_campus."""
+
+    def test_crea_los_volumenes_de_la_escala(self):
+        """Test que se crean las cantidades esperadas"""
+        n = cantidades(ESCALA)
+        resumen = generar_campus(escala=ESCALA, semilla=1)
+
+        assert resumen['empresas'] == Empresa.objects.count() == n['empresas']
+        assert resumen['vacantes'] == Vacante.objects.count() == n['vacantes']
+        assert resumen['practicas'] == Practica.objects.count() == n['practicas']
+        assert resumen['entregables'] == Entregable.objects.count() == n['entregables']
+        assert resumen['notificaciones'] == Notificacion.objects.count() == n['notificaciones']
+        assert User.objects.filter(role=User.ESTUDIANTE).count() == n['estudiantes']
+        assert agregados.verificar() == {}
+
+    def test_misma_semilla_mismos_datos(self):
+        """Test que la semilla hace reproducible el campus"""
+        def huella():
+            return (
+                list(Practica.objects.order_by('estudiante__email').values_list(
+                    'estudiante__email', 'tutor_empresarial__email', 'estado', 'fecha_inicio'
+                )),
+                list(Entregable.objects.order_by('pk').values_list('titulo', 'estado', 'calificacion')),
+            )
+
+        generar_campus(escala=ESCALA, semilla=7)
+        primera = huella()
+        limpiar_campus()
+        generar_campus(escala=ESCALA, semilla=7)
+
+        assert huella() == primera
+
+    def test_no_duplica_un_campus_existente(self):
+        """Test que no se genera dos veces sobre el mismo campus"""
+        generar_campus(escala=ESCALA)
+
+        with pytest.raises(ValueError):
+            generar_campus(escala=ESCALA)
+
+    def test_limpiar_elimina_solo_el_campus(self):
+        """Test que limpiar_campus no toca usuarios ajenos"""
+        ajeno = User.objects.create_user(
+            email='ajeno@test.com', password='testpass123', username='ajeno', role=User.ESTUDIANTE
+        )
+        generar_campus(escala=ESCALA)
+
+        limpiar_campus()
+
+        assert not User.objects.filter(email__endswith=f'@{DOMINIO}').exists()
+        assert Entregable.objects.count() == 0
+        assert Notificacion.objects.count() == 0
+        assert Empresa.objects.count() == 0
+        assert User.objects.filter(pk=ajeno.pk).exists()
+
+
+class TestBenchmark:
+    """Tests de las cargas de trabajo por rol."""
+
+    @pytest.fixture
+    def campus(self):
+        generar_campus(escala=ESCALA, semilla=3)
+
+    def test_percentil(self):
+        """Test del percentil por rango más cercano"""
+        valores = list(range(1, 101))
+
+        assert percentil(valores, 50) == 50
+        assert percentil(valores, 99) == 99
+        assert percentil([5.0], 95) == 5.0
+
+    @pytest.mark.parametrize('nombre', list(ESCENARIOS))
+    def test_escenarios_sin_errores(self, campus, nombre):
+        """Test que cada escenario se ejecuta y mide consultas"""
+        escenario = ESCENARIOS[nombre]
+        usuarios = elegir_usuarios(escenario.role, 2, semilla=1)
+
+        resultado = ejecutar_escenario(escenario, usuarios, iteraciones=2, calentamiento=0)
+
+        assert resultado['peticiones'] > 0
+        for datos in resultado['pasos'].values():
+            assert datos['errores'] == 0
+            if datos['n']:
+                assert datos['consultas'] > 0
+
+    def test_tutor_califica_y_se_revierte(self, campus):
+        """Test que las calificaciones del benchmark local no persisten"""
+        escenario = ESCENARIOS['tutor']
+        usuarios = elegir_usuarios(escenario.role, 1, semilla=1)
+        enviados = Entregable.objects.filter(estado=Entregable.ENVIADO).count()
+
+        resultado = ejecutar_escenario(escenario, usuarios, iteraciones=1, calentamiento=0)
+
+        assert resultado['pasos']['evaluar']['n'] == 1
+        assert Entregable.objects.filter(estado=Entregable.ENVIADO).count() == enviados
+
+    def test_comando_guarda_y_compara(self, campus, tmp_path):
+        """Test que el comando guarda JSON y compara contra una corrida previa"""
+        base = tmp_path / 'base.json'
+        call_command('benchmark', escenario='estudiante', usuarios=1, iteraciones=1, salida=str(base))
+        datos = json.loads(base.read_text())
+
+        assert set(datos) == {'estudiante'}
+        assert datos['estudiante']['pasos']['entregables']['n'] == 1
+
+        call_command('benchmark', escenario='estudiante', usuarios=1, iteraciones=1, comparar=str(base))
+
+    def test_host_de_allowed_hosts(self, campus, settings):
+        """Test que fuera de pytest (sin 'testserver') el cliente local usa un host permitido"""
+        settings.ALLOWED_HOSTS = ['.practicas.example.com']
+        escenario = ESCENARIOS['estudiante']
+        usuarios = elegir_usuarios(escenario.role, 1, semilla=1)
+
+        resultado = ejecutar_escenario(escenario, usuarios, iteraciones=1, calentamiento=0)
+
+        assert resultado['peticiones'] > 0
+        assert resultado['errores'] == 0
+
+    def test_comando_falla_si_todo_es_error(self, campus, monkeypatch):
+        """Test que una corrida con solo respuestas de error termina con error"""
+        monkeypatch.setattr(
+            benchmark.ClienteLocal, 'pedir', lambda self, metodo, ruta, datos=None: benchmark.Respuesta(400, 1.0, 0)
+        )
+
+        with pytest.raises(CommandError, match='estudiante'):
+            call_command('benchmark', escenario='estudiante', usuarios=1, iteraciones=1)
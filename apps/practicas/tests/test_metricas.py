@@ -0,0 +1,241 @@
+"""
+Pruebas de la instrumentación por petición (config/metricas.py).
+"""
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncClient
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.notificaciones.models import Notificacion
+from apps.usuarios.models import User
+from config import metricas
+
+pytestmark = pytest.mark.django_db
+
+URL_NOTIFICACIONES = '/api/notificaciones/'
+
+
+def crear_usuario(username, role, **extra):
+    return User.objects.create_user(
+        email=f'{username}@example.com',
+        password='testpass123',
+        username=username,
+        role=role,
+        **extra
+    )
+
+
+def cliente_jwt(usuario):
+    client = APIClient()
+    token = RefreshToken.for_user(usuario).access_token
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.fixture(autouse=True)
+def entorno(settings):
+    settings.CACHES = {'default': {'BACKEND': 'config.metricas.LocMemCacheMedido'}}
+    settings.METRICAS_SERVER_TIMING = True
+    settings.METRICAS_TOKEN = ''
+    cache.clear()
+    metricas.reiniciar()
+    yield
+    metricas.reiniciar()
+    cache.clear()
+
+
+@pytest.fixture
+def escenario():
+    coordinadora = crear_usuario('coordinadora', User.COORDINADORA_EMPRESARIAL, is_staff=True)
+    estudiante = crear_usuario('estudiante', User.ESTUDIANTE)
+    for i in range(3):
+        Notificacion.objects.create(
+            remitente=coordinadora, destinatario=estudiante, asunto=f'Aviso {i}', mensaje='Hola'
+        )
+    return coordinadora, estudiante
+
+
+def vista(nombre, metodo='GET'):
+    return metricas.instantanea()['vistas'][f'{nombre}|{metodo}']
+
+
+class RedisFalso:
+    """Lo mínimo de redis-py que usan los contadores compartidos."""
+
+    def __init__(self):
+        self.hashes, self.maximos, self.incrementos = {}, {}, []
+
+    def pipeline(self, transaction=True):
+        self.resultados = []
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def hincrby(self, clave, campo, valor):
+        self.incrementos.append(campo)
+        actual = self.hashes.setdefault(clave, {})
+        actual[campo] = str(int(actual.get(campo, 0)) + valor)
+
+    def hincrbyfloat(self, clave, campo, valor):
+        self.incrementos.append(campo)
+        actual = self.hashes.setdefault(clave, {})
+        actual[campo] = str(float(actual.get(campo, 0)) + valor)
+
+    def zadd(self, clave, valores, gt=False):
+        for miembro, valor in valores.items():
+            self.maximos[miembro] = max(self.maximos.get(miembro, valor), valor)
+
+    def hgetall(self, clave):
+        self.resultados.append({
+            campo.encode(): valor.encode() for campo, valor in self.hashes.get(clave, {}).items()
+        })
+
+    def zscore(self, clave, miembro):
+        self.resultados.append(self.maximos.get(miembro))
+
+    def execute(self):
+        return self.resultados
+
+
+class TestMedicion:
+    """Pruebas de lo que se mide en cada petición"""
+
+    def test_server_timing(self, escenario):
+        coordinadora, _ = escenario
+        response = cliente_jwt(coordinadora).get(URL_NOTIFICACIONES)
+        assert response.status_code == status.HTTP_200_OK
+        partes = response['Server-Timing']
+        assert partes.startswith('total;dur=')
+        assert 'db;dur=' in partes and 'serializer;dur=' in partes
+
+    def test_acumula_por_vista(self, escenario):
+        coordinadora, _ = escenario
+        client = cliente_jwt(coordinadora)
+        client.get(URL_NOTIFICACIONES)
+        client.get(URL_NOTIFICACIONES)
+
+        entrada = vista('notificacion-list')
+        assert entrada['peticiones'] == {200: 2}
+        assert entrada['consultas'] >= 2
+        assert entrada['serializer_s'] > 0
+        assert entrada['buckets'][-1] == 2
+
+    def test_cache(self, escenario, settings):
+        settings.VISIBILIDAD_CACHE_TIMEOUT = 60
+        docente = crear_usuario('docente', User.DOCENTE_ASESOR)
+        client = cliente_jwt(docente)
+        client.get(URL_NOTIFICACIONES)
+        client.get(URL_NOTIFICACIONES)
+        entrada = vista('notificacion-list')
+        assert (entrada['aciertos_cache'], entrada['fallos_cache']) == (1, 1)
+
+    def test_sin_ruta(self):
+        APIClient().get('/no-existe/')
+        assert vista('sin_ruta')['peticiones'] == {404: 1}
+
+    def test_peticion_lenta(self, escenario, settings, caplog):
+        settings.METRICAS_PETICION_LENTA_MS = 0
+        coordinadora, _ = escenario
+        logger = logging.getLogger('apps')
+        logger.addHandler(caplog.handler)
+        try:
+            cliente_jwt(coordinadora).get(URL_NOTIFICACIONES)
+        finally:
+            logger.removeHandler(caplog.handler)
+        mensajes = [r.getMessage() for r in caplog.records if 'Petición lenta' in r.getMessage()]
+        assert mensajes
+        assert 'notificacion-list' in mensajes[0]
+        assert 'SELECT' in mensajes[0]
+
+    def test_camino_async(self, escenario):
+        _, estudiante = escenario
+        token = RefreshToken.for_user(estudiante).access_token
+        response = async_to_sync(AsyncClient().get)(
+            '/api/notificaciones/no-leidas/', headers={'Authorization': f'Bearer {token}'}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Server-Timing'].startswith('total;dur=')
+        assert vista('notificacion-no-leidas')['peticiones'] == {200: 1}
+
+
+class TestCacheMedida:
+    """Pruebas del conteo de aciertos y fallos de caché"""
+
+    def test_get_y_get_many(self):
+        medicion = metricas.Medicion()
+        token = metricas._medicion_actual.set(medicion)
+        try:
+            cache.set('a', 1)
+            assert cache.get('a') == 1
+            assert cache.get('b', 'defecto') == 'defecto'
+            assert cache.get_many(['a', 'b', 'c']) == {'a': 1}
+        finally:
+            metricas._medicion_actual.reset(token)
+        assert (medicion.aciertos_cache, medicion.fallos_cache) == (2, 3)
+
+
+class TestEndpointMetricas:
+    """Pruebas del endpoint Prometheus"""
+
+    def test_formato(self, escenario):
+        coordinadora, _ = escenario
+        cliente_jwt(coordinadora).get(URL_NOTIFICACIONES)
+
+        client = APIClient()
+        client.force_login(coordinadora)
+        response = client.get('/metrics')
+        assert response.status_code == status.HTTP_200_OK
+        texto = response.content.decode()
+        assert '# TYPE practicas_http_request_duration_seconds histogram' in texto
+        assert 'practicas_http_requests_total{vista="notificacion-list",metodo="GET",estado="200"} 1' in texto
+        assert 'practicas_http_request_duration_seconds_count{vista="notificacion-list",metodo="GET"} 1' in texto
+        assert 'practicas_db_connections_total' in texto
+
+    def test_contadores_sobreviven_al_reciclar(self, escenario):
+        """Lo publicado queda en los contadores compartidos aunque el worker se recicle."""
+        coordinadora, _ = escenario
+        cliente_jwt(coordinadora).get(URL_NOTIFICACIONES)
+        metricas.publicar()
+        metricas.reiniciar()  # un worker nuevo empieza de cero
+        cliente_jwt(coordinadora).get(URL_NOTIFICACIONES)
+
+        client = APIClient()
+        client.force_login(coordinadora)
+        texto = client.get('/metrics').content.decode()
+        assert 'practicas_http_requests_total{vista="notificacion-list",metodo="GET",estado="200"} 2' in texto
+
+    def test_publica_solo_lo_nuevo_en_redis(self, escenario, monkeypatch):
+        redis = RedisFalso()
+        monkeypatch.setattr(metricas, '_cliente_redis', lambda: (cache, redis))
+        coordinadora, _ = escenario
+        client = cliente_jwt(coordinadora)
+        client.get(URL_NOTIFICACIONES)
+        metricas.publicar()
+        client.get(URL_NOTIFICACIONES)
+        metricas.publicar()
+        metricas.publicar()
+
+        campo = 'notificacion-list|GET|peticiones|200'
+        assert redis.incrementos.count(campo) == 2
+        compartidos = metricas.contadores_compartidos()
+        assert compartidos['vistas']['notificacion-list|GET']['peticiones'] == {200: 2}
+        assert compartidos['vistas']['notificacion-list|GET']['duracion_s'] > 0
+
+    def test_permisos(self, escenario, settings):
+        _, estudiante = escenario
+        client = APIClient()
+        assert client.get('/metrics').status_code == status.HTTP_403_FORBIDDEN
+        client.force_login(estudiante)
+        assert client.get('/metrics').status_code == status.HTTP_403_FORBIDDEN
+
+        settings.METRICAS_TOKEN = 'secreto'
+        assert APIClient().get('/metrics', HTTP_AUTHORIZATION='Bearer secreto').status_code == 200
@@ -0,0 +1,132 @@
+"""
+Pruebas del logging en segundo plano y del muestreo de trazas.
+"""
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from config import trazas
+from config.logs import ColaHandler, FormatoJSON
+from config.trazas import MuestreadorAdaptativo, before_send_transaction, traces_sampler
+
+
+class ListaHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.registros = []
+
+    def emit(self, record):
+        self.registros.append(self.format(record))
+
+
+@pytest.fixture
+def cola():
+    destino = ListaHandler()
+    destino.setFormatter(FormatoJSON())
+    destino.set_name('prueba_destino')
+    handler = ColaHandler(['prueba_destino'], capacidad=2)
+    logger = logging.getLogger('prueba.cola')
+    logger.addHandler(handler)
+    logger.propagate = False
+    yield logger, handler, destino
+    logger.removeHandler(handler)
+    handler.close()
+
+
+class TestColaHandler:
+    """Pruebas del handler con cola"""
+
+    def test_escribe_desde_otro_hilo_en_json(self, cola):
+        logger, handler, destino = cola
+        logger.warning('hola %s', 'mundo', extra={'usuario_id': 7})
+        handler.detener()
+        datos = json.loads(destino.registros[0])
+        assert datos['mensaje'] == 'hola mundo'
+        assert datos['nivel'] == 'WARNING'
+        assert datos['usuario_id'] == 7
+
+    def test_excepcion_separada_del_mensaje(self, cola):
+        logger, handler, destino = cola
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logger.exception('fallo')
+        handler.detener()
+        datos = json.loads(destino.registros[0])
+        assert datos['mensaje'] == 'fallo'
+        assert 'ZeroDivisionError' in datos['excepcion']
+
+    def test_descarta_si_la_cola_esta_llena(self, cola):
+        logger, handler, destino = cola
+        handler._pid = os.getpid()  # sin listener la cola no se vacía
+        for i in range(5):
+            logger.warning('mensaje %s', i)
+        assert handler.descartados == 3
+
+    def test_destino_inexistente(self):
+        with pytest.raises(ValueError):
+            ColaHandler(['no_existe'])
+
+
+class TestMuestreo:
+    """Pruebas del muestreo adaptativo de Sentry"""
+
+    def test_probabilidad_por_endpoint(self):
+        muestreador = MuestreadorAdaptativo(por_minuto=10)
+        for _ in range(100):
+            muestreador.probabilidad('/api/entregables/', ahora=0)
+        assert muestreador.probabilidad('/api/entregables/', ahora=1) == pytest.approx(10 / 101)
+        # Un endpoint de poco tráfico no se ve afectado
+        assert muestreador.probabilidad('/api/reuniones/', ahora=1) == 1.0
+
+    def test_nueva_ventana_usa_la_tasa_anterior(self):
+        muestreador = MuestreadorAdaptativo(por_minuto=10)
+        for _ in range(100):
+            muestreador.probabilidad('/api/x/', ahora=0)
+        assert muestreador.probabilidad('/api/x/', ahora=61) == pytest.approx(0.1)
+
+    def evento(self, ms, status='ok', transaccion='/api/entregables/'):
+        inicio = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        return {
+            'transaction': transaccion,
+            'start_timestamp': inicio,
+            'timestamp': inicio + timedelta(milliseconds=ms),
+            'contexts': {'trace': {'status': status}},
+        }
+
+    def test_conserva_errores_y_lentas(self, monkeypatch, settings):
+        settings.SENTRY_TRACES_LENTA_MS = 500
+        monkeypatch.setattr(trazas, '_muestreador', MuestreadorAdaptativo(0))
+        assert before_send_transaction(self.evento(10, status='internal_error'), {}) is not None
+        assert before_send_transaction(self.evento(800), {}) is not None
+        assert before_send_transaction(self.evento(10), {}) is None
+
+    def test_muestrea_trafico_sano(self, monkeypatch):
+        monkeypatch.setattr(trazas, '_muestreador', MuestreadorAdaptativo(1, aleatorio=lambda: 0.5))
+        eventos = [before_send_transaction(self.evento(10), {}) for _ in range(4)]
+        assert eventos[0] is not None
+        assert eventos[-1] is None
+
+    def test_traces_sampler_excluye_rutas(self, settings):
+        settings.SENTRY_TRACES_MUESTREO = 0.25
+        assert traces_sampler({'asgi_scope': {'path': '/static/css/app.css'}}) == 0.0
+        assert traces_sampler({'wsgi_environ': {'PATH_INFO': '/metrics'}}) == 0.0
+        assert traces_sampler({'asgi_scope': {'path': '/api/entregables/'}}) == 0.25
+
+
+@pytest.mark.django_db
+class TestLoginSinDatosPersonales:
+    """El login web no registra el identificador ni la contraseña"""
+
+    def test_login_fallido(self, client):
+        logger = logging.getLogger('apps')
+        destino = ListaHandler()
+        logger.addHandler(destino)
+        try:
+            client.post('/login/', {'username': 'alguien@example.com', 'password': 'secreta123'})
+        finally:
+            logger.removeHandler(destino)
+        assert not any('alguien' in r or 'secreta' in r for r in destino.registros)
@@ -0,0 +1,201 @@
+"""
+Pruebas del enrutamiento de lecturas a la réplica.
+"""
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpResponse
+from django.test import Client, RequestFactory
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.encuestas.analitica import obtener_tablas_cruzadas
+from apps.encuestas.models import Encuesta, Pregunta
+from apps.encuestas.resultados import materializar_resultados
+from apps.entregables.models import PaqueteEntregables
+from apps.entregables.paquetes import generar_paquete
+from apps.notificaciones.models import Notificacion
+from apps.usuarios.models import User
+from config.db import replicas
+from config.db.replicas import (
+    REPLICA, EscriturasRecientesMiddleware, ReplicaRouter, lecturas_en_replica, vista_en_replica,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def crear_usuario(username, role):
+    return User.objects.create_user(
+        email=f'{username}@example.com',
+        password='testpass123',
+        username=username,
+        role=role,
+    )
+
+
+def cliente_jwt(usuario):
+    client = APIClient()
+    token = RefreshToken.for_user(usuario).access_token
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def destinos(monkeypatch):
+    """
+    Simula una réplica configurada y registra a qué alias se enviaría cada
+    lectura; las consultas se siguen ejecutando en 'default'.
+    """
+    monkeypatch.setattr(replicas, 'replica_configurada', lambda: True)
+    registrados = []
+    original = ReplicaRouter.db_for_read
+
+    def espia(self, model, **hints):
+        registrados.append(original(self, model, **hints))
+        return DEFAULT_DB_ALIAS
+
+    monkeypatch.setattr(ReplicaRouter, 'db_for_read', espia)
+    return registrados
+
+
+class TestReplicaRouter:
+    """Pruebas del router"""
+
+    def test_sin_replica_configurada(self):
+        router = ReplicaRouter()
+        with lecturas_en_replica():
+            assert router.db_for_read(User) == DEFAULT_DB_ALIAS
+
+    def test_lecturas_y_escrituras(self, monkeypatch):
+        monkeypatch.setattr(replicas, 'replica_configurada', lambda: True)
+        router = ReplicaRouter()
+        assert router.db_for_read(User) == DEFAULT_DB_ALIAS
+        with lecturas_en_replica():
+            assert router.db_for_read(User) == REPLICA
+            assert router.db_for_write(User) == DEFAULT_DB_ALIAS
+            # Después de escribir se lee lo escrito
+            assert router.db_for_read(User) == DEFAULT_DB_ALIAS
+        assert router.db_for_read(User) == DEFAULT_DB_ALIAS
+
+    def test_no_migra_la_replica(self):
+        router = ReplicaRouter()
+        assert router.allow_migrate(REPLICA, 'usuarios') is False
+        assert router.allow_migrate(DEFAULT_DB_ALIAS, 'usuarios') is True
+
+
+class TestLecturaEnReplica:
+    """Pruebas de las vistas con lecturas en réplica"""
+
+    def test_listado_lee_de_replica(self, destinos):
+        coordinadora = crear_usuario('coordinadora', User.COORDINADORA_EMPRESARIAL)
+        response = cliente_jwt(coordinadora).get('/api/entregables/')
+        assert response.status_code == status.HTTP_200_OK
+        assert REPLICA in destinos
+
+    def test_lee_sus_escrituras(self, destinos):
+        coordinadora = crear_usuario('coordinadora', User.COORDINADORA_EMPRESARIAL)
+        estudiante = crear_usuario('estudiante', User.ESTUDIANTE)
+        client = cliente_jwt(coordinadora)
+
+        response = client.post('/api/notificaciones/', {
+            'remitente': coordinadora.pk, 'destinatario': estudiante.pk,
+            'asunto': 'Aviso', 'mensaje': 'Hola',
+        })
+        assert response.status_code == status.HTTP_201_CREATED
+        assert replicas.escribio_recientemente(coordinadora.pk)
+
+        destinos.clear()
+        response = client.get('/api/notificaciones/')
+        assert response.status_code == status.HTTP_200_OK
+        assert destinos and REPLICA not in destinos
+
+    def test_otros_usuarios_siguen_en_replica(self, destinos):
+        coordinadora = crear_usuario('coordinadora', User.COORDINADORA_EMPRESARIAL)
+        estudiante = crear_usuario('estudiante', User.ESTUDIANTE)
+        Notificacion.objects.create(
+            remitente=coordinadora, destinatario=estudiante, asunto='Aviso', mensaje='Hola'
+        )
+        replicas.registrar_escritura(coordinadora.pk)
+
+        cliente_jwt(estudiante).get('/api/notificaciones/')
+        assert REPLICA in destinos
+
+    def test_vista_de_funcion(self, destinos):
+        coordinadora = crear_usuario('coordinadora', User.COORDINADORA_EMPRESARIAL)
+
+        @vista_en_replica
+        def vista(request):
+            return HttpResponse(User.objects.count())
+
+        request = RequestFactory().get('/')
+        request.user = coordinadora
+        assert vista(request).content == b'1'
+        assert destinos == [REPLICA]
+
+        destinos.clear()
+        request = RequestFactory().post('/')
+        request.user = coordinadora
+        vista(request)
+        assert destinos == [DEFAULT_DB_ALIAS]
+
+    def test_middleware_async(self, destinos):
+        """Bajo ASGI el middleware corre en el event loop y registra igual la escritura."""
+        coordinadora = crear_usuario('coordinadora', User.COORDINADORA_EMPRESARIAL)
+
+        async def vista(request):
+            return HttpResponse(status=201)
+
+        middleware = EscriturasRecientesMiddleware(vista)
+        assert iscoroutinefunction(middleware)
+
+        request = RequestFactory().post('/')
+        request.user = coordinadora
+        async_to_sync(middleware)(request)
+        assert replicas.escribio_recientemente(coordinadora.pk)
+
+
+class TestTrabajosDeReporte:
+    """Qué trabajos leen de la réplica y cuáles se quedan en 'default'"""
+
+    @pytest.fixture
+    def encuesta(self):
+        coordinadora = crear_usuario('coordinadora', User.COORDINADORA_EMPRESARIAL)
+        encuesta = Encuesta.objects.create(
+            titulo='Satisfacción', creada_por=coordinadora, estado=Encuesta.ACTIVA,
+        )
+        Pregunta.objects.create(encuesta=encuesta, texto='Escala', tipo=Pregunta.ESCALA, orden=0)
+        return encuesta
+
+    def test_materializar_no_usa_replica(self, destinos, encuesta):
+        with lecturas_en_replica():
+            materializar_resultados(encuesta)
+        assert destinos
+        assert REPLICA not in destinos
+
+    def test_tablas_cruzadas_no_usan_replica(self, destinos, encuesta):
+        with lecturas_en_replica():
+            obtener_tablas_cruzadas(encuesta, 'rol')
+        assert REPLICA not in destinos
+
+    def test_resultados_lee_de_default(self, destinos, encuesta):
+        client = Client()
+        client.force_login(encuesta.creada_por)
+        response = client.get(f'/encuestas/resultados/{encuesta.pk}/')
+        assert response.status_code == status.HTTP_200_OK
+        assert REPLICA not in destinos
+
+    def test_paquete_lee_de_replica(self, destinos):
+        tutor = crear_usuario('tutor', User.TUTOR_EMPRESARIAL)
+        paquete = PaqueteEntregables.objects.create(solicitado_por=tutor, entregable_ids=[])
+        generar_paquete(paquete)
+        assert paquete.estado == PaqueteEntregables.COMPLETADO
+        assert REPLICA in destinos
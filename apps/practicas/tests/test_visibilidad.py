@@ -0,0 +1,144 @@
+"""
+Pruebas para el servicio de visibilidad por rol.
+"""
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.entregables.models import Entregable
+from apps.notificaciones.models import Notificacion
+from apps.practicas.models import Practica
+from apps.practicas.visibilidad import Visibilidad, obtener_visibilidad
+from apps.reuniones.models import Reunion
+from apps.usuarios.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def crear_usuario(username, role):
+    return User.objects.create_user(
+        email=f'{username}@example.com',
+        password='testpass123',
+        username=username,
+        role=role,
+    )
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def escenario():
+    coordinadora = crear_usuario('coordinadora', User.COORDINADORA_EMPRESARIAL)
+    docente = crear_usuario('docente', User.DOCENTE_ASESOR)
+    tutor = crear_usuario('tutor', User.TUTOR_EMPRESARIAL)
+    ana = crear_usuario('ana', User.ESTUDIANTE)
+    luis = crear_usuario('luis', User.ESTUDIANTE)
+
+    practica_ana = Practica.objects.create(estudiante=ana, docente_asesor=docente, tutor_empresarial=tutor)
+    practica_luis = Practica.objects.create(estudiante=luis)
+
+    limite = timezone.now() + timedelta(days=7)
+    for practica in [practica_ana, practica_luis]:
+        Entregable.objects.create(
+            practica=practica, estudiante=practica.estudiante, titulo='Informe', fecha_limite=limite
+        )
+        Notificacion.objects.create(
+            remitente=coordinadora, destinatario=practica.estudiante, asunto='Aviso', mensaje='Hola'
+        )
+
+    return {
+        'coordinadora': coordinadora, 'docente': docente, 'tutor': tutor,
+        'ana': ana, 'luis': luis, 'practica_ana': practica_ana,
+    }
+
+
+class TestVisibilidad:
+    """Pruebas de las reglas de acceso por rol."""
+
+    def test_coordinadora_ve_todo(self, escenario, django_assert_num_queries):
+        visibilidad = Visibilidad(escenario['coordinadora'])
+        with django_assert_num_queries(1):
+            assert visibilidad.filtrar(Entregable.objects.all()).count() == 2
+
+    @pytest.mark.parametrize('rol', ['docente', 'tutor'])
+    def test_docente_y_tutor_ven_sus_practicas(self, escenario, rol):
+        visibilidad = Visibilidad(escenario[rol])
+        assert visibilidad.practica_ids == {escenario['practica_ana'].id}
+        assert visibilidad.estudiante_ids == {escenario['ana'].id}
+
+        entregables = visibilidad.filtrar(Entregable.objects.all())
+        assert list(entregables.values_list('estudiante', flat=True)) == [escenario['ana'].id]
+
+        notificaciones = visibilidad.filtrar(
+            Notificacion.objects.all(), practica=None, estudiante='destinatario'
+        )
+        assert list(notificaciones.values_list('destinatario', flat=True)) == [escenario['ana'].id]
+
+    def test_estudiante_sin_consultar_practicas(self, escenario, django_assert_num_queries):
+        visibilidad = Visibilidad(escenario['luis'])
+        with django_assert_num_queries(1):
+            assert visibilidad.filtrar(Entregable.objects.all()).count() == 1
+
+    def test_ids_se_calculan_una_vez(self, escenario, django_assert_num_queries):
+        visibilidad = Visibilidad(escenario['docente'])
+        visibilidad.practica_ids
+        with django_assert_num_queries(0):
+            visibilidad.estudiante_ids
+            visibilidad.filtrar(Entregable.objects.all())
+
+    def test_memorizada_en_la_request(self, escenario):
+        request = RequestFactory().get('/')
+        request.user = escenario['docente']
+        assert obtener_visibilidad(request) is obtener_visibilidad(request)
+
+
+class TestReunionesDocente:
+    """Un docente ve las reuniones de sus prácticas y las que programó."""
+
+    def test_reunion_programada_tras_reasignar_la_practica(self, escenario):
+        practica = escenario['practica_ana']
+        reunion = Reunion.objects.create(
+            practica=practica, docente_asesor=escenario['docente'], estudiante=escenario['ana'],
+            titulo='Seguimiento', fecha_hora=timezone.now() + timedelta(days=1),
+        )
+        nuevo = crear_usuario('nuevo_docente', User.DOCENTE_ASESOR)
+        Practica.objects.filter(pk=practica.pk).update(docente_asesor=nuevo)
+
+        for docente in [escenario['docente'], nuevo]:
+            client = APIClient()
+            client.force_authenticate(user=docente)
+            response = client.get('/api/reuniones/')
+            assert [fila['id'] for fila in response.data['results']] == [reunion.pk]
+
+
+class TestCacheVisibilidad:
+    """Pruebas de la caché opcional por usuario."""
+
+    def test_cache_por_usuario(self, escenario, settings, django_assert_num_queries):
+        settings.VISIBILIDAD_CACHE_TIMEOUT = 60
+        Visibilidad(escenario['tutor']).practica_ids
+        with django_assert_num_queries(0):
+            assert Visibilidad(escenario['tutor']).practica_ids == {escenario['practica_ana'].id}
+
+    def test_reasignacion_invalida_cache(self, escenario, settings):
+        """Al cambiar el tutor se invalida la caché del anterior y del nuevo."""
+        settings.VISIBILIDAD_CACHE_TIMEOUT = 60
+        nuevo = crear_usuario('nuevo_tutor', User.TUTOR_EMPRESARIAL)
+        Visibilidad(escenario['tutor']).practica_ids
+        Visibilidad(nuevo).practica_ids
+
+        practica = Practica.objects.get(pk=escenario['practica_ana'].pk)
+        practica.tutor_empresarial = nuevo
+        practica.save()
+
+        assert Visibilidad(escenario['tutor']).practica_ids == set()
+        assert Visibilidad(nuevo).practica_ids == {practica.id}
@@ -3,21 +3,31 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import SearchFilter
+from .agregados import anotar_vencidos
+from .filters import PracticaFilter, PracticaOrdering
 from .models import Practica
 from .serializers import PracticaSerializer
 from apps.usuarios.permissions import IsCoordinador, IsCoordinadorOrProfesor
+from config.db.replicas import LecturaEnReplicaMixin
 
-class PracticaViewSet(viewsets.ModelViewSet):
+class PracticaViewSet(LecturaEnReplicaMixin, viewsets.ModelViewSet):
     queryset = Practica.objects.all()
     serializer_class = PracticaSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['estado', 'estudiante', 'profesor', 'empresa']
-    search_fields = ['estudiante__email', 'profesor__email', 'empresa__nombre']
-    ordering_fields = ['created_at', 'fecha_inicio']
+    filter_backends = [DjangoFilterBackend, SearchFilter, PracticaOrdering]
+    filterset_class = PracticaFilter
+    search_fields = ['estudiante__email', 'docente_asesor__email', 'empresa__nombre']
+    ordering_fields = [
+        'created_at', 'fecha_inicio', 'progreso', 'promedio_calificacion',
+        'entregables_vencidos', 'ultima_actividad',
+    ]
     ordering = ['-created_at']
     
+    def get_queryset(self):
+        # La columna guardada se atrasa con la hora; los vencidos se cuentan al momento
+        return anotar_vencidos(super().get_queryset())
+    
     def get_permissions(self):
         if self.action in ['create', 'update', 'destroy', 'asignar']:
             return [IsAuthenticated(), IsCoordinador()]
@@ -0,0 +1,123 @@
+"""
+Visibilidad por rol: qué prácticas y estudiantes puede ver cada usuario.
+
+Concentra las reglas que antes repetían los viewsets de entregables,
+reuniones y notificaciones:
+- Coordinadora: todo.
+- Docente asesor / tutor empresarial: las prácticas que asesora / tutora y
+  los estudiantes de esas prácticas.
+- Estudiante: lo suyo.
+
+Los ids se calculan una sola vez por petición (obtener_visibilidad guarda el
+resultado en la request) y, si VISIBILIDAD_CACHE_TIMEOUT > 0, también en la
+caché por usuario; las señales de Practica invalidan esa caché.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+
+from .models import Practica
+
+
+VISIBILIDAD_CACHE_KEY = 'practicas:visibilidad:{usuario_id}'
+
+
+def invalidar_visibilidad(*usuario_ids):
+    """Eliminar la visibilidad en caché de los usuarios indicados."""
+    cache.delete_many([
+        VISIBILIDAD_CACHE_KEY.format(usuario_id=usuario_id)
+        for usuario_id in usuario_ids
+        if usuario_id
+    ])
+
+
+class Visibilidad:
+    """Prácticas y estudiantes accesibles para un usuario."""
+
+    def __init__(self, usuario):
+        self.usuario = usuario
+
+    @property
+    def ve_todo(self):
+        return self.usuario.is_coordinadora
+
+    def _campo_practica(self):
+        if self.usuario.is_docente_asesor:
+            return 'docente_asesor'
+        if self.usuario.is_tutor_empresarial:
+            return 'tutor_empresarial'
+        if self.usuario.is_estudiante:
+            return 'estudiante'
+        return None
+
+    @cached_property
+    def _ids(self):
+        """(practica_ids, estudiante_ids) en una sola consulta."""
+        campo = self._campo_practica()
+        if campo is None:
+            return frozenset(), frozenset()
+
+        timeout = getattr(settings, 'VISIBILIDAD_CACHE_TIMEOUT', 0)
+        clave = VISIBILIDAD_CACHE_KEY.format(usuario_id=self.usuario.pk)
+        if timeout:
+            ids = cache.get(clave)
+            if ids is not None:
+                return ids
+
+        filas = Practica.objects.filter(**{campo: self.usuario}).values_list('id', 'estudiante_id')
+        practicas, estudiantes = set(), set()
+        for practica_id, estudiante_id in filas:
+            practicas.add(practica_id)
+            estudiantes.add(estudiante_id)
+        ids = frozenset(practicas), frozenset(estudiantes)
+
+        if timeout:
+            cache.set(clave, ids, timeout)
+        return ids
+
+    @property
+    def practica_ids(self):
+        return self._ids[0]
+
+    @property
+    def estudiante_ids(self):
+        return self._ids[1]
+
+    def ve_practica(self, practica_id):
+        return self.ve_todo or practica_id in self.practica_ids
+
+    def filtrar(self, queryset, practica='practica', estudiante='estudiante'):
+        """
+        Filtrar un queryset a lo que el usuario puede ver.
+
+        `practica` y `estudiante` son los nombres de los campos del modelo que
+        apuntan a la práctica y al estudiante (None si el modelo no lo tiene).
+        Los estudiantes se filtran por su propio id, sin consultar prácticas.
+        """
+        if self.ve_todo:
+            return queryset
+
+        if self.usuario.is_estudiante and estudiante:
+            return queryset.filter(**{f'{estudiante}_id': self.usuario.pk})
+
+        if self._campo_practica() is None:
+            return queryset.none()
+
+        if practica:
+            return queryset.filter(**{f'{practica}_id__in': self.practica_ids})
+        if estudiante:
+            return queryset.filter(**{f'{estudiante}_id__in': self.estudiante_ids})
+        return queryset.none()
+
+
+def obtener_visibilidad(request):
+    """
+    Visibilidad del usuario de la petición, memorizada en la request.
+    Acepta tanto la Request de DRF como la HttpRequest de Django.
+    """
+    http_request = getattr(request, '_request', request)
+    visibilidad = getattr(http_request, '_visibilidad', None)
+    if visibilidad is None or visibilidad.usuario.pk != request.user.pk:
+        visibilidad = Visibilidad(request.user)
+        http_request._visibilidad = visibilidad
+    return visibilidad
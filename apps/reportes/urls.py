@@ -1,4 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from .views import EntregablesRetrasadosAPIView
+
 router = DefaultRouter()
-urlpatterns = [path('', include(router.urls))]
+urlpatterns = [
+    path('entregables-retrasados/', EntregablesRetrasadosAPIView.as_view(), name='entregables_retrasados'),
+    path('', include(router.urls)),
+]
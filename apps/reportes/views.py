@@ -0,0 +1,70 @@
+"""
+Reportes para la coordinadora.
+"""
+from django.db.models import Count, Min
+from django.utils import timezone
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.views import APIView
+
+from apps.entregables.models import Entregable
+from config.db.replicas import LecturaEnReplicaMixin
+from config.permissions import IsCoordinadora
+
+
+class EntregablesRetrasadosAPIView(LecturaEnReplicaMixin, APIView):
+    """
+    Todos los entregables retrasados del campus (abiertos con la fecha límite
+    vencida), del más antiguo al más reciente, con el resumen por empresa.
+
+    Parámetros: ?empresa=<id> y la paginación estándar (?page=).
+    Lee solo las filas del índice parcial de entregables abiertos.
+    """
+    permission_classes = [IsCoordinadora]
+    
+    CAMPOS = [
+        'id', 'titulo', 'estado', 'fecha_limite', 'practica_id',
+        'estudiante_id', 'estudiante__first_name', 'estudiante__last_name', 'estudiante__email',
+        'practica__empresa_id', 'practica__empresa__nombre',
+    ]
+    
+    def get(self, request):
+        ahora = timezone.now()
+        retrasados = Entregable.objects.overdue(ahora)
+        empresa = request.query_params.get('empresa')
+        if empresa and empresa.isdigit():
+            retrasados = retrasados.filter(practica__empresa_id=empresa)
+        
+        paginator = PageNumberPagination()
+        pagina = paginator.paginate_queryset(
+            retrasados.order_by('fecha_limite', 'pk').values(*self.CAMPOS), request, view=self
+        )
+        resultados = [
+            {
+                'id': fila['id'],
+                'titulo': fila['titulo'],
+                'estado': fila['estado'],
+                'fecha_limite': fila['fecha_limite'],
+                'dias_retraso': (ahora - fila['fecha_limite']).days,
+                'practica': fila['practica_id'],
+                'estudiante': {
+                    'id': fila['estudiante_id'],
+                    'nombre': f"{fila['estudiante__first_name']} {fila['estudiante__last_name']}".strip(),
+                    'email': fila['estudiante__email'],
+                },
+                'empresa': {
+                    'id': fila['practica__empresa_id'],
+                    'nombre': fila['practica__empresa__nombre'],
+                },
+            }
+            for fila in pagina
+        ]
+        
+        response = paginator.get_paginated_response(resultados)
+        response.data['generado'] = ahora
+        response.data['por_empresa'] = list(
+            retrasados.order_by()
+            .values('practica__empresa_id', 'practica__empresa__nombre')
+            .annotate(retrasados=Count('id'), mas_antiguo=Min('fecha_limite'))
+            .order_by('-retrasados', 'practica__empresa__nombre')
+        )
+        return response
@@ -3,6 +3,8 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.core.exceptions import ValidationError
+from apps.practicas.visibilidad import obtener_visibilidad
+from config.db.replicas import LecturaEnReplicaMixin
 from .models import Reunion
 from .serializers import (
     ReunionSerializer, MarcarRealizadaSerializer,
@@ -10,7 +12,7 @@ from .serializers import (
 )
 
 
-class ReunionViewSet(viewsets.ModelViewSet):
+class ReunionViewSet(LecturaEnReplicaMixin, viewsets.ModelViewSet):
     """
     ViewSet para Reuniones.
     - Docentes Asesores: pueden crear, ver y gestionar reuniones de sus estudiantes
@@ -22,25 +24,16 @@ class ReunionViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        """Filtrar reuniones según rol."""
-        user = self.request.user
-        
-        if user.is_coordinadora:
-            # Coordinadora ve todas
-            return Reunion.objects.all()
-        elif user.is_docente_asesor:
-            # Docente asesor ve sus reuniones
-            return Reunion.objects.filter(docente_asesor=user)
-        elif user.is_tutor_empresarial:
-            # Tutor empresarial ve reuniones de sus estudiantes
-            return Reunion.objects.filter(
-                practica__tutor_empresarial=user
-            )
-        elif user.is_estudiante:
-            # Estudiante ve solo sus reuniones
-            return Reunion.objects.filter(estudiante=user)
-        
-        return Reunion.objects.none()
+        """
+        Filtrar reuniones según rol.
+        Los docentes ven las reuniones de las prácticas que asesoran y,
+        además, las que programaron aunque la práctica cambie de docente.
+        """
+        reuniones = Reunion.objects.all()
+        visibles = obtener_visibilidad(self.request).filtrar(reuniones)
+        if self.request.user.is_docente_asesor:
+            visibles = visibles | reuniones.filter(docente_asesor=self.request.user)
+        return visibles
     
     def perform_create(self, serializer):
         """Crear reunión (solo docentes asesores)."""
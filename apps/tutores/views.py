@@ -1,7 +1,7 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Avg, Count
+from django.db.models import Sum
 from apps.usuarios.decorators import role_required
 from apps.practicas.models import Practica
 from apps.entregables.models import Entregable
@@ -31,11 +31,11 @@ def dashboard_tutor(request):
     
     entregables_pendientes = entregables_pendientes_lista.count()
     
-    # Calcular promedio general de calificaciones
-    promedio_general = Entregable.objects.filter(
-        practica__tutor_empresarial=tutor,
-        calificacion__isnull=False
-    ).aggregate(Avg('calificacion'))['calificacion__avg'] or 0
+    # Promedio general de calificaciones desde los agregados de cada práctica
+    totales = Practica.objects.filter(tutor_empresarial=tutor).aggregate(
+        suma=Sum('suma_calificaciones'), evaluados=Sum('entregables_evaluados')
+    )
+    promedio_general = totales['suma'] / totales['evaluados'] if totales['evaluados'] else 0
     
     # Actividad reciente (últimas 10 actividades)
     actividades_recientes = []
@@ -81,23 +81,18 @@ def estudiantes_lista(request):
 def progreso_general(request):
     """Vista de progreso general de estudiantes"""
     tutor = request.user
-    practicas = Practica.objects.filter(tutor_empresarial=tutor)
+    practicas = Practica.objects.filter(tutor_empresarial=tutor).select_related('estudiante')
     
-    # Calcular estadísticas por estudiante
-    estadisticas = []
-    for practica in practicas:
-        total_entregables = practica.entregables.count()
-        evaluados = practica.entregables.filter(calificacion__isnull=False).count()
-        promedio = practica.entregables.filter(
-            calificacion__isnull=False
-        ).aggregate(Avg('calificacion'))['calificacion__avg'] or 0
-        
-        estadisticas.append({
+    # Estadísticas por estudiante (agregados guardados en la práctica)
+    estadisticas = [
+        {
             'practica': practica,
-            'total_entregables': total_entregables,
-            'evaluados': evaluados,
-            'promedio': promedio,
-        })
+            'total_entregables': practica.entregables_total,
+            'evaluados': practica.entregables_evaluados,
+            'promedio': practica.promedio_calificacion or 0,
+        }
+        for practica in practicas
+    ]
     
     context = {
         'estadisticas': estadisticas,
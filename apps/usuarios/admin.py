@@ -6,7 +6,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
 
-from .models import User
+from .models import User, ImportacionEstudiantes
 
 
 @admin.register(User)
@@ -58,3 +58,12 @@ class UserAdmin(BaseUserAdmin):
         """Personalizar queryset."""
         qs = super().get_queryset(request)
         return qs.select_related()
+
+
+@admin.register(ImportacionEstudiantes)
+class ImportacionEstudiantesAdmin(admin.ModelAdmin):
+    """Admin para importaciones masivas de estudiantes."""
+    
+    list_display = ['nombre_archivo', 'estado', 'total_filas', 'creados', 'creada_por', 'created_at']
+    list_filter = ['estado', 'created_at']
+    readonly_fields = ['errores', 'mensaje', 'finalizada_at']
@@ -4,10 +4,18 @@ Vista personalizada de JWT que incluye datos del usuario
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
+from .authentication import agregar_claims
+
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """Serializer personalizado que incluye datos del usuario"""
     
+    @classmethod
+    def get_token(cls, user):
+        # Rol y perfil mínimo en el token para JWTClaimsAuthentication;
+        # el token de acceso generado a partir del refresh los hereda.
+        return agregar_claims(super().get_token(user), user)
+    
     def validate(self, attrs):
         data = super().validate(attrs)
         
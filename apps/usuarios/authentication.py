@@ -0,0 +1,119 @@
+"""
+Autenticación JWT sin consulta del usuario por petición.
+
+El token de acceso lleva el rol y un perfil mínimo (ver
+CustomTokenObtainPairSerializer.get_token). JWTClaimsAuthentication arma un
+User con esos campos y deja el resto diferido: se cargan de la base de datos
+solo si la vista los usa. La revocación (is_active) y los cambios de rol o
+de permisos (is_staff, is_superuser) se comprueban contra una caché de vida
+corta.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework.settings import api_settings as drf_settings
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+
+# Campos del usuario que viajan en el token de acceso
+CLAIMS_USUARIO = ['username', 'email', 'first_name', 'last_name', 'role', 'is_staff', 'is_superuser']
+
+# Claims que deben coincidir con la base de datos para usar el token tal cual
+CLAIMS_ACCESO = ['role', 'is_staff', 'is_superuser']
+
+ESTADO_CACHE_KEY = 'usuarios:estado:{usuario_id}'
+
+
+def agregar_claims(token, usuario):
+    """Agregar al token los campos de CLAIMS_USUARIO."""
+    for campo in CLAIMS_USUARIO:
+        token[campo] = getattr(usuario, campo)
+    return token
+
+
+def estado_usuario(usuario_id):
+    """
+    (is_active, role, is_staff, is_superuser) del usuario o None si no existe.
+    Se guarda en caché JWT_CLAIMS_STATUS_TTL segundos.
+    """
+    clave = ESTADO_CACHE_KEY.format(usuario_id=usuario_id)
+    estado = cache.get(clave)
+    if estado is None:
+        fila = User.objects.filter(pk=usuario_id).values_list('is_active', *CLAIMS_ACCESO).first()
+        # Los usuarios inexistentes se guardan como () para no repetir la consulta
+        estado = tuple(fila) if fila else ()
+        cache.set(clave, estado, getattr(settings, 'JWT_CLAIMS_STATUS_TTL', 60))
+    return estado or None
+
+
+def invalidar_estado_usuario(*usuario_ids):
+    """Eliminar el estado en caché de los usuarios."""
+    cache.delete_many([ESTADO_CACHE_KEY.format(usuario_id=usuario_id) for usuario_id in usuario_ids])
+
+
+class JWTClaimsAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que construye el usuario desde los claims del token.
+
+    Los tokens emitidos antes de incluir los claims, o cuyo rol o permisos
+    ya no coinciden con los de la base de datos, se resuelven con la
+    consulta normal.
+    """
+
+    def get_user(self, validated_token):
+        if any(campo not in validated_token for campo in CLAIMS_USUARIO):
+            return super().get_user(validated_token)
+
+        try:
+            usuario_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        estado = estado_usuario(usuario_id)
+        if estado is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        is_active, *acceso = estado
+        if not is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if acceso != [validated_token[campo] for campo in CLAIMS_ACCESO]:
+            return super().get_user(validated_token)
+
+        datos = {campo: validated_token[campo] for campo in CLAIMS_USUARIO}
+        datos.update(id=usuario_id, is_active=True)
+        # from_db espera los valores en el orden de los campos del modelo
+        campos = [f.attname for f in User._meta.concrete_fields if f.attname in datos]
+        return User.from_db(router.db_for_read(User), campos, [datos[c] for c in campos])
+
+
+def _resolver_usuario(request):
+    for clase in drf_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        if issubclass(clase, JWTAuthentication):
+            try:
+                resultado = clase().authenticate(request)
+            except (AuthenticationFailed, InvalidToken):
+                return None
+            if resultado is not None:
+                return resultado[0]
+
+    # Sin token: la sesión del navegador (AuthenticationMiddleware)
+    usuario = getattr(request, 'user', None)
+    if usuario is not None and usuario.is_authenticated:
+        return usuario
+    return None
+
+
+async def autenticar_async(request):
+    """
+    Usuario autenticado de una vista async de Django, o None.
+
+    Las vistas async no pasan por DRF: se usa el mismo autenticador JWT
+    configurado en REST_FRAMEWORK y, si no hay token, la sesión.
+    """
+    return await sync_to_async(_resolver_usuario)(request)
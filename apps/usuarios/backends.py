@@ -1,44 +1,72 @@
 """
 Backend de autenticación personalizado que permite login con email O username
 """
+import hashlib
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
-from django.db.models import Q
+from django.core.cache import cache
 
 
 User = get_user_model()
 
+# Identificadores sin usuario se recuerdan poco tiempo para no consultar la
+# base de datos en cada reintento; se invalidan al crear el usuario o al
+# cambiar su email o username (también en bloque, ver UserQuerySet).
+INEXISTENTE_CACHE_KEY = 'usuarios:login:inexistente:{huella}'
+INEXISTENTE_CACHE_TIMEOUT = 60
+
+
+def _huella(identificador):
+    """Huella del identificador para no guardar correos en las claves de caché."""
+    return hashlib.sha256(identificador.encode()).hexdigest()
+
+
+def invalidar_usuario_inexistente(*identificadores):
+    """Olvidar los identificadores marcados como inexistentes."""
+    cache.delete_many([
+        INEXISTENTE_CACHE_KEY.format(huella=_huella(identificador))
+        for identificador in identificadores
+        if identificador
+    ])
+
 
 class EmailOrUsernameModelBackend(ModelBackend):
     """
-    Backend que permite autenticación con email o username
+    Backend que permite autenticación con email o username.
+
+    Si el identificador contiene '@' se busca por email y, si no existe, por
+    username (que también admite '@'); si no, solo por username. Cada
+    consulta usa un índice único en lugar de un OR entre columnas.
     """
-    
+
     def authenticate(self, request, username=None, password=None, **kwargs):
         """
         Autenticar con email o username
         """
+        if username is None:
+            # El login JWT envía el USERNAME_FIELD (email) como argumento propio
+            username = kwargs.get(User.USERNAME_FIELD)
         if username is None or password is None:
             return None
-        
-        try:
-            # Intentar encontrar usuario por email O username
-            user = User.objects.get(
-                Q(email=username) | Q(username=username)
-            )
-        except User.DoesNotExist:
+
+        clave = INEXISTENTE_CACHE_KEY.format(huella=_huella(username))
+        user = None
+        if not cache.get(clave):
+            if '@' in username:
+                user = User.objects.filter(email=username).first()
+            if user is None:
+                user = User.objects.filter(username=username).first()
+
+        if user is None:
+            cache.set(clave, True, INEXISTENTE_CACHE_TIMEOUT)
             # Run the default password hasher once to reduce the timing
             # difference between an existing and a nonexistent user
             User().set_password(password)
             return None
-        except User.MultipleObjectsReturned:
-            # Si hay múltiples usuarios, intentar con el email primero
-            user = User.objects.filter(
-                Q(email=username) | Q(username=username)
-            ).first()
-        
+
         # Verificar contraseña
-        if user and user.check_password(password) and self.user_can_authenticate(user):
+        if user.check_password(password) and self.user_can_authenticate(user):
             return user
-        
+
         return None
@@ -1,15 +1,27 @@
 """
 Factories para generar datos de prueba usando Factory Boy.
 """
+from functools import lru_cache
+
 import factory
 from factory.django import DjangoModelFactory
 from factory import fuzzy
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from faker import Faker
 
 fake = Faker('es_ES')
 User = get_user_model()
 
+PASSWORD_PRUEBA = 'testpass123'
+
+
+@lru_cache(maxsize=None)
+def _hash_password_prueba(hashers):
+    """Hash de la contraseña por defecto, calculado una vez por configuración de hashers."""
+    return make_password(PASSWORD_PRUEBA)
+
 
 class UserFactory(DjangoModelFactory):
     """Factory base para crear usuarios."""
@@ -35,7 +47,7 @@ class UserFactory(DjangoModelFactory):
         if extracted:
             obj.set_password(extracted)
         else:
-            obj.set_password('testpass123')
+            obj.password = _hash_password_prueba(tuple(settings.PASSWORD_HASHERS))
 
 
 class EstudianteFactory(UserFactory):
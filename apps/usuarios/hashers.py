@@ -0,0 +1,103 @@
+"""
+Política de hash de contraseñas.
+
+- Hashers con costo configurable desde settings (PASSWORD_SCRYPT_WORK_FACTOR,
+  PASSWORD_PBKDF2_ITERATIONS). Al cambiar el costo, los hashes existentes se
+  actualizan en el siguiente login exitoso.
+- programar_rehash() guarda el nuevo hash en segundo plano para no sumar un
+  segundo cálculo de hash a la latencia del login. Los logins con sesión
+  esperan el resultado (ver User.completar_rehash) porque la sesión guarda
+  un hash derivado de la contraseña.
+- hashear_passwords() calcula muchos hashes en un pool de procesos para la
+  creación de usuarios en bloque.
+"""
+import logging
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.db import connection
+
+
+logger = logging.getLogger('apps')
+
+# Por debajo de este número de contraseñas no compensa arrancar procesos
+MINIMO_POOL = 32
+
+_rehash_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rehash')
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    """Scrypt con factor de trabajo configurable."""
+
+    @property
+    def work_factor(self):
+        return getattr(settings, 'PASSWORD_SCRYPT_WORK_FACTOR', 2**14)
+
+    @property
+    def maxmem(self):
+        # scrypt usa ~128 * n * r bytes; se deja margen para factores altos
+        return 256 * self.work_factor * self.block_size
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 con iteraciones configurables."""
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', 600000)
+
+
+def _guardar_rehash(usuario_id, hash_anterior, raw_password):
+    """Devuelve el hash nuevo si se guardó, None si no."""
+    from .models import User
+
+    try:
+        nuevo = hashers.make_password(raw_password)
+        # Solo se reemplaza si nadie cambió la contraseña mientras tanto
+        if User.objects.filter(pk=usuario_id, password=hash_anterior).update(password=nuevo):
+            return nuevo
+    except Exception:
+        logger.exception('Error al actualizar el hash de la contraseña del usuario %s', usuario_id)
+    finally:
+        if getattr(settings, 'PASSWORD_REHASH_ASYNC', True):
+            connection.close()
+
+
+def programar_rehash(usuario_id, hash_anterior, raw_password):
+    """
+    Actualizar el hash de un usuario al hasher/costo preferido.
+    Con PASSWORD_REHASH_ASYNC se hace en un hilo aparte; la contraseña nunca
+    sale del proceso (no se envía a Celery).
+    Devuelve un Future con el resultado de _guardar_rehash (ya resuelto si
+    no es asíncrono).
+    """
+    if getattr(settings, 'PASSWORD_REHASH_ASYNC', True):
+        return _rehash_executor.submit(_guardar_rehash, usuario_id, hash_anterior, raw_password)
+    resultado = Future()
+    resultado.set_result(_guardar_rehash(usuario_id, hash_anterior, raw_password))
+    return resultado
+
+
+def _inicializar_worker():
+    import django
+    django.setup()
+
+
+def hashear_passwords(passwords, procesos=None):
+    """
+    Hashes de una lista de contraseñas con el hasher preferido, en el mismo orden.
+    Las listas grandes se reparten en un pool de procesos.
+    """
+    passwords = list(passwords)
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1 or len(passwords) < MINIMO_POOL:
+        return [hashers.make_password(password) for password in passwords]
+
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_worker) as pool:
+        return list(pool.map(
+            hashers.make_password,
+            passwords,
+            chunksize=max(1, len(passwords) // (procesos * 4)),
+        ))
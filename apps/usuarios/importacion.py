@@ -0,0 +1,208 @@
+"""
+Importación masiva de estudiantes desde CSV o XLSX.
+
+- La unicidad de email, username y matrícula se valida con una consulta por
+  campo para todo el archivo (y contra las demás filas del mismo archivo).
+- Las matrículas faltantes se generan en bloque sin colisiones y las
+  contraseñas se hashean en paralelo (User.objects.bulk_create_users).
+- Cada fila pasa por los validadores de los campos del modelo (longitud,
+  dígitos del promedio, formato del teléfono) con full_clean().
+- Las filas válidas se insertan con bulk_create por lotes; las inválidas
+  quedan en el reporte de errores con su número de fila.
+"""
+import csv
+import io
+import logging
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.utils import timezone
+
+from .models import User, ImportacionEstudiantes
+
+
+# Columnas opcionales: password, matricula, carrera, semestre, promedio, phone.
+# Sin password el estudiante queda con contraseña inutilizable hasta restablecerla.
+COLUMNAS_REQUERIDAS = ['email', 'username', 'first_name', 'last_name']
+CAMPOS_UNICOS = ['email', 'username', 'matricula']
+
+TAMANO_LOTE = 500
+
+logger = logging.getLogger('apps')
+
+
+def leer_filas(archivo, nombre):
+    """
+    Filas del archivo como diccionarios con las columnas en minúsculas.
+    Acepta CSV (UTF-8, con o sin BOM) y XLSX (primera hoja).
+    """
+    if nombre.lower().endswith('.xlsx'):
+        from openpyxl import load_workbook
+
+        libro = load_workbook(archivo, read_only=True, data_only=True)
+        filas = libro.active.iter_rows(values_only=True)
+        encabezados = [str(c or '').strip().lower() for c in next(filas, [])]
+        for fila in filas:
+            if any(valor not in (None, '') for valor in fila):
+                yield {
+                    columna: '' if valor is None else str(valor).strip()
+                    for columna, valor in zip(encabezados, fila)
+                }
+        libro.close()
+        return
+
+    texto = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+    lector = csv.DictReader(texto)
+    lector.fieldnames = [(c or '').strip().lower() for c in lector.fieldnames or []]
+    for fila in lector:
+        if any((valor or '').strip() for valor in fila.values() if isinstance(valor, str)):
+            yield {columna: (valor or '').strip() for columna, valor in fila.items() if columna}
+
+
+def _validar_campos(fila):
+    """Validar y convertir los campos de una fila. Retorna (datos, password, errores)."""
+    errores = {}
+    datos = {}
+
+    for campo in COLUMNAS_REQUERIDAS:
+        if not fila.get(campo):
+            errores[campo] = 'Este campo es obligatorio.'
+        else:
+            datos[campo] = fila[campo]
+
+    if 'email' in datos:
+        try:
+            validate_email(datos['email'])
+        except ValidationError:
+            errores['email'] = 'Email no válido.'
+        datos['email'] = User.objects.normalize_email(datos['email'])
+
+    for campo in ['matricula', 'carrera', 'phone']:
+        if fila.get(campo):
+            datos[campo] = fila[campo]
+
+    if fila.get('semestre'):
+        try:
+            datos['semestre'] = int(float(fila['semestre']))
+        except (ValueError, OverflowError):
+            errores['semestre'] = 'Debe ser un número entero.'
+
+    if fila.get('promedio'):
+        try:
+            datos['promedio'] = Decimal(fila['promedio']).quantize(Decimal('0.01'))
+        except (InvalidOperation, ValueError):
+            errores['promedio'] = 'Debe ser un número.'
+
+    # Validadores de los campos del modelo; la unicidad se valida por conjuntos
+    campos = set(datos)
+    try:
+        User(role=User.ESTUDIANTE, **datos).full_clean(
+            exclude=[f.name for f in User._meta.fields if f.name not in campos],
+            validate_unique=False,
+            validate_constraints=False,
+        )
+    except ValidationError as e:
+        for campo, mensajes in e.message_dict.items():
+            errores.setdefault(campo, ' '.join(mensajes))
+
+    password = fila.get('password') or None
+    if password and not errores:
+        try:
+            validate_password(password, User(**datos))
+        except ValidationError as e:
+            errores['password'] = ' '.join(e.messages)
+
+    return datos, password, errores
+
+
+def validar_filas(filas):
+    """
+    Validar todas las filas.
+    Retorna (validas, errores): validas es una lista de (numero, datos, password)
+    y errores una lista de {'fila': numero, 'errores': {campo: mensaje}}.
+    La fila 1 es el encabezado, por eso los datos empiezan en la fila 2.
+    """
+    candidatas = []
+    errores = {}
+    vistos = {campo: {} for campo in CAMPOS_UNICOS}
+
+    for numero, fila in enumerate(filas, start=2):
+        datos, password, errores_fila = _validar_campos(fila)
+        for campo in CAMPOS_UNICOS:
+            valor = datos.get(campo)
+            if not valor:
+                continue
+            if valor in vistos[campo]:
+                errores_fila[campo] = f'Duplicado en el archivo (fila {vistos[campo][valor]}).'
+            else:
+                vistos[campo][valor] = numero
+        if errores_fila:
+            errores[numero] = errores_fila
+        else:
+            candidatas.append((numero, datos, password))
+
+    # Una consulta por campo único para todo el archivo
+    for campo in CAMPOS_UNICOS:
+        existentes = set(
+            User.objects.filter(**{f'{campo}__in': list(vistos[campo])})
+            .values_list(campo, flat=True)
+        )
+        for valor in existentes:
+            numero = vistos[campo][valor]
+            errores.setdefault(numero, {})[campo] = 'Ya está registrado.'
+
+    validas = [
+        (numero, datos, password)
+        for numero, datos, password in candidatas
+        if numero not in errores
+    ]
+    reporte = [{'fila': numero, 'errores': errores[numero]} for numero in sorted(errores)]
+    return validas, reporte
+
+
+def crear_estudiantes(validas, tamano_lote=TAMANO_LOTE):
+    """Crear los estudiantes válidos con bulk_create por lotes en una transacción."""
+    usuarios = [
+        User(role=User.ESTUDIANTE, is_active=True, **datos)
+        for _, datos, _ in validas
+    ]
+    passwords = [password for _, _, password in validas]
+
+    with transaction.atomic():
+        return User.objects.bulk_create_users(usuarios, passwords, batch_size=tamano_lote)
+
+
+def procesar_importacion(importacion):
+    """Procesar una ImportacionEstudiantes y guardar el resultado y el reporte."""
+    importacion.estado = ImportacionEstudiantes.PROCESANDO
+    importacion.save(update_fields=['estado'])
+
+    try:
+        with importacion.archivo.open('rb') as archivo:
+            filas = list(leer_filas(archivo, importacion.nombre_archivo))
+
+        faltantes = [c for c in COLUMNAS_REQUERIDAS if filas and c not in filas[0]]
+        if faltantes:
+            raise ValueError(f"Faltan columnas: {', '.join(faltantes)}")
+
+        validas, reporte = validar_filas(filas)
+        creados = crear_estudiantes(validas)
+
+        importacion.total_filas = len(filas)
+        importacion.creados = len(creados)
+        importacion.errores = reporte
+        importacion.estado = ImportacionEstudiantes.COMPLETADA
+    except Exception as e:
+        logger.exception('Error en la importación de estudiantes %s', importacion.pk)
+        importacion.estado = ImportacionEstudiantes.FALLIDA
+        importacion.mensaje = str(e)
+    finally:
+        # El archivo puede contener contraseñas; solo se conserva el reporte
+        importacion.archivo.delete(save=False)
+
+    importacion.finalizada_at = timezone.now()
+    importacion.save()
+    return importacion
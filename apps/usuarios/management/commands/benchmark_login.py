@@ -0,0 +1,82 @@
+"""
+Mide la latencia del login por sesión y por JWT.
+
+Uso: python manage.py benchmark_login [--iteraciones 200] [--email ... --password ...]
+Sin credenciales se crea un usuario temporal que se elimina al terminar.
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from apps.usuarios.models import User
+
+
+USUARIO_TEMPORAL = 'benchmark_login'
+
+
+class Command(BaseCommand):
+    help = 'Reporta p50/p99 de latencia de login (sesión y JWT)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iteraciones', type=int, default=200)
+        parser.add_argument('--email', help='Email de un usuario existente')
+        parser.add_argument('--password', help='Contraseña del usuario existente')
+
+    def handle(self, *args, **options):
+        iteraciones = options['iteraciones']
+        if iteraciones < 2:
+            raise CommandError('Se necesitan al menos 2 iteraciones.')
+
+        email, password = options['email'], options['password']
+        temporal = None
+        if not email:
+            password = 'benchmark123'
+            temporal = User.objects.create_user(
+                email=f'{USUARIO_TEMPORAL}@example.com',
+                password=password,
+                username=USUARIO_TEMPORAL,
+                first_name='Benchmark',
+                last_name='Login',
+                role=User.ESTUDIANTE,
+            )
+            email = temporal.email
+        elif not password:
+            raise CommandError('--password es obligatorio junto con --email.')
+
+        try:
+            rutas = [
+                ('sesión', self._login_sesion, {'username': email, 'password': password}),
+                ('JWT', self._login_jwt, {'email': email, 'password': password}),
+            ]
+            self.stdout.write(f"{'ruta':<10}{'n':>6}{'p50 ms':>10}{'p99 ms':>10}")
+            for nombre, login, datos in rutas:
+                tiempos = [login(datos) for _ in range(iteraciones)]
+                percentiles = statistics.quantiles(tiempos, n=100)
+                self.stdout.write(
+                    f'{nombre:<10}{iteraciones:>6}{percentiles[49]:>10.2f}{percentiles[98]:>10.2f}'
+                )
+        finally:
+            if temporal is not None:
+                temporal.delete()
+
+    def _medir(self, peticion, esperado):
+        inicio = time.perf_counter()
+        response = peticion()
+        transcurrido = (time.perf_counter() - inicio) * 1000
+        if response.status_code != esperado:
+            raise CommandError(f'Login fallido (HTTP {response.status_code}).')
+        return transcurrido
+
+    def _login_sesion(self, datos):
+        client = Client()
+        return self._medir(lambda: client.post(reverse('login'), datos), 302)
+
+    def _login_jwt(self, datos):
+        client = Client()
+        return self._medir(
+            lambda: client.post(reverse('token_obtain_pair'), datos, content_type='application/json'),
+            200,
+        )
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0002_user_empresa_user_puesto_alter_user_role'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportacionEstudiantes',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('archivo', models.FileField(blank=True, upload_to='importaciones/estudiantes/', verbose_name='Archivo')),
+                ('nombre_archivo', models.CharField(max_length=255, verbose_name='Nombre del archivo')),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('PROCESANDO', 'Procesando'), ('COMPLETADA', 'Completada'), ('FALLIDA', 'Fallida')], default='PENDIENTE', max_length=20, verbose_name='Estado')),
+                ('total_filas', models.PositiveIntegerField(default=0, verbose_name='Total de filas')),
+                ('creados', models.PositiveIntegerField(default=0, verbose_name='Estudiantes creados')),
+                ('errores', models.JSONField(blank=True, default=list, help_text='Lista de {"fila": n, "errores": {campo: mensaje}}', verbose_name='Errores por fila')),
+                ('mensaje', models.TextField(blank=True, verbose_name='Mensaje')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finalizada_at', models.DateTimeField(blank=True, null=True)),
+                ('creada_por', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='importaciones_estudiantes', to=settings.AUTH_USER_MODEL, verbose_name='Creada por')),
+            ],
+            options={
+                'verbose_name': 'Importación de Estudiantes',
+                'verbose_name_plural': 'Importaciones de Estudiantes',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
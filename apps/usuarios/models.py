@@ -10,7 +10,58 @@ from django.core.validators import RegexValidator
 from django.utils.translation import gettext_lazy as _
 
 
-class UserManager(BaseUserManager):
+def _olvidar_logins_inexistentes(usuarios):
+    """Los identificadores de `usuarios` ya pueden iniciar sesión (ver backends)."""
+    from .backends import invalidar_usuario_inexistente
+    
+    identificadores = []
+    for email, username in usuarios:
+        identificadores += [email, username]
+    invalidar_usuario_inexistente(*identificadores)
+
+
+class UserQuerySet(models.QuerySet):
+    """
+    Las escrituras en bloque no disparan post_save: aquí se olvidan los
+    logins marcados como inexistentes cuando aparecen un email o un
+    username nuevos, y el estado en caché de los tokens JWT cuando cambian
+    los CAMPOS_ACCESO.
+    """
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        creados = super().bulk_create(objs, *args, **kwargs)
+        _olvidar_logins_inexistentes((u.email, u.username) for u in creados)
+        return creados
+    
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        filas = super().bulk_update(objs, fields, *args, **kwargs)
+        if {'email', 'username'} & set(fields):
+            _olvidar_logins_inexistentes((u.email, u.username) for u in objs)
+        if set(self.model.CAMPOS_ACCESO) & set(fields):
+            from .authentication import invalidar_estado_usuario
+            invalidar_estado_usuario(*(u.pk for u in objs))
+        return filas
+    
+    def update(self, **kwargs):
+        login = {'email', 'username'} & set(kwargs)
+        acceso = set(self.model.CAMPOS_ACCESO) & set(kwargs)
+        if not login and not acceso:
+            return super().update(**kwargs)
+        pks = list(self.values_list('pk', flat=True))
+        filas = super().update(**kwargs)
+        if login:
+            # Los valores pueden ser expresiones: se leen después de actualizar
+            _olvidar_logins_inexistentes(
+                self.model._base_manager.filter(pk__in=pks).values_list('email', 'username')
+            )
+        if acceso:
+            from .authentication import invalidar_estado_usuario
+            invalidar_estado_usuario(*pks)
+        return filas
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     """Custom user manager."""
     
     def create_user(self, email, password=None, **extra_fields):
@@ -37,6 +88,53 @@ class UserManager(BaseUserManager):
             raise ValueError('El superusuario debe tener is_superuser=True.')
         
         return self.create_user(email, password, **extra_fields)
+    
+    def generate_matriculas(self, count, reserved=()):
+        """
+        Generate `count` unused student matriculas (EST + 8 digits).
+        Candidates are checked against the database in one query per round,
+        so only collisions are regenerated.
+        """
+        from django.utils.crypto import get_random_string
+        
+        usadas = set(reserved)
+        matriculas = []
+        while len(matriculas) < count:
+            candidatas = set()
+            while len(candidatas) < count - len(matriculas):
+                candidata = f"EST{get_random_string(8, allowed_chars='0123456789')}"
+                if candidata not in usadas:
+                    candidatas.add(candidata)
+            usadas |= candidatas
+            existentes = set(
+                self.filter(matricula__in=candidatas).values_list('matricula', flat=True)
+            )
+            matriculas += sorted(candidatas - existentes)
+        return matriculas
+    
+    def bulk_create_users(self, users, passwords, batch_size=1000, procesos=None):
+        """
+        Create many users at once.
+        Passwords are hashed in a process pool and rows are inserted with
+        bulk_create; role-specific fields are normalized like in save().
+        """
+        from .hashers import hashear_passwords
+        from .signals import usuarios_creados_en_bloque
+        
+        users = list(users)
+        sin_matricula = [u for u in users if u.role == User.ESTUDIANTE and not u.matricula]
+        reservadas = {u.matricula for u in users if u.matricula}
+        for user, matricula in zip(sin_matricula, self.generate_matriculas(len(sin_matricula), reservadas)):
+            user.matricula = matricula
+        
+        for user, encoded in zip(users, hashear_passwords(passwords, procesos=procesos)):
+            user.email = self.normalize_email(user.email)
+            user.password = encoded
+            user.normalizar_campos_rol()
+        
+        creados = self.bulk_create(users, batch_size=batch_size)
+        usuarios_creados_en_bloque.send(sender=self.model, usuarios=creados)
+        return creados
 
 
 class User(AbstractUser):
@@ -58,6 +156,9 @@ class User(AbstractUser):
         (COORDINADORA_EMPRESARIAL, 'Coordinadora Empresarial'),
     ]
     
+    # Campos de acceso cuyos cambios se detectan al guardar (ver campos_modificados)
+    CAMPOS_ACCESO = ('role', 'is_active', 'is_staff', 'is_superuser')
+    
     # Validators
     phone_regex = RegexValidator(
         regex=r'^\+?1?\d{9,15}$',
@@ -190,13 +291,38 @@ class User(AbstractUser):
         """Check if user is student."""
         return self.role == self.ESTUDIANTE
     
-    def save(self, *args, **kwargs):
-        """Override save to validate role-specific fields."""
+    def check_password(self, raw_password):
+        """
+        Verificar la contraseña; si el hash usa un hasher o costo anterior,
+        se actualiza en segundo plano en lugar de hacerlo dentro del login.
+        """
+        from django.contrib.auth.hashers import check_password
+        from .hashers import programar_rehash
+        
+        def setter(raw_password):
+            self._rehash_pendiente = programar_rehash(self.pk, self.password, raw_password)
+            if self._rehash_pendiente.done():
+                self.completar_rehash()
+        
+        return check_password(raw_password, self.password, setter)
+    
+    def completar_rehash(self):
+        """
+        Esperar el rehash programado por check_password() y tomar el hash
+        nuevo. Devuelve True si la contraseña en memoria cambió.
+        """
+        pendiente = self.__dict__.pop('_rehash_pendiente', None)
+        nuevo = pendiente.result() if pendiente is not None else None
+        if nuevo:
+            self.password = nuevo
+        return bool(nuevo)
+    
+    def normalizar_campos_rol(self):
+        """Completar y limpiar los campos que dependen del rol."""
         # Validar que estudiantes tengan matrícula
         if self.role == self.ESTUDIANTE and not self.matricula:
-            # Si no tiene matrícula, generarla automáticamente
-            from django.utils.crypto import get_random_string
-            self.matricula = f"EST{get_random_string(8, allowed_chars='0123456789')}"
+            # Si no tiene matrícula, generar una que no esté en uso
+            self.matricula = User.objects.generate_matriculas(1)[0]
         
         # Limpiar campos según rol
         if self.role != self.ESTUDIANTE:
@@ -212,5 +338,111 @@ class User(AbstractUser):
         if self.role != self.TUTOR_EMPRESARIAL:
             self.empresa = None
             self.puesto = None
-        
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Recordar los campos de acceso tal como se leyeron."""
+        instance = super().from_db(db, field_names, values)
+        instance._acceso_guardado = {
+            campo: getattr(instance, campo)
+            for campo in cls.CAMPOS_ACCESO
+            if campo in instance.__dict__
+        }
+        return instance
+    
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        guardado = getattr(self, '_acceso_guardado', {})
+        guardado.update(
+            (campo, self.__dict__[campo]) for campo in self.CAMPOS_ACCESO
+            if campo in self.__dict__ and (fields is None or campo in fields)
+        )
+        self._acceso_guardado = guardado
+    
+    def _campos_acceso_modificados(self):
+        guardado = getattr(self, '_acceso_guardado', None)
+        if guardado is None:
+            return set(self.CAMPOS_ACCESO)
+        return {
+            campo for campo in self.CAMPOS_ACCESO
+            if campo not in guardado or getattr(self, campo) != guardado[campo]
+        }
+    
+    def save(self, *args, **kwargs):
+        """
+        Override save to validate role-specific fields.
+        Durante post_save, `campos_modificados` tiene los CAMPOS_ACCESO que
+        cambiaron desde que se leyó el usuario (todos si es nuevo).
+        """
+        self.normalizar_campos_rol()
+        self.campos_modificados = self._campos_acceso_modificados()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            self.campos_modificados &= set(update_fields)
         super().save(*args, **kwargs)
+        
+        guardado = getattr(self, '_acceso_guardado', {})
+        guardado.update((campo, getattr(self, campo)) for campo in self.campos_modificados)
+        self._acceso_guardado = guardado
+        self.campos_modificados = set()
+
+
+class ImportacionEstudiantes(models.Model):
+    """
+    Importación masiva de estudiantes desde un archivo CSV/XLSX.
+    Se procesa en segundo plano; `errores` guarda el reporte por fila.
+    """
+    
+    PENDIENTE = 'PENDIENTE'
+    PROCESANDO = 'PROCESANDO'
+    COMPLETADA = 'COMPLETADA'
+    FALLIDA = 'FALLIDA'
+    
+    ESTADO_CHOICES = [
+        (PENDIENTE, 'Pendiente'),
+        (PROCESANDO, 'Procesando'),
+        (COMPLETADA, 'Completada'),
+        (FALLIDA, 'Fallida'),
+    ]
+    
+    archivo = models.FileField(
+        upload_to='importaciones/estudiantes/',
+        blank=True,
+        verbose_name='Archivo'
+    )
+    nombre_archivo = models.CharField(
+        max_length=255,
+        verbose_name='Nombre del archivo'
+    )
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADO_CHOICES,
+        default=PENDIENTE,
+        verbose_name='Estado'
+    )
+    creada_por = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='importaciones_estudiantes',
+        verbose_name='Creada por'
+    )
+    total_filas = models.PositiveIntegerField(default=0, verbose_name='Total de filas')
+    creados = models.PositiveIntegerField(default=0, verbose_name='Estudiantes creados')
+    errores = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='Errores por fila',
+        help_text='Lista de {"fila": n, "errores": {campo: mensaje}}'
+    )
+    mensaje = models.TextField(blank=True, verbose_name='Mensaje')
+    created_at = models.DateTimeField(auto_now_add=True)
+    finalizada_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Importación de Estudiantes'
+        verbose_name_plural = 'Importaciones de Estudiantes'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.nombre_archivo} ({self.get_estado_display()})"
@@ -7,6 +7,8 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.db import transaction
 
+from .models import ImportacionEstudiantes
+
 User = get_user_model()
 
 
@@ -281,3 +283,33 @@ class ChangePasswordSerializer(serializers.Serializer):
         user.set_password(self.validated_data['new_password'])
         user.save()
         return user
+
+
+class ImportacionEstudiantesSerializer(serializers.ModelSerializer):
+    """
+    Serializer para importaciones masivas de estudiantes.
+    Al crear solo se recibe el archivo; el resto lo completa el proceso.
+    """
+    
+    archivo = serializers.FileField(write_only=True)
+    
+    class Meta:
+        model = ImportacionEstudiantes
+        fields = [
+            'id', 'archivo', 'nombre_archivo', 'estado', 'total_filas',
+            'creados', 'errores', 'mensaje', 'created_at', 'finalizada_at'
+        ]
+        read_only_fields = [
+            'id', 'nombre_archivo', 'estado', 'total_filas', 'creados',
+            'errores', 'mensaje', 'created_at', 'finalizada_at'
+        ]
+    
+    def validate_archivo(self, value):
+        """Validar que el archivo sea CSV o XLSX."""
+        if not value.name.lower().endswith(('.csv', '.xlsx')):
+            raise serializers.ValidationError('El archivo debe ser CSV o XLSX.')
+        return value
+    
+    def create(self, validated_data):
+        validated_data['nombre_archivo'] = validated_data['archivo'].name
+        return super().create(validated_data)
@@ -0,0 +1,53 @@
+"""
+Señales de usuarios.
+"""
+from django.contrib.auth import update_session_auth_hash
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .authentication import invalidar_estado_usuario
+from .backends import invalidar_usuario_inexistente
+from .models import User
+
+
+# Se envía tras User.objects.bulk_create_users(), que no dispara post_save.
+# Argumentos: usuarios (lista de usuarios creados).
+usuarios_creados_en_bloque = Signal()
+
+
+@receiver(post_save, sender=User)
+def olvidar_login_inexistente(sender, instance, update_fields=None, **kwargs):
+    """
+    Un usuario nuevo o con email/username cambiado ya puede iniciar sesión.
+    Las escrituras en bloque lo hacen en UserQuerySet.
+    """
+    if update_fields is not None and not {'email', 'username'} & set(update_fields):
+        return
+    invalidar_usuario_inexistente(instance.email, instance.username)
+
+
+@receiver(post_save, sender=User)
+def invalidar_estado_token(sender, instance, created, **kwargs):
+    """Los tokens con claims deben ver enseguida la desactivación o el cambio de rol o permisos."""
+    if created:
+        return
+    if not getattr(instance, 'campos_modificados', User.CAMPOS_ACCESO):
+        return
+    invalidar_estado_usuario(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def invalidar_estado_token_eliminado(sender, instance, **kwargs):
+    invalidar_estado_usuario(instance.pk)
+
+
+@receiver(user_logged_in)
+def actualizar_hash_sesion(sender, request, user, **kwargs):
+    """
+    La sesión guarda un hash derivado de la contraseña: si el login programó
+    un rehash se espera y se actualiza la sesión, o la siguiente petición
+    cerraría la sesión.
+    """
+    if hasattr(user, 'completar_rehash') and user.completar_rehash():
+        update_session_auth_hash(request, user)
@@ -0,0 +1,13 @@
+# Celery tasks para usuarios
+from celery import shared_task
+
+
+@shared_task
+def importar_estudiantes(importacion_id):
+    """Procesar una importación masiva de estudiantes."""
+    from .importacion import procesar_importacion
+    from .models import ImportacionEstudiantes
+
+    importacion = ImportacionEstudiantes.objects.get(pk=importacion_id)
+    procesar_importacion(importacion)
+    return {'creados': importacion.creados, 'errores': len(importacion.errores)}
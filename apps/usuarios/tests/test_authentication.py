@@ -0,0 +1,96 @@
+"""
+Pruebas para la autenticación JWT basada en claims.
+"""
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from apps.usuarios.auth_views import CustomTokenObtainPairSerializer
+from apps.usuarios.authentication import JWTClaimsAuthentication
+from apps.usuarios.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def estudiante():
+    return User.objects.create_user(
+        email='ana@example.com',
+        password='testpass123',
+        username='ana',
+        first_name='Ana',
+        last_name='López',
+        role=User.ESTUDIANTE,
+        carrera='Sistemas',
+    )
+
+
+def autenticar(usuario):
+    token = CustomTokenObtainPairSerializer.get_token(usuario).access_token
+    request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+    return JWTClaimsAuthentication().authenticate(request)[0]
+
+
+class TestJWTClaimsAuthentication:
+    """Pruebas para JWTClaimsAuthentication."""
+
+    def test_token_incluye_claims(self, estudiante):
+        token = CustomTokenObtainPairSerializer.get_token(estudiante).access_token
+        assert token['role'] == User.ESTUDIANTE
+        assert token['email'] == 'ana@example.com'
+
+    def test_sin_consultas_con_estado_en_cache(self, estudiante, django_assert_num_queries):
+        """Con el estado en caché la autenticación no consulta la base de datos."""
+        autenticar(estudiante)
+        with django_assert_num_queries(0):
+            usuario = autenticar(estudiante)
+        assert usuario == estudiante
+        assert usuario.is_estudiante
+        assert usuario.get_full_name() == 'Ana López'
+
+    def test_campos_diferidos_se_cargan_al_usarlos(self, estudiante, django_assert_num_queries):
+        usuario = autenticar(estudiante)
+        with django_assert_num_queries(1):
+            assert usuario.carrera == 'Sistemas'
+
+    def test_usuario_desactivado(self, estudiante):
+        """Desactivar al usuario invalida la caché y rechaza el token."""
+        autenticar(estudiante)
+        estudiante.is_active = False
+        estudiante.save()
+        with pytest.raises(AuthenticationFailed):
+            autenticar(estudiante)
+
+    def test_cambio_de_rol_consulta_usuario(self, estudiante):
+        """Si el rol del token ya no es el actual se usa el usuario de la base de datos."""
+        token = CustomTokenObtainPairSerializer.get_token(estudiante).access_token
+        User.objects.filter(pk=estudiante.pk).update(role=User.DOCENTE_ASESOR)
+        cache.clear()
+
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        usuario = JWTClaimsAuthentication().authenticate(request)[0]
+        assert usuario.role == User.DOCENTE_ASESOR
+
+    def test_permisos_revocados_no_se_toman_del_token(self, estudiante):
+        """Quitar is_staff/is_superuser invalida la caché y el token deja de otorgarlos."""
+        estudiante.is_staff = True
+        estudiante.save()
+        token = CustomTokenObtainPairSerializer.get_token(estudiante).access_token
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        assert JWTClaimsAuthentication().authenticate(request)[0].is_staff
+
+        estudiante.is_staff = False
+        estudiante.save()
+        assert not JWTClaimsAuthentication().authenticate(request)[0].is_staff
+
+        User.objects.filter(pk=estudiante.pk).update(is_staff=True, is_superuser=True)
+        usuario = JWTClaimsAuthentication().authenticate(request)[0]
+        assert usuario.is_staff and usuario.is_superuser
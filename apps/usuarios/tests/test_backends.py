@@ -0,0 +1,112 @@
+"""
+Pruebas para el backend de autenticación por email o username.
+"""
+import pytest
+from django.contrib.auth import authenticate
+from django.core.cache import cache
+from django.core.management import call_command
+
+from apps.usuarios.backends import EmailOrUsernameModelBackend
+from apps.usuarios.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def usuario():
+    return User.objects.create_user(
+        email='ana@example.com',
+        password='testpass123',
+        username='ana',
+        first_name='Ana',
+        last_name='López',
+        role=User.ESTUDIANTE,
+    )
+
+
+class TestEmailOrUsernameModelBackend:
+    """Pruebas para EmailOrUsernameModelBackend."""
+
+    def test_login_por_email(self, usuario, django_assert_num_queries):
+        """Con '@' se consulta solo por email, en una consulta."""
+        with django_assert_num_queries(1):
+            user = EmailOrUsernameModelBackend().authenticate(
+                None, username='ana@example.com', password='testpass123'
+            )
+        assert user == usuario
+
+    def test_login_por_username(self, usuario):
+        assert authenticate(username='ana', password='testpass123') == usuario
+
+    def test_login_jwt_por_username_field(self, usuario):
+        """El login JWT envía el email como argumento 'email'."""
+        user = EmailOrUsernameModelBackend().authenticate(
+            None, email='ana@example.com', password='testpass123'
+        )
+        assert user == usuario
+
+    def test_password_incorrecto(self, usuario):
+        assert authenticate(username='ana', password='otra') is None
+
+    def test_inexistente_en_cache(self, django_assert_num_queries):
+        """Un identificador inexistente no vuelve a consultar la base de datos."""
+        backend = EmailOrUsernameModelBackend()
+        assert backend.authenticate(None, username='nadie', password='x') is None
+        with django_assert_num_queries(0):
+            assert backend.authenticate(None, username='nadie', password='x') is None
+
+    def test_usuario_nuevo_invalida_cache(self):
+        """Al crear el usuario se olvida el intento fallido previo."""
+        backend = EmailOrUsernameModelBackend()
+        assert backend.authenticate(None, username='nuevo', password='testpass123') is None
+
+        nuevo = User.objects.create_user(
+            email='nuevo@example.com',
+            password='testpass123',
+            username='nuevo',
+            role=User.ESTUDIANTE,
+        )
+        assert backend.authenticate(None, username='nuevo', password='testpass123') == nuevo
+
+
+    def test_username_con_arroba(self):
+        """Un username con '@' que no es un email también puede iniciar sesión."""
+        usuario = User.objects.create_user(
+            email='beto@example.com',
+            password='testpass123',
+            username='beto@empresa',
+            role=User.TUTOR_EMPRESARIAL,
+        )
+        assert authenticate(username='beto@empresa', password='testpass123') == usuario
+
+    def test_escrituras_en_bloque_invalidan_cache(self, usuario):
+        """update() y bulk_create() también olvidan los intentos fallidos."""
+        backend = EmailOrUsernameModelBackend()
+        assert backend.authenticate(None, username='ana.nueva', password='testpass123') is None
+        assert backend.authenticate(None, username='beto', password='testpass123') is None
+
+        User.objects.filter(pk=usuario.pk).update(username='ana.nueva')
+        assert backend.authenticate(None, username='ana.nueva', password='testpass123') == usuario
+
+        beto = User(email='beto@example.com', username='beto', role=User.TUTOR_EMPRESARIAL)
+        beto.set_password('testpass123')
+        User.objects.bulk_create([beto])
+        assert backend.authenticate(None, username='beto', password='testpass123') == beto
+
+
+class TestBenchmarkLogin:
+    """Pruebas para el comando benchmark_login."""
+
+    def test_reporta_percentiles(self, capsys):
+        call_command('benchmark_login', iteraciones=3)
+        salida = capsys.readouterr().out
+        assert 'sesión' in salida
+        assert 'JWT' in salida
+        assert not User.objects.filter(username='benchmark_login').exists()
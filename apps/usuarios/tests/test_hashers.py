@@ -0,0 +1,104 @@
+"""
+Pruebas para la política de hash de contraseñas.
+"""
+import pytest
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.cache import cache
+
+from apps.usuarios.hashers import hashear_passwords
+from apps.usuarios.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def politica(settings):
+    settings.PASSWORD_HASHERS = [
+        'apps.usuarios.hashers.ScryptPasswordHasher',
+        'apps.usuarios.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    ]
+    settings.PASSWORD_SCRYPT_WORK_FACTOR = 2**10
+    settings.PASSWORD_REHASH_ASYNC = False
+    cache.clear()
+    yield settings
+    cache.clear()
+
+
+def crear_usuario(username, password_hash):
+    usuario = User.objects.create_user(
+        email=f'{username}@example.com',
+        username=username,
+        role=User.DOCENTE_ASESOR,
+    )
+    User.objects.filter(pk=usuario.pk).update(password=password_hash)
+    usuario.refresh_from_db()
+    return usuario
+
+
+class TestRehashEnLogin:
+    """Pruebas del rehash al iniciar sesión."""
+
+    def test_hash_antiguo_se_actualiza(self):
+        """Un hash MD5 se reemplaza por scrypt tras un login correcto."""
+        usuario = crear_usuario('docente', make_password('clave123', hasher='md5'))
+        assert usuario.check_password('clave123')
+
+        usuario.refresh_from_db()
+        assert identify_hasher(usuario.password).algorithm == 'scrypt'
+        assert usuario.check_password('clave123')
+
+    def test_cambio_de_costo_se_actualiza(self, politica):
+        """Subir el factor de trabajo actualiza el hash en el siguiente login."""
+        usuario = crear_usuario('docente', make_password('clave123'))
+        politica.PASSWORD_SCRYPT_WORK_FACTOR = 2**11
+
+        assert usuario.check_password('clave123')
+        usuario.refresh_from_db()
+        assert f'scrypt${2**11}$' in usuario.password
+
+    def test_password_incorrecto_no_actualiza(self):
+        anterior = make_password('clave123', hasher='md5')
+        usuario = crear_usuario('docente', anterior)
+        assert not usuario.check_password('otra')
+
+        usuario.refresh_from_db()
+        assert usuario.password == anterior
+
+    def test_sesion_sigue_valida_tras_rehash(self, client):
+        """La sesión creada en el login que actualizó el hash sigue siendo válida."""
+        crear_usuario('docente', make_password('clave123', hasher='md5'))
+
+        response = client.post('/login/', {'username': 'docente', 'password': 'clave123'})
+        assert response.status_code == 302
+        assert identify_hasher(User.objects.get(username='docente').password).algorithm == 'scrypt'
+
+        response = client.get('/dashboard/')
+        assert response.status_code == 200
+        assert response.wsgi_request.user.username == 'docente'
+
+
+class TestCreacionEnBloque:
+    """Pruebas de la creación de usuarios en bloque."""
+
+    def test_hashear_passwords_conserva_orden(self):
+        hashes = hashear_passwords(['uno', 'dos'])
+        assert User(password=hashes[0]).check_password('uno')
+        assert User(password=hashes[1]).check_password('dos')
+
+    def test_bulk_create_users(self):
+        usuarios = User.objects.bulk_create_users(
+            [
+                User(username='est1', email='est1@EXAMPLE.com', role=User.ESTUDIANTE),
+                User(username='tutor1', email='tutor1@example.com', role=User.TUTOR_EMPRESARIAL,
+                     carrera='No aplica'),
+            ],
+            ['clave-est', 'clave-tutor'],
+        )
+
+        estudiante = User.objects.get(username='est1')
+        assert estudiante.email == 'est1@example.com'
+        assert estudiante.matricula
+        assert estudiante.check_password('clave-est')
+        assert User.objects.get(username='tutor1').carrera is None
+        assert len(usuarios) == 2
@@ -0,0 +1,164 @@
+"""
+Pruebas para la importación masiva de estudiantes.
+"""
+import io
+
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from openpyxl import Workbook
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.usuarios.importacion import leer_filas, validar_filas
+from apps.usuarios.models import User, ImportacionEstudiantes
+
+pytestmark = pytest.mark.django_db
+
+
+CSV_VALIDO = (
+    'Email,Username,First_Name,Last_Name,Password,Carrera,Semestre\n'
+    'ana@example.com,ana,Ana,López,Clave-Segura-1,Sistemas,5\n'
+    'luis@example.com,luis,Luis,Pérez,,Industrial,3\n'
+)
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def coordinadora():
+    return User.objects.create_user(
+        email='coordinadora@example.com',
+        password='testpass123',
+        username='coordinadora',
+        role=User.COORDINADORA_EMPRESARIAL,
+    )
+
+
+def filas_csv(contenido):
+    return list(leer_filas(io.BytesIO(contenido.encode()), 'estudiantes.csv'))
+
+
+class TestLeerFilas:
+    """Pruebas de lectura de CSV y XLSX."""
+
+    def test_csv_normaliza_encabezados(self):
+        filas = filas_csv(CSV_VALIDO)
+        assert len(filas) == 2
+        assert filas[0]['email'] == 'ana@example.com'
+        assert filas[1]['password'] == ''
+
+    def test_xlsx(self):
+        libro = Workbook()
+        hoja = libro.active
+        hoja.append(['email', 'username', 'first_name', 'last_name', 'semestre'])
+        hoja.append(['ana@example.com', 'ana', 'Ana', 'López', 5])
+        hoja.append([None, None, None, None, None])
+        contenido = io.BytesIO()
+        libro.save(contenido)
+        contenido.seek(0)
+
+        filas = list(leer_filas(contenido, 'estudiantes.xlsx'))
+        assert filas == [{
+            'email': 'ana@example.com', 'username': 'ana', 'first_name': 'Ana',
+            'last_name': 'López', 'semestre': '5',
+        }]
+
+
+class TestValidarFilas:
+    """Pruebas de la validación por conjuntos."""
+
+    def test_unicidad_en_consultas_por_conjunto(self, coordinadora, django_assert_max_num_queries):
+        """Una consulta por campo único, sin importar el número de filas."""
+        filas = filas_csv(
+            CSV_VALIDO
+            + 'coordinadora@example.com,otro,Otro,Usuario,,,\n'
+            + 'ana2@example.com,ana,Ana,Duplicada,,,\n'
+            + 'sin-arroba,malo,Malo,Email,,,\n'
+        )
+        with django_assert_max_num_queries(3):
+            validas, reporte = validar_filas(filas)
+
+        assert [numero for numero, _, _ in validas] == [2, 3]
+        errores = {error['fila']: error['errores'] for error in reporte}
+        assert errores[4] == {'email': 'Ya está registrado.'}
+        assert errores[5] == {'username': 'Duplicado en el archivo (fila 2).'}
+        assert 'email' in errores[6]
+
+    def test_validadores_del_modelo(self):
+        """Los valores fuera de rango o con formato inválido son errores de la fila."""
+        filas = filas_csv(
+            'email,username,first_name,last_name,semestre,promedio,phone\n'
+            'a@example.com,a,A,A,5,123.45,\n'
+            'b@example.com,b,B,B,5,NaN,\n'
+            'c@example.com,c,C,C,inf,9.5,\n'
+            'd@example.com,d,D,D,nan,Infinity,\n'
+            'e@example.com,e,E,E,5,9.5,abc\n'
+            'f@example.com,f,F,F,5,9.5,+5215512345678\n'
+        )
+        validas, reporte = validar_filas(filas)
+
+        assert [numero for numero, _, _ in validas] == [7]
+        errores = {error['fila']: error['errores'] for error in reporte}
+        assert set(errores[2]) == {'promedio'}
+        assert set(errores[3]) == {'promedio'}
+        assert set(errores[4]) == {'semestre'}
+        assert set(errores[5]) == {'semestre', 'promedio'}
+        assert set(errores[6]) == {'phone'}
+
+
+class TestImportarAPI:
+    """Pruebas del endpoint de importación."""
+
+    def test_importar_csv(self, coordinadora, django_capture_on_commit_callbacks):
+        client = APIClient()
+        client.force_authenticate(user=coordinadora)
+        archivo = SimpleUploadedFile('estudiantes.csv', CSV_VALIDO.encode(), content_type='text/csv')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(
+                reverse('usuarios:estudiante-importar'), {'archivo': archivo}, format='multipart'
+            )
+        assert response.status_code == status.HTTP_202_ACCEPTED
+
+        importacion = ImportacionEstudiantes.objects.get(pk=response.data['id'])
+        assert importacion.estado == ImportacionEstudiantes.COMPLETADA
+        assert importacion.creados == 2
+        assert not importacion.archivo
+
+        ana = User.objects.get(username='ana')
+        assert ana.is_estudiante
+        assert ana.matricula.startswith('EST')
+        assert ana.check_password('Clave-Segura-1')
+        assert not User.objects.get(username='luis').has_usable_password()
+
+        response = client.get(
+            reverse('usuarios:estudiante-importacion', args=[importacion.pk])
+        )
+        assert response.data['creados'] == 2
+        assert response.data['errores'] == []
+
+    def test_rechaza_otro_formato(self, coordinadora):
+        client = APIClient()
+        client.force_authenticate(user=coordinadora)
+        archivo = SimpleUploadedFile('estudiantes.txt', b'x')
+        response = client.post(
+            reverse('usuarios:estudiante-importar'), {'archivo': archivo}, format='multipart'
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestGenerarMatriculas:
+    """Pruebas de la generación de matrículas sin colisiones."""
+
+    def test_no_repite_existentes_ni_reservadas(self):
+        matriculas = User.objects.generate_matriculas(50, reserved={'EST00000000'})
+        assert len(set(matriculas)) == 50
+        assert 'EST00000000' not in matriculas
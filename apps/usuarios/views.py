@@ -9,16 +9,20 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 
-from .models import User
+from config.permissions import IsCoordinadora
+from .models import User, ImportacionEstudiantes
 from .serializers import (
     UserSerializer,
     EstudianteSerializer,
     ProfesorSerializer,
     CoordinadorSerializer,
     ChangePasswordSerializer,
+    ImportacionEstudiantesSerializer,
 )
 from .permissions import IsCoordinador, IsCoordinadorOrProfesor
 
@@ -90,6 +94,42 @@ class EstudianteViewSet(viewsets.ModelViewSet):
         # from .tasks import enviar_email_bienvenida
         # enviar_email_bienvenida.delay(estudiante.id)
     
+    @action(
+        detail=False,
+        methods=['post'],
+        permission_classes=[IsAuthenticated, IsCoordinadora],
+        serializer_class=ImportacionEstudiantesSerializer,
+    )
+    def importar(self, request):
+        """
+        Importar estudiantes desde un archivo CSV/XLSX.
+        El archivo se procesa en segundo plano; consultar el resultado en
+        importaciones/<id>/.
+        """
+        serializer = ImportacionEstudiantesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        importacion = serializer.save(creada_por=request.user)
+        
+        from .tasks import importar_estudiantes
+        transaction.on_commit(lambda: importar_estudiantes.delay(importacion.id))
+        
+        return Response(
+            ImportacionEstudiantesSerializer(importacion).data,
+            status=status.HTTP_202_ACCEPTED
+        )
+    
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path=r'importaciones/(?P<importacion_id>\d+)',
+        permission_classes=[IsAuthenticated, IsCoordinadora],
+        serializer_class=ImportacionEstudiantesSerializer,
+    )
+    def importacion(self, request, importacion_id=None):
+        """Estado y reporte de errores por fila de una importación."""
+        importacion = get_object_or_404(ImportacionEstudiantes, pk=importacion_id)
+        return Response(ImportacionEstudiantesSerializer(importacion).data)
+    
     @action(detail=True, methods=['post'])
     def activate(self, request, pk=None):
         """Activar estudiante."""
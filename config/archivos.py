@@ -0,0 +1,246 @@
+"""
+Validación de archivos subidos.
+
+Inspector recibe el archivo por bloques y, en una sola pasada:
+- detecta el tipo MIME real con los primeros bytes (python-magic), sin
+  confiar en la extensión ni en el Content-Type que manda el cliente;
+- corta en cuanto se supera ARCHIVOS_TAMANO_MAXIMO;
+- calcula el SHA-256.
+
+InspeccionUploadHandler lo aplica mientras Django lee el cuerpo multipart,
+así un archivo inválido se rechaza sin terminar de recibirlo ni escribirlo
+a disco; MultiPartInspeccionParser lo activa en los viewsets de DRF y deja
+el resultado en `archivo.inspeccion`. inspeccionar_subida() hace lo mismo
+para archivos que no pasaron por el parser (formularios, admin, pruebas).
+
+Las revisiones costosas (bombas ZIP, estructura de PDF, imágenes) no se
+hacen en la petición: revisar_contenido() corre en Celery sobre el archivo
+ya guardado.
+"""
+import hashlib
+import os
+import re
+import zipfile
+from dataclasses import dataclass
+
+import magic
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadhandler import FileUploadHandler
+from rest_framework import exceptions
+from rest_framework.parsers import MultiPartParser
+
+
+BYTES_DETECCION = 2048
+TAMANO_BLOQUE = 64 * 1024
+
+DOCX = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+MIME_POR_EXTENSION = {
+    'pdf': 'application/pdf',
+    'doc': 'application/msword',
+    'docx': DOCX,
+    'xls': 'application/vnd.ms-excel',
+    'xlsx': XLSX,
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+    'zip': 'application/zip',
+}
+# libmagic reconoce el contenedor (ZIP u OLE) de los formatos de Office
+# según la versión y cuántos bytes ve: ahí manda la extensión
+CONTENEDORES = {
+    'application/zip': {'docx', 'xlsx'},
+    'application/vnd.ms-office': {'doc', 'xls'},
+    'application/CDFV2': {'doc', 'xls'},
+    'application/x-ole-storage': {'doc', 'xls'},
+}
+MIME_ZIP = {'application/zip', DOCX, XLSX}
+
+
+@dataclass
+class Inspeccion:
+    mime: str
+    tamano: int
+    sha256: str
+
+
+def tamano_maximo():
+    return getattr(settings, 'ARCHIVOS_TAMANO_MAXIMO', 25 * 1024 * 1024)
+
+
+class Inspector:
+    """Detección de tipo, límite de tamaño y hash sobre los bloques de un archivo."""
+
+    def __init__(self, nombre):
+        self.extension = os.path.splitext(nombre or '')[1].lower().lstrip('.')
+        if self.extension not in settings.ALLOWED_DOCUMENT_EXTENSIONS:
+            raise ValidationError(
+                f'Extensión no permitida. Se aceptan: {", ".join(settings.ALLOWED_DOCUMENT_EXTENSIONS)}.'
+            )
+        self.tamano = 0
+        self.mime = None
+        self._hash = hashlib.sha256()
+        self._inicio = b''
+
+    def agregar(self, bloque):
+        self.tamano += len(bloque)
+        if self.tamano > tamano_maximo():
+            raise ValidationError(f'El archivo supera el máximo de {tamano_maximo() // (1024 * 1024)} MB.')
+        self._hash.update(bloque)
+        if self.mime is None:
+            self._inicio += bloque[:BYTES_DETECCION - len(self._inicio)]
+            if len(self._inicio) >= BYTES_DETECCION:
+                self._detectar()
+
+    def _detectar(self):
+        mime = magic.from_buffer(self._inicio, mime=True)
+        self._inicio = b''
+        if self.extension in CONTENEDORES.get(mime, ()):
+            mime = MIME_POR_EXTENSION[self.extension]
+        esperado = MIME_POR_EXTENSION.get(self.extension)
+        if mime not in settings.ALLOWED_MIME_TYPES or (esperado and mime != esperado):
+            raise ValidationError(f'El contenido del archivo ({mime}) no corresponde a un .{self.extension} permitido.')
+        self.mime = mime
+
+    def terminar(self):
+        if not self.tamano:
+            raise ValidationError('El archivo está vacío.')
+        if self.mime is None:
+            self._detectar()
+        return Inspeccion(self.mime, self.tamano, self._hash.hexdigest())
+
+
+def inspeccionar_subida(archivo):
+    """
+    Inspección de un UploadedFile: la del parser si ya la tiene o una pasada
+    por sus bloques. Lanza ValidationError si el archivo no es aceptable.
+    """
+    inspeccion = getattr(archivo, 'inspeccion', None)
+    if inspeccion is None:
+        inspector = Inspector(archivo.name)
+        for bloque in archivo.chunks(TAMANO_BLOQUE):
+            inspector.agregar(bloque)
+        inspeccion = archivo.inspeccion = inspector.terminar()
+    return inspeccion
+
+
+class InspeccionUploadHandler(FileUploadHandler):
+    """
+    Inspecciona cada archivo mientras llega y pasa los bloques sin cambios a
+    los handlers siguientes (memoria o archivo temporal).
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.resultados = {}
+
+    def _validar(self, paso, *args):
+        try:
+            return paso(*args)
+        except ValidationError as e:
+            raise exceptions.ValidationError({self.field_name: e.messages})
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        self.inspector = self._validar(Inspector, file_name)
+
+    def receive_data_chunk(self, raw_data, start):
+        self._validar(self.inspector.agregar, raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        self.resultados.setdefault(self.field_name, []).append(self._validar(self.inspector.terminar))
+        return None
+
+
+class MultiPartInspeccionParser(MultiPartParser):
+    """MultiPartParser que valida los archivos durante la subida (ver InspeccionUploadHandler)."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = parser_context['request']._request
+        handler = InspeccionUploadHandler(request)
+        request.upload_handlers = [handler, *request.upload_handlers]
+        datos = super().parse(stream, media_type, parser_context)
+        for campo, inspecciones in handler.resultados.items():
+            for archivo, inspeccion in zip(datos.files.getlist(campo), inspecciones):
+                archivo.inspeccion = inspeccion
+        return datos
+
+
+# ---------------------------------------------------------------------------
+# Revisión diferida (Celery)
+# ---------------------------------------------------------------------------
+
+PATRON_PDF_ACTIVO = re.compile(rb'/(JavaScript|Launch)\b')
+
+
+def _revisar_zip(archivo, mime):
+    max_entradas = getattr(settings, 'ARCHIVOS_ZIP_MAX_ENTRADAS', 5000)
+    max_descomprimido = getattr(settings, 'ARCHIVOS_ZIP_MAX_DESCOMPRIMIDO', 200 * 1024 * 1024)
+    try:
+        with zipfile.ZipFile(archivo) as zf:
+            entradas = zf.infolist()
+            if len(entradas) > max_entradas:
+                return [f'El ZIP tiene demasiadas entradas ({len(entradas)}).']
+            if mime in (DOCX, XLSX) and '[Content_Types].xml' not in zf.namelist():
+                return ['El documento de Office no tiene una estructura válida.']
+            # Se descomprime de verdad: los tamaños declarados pueden ser falsos
+            total = 0
+            for info in entradas:
+                with zf.open(info) as entrada:
+                    while bloque := entrada.read(TAMANO_BLOQUE):
+                        total += len(bloque)
+                        if total > max_descomprimido:
+                            return ['El contenido descomprimido supera el límite (posible bomba ZIP).']
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, NotImplementedError, RuntimeError) as e:
+        return [f'ZIP dañado o no soportado: {e}']
+    return []
+
+
+def _revisar_pdf(archivo):
+    problemas = []
+    if b'%PDF-' not in archivo.read(1024):
+        problemas.append('Falta el encabezado %PDF-.')
+    archivo.seek(0)
+    anterior = b''
+    activos = set()
+    while bloque := archivo.read(TAMANO_BLOQUE):
+        # Con el final del bloque anterior para no perder nombres partidos
+        ventana = anterior + bloque
+        activos.update(m.decode() for m in PATRON_PDF_ACTIVO.findall(ventana))
+        anterior = ventana[-64:]
+    archivo.seek(max(0, archivo.tell() - 2048))
+    cola = archivo.read()
+    if b'startxref' not in cola or b'%%EOF' not in cola:
+        problemas.append('El PDF está incompleto (sin startxref/%%EOF al final).')
+    if activos:
+        problemas.append(f'El PDF contiene acciones activas: {", ".join(sorted(activos))}.')
+    return problemas
+
+
+def _revisar_imagen(archivo):
+    from PIL import Image
+
+    try:
+        with Image.open(archivo) as imagen:
+            imagen.verify()
+    except Image.DecompressionBombError:
+        return ['La imagen excede el número de píxeles permitido.']
+    except Exception as e:
+        return [f'Imagen dañada: {e}']
+    return []
+
+
+def revisar_contenido(archivo, mime):
+    """
+    Revisiones costosas sobre un archivo ya guardado (abierto en 'rb' y con
+    seek). Retorna la lista de problemas encontrados; vacía si es válido.
+    """
+    if mime in MIME_ZIP:
+        return _revisar_zip(archivo, mime)
+    if mime == 'application/pdf':
+        return _revisar_pdf(archivo)
+    if mime.startswith('image/'):
+        return _revisar_imagen(archivo)
+    return []
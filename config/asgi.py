@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# Los settings ajustan CONN_MAX_AGE bajo ASGI
+os.environ.setdefault('DJANGO_ASGI', 'True')
 
 application = get_asgi_application()
@@ -0,0 +1,72 @@
+"""
+Utilidades de base de datos: conexiones persistentes, PgBouncer y métricas.
+
+- estadisticas_conexiones(): conexiones abiertas por este proceso y tiempo de
+  espera al abrirlas (lo registra el backend config.db.postgresql).
+- iterar_en_lotes(): alternativa a QuerySet.iterator() que no depende de
+  cursores del lado del servidor, necesaria detrás de PgBouncer en modo
+  transacción (DISABLE_SERVER_SIDE_CURSORS).
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger('apps')
+
+_lock = threading.Lock()
+_estadisticas = {
+    'conexiones': 0,
+    'espera_total_ms': 0.0,
+    'espera_max_ms': 0.0,
+}
+
+
+def registrar_conexion(alias, espera_ms):
+    """Registrar una conexión nueva y el tiempo que tardó en obtenerse."""
+    with _lock:
+        _estadisticas['conexiones'] += 1
+        _estadisticas['espera_total_ms'] += espera_ms
+        _estadisticas['espera_max_ms'] = max(_estadisticas['espera_max_ms'], espera_ms)
+
+    if espera_ms >= getattr(settings, 'DATABASE_CONNECT_SLOW_MS', 100):
+        logger.warning('Conexión lenta a la base de datos %s: %.1f ms', alias, espera_ms)
+
+
+def estadisticas_conexiones():
+    """Copia de las métricas de conexión de este proceso."""
+    with _lock:
+        estadisticas = dict(_estadisticas)
+    conexiones = estadisticas['conexiones']
+    estadisticas['espera_promedio_ms'] = (
+        estadisticas['espera_total_ms'] / conexiones if conexiones else 0.0
+    )
+    return estadisticas
+
+
+def iterar_en_lotes(queryset, tamano=2000):
+    """
+    Recorrer un queryset grande con memoria acotada.
+
+    Con cursores del lado del servidor disponibles equivale a
+    queryset.iterator(). Si están deshabilitados (PgBouncer en modo
+    transacción), pagina por clave primaria: cada lote son dos consultas
+    cortas que no dejan un cursor abierto entre transacciones. En ese caso
+    las filas salen ordenadas por pk.
+    """
+    base = connections[queryset.db].settings_dict
+    if not base.get('DISABLE_SERVER_SIDE_CURSORS'):
+        yield from queryset.iterator(chunk_size=tamano)
+        return
+
+    pks = queryset.order_by().values_list('pk', flat=True).order_by('pk')
+    ultimo = None
+    while True:
+        lote = pks if ultimo is None else pks.filter(pk__gt=ultimo)
+        lote = list(lote[:tamano])
+        if not lote:
+            return
+        yield from queryset.filter(pk__in=lote).order_by('pk')
+        ultimo = lote[-1]
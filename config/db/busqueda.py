@@ -0,0 +1,44 @@
+"""
+Índices para la búsqueda de texto de los listados (?search= de SearchFilter).
+
+SearchFilter filtra con icontains, que en PostgreSQL se traduce a
+UPPER(columna::text) LIKE UPPER('%...%'): sin índice recorre toda la tabla,
+y texto_extraido guarda el texto completo de cada archivo. Un índice GIN
+trigram (pg_trgm) sobre esa misma expresión atiende el LIKE con comodines a
+ambos lados sin cambiar las consultas. Cada campo de search_fields necesita
+su índice: si uno de los OR no lo tiene, PostgreSQL vuelve a recorrer la tabla.
+
+En otros motores (SQLite en desarrollo y pruebas) las migraciones no hacen nada.
+"""
+from django.db import migrations
+
+
+def expresion(campo):
+    """Expresión indexada; debe coincidir con el lado izquierdo de icontains."""
+    return f'UPPER({campo}::text)'
+
+
+def nombre_indice(tabla, campo):
+    return f'{tabla}_{campo}_trgm'[:63]
+
+
+def indices_trigram(tabla, campos):
+    """Operación de migración que crea (o quita) los índices trigram de `campos`."""
+
+    def crear(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for campo in campos:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {nombre_indice(tabla, campo)} '
+                f'ON {tabla} USING gin (({expresion(campo)}) gin_trgm_ops)'
+            )
+
+    def eliminar(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for campo in campos:
+            schema_editor.execute(f'DROP INDEX IF EXISTS {nombre_indice(tabla, campo)}')
+
+    return migrations.RunPython(crear, eliminar, elidable=False)
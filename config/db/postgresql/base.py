@@ -0,0 +1,20 @@
+"""
+Backend PostgreSQL que mide el tiempo de obtención de cada conexión.
+
+Se usa con DATABASE_ENGINE=config.db.postgresql; por lo demás es el backend
+estándar de Django.
+"""
+import time
+
+from django.db.backends.postgresql import base
+
+from config.db import registrar_conexion
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_new_connection(self, conn_params):
+        inicio = time.perf_counter()
+        conexion = super().get_new_connection(conn_params)
+        registrar_conexion(self.alias, (time.perf_counter() - inicio) * 1000)
+        return conexion
@@ -0,0 +1,164 @@
+"""
+Lecturas en réplica con lectura de las propias escrituras.
+
+Si DATABASES define el alias 'replica', las lecturas marcadas se envían a él:
+- LecturaEnReplicaMixin: acciones de solo lectura (GET/HEAD/OPTIONS) de
+  viewsets y APIViews.
+- vista_en_replica: vistas de función (dashboards, resultados).
+- lecturas_en_replica(): contexto/decorador para tareas de reportes.
+
+Todo lo demás sigue en 'default'. Después de una escritura el usuario queda
+fijado a 'default' durante DATABASE_REPLICA_STICKY_SECONDS (lo registra
+EscriturasRecientesMiddleware), para que no lea datos anteriores a su propio
+cambio mientras la réplica se pone al día. Dentro de una misma petición, la
+primera escritura también devuelve las lecturas siguientes a 'default'.
+"""
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+
+REPLICA = 'replica'
+ESCRITURA_CACHE_KEY = 'db:escritura:{usuario_id}'
+METODOS_LECTURA = ('GET', 'HEAD', 'OPTIONS')
+
+_lecturas_en_replica = ContextVar('lecturas_en_replica', default=False)
+
+
+def replica_configurada():
+    return REPLICA in settings.DATABASES
+
+
+def registrar_escritura(usuario_id):
+    """Fijar al usuario a 'default' durante la ventana de lectura de sus escrituras."""
+    if usuario_id and replica_configurada():
+        cache.set(
+            ESCRITURA_CACHE_KEY.format(usuario_id=usuario_id),
+            True,
+            getattr(settings, 'DATABASE_REPLICA_STICKY_SECONDS', 10),
+        )
+
+
+def escribio_recientemente(usuario_id):
+    return bool(usuario_id) and bool(cache.get(ESCRITURA_CACHE_KEY.format(usuario_id=usuario_id)))
+
+
+def puede_usar_replica(usuario, metodo):
+    """Si una petición de este usuario y método puede leer de la réplica."""
+    if not replica_configurada() or metodo not in METODOS_LECTURA:
+        return False
+    usuario_id = usuario.pk if usuario is not None and usuario.is_authenticated else None
+    return not escribio_recientemente(usuario_id)
+
+
+class lecturas_en_replica(ContextDecorator):
+    """
+    Enviar a la réplica las lecturas del bloque (o de la función decorada).
+    Sin réplica configurada, o con activar=False, no cambia nada.
+    """
+
+    def __init__(self, activar=True):
+        self.activar = activar
+        self._tokens = []
+
+    def __enter__(self):
+        self._tokens.append(_lecturas_en_replica.set(self.activar and replica_configurada()))
+        return self
+
+    def __exit__(self, *exc):
+        _lecturas_en_replica.reset(self._tokens.pop())
+        return False
+
+
+def vista_en_replica(vista):
+    """Decorador para vistas de función de solo lectura (va después de login_required)."""
+    @wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        with lecturas_en_replica(puede_usar_replica(request.user, request.method)):
+            return vista(request, *args, **kwargs)
+    return envoltura
+
+
+class LecturaEnReplicaMixin:
+    """
+    Mixin para viewsets y APIViews: las acciones de solo lectura leen de la
+    réplica salvo que el usuario haya escrito hace poco. Se decide después
+    de autenticar, cuando ya se conoce request.user.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if puede_usar_replica(request.user, request.method):
+            self._token_replica = _lecturas_en_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_token_replica', None)
+        if token is not None:
+            _lecturas_en_replica.reset(token)
+            self._token_replica = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class ReplicaRouter:
+    """Router de DATABASE_ROUTERS: lecturas marcadas a 'replica', escrituras a 'default'."""
+
+    def db_for_read(self, model, **hints):
+        if _lecturas_en_replica.get():
+            return REPLICA
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Lo que se lea después de escribir en este contexto debe ver la escritura
+        if _lecturas_en_replica.get():
+            _lecturas_en_replica.set(False)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 'replica' es una copia de 'default': los objetos de ambas se relacionan
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA
+
+
+class EscriturasRecientesMiddleware:
+    """
+    Registrar las escrituras exitosas del usuario (métodos distintos de
+    GET/HEAD/OPTIONS con respuesta < 400) para fijarlo a 'default'.
+    Con JWT el usuario lo asigna DRF a la request durante la vista.
+    Es síncrono y asíncrono: bajo ASGI no obliga a pasar la petición por un hilo.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if request.method not in METODOS_LECTURA and response.status_code < 400:
+            self._registrar(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if request.method not in METODOS_LECTURA and response.status_code < 400:
+            # request.user puede consultar la sesión en la base de datos
+            await sync_to_async(self._registrar)(request)
+        return response
+
+    @staticmethod
+    def _registrar(request):
+        usuario = getattr(request, 'user', None)
+        if usuario is not None and usuario.is_authenticated:
+            registrar_escritura(usuario.pk)
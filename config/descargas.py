@@ -0,0 +1,126 @@
+"""
+Descargas que no acumulan el contenido en memoria del worker.
+
+Django 4.2 convierte a lista un iterador síncrono servido por ASGI (y uno
+asíncrono servido por WSGI) antes de enviarlo, así que una descarga grande
+terminaría completa en la memoria del worker. respuesta_en_flujo() entrega
+el tipo de iterador que corresponde al servidor de la petición: síncrono
+con WSGI y asíncrono con ASGI, avanzando el generador de a un bloque en el
+hilo síncrono (thread_sensitive) para que las consultas y los archivos
+abiertos sigan en el mismo hilo.
+
+respuesta_archivo() sirve un archivo del storage después de que la vista
+comprobó los permisos. Según DESCARGAS_SERVIDOR la transferencia la hace
+el proxy de entrada y el worker solo responde los encabezados:
+- 'nginx': X-Accel-Redirect a DESCARGAS_PREFIJO_INTERNO, una location
+  `internal` que apunta a MEDIA_ROOT:
+      location /protegido/ { internal; alias /app/media/; }
+- 'apache': X-Sendfile con la ruta absoluta (mod_xsendfile).
+- '' (por defecto): FileResponse. Con WSGI el servidor usa
+  wsgi.file_wrapper (os.sendfile en gunicorn); con ASGI el archivo se
+  envía de a un bloque como en respuesta_en_flujo().
+Los storages remotos no tienen ruta local: se redirige a una URL de corta
+duración (DESCARGAS_URL_EXPIRACION segundos). Con S3 la URL se prefirma con
+el cliente del bucket: storage.url() no firma cuando hay
+AWS_S3_CUSTOM_DOMAIN y los objetos privados responderían 403.
+"""
+import mimetypes
+import os
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+
+_FIN = object()
+
+
+def _es_asgi(request):
+    # Acepta tanto HttpRequest como la Request de DRF
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+async def _iterar_async(iterable):
+    iterador = iter(iterable)
+    siguiente = sync_to_async(next, thread_sensitive=True)
+    try:
+        while (bloque := await siguiente(iterador, _FIN)) is not _FIN:
+            yield bloque
+    finally:
+        cerrar = getattr(iterador, 'close', None)
+        if cerrar is not None:
+            await sync_to_async(cerrar, thread_sensitive=True)()
+
+
+def respuesta_en_flujo(request, contenido, nombre_archivo=None, **kwargs):
+    """
+    StreamingHttpResponse para `contenido` (iterable síncrono de bytes) que se
+    envía de a un bloque tanto con WSGI como con ASGI.
+    """
+    response = StreamingHttpResponse(
+        _iterar_async(contenido) if _es_asgi(request) else contenido, **kwargs
+    )
+    if nombre_archivo:
+        response['Content-Disposition'] = content_disposition_header(True, nombre_archivo)
+    return response
+
+
+def _ruta_local(storage, nombre):
+    try:
+        return storage.path(nombre)
+    except NotImplementedError:
+        return None
+
+
+def _url_remota(storage, nombre, nombre_archivo, as_attachment):
+    bucket = getattr(storage, 'bucket', None)
+    if bucket is None:
+        return storage.url(nombre)
+    return bucket.meta.client.generate_presigned_url(
+        'get_object',
+        Params={
+            'Bucket': storage.bucket_name,
+            'Key': storage._normalize_name(nombre),
+            'ResponseContentDisposition': content_disposition_header(as_attachment, nombre_archivo),
+        },
+        ExpiresIn=getattr(settings, 'DESCARGAS_URL_EXPIRACION', 60),
+    )
+
+
+def respuesta_archivo(request, archivo, nombre_archivo=None, as_attachment=True):
+    """
+    Respuesta de descarga para `archivo` (FieldFile) ya autorizado.
+    Lanza FileNotFoundError si no existe en el storage.
+    """
+    return respuesta_almacenada(request, archivo.storage, archivo.name, nombre_archivo, as_attachment)
+
+
+def respuesta_almacenada(request, storage, nombre, nombre_archivo=None, as_attachment=True):
+    """Como respuesta_archivo() para el archivo `nombre` de `storage`."""
+    nombre_archivo = nombre_archivo or os.path.basename(nombre)
+    ruta = _ruta_local(storage, nombre)
+    if ruta is None:
+        return HttpResponseRedirect(_url_remota(storage, nombre, nombre_archivo, as_attachment))
+    if not os.path.exists(ruta):
+        raise FileNotFoundError(nombre)
+
+    servidor = getattr(settings, 'DESCARGAS_SERVIDOR', '')
+    if servidor in ('nginx', 'apache'):
+        content_type, _ = mimetypes.guess_type(nombre_archivo)
+        response = HttpResponse(content_type=content_type or 'application/octet-stream')
+        response['Content-Disposition'] = content_disposition_header(as_attachment, nombre_archivo)
+        if servidor == 'nginx':
+            prefijo = getattr(settings, 'DESCARGAS_PREFIJO_INTERNO', '/protegido/').rstrip('/')
+            response['X-Accel-Redirect'] = quote(f'{prefijo}/{nombre}')
+        else:
+            response['X-Sendfile'] = ruta
+        return response
+
+    response = FileResponse(open(ruta, 'rb'), as_attachment=as_attachment, filename=nombre_archivo)
+    if _es_asgi(request):
+        # FileResponse también se acumularía en memoria con ASGI
+        response.streaming_content = _iterar_async(response.streaming_content)
+    return response
@@ -0,0 +1,60 @@
+"""
+Configuración de gunicorn para producción.
+
+    gunicorn config.asgi:application -c config/gunicorn.conf.py
+
+Workers de uvicorn sobre la aplicación ASGI: las vistas async (sondeo de
+notificaciones, exportaciones) esperan sin ocupar un hilo, siempre que todo
+el MIDDLEWARE sea async-capable (ver config/middleware.py), y las vistas
+síncronas corren en el pool de hilos de asgiref (GUNICORN_THREADS).
+Bajo ASGI las conexiones a la base de datos no son persistentes
+(CONN_MAX_AGE=0 por defecto): el pool lo da PgBouncer.
+
+Con preload la aplicación se carga una vez en el proceso maestro y los
+workers comparten esa memoria (copy-on-write); las conexiones a la base de
+datos se cierran después del fork para que ningún worker herede un socket.
+"""
+import multiprocessing
+import os
+
+
+def _env_int(nombre, por_defecto):
+    return int(os.environ.get(nombre) or por_defecto)
+
+
+def _env_bool(nombre, por_defecto):
+    return (os.environ.get(nombre) or str(por_defecto)).lower() in ('1', 'true', 'yes', 'on')
+
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'uvicorn.workers.UvicornWorker')
+workers = _env_int('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1)
+
+# Hilos para las vistas síncronas dentro de cada worker ASGI
+threads = _env_int('GUNICORN_THREADS', 4)
+os.environ.setdefault('ASGI_THREADS', str(threads))
+
+timeout = _env_int('GUNICORN_TIMEOUT', 60)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+# Reciclar workers de vez en cuando acota fugas de memoria; el jitter evita
+# que todos se reinicien a la vez
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 2000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 200)
+
+# En desarrollo (GUNICORN_RELOAD=True) se recarga el código y no se precarga
+reload = _env_bool('GUNICORN_RELOAD', False)
+preload_app = not reload and _env_bool('GUNICORN_PRELOAD', True)
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    """Descartar las conexiones abiertas por el maestro durante la precarga."""
+    from django.db import connections
+
+    for conexion in connections.all(initialized_only=True):
+        conexion.close()
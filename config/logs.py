@@ -0,0 +1,115 @@
+"""
+Logging sin bloquear la petición.
+
+- ColaHandler: QueueHandler que deja cada registro en una cola acotada; un
+  QueueListener en un hilo aparte lo escribe en los handlers de destino
+  (archivo, consola). La petición nunca espera al disco: si la cola
+  se llena, el registro se descarta y se cuenta.
+- FormatoJSON: un objeto JSON por línea con los campos `extra` del registro.
+
+Los destinos se declaran como handlers normales en settings.LOGGING y se
+referencian por nombre en `destinos`; no deben asignarse a ningún logger.
+dictConfig crea los handlers en orden alfabético, así que el de la cola debe
+llamarse de modo que quede después de sus destinos (en settings: 'queue').
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+
+# Atributos propios de LogRecord; el resto son campos `extra`
+_ATRIBUTOS_RECORD = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class FormatoJSON(logging.Formatter):
+    """Formatear cada registro como una línea JSON."""
+
+    def format(self, record):
+        datos = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+            'modulo': record.module,
+            'linea': record.lineno,
+            'proceso': record.process,
+        }
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_RECORD and not clave.startswith('_'):
+                datos[clave] = valor
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            datos['excepcion'] = record.exc_text
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class ColaHandler(QueueHandler):
+    """
+    Encolar los registros y escribirlos desde un hilo en los handlers
+    `destinos` (nombres de settings.LOGGING['handlers']).
+
+    El listener se arranca con el primer registro de cada proceso, así los
+    workers creados por fork (gunicorn con preload) tienen su propio hilo.
+    """
+
+    def __init__(self, destinos, capacidad=10000):
+        super().__init__(queue.Queue(capacidad))
+        # Referencias fuertes: logging solo guarda referencias débiles a los
+        # handlers que no están asignados a ningún logger
+        try:
+            self.destinos = [logging._handlers[nombre] for nombre in destinos]
+        except KeyError as e:
+            raise ValueError(f'El handler de destino {e} no está configurado todavía') from None
+        self.descartados = 0
+        self._listener = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _iniciar_listener(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # Tras un fork el hilo del padre no existe en el hijo: se crea uno nuevo
+            self._listener = QueueListener(self.queue, *self.destinos, respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+            atexit.register(self.detener)
+
+    def prepare(self, record):
+        # Se fija el mensaje y la traza aquí (los argumentos pueden cambiar
+        # después), pero sin mezclarlos: el formateador de destino los separa
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            self._iniciar_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+    def detener(self):
+        """Vaciar la cola y detener el hilo del listener."""
+        with self._lock:
+            if self._listener is not None and self._pid == os.getpid():
+                self._listener.stop()
+            self._listener = None
+            self._pid = None
+
+    def close(self):
+        self.detener()
+        super().close()
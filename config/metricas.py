@@ -0,0 +1,563 @@
+"""
+Instrumentación de peticiones sin APM externo.
+
+MetricasMiddleware mide por petición:
+- latencia total,
+- consultas SQL (cantidad y tiempo) con un execute_wrapper en cada conexión,
+- aciertos y fallos de caché (backends RedisCacheMedido / LocMemCacheMedido),
+- tiempo de serialización de DRF (Serializer.data / ListSerializer.data).
+
+Los datos salen por tres vías:
+- encabezado Server-Timing (METRICAS_SERVER_TIMING),
+- endpoint /metrics en formato Prometheus (metricas_view), agregado por vista,
+- log de peticiones lentas (METRICAS_PETICION_LENTA_MS) con las consultas
+  más costosas.
+
+Cada proceso acumula sus métricas en memoria y cada
+METRICAS_INTERVALO_PUBLICACION segundos suma lo nuevo a contadores
+compartidos: un hash de Redis con HINCRBY/HINCRBYFLOAT, atómicos, y sin
+vencimiento. /metrics lee esos totales, así no importa a qué worker llegue el
+scrape y los contadores no bajan cuando un worker se recicla; de un worker
+que muere se pierde a lo sumo lo del último intervalo. Con otro backend de
+caché (LocMem en desarrollo y pruebas) los totales se guardan en la caché
+del proceso.
+"""
+import heapq
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+from django_redis.cache import RedisCache
+from rest_framework import serializers
+
+from config.db import estadisticas_conexiones
+
+
+logger = logging.getLogger('apps')
+
+# Límites superiores de los buckets del histograma de latencia (segundos)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TOP_SQL = 5
+
+CONTADORES_CACHE_KEY = 'metricas:contadores'
+MAXIMOS_CACHE_KEY = 'metricas:maximos'
+CAMPOS_ENTEROS = ('consultas', 'aciertos_cache', 'fallos_cache')
+CAMPOS_REALES = ('duracion_s', 'sql_s', 'serializer_s')
+
+_AUSENTE = object()
+
+_medicion_actual = ContextVar('medicion_actual', default=None)
+
+
+class Medicion:
+    """Métricas de una petición en curso."""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.sql_s = 0.0
+        self.top_sql = []  # heap de (duración, sql) con las TOP_SQL más lentas
+        self.aciertos_cache = 0
+        self.fallos_cache = 0
+        self.serializer_s = 0.0
+        self.serializando = False
+        self._lock = threading.Lock()
+
+    def registrar_sql(self, sql, duracion):
+        with self._lock:
+            self.consultas += 1
+            self.sql_s += duracion
+            if len(self.top_sql) < TOP_SQL:
+                heapq.heappush(self.top_sql, (duracion, sql))
+            elif duracion > self.top_sql[0][0]:
+                heapq.heapreplace(self.top_sql, (duracion, sql))
+
+
+# ---------------------------------------------------------------------------
+# Recolección: SQL, caché y serializadores
+# ---------------------------------------------------------------------------
+
+def _medir_sql(execute, sql, params, many, context):
+    medicion = _medicion_actual.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicion.registrar_sql(sql, time.perf_counter() - inicio)
+
+
+def _instalar_en_conexion(conexion):
+    if _medir_sql not in conexion.execute_wrappers:
+        conexion.execute_wrappers.append(_medir_sql)
+
+
+def _al_crear_conexion(sender, connection, **kwargs):
+    _instalar_en_conexion(connection)
+
+
+connection_created.connect(_al_crear_conexion, dispatch_uid='metricas_medir_sql')
+
+
+def _registrar_cache(aciertos, fallos):
+    medicion = _medicion_actual.get()
+    if medicion is not None:
+        medicion.aciertos_cache += aciertos
+        medicion.fallos_cache += fallos
+
+
+class CacheMedidoMixin:
+    """Contar aciertos y fallos de get() en la petición en curso."""
+
+    def get(self, key, default=None, version=None, **kwargs):
+        valor = super().get(key, _AUSENTE, version=version, **kwargs)
+        if valor is _AUSENTE:
+            _registrar_cache(0, 1)
+            return default
+        _registrar_cache(1, 0)
+        return valor
+
+
+class RedisCacheMedido(CacheMedidoMixin, RedisCache):
+    """RedisCache con conteo de aciertos/fallos (get_many usa MGET, no get)."""
+
+    def get_many(self, keys, *args, **kwargs):
+        keys = list(keys)
+        valores = super().get_many(keys, *args, **kwargs)
+        _registrar_cache(len(valores), len(keys) - len(valores))
+        return valores
+
+
+class LocMemCacheMedido(CacheMedidoMixin, LocMemCache):
+    """LocMemCache con conteo de aciertos/fallos (get_many delega en get)."""
+
+
+def _medir_propiedad(propiedad):
+    # Solo se mide el serializador exterior; los anidados quedan incluidos
+    def data(self):
+        medicion = _medicion_actual.get()
+        if medicion is None or medicion.serializando:
+            return propiedad.fget(self)
+        medicion.serializando = True
+        inicio = time.perf_counter()
+        try:
+            return propiedad.fget(self)
+        finally:
+            medicion.serializer_s += time.perf_counter() - inicio
+            medicion.serializando = False
+    data._medido = True
+    return property(data)
+
+
+def _instalar_medicion_serializadores():
+    for clase in (serializers.Serializer, serializers.ListSerializer):
+        if not getattr(clase.data.fget, '_medido', False):
+            clase.data = _medir_propiedad(clase.data)
+
+
+# ---------------------------------------------------------------------------
+# Acumulado del proceso
+# ---------------------------------------------------------------------------
+
+_lock = threading.Lock()
+_vistas = {}
+_ultima_publicacion = 0.0
+# Contadores ya sumados a los compartidos y lock para no publicar dos veces a la vez
+_publicado = {}
+_lock_publicacion = threading.Lock()
+
+
+def _nueva_entrada():
+    return {
+        'peticiones': {},  # estado HTTP -> cantidad
+        'duracion_s': 0.0,
+        'buckets': [0] * len(BUCKETS),
+        'consultas': 0,
+        'sql_s': 0.0,
+        'aciertos_cache': 0,
+        'fallos_cache': 0,
+        'serializer_s': 0.0,
+    }
+
+
+def _acumular(vista, metodo, estado, duracion, medicion):
+    with _lock:
+        entrada = _vistas.setdefault(f'{vista}|{metodo}', _nueva_entrada())
+        entrada['peticiones'][estado] = entrada['peticiones'].get(estado, 0) + 1
+        entrada['duracion_s'] += duracion
+        for i, limite in enumerate(BUCKETS):
+            if duracion <= limite:
+                entrada['buckets'][i] += 1
+        entrada['consultas'] += medicion.consultas
+        entrada['sql_s'] += medicion.sql_s
+        entrada['aciertos_cache'] += medicion.aciertos_cache
+        entrada['fallos_cache'] += medicion.fallos_cache
+        entrada['serializer_s'] += medicion.serializer_s
+
+
+def instantanea():
+    """Copia de las métricas de este proceso (vistas y conexiones)."""
+    with _lock:
+        vistas = {
+            clave: dict(entrada, peticiones=dict(entrada['peticiones']), buckets=list(entrada['buckets']))
+            for clave, entrada in _vistas.items()
+        }
+    return {'vistas': vistas, 'conexiones': estadisticas_conexiones()}
+
+
+def reiniciar():
+    """Vaciar las métricas de este proceso."""
+    global _ultima_publicacion, _publicado
+    with _lock:
+        _vistas.clear()
+        _ultima_publicacion = 0.0
+        _publicado = {}
+
+
+# ---------------------------------------------------------------------------
+# Contadores compartidos
+# ---------------------------------------------------------------------------
+
+def _aplanar(datos):
+    """Contadores de una instantánea como {campo: valor}, los campos del hash compartido."""
+    planos = {}
+    for clave, entrada in datos['vistas'].items():
+        for estado, cantidad in entrada['peticiones'].items():
+            planos[f'{clave}|peticiones|{estado}'] = cantidad
+        for i, cantidad in enumerate(entrada['buckets']):
+            planos[f'{clave}|bucket|{i}'] = cantidad
+        for campo in CAMPOS_ENTEROS + CAMPOS_REALES:
+            planos[f'{clave}|{campo}'] = entrada[campo]
+    planos['conexiones'] = datos['conexiones']['conexiones']
+    planos['espera_total_ms'] = datos['conexiones']['espera_total_ms']
+    return planos
+
+
+def _desaplanar(planos, espera_max_ms=0.0):
+    """Instantánea a partir de los campos de _aplanar()."""
+    vistas = {}
+    conexiones = {'conexiones': 0, 'espera_total_ms': 0.0, 'espera_max_ms': espera_max_ms}
+    for campo, valor in planos.items():
+        if campo in conexiones:
+            conexiones[campo] = int(valor) if campo == 'conexiones' else float(valor)
+            continue
+        vista, metodo, nombre, *resto = campo.split('|')
+        entrada = vistas.setdefault(f'{vista}|{metodo}', _nueva_entrada())
+        if nombre == 'peticiones':
+            entrada['peticiones'][int(resto[0])] = int(valor)
+        elif nombre == 'bucket':
+            entrada['buckets'][int(resto[0])] = int(valor)
+        elif nombre in CAMPOS_ENTEROS:
+            entrada[nombre] = int(valor)
+        elif nombre in CAMPOS_REALES:
+            entrada[nombre] = float(valor)
+    return {'vistas': vistas, 'conexiones': conexiones}
+
+
+def _cliente_redis():
+    """Cliente de Redis del backend de caché, o None si el backend no es Redis."""
+    backend = caches['default']
+    if isinstance(backend, RedisCache):
+        return backend, backend.client.get_client(write=True)
+    return backend, None
+
+
+def _sumar_compartidos(diferencias, espera_max_ms):
+    backend, redis = _cliente_redis()
+    if redis is not None:
+        clave = backend.make_key(CONTADORES_CACHE_KEY)
+        with redis.pipeline() as pipe:
+            for campo, valor in diferencias.items():
+                if isinstance(valor, float):
+                    pipe.hincrbyfloat(clave, campo, valor)
+                else:
+                    pipe.hincrby(clave, campo, valor)
+            if espera_max_ms:
+                # GT: el máximo solo sube
+                pipe.zadd(backend.make_key(MAXIMOS_CACHE_KEY), {'espera_max_ms': espera_max_ms}, gt=True)
+            pipe.execute()
+        return
+    # Sin Redis la caché es del proceso: no hay otros workers con quien competir
+    with _lock:
+        totales = backend.get(CONTADORES_CACHE_KEY) or {}
+        for campo, valor in diferencias.items():
+            totales[campo] = totales.get(campo, 0) + valor
+        backend.set(CONTADORES_CACHE_KEY, totales, None)
+        maximo = backend.get(MAXIMOS_CACHE_KEY) or 0.0
+        backend.set(MAXIMOS_CACHE_KEY, max(maximo, espera_max_ms), None)
+
+
+def contadores_compartidos():
+    """Totales de todos los workers ya publicados, como instantánea."""
+    backend, redis = _cliente_redis()
+    if redis is not None:
+        with redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(backend.make_key(CONTADORES_CACHE_KEY))
+            pipe.zscore(backend.make_key(MAXIMOS_CACHE_KEY), 'espera_max_ms')
+            planos, maximo = pipe.execute()
+        planos = {campo.decode(): valor.decode() for campo, valor in planos.items()}
+        return _desaplanar(planos, float(maximo or 0.0))
+    return _desaplanar(backend.get(CONTADORES_CACHE_KEY) or {}, backend.get(MAXIMOS_CACHE_KEY) or 0.0)
+
+
+def _pendientes():
+    """Lo acumulado en este proceso que todavía no se sumó a los compartidos."""
+    datos = instantanea()
+    actuales = _aplanar(datos)
+    with _lock:
+        publicado = dict(_publicado)
+    diferencias = {
+        campo: valor - publicado.get(campo, 0)
+        for campo, valor in actuales.items()
+        if valor != publicado.get(campo, 0)
+    }
+    return diferencias, datos['conexiones']['espera_max_ms']
+
+
+def publicar():
+    """Sumar a los contadores compartidos lo nuevo de este proceso."""
+    if not _lock_publicacion.acquire(blocking=False):
+        return  # otro hilo del proceso ya está publicando
+    try:
+        diferencias, espera_max_ms = _pendientes()
+        if not diferencias:
+            return
+        _sumar_compartidos(diferencias, espera_max_ms)
+        with _lock:
+            for campo, valor in diferencias.items():
+                _publicado[campo] = _publicado.get(campo, 0) + valor
+    finally:
+        _lock_publicacion.release()
+
+
+def _toca_publicar():
+    global _ultima_publicacion
+    ahora = time.monotonic()
+    intervalo = getattr(settings, 'METRICAS_INTERVALO_PUBLICACION', 15)
+    with _lock:
+        if ahora - _ultima_publicacion < intervalo:
+            return False
+        _ultima_publicacion = ahora
+        return True
+
+
+def _publicar():
+    try:
+        publicar()
+    except Exception:
+        logger.exception('No se pudieron publicar las métricas del proceso')
+
+
+def _publicar_si_corresponde():
+    if _toca_publicar():
+        _publicar()
+
+
+# ---------------------------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------------------------
+
+def _nombre_vista(request):
+    match = getattr(request, 'resolver_match', None)
+    # Las rutas inexistentes se agrupan para no multiplicar las series
+    return match.view_name if match else 'sin_ruta'
+
+
+def _server_timing(duracion, medicion):
+    return ', '.join([
+        f'total;dur={duracion * 1000:.1f}',
+        f'db;dur={medicion.sql_s * 1000:.1f};desc="{medicion.consultas} consultas"',
+        f'cache;desc="{medicion.aciertos_cache} aciertos, {medicion.fallos_cache} fallos"',
+        f'serializer;dur={medicion.serializer_s * 1000:.1f}',
+    ])
+
+
+def _registrar_peticion_lenta(request, vista, duracion, medicion):
+    consultas = '\n'.join(
+        f'  {segundos * 1000:.1f} ms  {sql[:500]}'
+        for segundos, sql in sorted(medicion.top_sql, reverse=True)
+    )
+    logger.warning(
+        'Petición lenta %s %s (%s): %.0f ms, %d consultas en %.0f ms, '
+        'caché %d/%d, serialización %.0f ms\n%s',
+        request.method, request.path, vista, duracion * 1000,
+        medicion.consultas, medicion.sql_s * 1000,
+        medicion.aciertos_cache, medicion.fallos_cache,
+        medicion.serializer_s * 1000, consultas,
+    )
+
+
+class MetricasMiddleware:
+    """
+    Medir cada petición y acumular por vista (ver docstring del módulo).
+    Es síncrono y asíncrono: bajo ASGI no obliga a pasar la petición por un hilo.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        _instalar_medicion_serializadores()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not getattr(settings, 'METRICAS_HABILITADAS', True):
+            return self.get_response(request)
+
+        medicion, token = self._iniciar()
+        try:
+            response = self.get_response(request)
+        finally:
+            _medicion_actual.reset(token)
+
+        self._terminar(request, response, medicion)
+        _publicar_si_corresponde()
+        return response
+
+    async def __acall__(self, request):
+        if not getattr(settings, 'METRICAS_HABILITADAS', True):
+            return await self.get_response(request)
+
+        medicion, token = self._iniciar()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _medicion_actual.reset(token)
+
+        self._terminar(request, response, medicion)
+        if _toca_publicar():
+            # publicar() escribe en la caché: fuera del event loop
+            await sync_to_async(_publicar, thread_sensitive=False)()
+        return response
+
+    @staticmethod
+    def _iniciar():
+        # Las conexiones abiertas antes de cargar este módulo no pasaron por la señal
+        for conexion in connections.all():
+            _instalar_en_conexion(conexion)
+
+        medicion = Medicion()
+        return medicion, _medicion_actual.set(medicion)
+
+    @staticmethod
+    def _terminar(request, response, medicion):
+        duracion = time.perf_counter() - medicion.inicio
+        vista = _nombre_vista(request)
+        _acumular(vista, request.method, response.status_code, duracion, medicion)
+
+        if getattr(settings, 'METRICAS_SERVER_TIMING', False):
+            response['Server-Timing'] = _server_timing(duracion, medicion)
+        if duracion * 1000 >= getattr(settings, 'METRICAS_PETICION_LENTA_MS', 1000):
+            _registrar_peticion_lenta(request, vista, duracion, medicion)
+
+
+# ---------------------------------------------------------------------------
+# Exposición en formato Prometheus
+# ---------------------------------------------------------------------------
+
+def _combinar(instantaneas):
+    vistas = {}
+    conexiones = {'conexiones': 0, 'espera_total_ms': 0.0, 'espera_max_ms': 0.0}
+    for datos in instantaneas:
+        for clave, entrada in datos['vistas'].items():
+            total = vistas.setdefault(clave, _nueva_entrada())
+            for estado, cantidad in entrada['peticiones'].items():
+                total['peticiones'][estado] = total['peticiones'].get(estado, 0) + cantidad
+            total['buckets'] = [a + b for a, b in zip(total['buckets'], entrada['buckets'])]
+            for campo in ('duracion_s', 'consultas', 'sql_s', 'aciertos_cache', 'fallos_cache', 'serializer_s'):
+                total[campo] += entrada[campo]
+        conexiones['conexiones'] += datos['conexiones']['conexiones']
+        conexiones['espera_total_ms'] += datos['conexiones']['espera_total_ms']
+        conexiones['espera_max_ms'] = max(conexiones['espera_max_ms'], datos['conexiones']['espera_max_ms'])
+    return vistas, conexiones
+
+
+def _etiqueta(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def formato_prometheus(instantaneas):
+    """Texto de exposición de Prometheus (versión 0.0.4) para las instantáneas dadas."""
+    vistas, conexiones = _combinar(instantaneas)
+    lineas = []
+
+    def metrica(nombre, tipo, ayuda, muestras):
+        lineas.append(f'# HELP {nombre} {ayuda}')
+        lineas.append(f'# TYPE {nombre} {tipo}')
+        for sufijo, etiquetas, valor in muestras:
+            texto = ','.join(f'{k}="{_etiqueta(v)}"' for k, v in etiquetas.items())
+            lineas.append(f'{nombre}{sufijo}{{{texto}}} {valor}' if texto else f'{nombre}{sufijo} {valor}')
+
+    por_vista = []
+    for clave in sorted(vistas):
+        vista, metodo = clave.split('|', 1)
+        por_vista.append(({'vista': vista, 'metodo': metodo}, vistas[clave]))
+
+    metrica('practicas_http_requests_total', 'counter', 'Peticiones atendidas.', [
+        ('', dict(etiquetas, estado=estado), cantidad)
+        for etiquetas, entrada in por_vista
+        for estado, cantidad in sorted(entrada['peticiones'].items())
+    ])
+
+    histograma = []
+    for etiquetas, entrada in por_vista:
+        for limite, cantidad in zip(BUCKETS, entrada['buckets']):
+            histograma.append(('_bucket', dict(etiquetas, le=limite), cantidad))
+        total = sum(entrada['peticiones'].values())
+        histograma.append(('_bucket', dict(etiquetas, le='+Inf'), total))
+        histograma.append(('_sum', etiquetas, round(entrada['duracion_s'], 6)))
+        histograma.append(('_count', etiquetas, total))
+    metrica('practicas_http_request_duration_seconds', 'histogram', 'Latencia por vista.', histograma)
+
+    for nombre, campo, ayuda in [
+        ('practicas_db_queries_total', 'consultas', 'Consultas SQL ejecutadas.'),
+        ('practicas_db_query_seconds_total', 'sql_s', 'Tiempo en consultas SQL.'),
+        ('practicas_cache_hits_total', 'aciertos_cache', 'Aciertos de caché.'),
+        ('practicas_cache_misses_total', 'fallos_cache', 'Fallos de caché.'),
+        ('practicas_serializer_seconds_total', 'serializer_s', 'Tiempo de serialización DRF.'),
+    ]:
+        metrica(nombre, 'counter', ayuda, [
+            ('', etiquetas, round(entrada[campo], 6)) for etiquetas, entrada in por_vista
+        ])
+
+    metrica('practicas_db_connections_total', 'counter', 'Conexiones nuevas a la base de datos.', [
+        ('', {}, conexiones['conexiones']),
+    ])
+    metrica('practicas_db_connect_wait_seconds_total', 'counter', 'Espera al abrir conexiones.', [
+        ('', {}, round(conexiones['espera_total_ms'] / 1000, 6)),
+    ])
+    metrica('practicas_db_connect_wait_max_seconds', 'gauge', 'Mayor espera al abrir una conexión.', [
+        ('', {}, round(conexiones['espera_max_ms'] / 1000, 6)),
+    ])
+    return '\n'.join(lineas) + '\n'
+
+
+def metricas_view(request):
+    """
+    Métricas de todos los workers en formato Prometheus.
+    Con METRICAS_TOKEN se exige 'Authorization: Bearer <token>'; sin él, solo staff.
+    """
+    token = getattr(settings, 'METRICAS_TOKEN', '')
+    if token:
+        if request.headers.get('Authorization') != f'Bearer {token}':
+            return HttpResponseForbidden()
+    elif not (request.user.is_authenticated and request.user.is_staff):
+        return HttpResponseForbidden()
+
+    # Lo de este proceso que aún no se publicó se suma para no mostrarlo con retraso
+    diferencias, espera_max_ms = _pendientes()
+    contenido = formato_prometheus([contadores_compartidos(), _desaplanar(diferencias, espera_max_ms)])
+    return HttpResponse(contenido, content_type='text/plain; version=0.0.4; charset=utf-8')
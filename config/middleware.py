@@ -0,0 +1,62 @@
+"""
+Versiones síncronas y asíncronas del middleware de terceros.
+
+Bajo ASGI, Django adapta cada middleware solo síncrono con sync_to_async: la
+petición ocupa un hilo durante toda la cadena interior, también mientras una
+vista async espera (p. ej. el sondeo de notificaciones). WhiteNoise 6 y
+django-axes 6 son solo síncronos; estas subclases agregan el camino async
+con la misma lógica y dejan el síncrono intacto para WSGI y las pruebas.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from axes.helpers import get_lockout_response
+from axes.middleware import AxesMiddleware as _AxesMiddleware
+from django.conf import settings
+from whitenoise.middleware import WhiteNoiseMiddleware as _WhiteNoiseMiddleware
+
+
+class SyncAsyncMixin:
+    """Elegir el camino según la cadena: __call__ del padre o __acall__."""
+
+    sync_capable = True
+    async_capable = True
+
+    def _marcar_async(self):
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+
+class WhiteNoiseMiddleware(SyncAsyncMixin, _WhiteNoiseMiddleware):
+    """WhiteNoiseMiddleware; en async sirve el archivo fuera del event loop."""
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self._marcar_async()
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file, thread_sensitive=False)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
+
+
+class AxesMiddleware(SyncAsyncMixin, _AxesMiddleware):
+    """AxesMiddleware; en async arma la respuesta de bloqueo en un hilo."""
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self._marcar_async()
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if getattr(settings, 'AXES_ENABLED', True) and getattr(request, 'axes_locked_out', None):
+            credentials = getattr(request, 'axes_credentials', None)
+            response = await sync_to_async(get_lockout_response)(request, credentials)
+        return response
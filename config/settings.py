@@ -75,15 +75,19 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'config.metricas.MetricasMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # Versiones async-capable de WhiteNoise y axes (ver config/middleware.py)
+    'config.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'config.db.replicas.EscriturasRecientesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'axes.middleware.AxesMiddleware',
+    'config.middleware.AxesMiddleware',
     'simple_history.middleware.HistoryRequestMiddleware',
 ]
 
@@ -106,11 +110,18 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# config/asgi.py define DJANGO_ASGI antes de cargar los settings. Bajo ASGI
+# cada petición corre en un hilo distinto y las conexiones persistentes no
+# se reutilizan: se acumulan hasta agotar las de PostgreSQL (ticket #33497).
+# Ahí CONN_MAX_AGE es 0 por defecto y el pool lo da PgBouncer.
+SERVIDOR_ASGI = env.bool('DJANGO_ASGI', default=False)
+
 DATABASES = {
     'default': {
         'ENGINE': env('DATABASE_ENGINE', default='django.db.backends.sqlite3'),
@@ -119,16 +130,43 @@ DATABASES = {
         'PASSWORD': env('DATABASE_PASSWORD', default=''),
         'HOST': env('DATABASE_HOST', default=''),
         'PORT': env('DATABASE_PORT', default=''),
+        # Conexiones persistentes (solo WSGI): se reutilizan hasta CONN_MAX_AGE
+        # segundos y se verifican antes de reutilizarlas tras un error
+        'CONN_MAX_AGE': env.int('DATABASE_CONN_MAX_AGE', default=0 if SERVIDOR_ASGI else 60),
+        'CONN_HEALTH_CHECKS': env.bool('DATABASE_CONN_HEALTH_CHECKS', default=True),
+        # PgBouncer en modo transacción no admite cursores del lado del servidor
+        # (QuerySet.iterator); usar config.db.iterar_en_lotes para exportaciones
+        'DISABLE_SERVER_SIDE_CURSORS': env.bool('DATABASE_PGBOUNCER', default=False),
     }
 }
 
+# Réplica de solo lectura (opcional) para dashboards, reportes y acciones de
+# lectura de la API (ver config/db/replicas.py). Tras escribir, el usuario lee
+# de 'default' durante DATABASE_REPLICA_STICKY_SECONDS.
+DATABASE_REPLICA_HOST = env('DATABASE_REPLICA_HOST', default='')
+if DATABASE_REPLICA_HOST:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': DATABASE_REPLICA_HOST,
+        'PORT': env('DATABASE_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['config.db.replicas.ReplicaRouter']
+DATABASE_REPLICA_STICKY_SECONDS = env.int('DATABASE_REPLICA_STICKY_SECONDS', default=10)
+
+# Conexiones que tardan más que esto se registran en el log (config.db.postgresql)
+DATABASE_CONNECT_SLOW_MS = env.int('DATABASE_CONNECT_SLOW_MS', default=100)
+
 # Si usas PostgreSQL, la configuración se tomará del .env:
-# DATABASE_ENGINE=django.db.backends.postgresql
+# DATABASE_ENGINE=config.db.postgresql  (backend estándar + métricas de conexión)
 # DATABASE_NAME=practicas_db
 # DATABASE_USER=postgres
 # DATABASE_PASSWORD=postgres
 # DATABASE_HOST=localhost
 # DATABASE_PORT=5432
+# DATABASE_CONN_MAX_AGE=60  (solo con WSGI; bajo ASGI dejar 0 y usar PgBouncer)
+# DATABASE_PGBOUNCER=True  (si DATABASE_HOST apunta a PgBouncer en modo transacción)
+# DATABASE_REPLICA_HOST=replica.local  (réplica de lectura, opcional)
 
 
 # Password validation
@@ -152,6 +190,25 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# PASSWORD_HASH_POLICY=moderno: scrypt (los hashes PBKDF2 existentes se
+# actualizan en el siguiente login). PASSWORD_HASH_POLICY=rapido: MD5, solo
+# para pruebas y benchmarks.
+PASSWORD_HASH_POLICY = env('PASSWORD_HASH_POLICY', default='moderno')
+PASSWORD_SCRYPT_WORK_FACTOR = env.int('PASSWORD_SCRYPT_WORK_FACTOR', default=2**14)
+PASSWORD_PBKDF2_ITERATIONS = env.int('PASSWORD_PBKDF2_ITERATIONS', default=600000)
+
+PASSWORD_HASHERS = [
+    'apps.usuarios.hashers.ScryptPasswordHasher',
+    'apps.usuarios.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+if PASSWORD_HASH_POLICY == 'rapido':
+    PASSWORD_HASHERS.insert(0, 'django.contrib.auth.hashers.MD5PasswordHasher')
+
+# Rehash-on-login en un hilo aparte (en pruebas se hace en línea)
+PASSWORD_REHASH_ASYNC = env.bool('PASSWORD_REHASH_ASYNC', default=PASSWORD_HASH_POLICY != 'rapido')
+
 # Custom User Model
 AUTH_USER_MODEL = 'usuarios.User'
 
@@ -174,8 +231,41 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
+# WhiteNoise sirve los estáticos desde el propio proceso. Con
+# STATIC_MANIFEST=True (imagen de producción, tras collectstatic) los archivos
+# llevan hash en el nombre, se precomprimen y se cachean por un año.
+STATIC_MANIFEST = env.bool('STATIC_MANIFEST', default=False)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'whitenoise.storage.CompressedManifestStaticFilesStorage'
+            if STATIC_MANIFEST else
+            'django.contrib.staticfiles.storage.StaticFilesStorage'
+        ),
+    },
+}
+WHITENOISE_MAX_AGE = env.int('WHITENOISE_MAX_AGE', default=3600)
+
+# Sondeo de notificaciones (long polling): espera máxima e intervalo en segundos
+NOTIFICACIONES_ESPERA_MAXIMA = env.int('NOTIFICACIONES_ESPERA_MAXIMA', default=25)
+NOTIFICACIONES_INTERVALO_SONDEO = env.float('NOTIFICACIONES_INTERVALO_SONDEO', default=2.0)
+
+# Paquetes ZIP de entregables: con más archivos se generan en segundo plano
+ENTREGABLES_ZIP_MAX_ARCHIVOS = env.int('ENTREGABLES_ZIP_MAX_ARCHIVOS', default=300)
+# Similitud (Jaccard estimada) desde la que dos entregables se marcan como casi iguales
+ENTREGABLES_SIMILITUD_UMBRAL = env.float('ENTREGABLES_SIMILITUD_UMBRAL', default=0.6)
+
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Descargas protegidas (config/descargas.py): 'nginx' (X-Accel-Redirect),
+# 'apache' (X-Sendfile) o vacío para que Django envíe el archivo
+DESCARGAS_SERVIDOR = env('DESCARGAS_SERVIDOR', default='')
+DESCARGAS_PREFIJO_INTERNO = env('DESCARGAS_PREFIJO_INTERNO', default='/protegido/')
+# Validez en segundos de la URL firmada a la que se redirige con S3
+DESCARGAS_URL_EXPIRACION = env.int('DESCARGAS_URL_EXPIRACION', default=60)
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -184,8 +274,15 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
 # REST Framework Configuration
+# JWT_CLAIMS_USER: construir request.user desde los claims del token en lugar
+# de consultar el usuario en cada petición (ver apps/usuarios/authentication.py)
+JWT_CLAIMS_USER = env.bool('JWT_CLAIMS_USER', default=False)
+JWT_CLAIMS_STATUS_TTL = env.int('JWT_CLAIMS_STATUS_TTL', default=60)  # segundos
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
+        'apps.usuarios.authentication.JWTClaimsAuthentication'
+        if JWT_CLAIMS_USER else
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
@@ -222,6 +319,10 @@ SIMPLE_JWT = {
     'TOKEN_TYPE_CLAIM': 'token_type',
 }
 
+# Visibilidad por rol (apps/practicas/visibilidad.py): segundos que se guardan
+# en caché las prácticas/estudiantes accesibles por usuario (0 = solo por petición)
+VISIBILIDAD_CACHE_TIMEOUT = env.int('VISIBILIDAD_CACHE_TIMEOUT', default=0)
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = env.list('CORS_ALLOWED_ORIGINS', default=[
     'http://localhost:3000',
@@ -237,6 +338,8 @@ AXES_LOCKOUT_PARAMETERS = [["username"]]  # Solo bloquear por username
 AXES_RESET_ON_SUCCESS = True
 AXES_VERBOSE = True
 AXES_ENABLE_ACCESS_FAILURE_LOG = True
+# El middleware de axes se usa a través de config.middleware.AxesMiddleware
+SILENCED_SYSTEM_CHECKS = ['axes.W002']
 # Cambiar orden: Backend personalizado primero, luego Axes
 AUTHENTICATION_BACKENDS = [
     'apps.usuarios.backends.EmailOrUsernameModelBackend',  # Backend personalizado que permite email O username
@@ -267,12 +370,21 @@ CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
 #         'task': 'apps.encuestas.tasks.enviar_recordatorios_encuestas',
 #         'schedule': crontab(hour=10, minute=0, day_of_week='*'),  # Diario 10:00 AM
 #     },
+#     'actualizar-entregables-vencidos': {
+#         'task': 'apps.practicas.tasks.actualizar_entregables_vencidos',
+#         'schedule': crontab(minute=5),  # Cada hora
+#     },
+#     'limpiar-subidas-directas': {
+#         'task': 'apps.documentos.tasks.limpiar_subidas_directas',
+#         'schedule': crontab(minute=30),  # Cada hora
+#     },
 # }
 
 # Cache Configuration (Redis)
 CACHES = {
     'default': {
-        'BACKEND': 'django_redis.cache.RedisCache',
+        # RedisCache con conteo de aciertos/fallos por petición (config/metricas.py)
+        'BACKEND': 'config.metricas.RedisCacheMedido',
         'LOCATION': env('REDIS_CACHE_URL', default='redis://localhost:6379/1'),
         'OPTIONS': {
             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
@@ -282,6 +394,15 @@ CACHES = {
     }
 }
 
+# Instrumentación por petición (config/metricas.py): Server-Timing, /metrics
+# en formato Prometheus y log de peticiones lentas con sus consultas más caras
+METRICAS_HABILITADAS = env.bool('METRICAS_HABILITADAS', default=True)
+METRICAS_SERVER_TIMING = env.bool('METRICAS_SERVER_TIMING', default=DEBUG)
+METRICAS_PETICION_LENTA_MS = env.int('METRICAS_PETICION_LENTA_MS', default=1000)
+METRICAS_INTERVALO_PUBLICACION = env.int('METRICAS_INTERVALO_PUBLICACION', default=15)  # segundos
+# Token para el scrape de Prometheus; sin token /metrics solo lo ve el staff
+METRICAS_TOKEN = env('METRICAS_TOKEN', default='')
+
 # Email Configuration
 EMAIL_BACKEND = env('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
 EMAIL_HOST = env('EMAIL_HOST', default='smtp.gmail.com')
@@ -312,6 +433,16 @@ ALLOWED_MIME_TYPES = [
     'application/zip',
 ]
 
+# Validación de subidas (config/archivos.py): tamaño máximo por archivo y
+# límites de la revisión diferida de ZIP/Office
+ARCHIVOS_TAMANO_MAXIMO = env.int('ARCHIVOS_TAMANO_MAXIMO_MB', default=25) * 1024 * 1024
+ARCHIVOS_ZIP_MAX_ENTRADAS = env.int('ARCHIVOS_ZIP_MAX_ENTRADAS', default=5000)
+ARCHIVOS_ZIP_MAX_DESCOMPRIMIDO = env.int('ARCHIVOS_ZIP_MAX_DESCOMPRIMIDO_MB', default=200) * 1024 * 1024
+
+# Subidas directas al storage (config/subidas.py): backend y validez de la URL firmada
+SUBIDAS_DIRECTAS_BACKEND = 'config.subidas.AlmacenamientoLocal'
+SUBIDAS_DIRECTAS_EXPIRACION = env.int('SUBIDAS_DIRECTAS_EXPIRACION', default=15 * 60)
+
 # AWS S3 Configuration (Optional - for production)
 USE_S3 = env.bool('USE_S3', default=False)
 
@@ -329,7 +460,8 @@ if USE_S3:
     AWS_S3_FILE_OVERWRITE = False
     
     # S3 Storage backends
-    DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
+    STORAGES['default'] = {'BACKEND': 'storages.backends.s3boto3.S3Boto3Storage'}
+    SUBIDAS_DIRECTAS_BACKEND = 'config.subidas.AlmacenamientoS3'
     MEDIA_URL = f'https://{AWS_S3_CUSTOM_DOMAIN}/media/'
 
 # Application-specific settings
@@ -337,20 +469,39 @@ MAX_ESTUDIANTES_POR_PROFESOR = env.int('MAX_ESTUDIANTES_POR_PROFESOR', default=1
 MAX_ESTUDIANTES_POR_TUTOR = env.int('MAX_ESTUDIANTES_POR_TUTOR', default=5)
 
 # Sentry Configuration (Optional)
+# Se traza una fracción SENTRY_TRACES_MUESTREO de las peticiones (todas por
+# defecto). De esas, errores y transacciones lentas se envían siempre y del
+# tráfico sano unas SENTRY_TRACES_POR_MINUTO por endpoint (ver config/trazas.py).
 SENTRY_DSN = env('SENTRY_DSN', default=None)
+SENTRY_TRACES_MUESTREO = env.float('SENTRY_TRACES_MUESTREO', default=1.0)
+SENTRY_TRACES_POR_MINUTO = env.int('SENTRY_TRACES_POR_MINUTO', default=30)
+SENTRY_TRACES_LENTA_MS = env.int('SENTRY_TRACES_LENTA_MS', default=1000)
 if SENTRY_DSN:
     import sentry_sdk
     from sentry_sdk.integrations.django import DjangoIntegration
+    from config.trazas import traces_sampler, before_send_transaction
     
     sentry_sdk.init(
         dsn=SENTRY_DSN,
         integrations=[DjangoIntegration()],
-        traces_sample_rate=1.0,
-        send_default_pii=True,
+        traces_sampler=traces_sampler,
+        before_send_transaction=before_send_transaction,
+        send_default_pii=False,
         environment='production' if not DEBUG else 'development',
     )
 
 # Logging Configuration
+# Los loggers escriben en 'queue' (config.logs.ColaHandler) y un hilo aparte
+# pasa los registros a consola y archivo; el archivo va en JSON y la consola
+# también con LOG_JSON=True. Todos los workers de gunicorn escriben el mismo
+# archivo, así que ninguno lo rota: lo hace logrotate (config/logrotate.conf)
+# y WatchedFileHandler lo reabre cuando cambia. 'queue' debe ordenarse después de sus
+# destinos (dictConfig crea los handlers en orden alfabético).
+LOGS_DIR = BASE_DIR / 'logs'
+LOGS_DIR.mkdir(exist_ok=True)
+LOG_LEVEL = env('LOG_LEVEL', default='INFO')
+LOG_JSON = env.bool('LOG_JSON', default=not DEBUG)
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -359,38 +510,42 @@ LOGGING = {
             'format': '{levelname} {asctime} {module} {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'config.logs.FormatoJSON',
+        },
     },
     'handlers': {
         'file': {
             'level': 'INFO',
-            'class': 'logging.FileHandler',
-            'filename': BASE_DIR / 'logs' / 'django.log',
-            'formatter': 'verbose',
+            'class': 'logging.handlers.WatchedFileHandler',
+            'filename': LOGS_DIR / 'django.log',
+            'formatter': 'json',
         },
         'console': {
             'level': 'DEBUG',
             'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
+            'formatter': 'json' if LOG_JSON else 'verbose',
+        },
+        'queue': {
+            '()': 'config.logs.ColaHandler',
+            'destinos': ['console', 'file'],
+            'capacidad': env.int('LOG_QUEUE_SIZE', default=10000),
         },
     },
     'root': {
-        'handlers': ['console', 'file'],
+        'handlers': ['queue'],
         'level': 'INFO',
     },
     'loggers': {
         'django': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
         'apps': {
-            'handlers': ['console', 'file'],
-            'level': 'DEBUG',
+            'handlers': ['queue'],
+            'level': LOG_LEVEL,
             'propagate': False,
         },
     },
 }
-
-# Create logs directory if it doesn't exist
-LOGS_DIR = BASE_DIR / 'logs'
-LOGS_DIR.mkdir(exist_ok=True)
@@ -0,0 +1,160 @@
+"""
+Subidas directas al storage con URL prefirmada.
+
+El cliente declara el archivo (nombre, tamaño y SHA-256), recibe una URL y
+los campos de un formulario POST firmado y envía el archivo directamente al
+almacenamiento; al terminar avisa a la API, que verifica el archivo y lo
+adjunta (ver apps/documentos/subidas.py). Los bytes no pasan por los
+workers web.
+
+SUBIDAS_DIRECTAS_BACKEND elige el backend:
+- AlmacenamientoS3 (con USE_S3): presigned POST de S3; la política fija el
+  tamaño exacto y el Content-Type, así S3 rechaza cualquier otro archivo;
+- AlmacenamientoLocal (desarrollo y pruebas): firma la misma política con
+  django.core.signing y la recibe recibir_subida_local(), que guarda el
+  archivo en el storage por defecto.
+Los dos escriben en el storage por defecto bajo una clave temporal
+(PREFIJO_TEMPORAL). La firma sigue valiendo un rato después de completar,
+así que el cliente nunca escribe en el nombre definitivo: al verificar se
+mueve el archivo (copia del lado del servidor en S3) y se borra la clave
+temporal. En S3 conviene una regla de ciclo de vida sobre el prefijo para
+lo que se vuelva a subir después de mover.
+"""
+import os
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, Http404
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+
+SAL_POLITICA = 'config.subidas.politica'
+PREFIJO_TEMPORAL = 'subidas'
+
+
+def expiracion():
+    """Segundos de validez de la URL firmada."""
+    return getattr(settings, 'SUBIDAS_DIRECTAS_EXPIRACION', 15 * 60)
+
+
+def clave_para(instancia, campo, nombre):
+    """
+    Nombre en el storage para `nombre` según el upload_to del FileField
+    `campo`, en una carpeta propia para que no choque con otros archivos.
+    """
+    generado = instancia._meta.get_field(campo).generate_filename(instancia, nombre)
+    return os.path.join(os.path.dirname(generado), uuid.uuid4().hex, os.path.basename(generado))
+
+
+def clave_temporal(clave):
+    """Clave donde sube el cliente el archivo que terminará en `clave`."""
+    return os.path.join(PREFIJO_TEMPORAL, uuid.uuid4().hex, os.path.basename(clave))
+
+
+class AlmacenamientoDirecto:
+    """Backend de subidas directas sobre el storage por defecto."""
+
+    def firmar(self, clave, tamano, mime):
+        """URL y campos del formulario POST para subir exactamente ese archivo a `clave`."""
+        raise NotImplementedError
+
+    def tamano(self, clave):
+        """Tamaño del archivo subido o None si todavía no existe."""
+        if not default_storage.exists(clave):
+            return None
+        return default_storage.size(clave)
+
+    def mover(self, origen, destino):
+        """Llevar el archivo de `origen` a `destino` y borrar `origen`."""
+        with default_storage.open(origen, 'rb') as archivo:
+            default_storage.save(destino, archivo)
+        default_storage.delete(origen)
+
+    def eliminar(self, clave):
+        default_storage.delete(clave)
+
+
+class AlmacenamientoLocal(AlmacenamientoDirecto):
+    """Sustituto de S3 para desarrollo y pruebas: la subida la recibe Django."""
+
+    def firmar(self, clave, tamano, mime):
+        politica = signing.dumps({'clave': clave, 'tamano': tamano, 'mime': mime}, salt=SAL_POLITICA)
+        return {
+            'url': reverse('subida_local'),
+            'campos': {'key': clave, 'Content-Type': mime, 'policy': politica},
+        }
+
+
+class AlmacenamientoS3(AlmacenamientoDirecto):
+    """Presigned POST al bucket de django-storages (AWS_STORAGE_BUCKET_NAME)."""
+
+    def firmar(self, clave, tamano, mime):
+        cliente = default_storage.bucket.meta.client
+        firmado = cliente.generate_presigned_post(
+            Bucket=default_storage.bucket_name,
+            Key=default_storage._normalize_name(clave),
+            Fields={'Content-Type': mime},
+            Conditions=[{'Content-Type': mime}, ['content-length-range', tamano, tamano]],
+            ExpiresIn=expiracion(),
+        )
+        return {'url': firmado['url'], 'campos': firmado['fields']}
+
+    def mover(self, origen, destino):
+        # Copia del lado del servidor: los bytes no pasan por el worker
+        from botocore.exceptions import ClientError
+
+        cliente = default_storage.bucket.meta.client
+        bucket = default_storage.bucket_name
+        origen, destino = default_storage._normalize_name(origen), default_storage._normalize_name(destino)
+        try:
+            cliente.copy_object(Bucket=bucket, Key=destino, CopySource={'Bucket': bucket, 'Key': origen})
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('NoSuchKey', '404'):
+                raise FileNotFoundError(origen) from e
+            raise
+        cliente.delete_object(Bucket=bucket, Key=origen)
+
+
+def obtener_backend():
+    ruta = getattr(settings, 'SUBIDAS_DIRECTAS_BACKEND', 'config.subidas.AlmacenamientoLocal')
+    return import_string(ruta)()
+
+
+@csrf_exempt
+@require_POST
+def recibir_subida_local(request):
+    """
+    Recibe el POST que en producción iría a S3 (multipart con key, policy y
+    file). La política firmada es la autorización, como en S3; además solo
+    se aceptan claves de subidas que siguen pendientes.
+    """
+    from apps.documentos.models import SubidaDirecta
+
+    if not isinstance(obtener_backend(), AlmacenamientoLocal):
+        raise Http404
+    try:
+        politica = signing.loads(request.POST.get('policy', ''), salt=SAL_POLITICA, max_age=expiracion())
+    except signing.BadSignature:
+        return HttpResponseForbidden('Política inválida o vencida.')
+    if request.POST.get('key') != politica['clave'] or request.POST.get('Content-Type') != politica['mime']:
+        return HttpResponseForbidden('La clave o el tipo no corresponden a la política.')
+    pendiente = SubidaDirecta.objects.filter(
+        clave_temporal=politica['clave'], estado=SubidaDirecta.PENDIENTE
+    ).exists()
+    if not pendiente:
+        return HttpResponseForbidden('La subida ya se completó o fue rechazada.')
+    archivo = request.FILES.get('file')
+    if archivo is None:
+        return HttpResponseBadRequest('Falta el archivo.')
+    if archivo.size != politica['tamano']:
+        return HttpResponseBadRequest('El tamaño no corresponde a la política.')
+
+    # Como en S3, una nueva subida a la misma clave reemplaza la anterior
+    default_storage.delete(politica['clave'])
+    default_storage.save(politica['clave'], archivo)
+    return HttpResponse(status=204)
@@ -0,0 +1,102 @@
+"""
+Muestreo adaptativo de trazas de Sentry por endpoint.
+
+traces_sampler decide al inicio qué se traza: nada de las rutas sin interés
+(estáticos, /metrics) y una fracción SENTRY_TRACES_MUESTREO del resto. Con
+1.0 (por defecto) se trazan todas las peticiones: la instrumentación se paga
+en cada una y solo el envío se muestrea. Bajarlo reduce ese costo, pero
+también se pierde esa fracción de errores y transacciones lentas.
+
+De lo trazado, el envío se decide al terminar, en before_send_transaction,
+cuando ya se conoce la duración y el resultado:
+- las transacciones con error o más lentas que SENTRY_TRACES_LENTA_MS se
+  envían siempre;
+- del tráfico sano de cada endpoint se envían unas SENTRY_TRACES_POR_MINUTO
+  por minuto: la probabilidad se ajusta con la tasa observada, así los
+  endpoints de mucho tráfico no consumen toda la cuota y los de poco
+  tráfico siguen apareciendo.
+"""
+import random
+import threading
+import time
+from datetime import datetime
+
+from django.conf import settings
+
+
+RUTAS_EXCLUIDAS = ('/static/', '/media/', '/metrics', '/favicon.ico')
+VENTANA_S = 60
+
+
+class MuestreadorAdaptativo:
+    """Probabilidad de envío por endpoint según su tasa en la última ventana."""
+
+    def __init__(self, por_minuto, ventana_s=VENTANA_S, aleatorio=random.random):
+        self.por_minuto = por_minuto
+        self.ventana_s = ventana_s
+        self.aleatorio = aleatorio
+        self._lock = threading.Lock()
+        self._ventanas = {}  # endpoint -> (inicio de la ventana, vistas, tasa anterior)
+
+    def probabilidad(self, endpoint, ahora=None):
+        """Registrar una transacción del endpoint y devolver su probabilidad de envío."""
+        ahora = time.monotonic() if ahora is None else ahora
+        with self._lock:
+            inicio, vistas, anterior = self._ventanas.get(endpoint, (ahora, 0, 0))
+            if ahora - inicio >= self.ventana_s:
+                inicio, vistas, anterior = ahora, 0, vistas
+            vistas += 1
+            self._ventanas[endpoint] = (inicio, vistas, anterior)
+        # Se estima con la mayor de las dos ventanas para no sobremuestrear al
+        # empezar una ventana nueva
+        tasa = max(vistas, anterior) * VENTANA_S / self.ventana_s
+        return min(1.0, self.por_minuto / tasa)
+
+    def conservar(self, endpoint, ahora=None):
+        return self.aleatorio() < self.probabilidad(endpoint, ahora)
+
+
+_muestreador = None
+
+
+def _obtener_muestreador():
+    global _muestreador
+    if _muestreador is None:
+        _muestreador = MuestreadorAdaptativo(getattr(settings, 'SENTRY_TRACES_POR_MINUTO', 30))
+    return _muestreador
+
+
+def _segundos(valor):
+    if isinstance(valor, datetime):
+        return valor.timestamp()
+    if isinstance(valor, str):
+        return datetime.fromisoformat(valor.replace('Z', '+00:00')).timestamp()
+    return float(valor)
+
+
+def traces_sampler(contexto):
+    """Descartar las rutas excluidas y trazar SENTRY_TRACES_MUESTREO del resto."""
+    scope = (contexto.get('asgi_scope') or {})
+    entorno = (contexto.get('wsgi_environ') or {})
+    ruta = scope.get('path') or entorno.get('PATH_INFO') or ''
+    if ruta.startswith(RUTAS_EXCLUIDAS):
+        return 0.0
+    return getattr(settings, 'SENTRY_TRACES_MUESTREO', 1.0)
+
+
+def before_send_transaction(event, hint):
+    """Conservar errores y transacciones lentas; muestrear el tráfico sano por endpoint."""
+    traza = event.get('contexts', {}).get('trace', {})
+    if traza.get('status') not in (None, 'ok'):
+        return event
+
+    try:
+        duracion_ms = (_segundos(event['timestamp']) - _segundos(event['start_timestamp'])) * 1000
+    except (KeyError, TypeError, ValueError):
+        duracion_ms = 0
+    if duracion_ms >= getattr(settings, 'SENTRY_TRACES_LENTA_MS', 1000):
+        return event
+
+    if _obtener_muestreador().conservar(event.get('transaction') or ''):
+        return event
+    return None
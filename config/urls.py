@@ -14,9 +14,12 @@ from rest_framework_simplejwt.views import (
 )
 from apps.usuarios.auth_views import CustomTokenObtainPairView
 from . import views
+from .metricas import metricas_view
+from .subidas import recibir_subida_local
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metricas_view, name='metricas'),
     
     # Template-based views
     path('', views.login_view, name='login'),
@@ -52,6 +55,9 @@ urlpatterns = [
     path('api/auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/auth/verify/', TokenVerifyView.as_view(), name='token_verify'),
     
+    # Receptor de subidas directas en desarrollo (config/subidas.py)
+    path('api/subidas/local/', recibir_subida_local, name='subida_local'),
+    
     # App URLs (API)
     path('api/usuarios/', include('apps.usuarios.urls')),
     path('api/vacantes/', include('apps.vacantes.urls')),
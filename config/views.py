@@ -10,6 +10,8 @@ from apps.usuarios.models import User
 from apps.vacantes.models import Vacante, Empresa
 from apps.practicas.models import Practica
 from apps.postulaciones.models import Postulacion
+from apps.encuestas.respuestas import encuestas_pendientes
+from .db.replicas import vista_en_replica
 from .forms import LoginForm, EstudianteForm, VacanteForm
 
 
@@ -23,25 +25,22 @@ def login_view(request):
     
     if request.method == 'POST':
         form = LoginForm(request.POST)
-        logger.debug(f"POST data: {request.POST}")
         
         if form.is_valid():
             username = form.cleaned_data['username']
             password = form.cleaned_data['password']
-            logger.info(f"Intento de login - Usuario: {username}")
-            
             user = authenticate(request, username=username, password=password)
-            logger.info(f"Resultado authenticate: {user}")
             
             if user is not None:
                 login(request, user)
                 messages.success(request, f'¡Bienvenido, {user.get_full_name() or user.username}!')
                 return redirect('dashboard')
             else:
-                logger.warning(f"Login fallido para usuario: {username}")
+                # Sin el identificador: django-axes ya registra los intentos fallidos
+                logger.info('Login fallido desde el formulario web')
                 messages.error(request, 'Credenciales inválidas')
         else:
-            logger.error(f"Form no válido: {form.errors}")
+            logger.info('Formulario de login no válido: %s', ', '.join(form.errors))
     else:
         form = LoginForm()
     
@@ -56,6 +55,7 @@ def logout_view(request):
 
 
 @login_required
+@vista_en_replica
 def dashboard_view(request):
     """Dashboard principal"""
     stats = {}
@@ -79,6 +79,7 @@ def dashboard_view(request):
                 estudiante=request.user,
                 estado='EN_PROCESO'
             ).exists(),
+            'encuestas_pendientes': encuestas_pendientes(request.user).count(),
         }
     
     return render(request, 'dashboard.html', {'stats': stats})
@@ -246,11 +247,12 @@ def vacante_close(request, pk):
 
 
 @login_required
+@vista_en_replica
 def dashboard_coordinadora(request):
     """Dashboard para Coordinadora Empresarial"""
-    from django.db.models import Avg
     from apps.usuarios.decorators import role_required
     from apps.entregables.models import Entregable
+    from apps.practicas.agregados import anotar_vencidos
     
     # Verificar permisos
     if request.user.role != 'COORDINADORA_EMPRESARIAL':
@@ -263,19 +265,15 @@ def dashboard_coordinadora(request):
     empresas_activas = Empresa.objects.filter(activa=True).count()
     vacantes_disponibles = Vacante.objects.filter(estado='ABIERTA').count()
     
-    # Prácticas que requieren atención
-    practicas_alerta = Practica.objects.filter(
+    # Prácticas que requieren atención (primero las de más entregables vencidos, contados al momento)
+    practicas_alerta = anotar_vencidos(Practica.objects.filter(
         estado='EN_PROCESO'
-    ).select_related('estudiante', 'empresa', 'docente_asesor')[:5]
+    )).select_related('estudiante', 'empresa', 'docente_asesor').order_by('-vencidos', '-created_at')[:5]
     
     # Agregar alertas a las prácticas
     for practica in practicas_alerta:
-        entregables_pendientes = practica.entregables.filter(
-            estado='PENDIENTE',
-            fecha_limite__lt=timezone.now()
-        ).count()
-        if entregables_pendientes > 0:
-            practica.alerta = f'{entregables_pendientes} entregables vencidos'
+        if practica.vencidos > 0:
+            practica.alerta = f'{practica.vencidos} entregables vencidos'
         else:
             practica.alerta = 'Sin alertas'
     
@@ -286,20 +284,13 @@ def dashboard_coordinadora(request):
     ).select_related('estudiante', 'empresa')
     
     for practica in practicas_con_notas[:10]:
-        entregables = practica.entregables.all()
-        total_entregables = entregables.count()
-        entregables_evaluados = entregables.filter(calificacion__isnull=False).count()
-        promedio = entregables.filter(
-            calificacion__isnull=False
-        ).aggregate(Avg('calificacion'))['calificacion__avg'] or 0
-        
         estudiantes_con_notas.append({
             'id': practica.estudiante.id,
             'nombre': practica.estudiante.get_full_name(),
             'empresa': practica.empresa.nombre if practica.empresa else 'N/A',
-            'total_entregables': total_entregables,
-            'entregables_evaluados': entregables_evaluados,
-            'promedio': promedio,
+            'total_entregables': practica.entregables_total,
+            'entregables_evaluados': practica.entregables_evaluados,
+            'promedio': practica.promedio_calificacion or 0,
         })
     
     # Actividad reciente del sistema
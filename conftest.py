@@ -108,6 +108,13 @@ def disable_celery(settings):
     settings.CELERY_TASK_EAGER_PROPAGATES = True
 
 
+@pytest.fixture(autouse=True)
+def fast_password_hasher(settings):
+    """Usar un hasher rápido y rehash en línea en pruebas."""
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    settings.PASSWORD_REHASH_ASYNC = False
+
+
 @pytest.fixture
 def mock_storage(mocker):
     """Mock para Django storage en pruebas de archivos."""
@@ -1,8 +1,12 @@
 """
 Script para crear usuarios de prueba para cada rol del sistema.
-Ejecutar con: python crear_usuarios_prueba.py
+Ejecutar con: python crear_usuarios_prueba.py [--estudiantes N]
+
+--estudiantes N crea además N estudiantes en bloque (hash en paralelo).
+Con PASSWORD_HASH_POLICY=rapido el hash es casi instantáneo.
 """
 
+import argparse
 import os
 import django
 
@@ -126,5 +130,33 @@ def crear_usuarios_prueba():
     print(f"  - Estudiante: estudiante@universidad.edu.pe")
     print("\n¡Listo! Ahora puedes iniciar sesión con cualquiera de estos usuarios.")
 
+
+def crear_estudiantes_en_bloque(cantidad, password='nuclear123'):
+    """Crear `cantidad` estudiantes con bulk_create y hash en un pool de procesos."""
+    inicio = User.objects.filter(username__startswith='estudiante_bloque_').count()
+    estudiantes = [
+        User(
+            username=f'estudiante_bloque_{n}',
+            email=f'estudiante_bloque_{n}@universidad.edu.pe',
+            first_name='Estudiante',
+            last_name=f'Prueba {n}',
+            role=User.ESTUDIANTE,
+            matricula=f'BLQ{n:08d}',
+            carrera='Ingeniería de Sistemas',
+            is_active=True,
+        )
+        for n in range(inicio, inicio + cantidad)
+    ]
+    User.objects.bulk_create_users(estudiantes, [password] * cantidad)
+    print(f"✅ {cantidad} estudiantes creados en bloque (password: {password})")
+
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Crear usuarios de prueba')
+    parser.add_argument('--estudiantes', type=int, default=0,
+                        help='Cantidad de estudiantes adicionales a crear en bloque')
+    args = parser.parse_args()
+    
     crear_usuarios_prueba()
+    if args.estudiantes:
+        crear_estudiantes_en_bloque(args.estudiantes)